@@ -16,6 +16,31 @@ class Settings(BaseSettings):
     api_key_header_name: str = "X-API-Key"
     openai_api_key: str = ""
 
+    # Embedding backend (app.services.embedding): "openai" calls
+    # text-embedding-3-small; "local" runs LOCAL_EMBEDDING_MODEL
+    # (sentence-transformers, `local-embeddings` extra) on CPU in
+    # LOCAL_EMBEDDING_WORKERS pool processes, LOCAL_EMBEDDING_BATCH_SIZE texts
+    # per encode, optionally truncated to LOCAL_EMBEDDING_DIMENSIONS (0 = the
+    # model's native width). Search only matches vectors of the active model.
+    embedding_backend: str = "openai"
+    local_embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    local_embedding_dimensions: int = 0
+    local_embedding_batch_size: int = 32
+    local_embedding_workers: int = 1
+    # Embedding reuse (app.services.embedding_cache): texts are looked up by
+    # SHA-256 + model in an in-process LRU (EMBEDDING_CACHE_MEMORY_ENTRIES)
+    # and the embedding_cache table before the backend is called.
+    embedding_cache_enabled: bool = True
+    embedding_cache_memory_entries: int = 4096
+    # Re-embedding migrations (app.services.reembed, scripts/reembed.py):
+    # shadow-embed REEMBED_BATCH_SIZE traces per committed batch, at most
+    # REEMBED_MAX_PER_SECOND traces/s. Once a migration is switched its model
+    # overrides EMBEDDING_BACKEND; every process re-reads it each
+    # EMBEDDING_MODEL_REFRESH_SECONDS.
+    reembed_batch_size: int = 200
+    reembed_max_per_second: float = 100.0
+    embedding_model_refresh_seconds: int = 30
+
     # Admin dashboard token — gates /api/v1/admin/* endpoints. Empty disables admin routes.
     admin_dashboard_token: str = ""
 
@@ -26,6 +51,135 @@ class Settings(BaseSettings):
     consolidation_interval_hours: int = 24
     consolidation_stale_age_days: int = 180
 
+    # Convergence clustering — neighbours are found in batches instead of one
+    # kNN query per trace. "hnsw" probes the pgvector index with one LATERAL
+    # query per CONVERGENCE_BATCH_SIZE traces; "numpy" loads the embeddings
+    # once and runs an exact in-memory pass (~6 KB of RAM per embedded trace).
+    convergence_knn_backend: str = "hnsw"
+    convergence_batch_size: int = 500
+    convergence_neighbors: int = 50
+
+    # Alternative/contradiction detection — only clusters whose members,
+    # their trust bands or their vectors changed since the last scan are
+    # re-scored. Clusters larger than ALTERNATIVES_MAX_CLUSTER_SIZE are
+    # sampled down to that many members, or skipped entirely when
+    # ALTERNATIVES_SAMPLE_OVERSIZED=false.
+    alternatives_max_cluster_size: int = 500
+    alternatives_sample_oversized: bool = True
+
+    # Knowledge-health early warning — duplicate/conflict pairs are found by
+    # per-trace HNSW kNN (HEALTH_SCAN_NEIGHBORS per trace and vector) and kept
+    # in health_pairs. Every HEALTH_SCAN_INTERVAL_MINUTES only traces embedded
+    # or re-embedded since their last scan are probed, at most
+    # HEALTH_SCAN_MAX_TRACES per run.
+    health_scan_neighbors: int = 20
+    health_scan_interval_minutes: int = 10
+    health_scan_max_traces: int = 5000
+    # The full knowledge-health report is materialized into report_snapshots
+    # every KNOWLEDGE_HEALTH_REFRESH_MINUTES; the endpoint serves the snapshot
+    # and, once it is older than that, revalidates it in the background.
+    knowledge_health_refresh_minutes: int = 15
+    knowledge_health_stale_while_revalidate_seconds: int = 3600
+
+    # Semantic search engine (app.services.vector_search): "pgvector" queries
+    # the HNSW index; "memory" keeps an exact in-process NumPy index of every
+    # embedding (~6 KB of RAM per trace), loaded at startup and resynced
+    # every VECTOR_INDEX_SYNC_MINUTES, and only hydrates the top-k from Postgres.
+    vector_search_backend: str = "pgvector"
+    vector_index_sync_minutes: int = 5
+    # Compact HNSW index the pgvector engine shortlists from (migration 0031):
+    # "none" = full-precision index; "halfvec" = 16-bit floats; "binary" =
+    # binary_quantize + Hamming. The shortlist (limit × VECTOR_RESCORE_FACTOR)
+    # is re-ranked by exact cosine distance on the float32 column.
+    vector_quantization: str = "none"
+    vector_rescore_factor: int = 4
+    # ANN planning: search over-fetches limit × SEARCH_OVERFETCH_FACTOR
+    # candidates (capped at SEARCH_MAX_CANDIDATES) for re-ranking; ef_search is
+    # sized from that, the tag filter's selectivity (eligible-row counts cached
+    # SEARCH_SELECTIVITY_CACHE_SECONDS) and the observed yield of recent probes.
+    # A tag-filtered probe that still comes back short is retried with
+    # hnsw.iterative_scan (pgvector >= 0.8; disable for older servers).
+    search_overfetch_factor: int = 10
+    search_max_candidates: int = 200
+    search_selectivity_cache_seconds: int = 60
+    search_iterative_scan: bool = True
+    # Tag pre-filter (app.services.tag_index): an in-process bitset per tag,
+    # rebuilt from trace_tags every TAG_INDEX_REFRESH_MINUTES and updated on
+    # submit/delete. AND-tag filters resolve to candidate ids before the vector
+    # search; pgvector uses the SQL semi-join instead when more than
+    # TAG_INDEX_MAX_CANDIDATES traces match.
+    tag_index_enabled: bool = True
+    tag_index_refresh_minutes: int = 10
+    tag_index_max_candidates: int = 20000
+    # Tag resolution on submit (app.services.tags): name -> id cache, cleared
+    # when it would exceed TAG_ID_CACHE_ENTRIES.
+    tag_id_cache_entries: int = 50000
+    # Multi-vector retrieval (search mode "multi_vector"): content, solution and
+    # context-embedding legs run as one UNION ALL of HNSW probes (solution and
+    # context capped at SEARCH_MULTI_VECTOR_LEG_LIMIT rows each) and are fused
+    # with reciprocal rank fusion, score = Σ 1 / (SEARCH_RRF_K + rank).
+    search_multi_vector_leg_limit: int = 50
+    search_rrf_k: int = 60
+    # Lexical leg (app.services.lexical_search): a ts_rank_cd full-text query
+    # over traces.search_tsv (top SEARCH_LEXICAL_LIMIT) runs alongside the
+    # vector search and is RRF-fused with it. When embedding the query takes
+    # longer than SEARCH_EMBEDDING_TIMEOUT_SECONDS or is unavailable, search
+    # answers from the lexical ranking alone instead of failing.
+    search_lexical_enabled: bool = True
+    search_lexical_limit: int = 50
+    search_embedding_timeout_seconds: float = 1.5
+    # Batch search (POST /traces/search/batch): the searches of one request
+    # run concurrently, each on its own pooled session, at most
+    # SEARCH_BATCH_CONCURRENCY at a time.
+    search_batch_concurrency: int = 4
+
+    # Hourly tag trends — an hourly per-tag rollup (tag_activity_hourly),
+    # refreshed incrementally every TAG_TRENDS_HOURLY_REFRESH_MINUTES, backs
+    # GET /api/v1/tags/trending?window=hourly (last N hours vs the N before).
+    tag_trends_hourly_enabled: bool = False
+    tag_trends_hourly_window_hours: int = 24
+    tag_trends_hourly_refresh_minutes: int = 15
+
+    # Retrieval logs — daily range partitions, created this many days ahead
+    # and dropped whole once past retention. Maintenance runs in the
+    # consolidation cycle and every RETRIEVAL_LOG_PARTITION_CHECK_HOURS.
+    retrieval_log_retention_days: int = 30
+    retrieval_log_partitions_ahead: int = 14
+    retrieval_log_partition_check_hours: int = 6
+
+    # Owner-dashboard rollups — daily aggregate tables refreshed every
+    # ANALYTICS_ROLLUP_INTERVAL_MINUTES (today + yesterday are recomputed;
+    # the first run backfills ANALYTICS_BACKFILL_DAYS).
+    analytics_rollup_interval_minutes: int = 15
+    analytics_backfill_days: int = 365
+    # Independent dashboard aggregates run on up to this many pooled
+    # connections at once (app.services.concurrent_reads); 1 = sequential
+    # on the request session. Keep below the engine pool size (5).
+    analytics_query_concurrency: int = 4
+
+    # PyPI staleness (app.services.staleness): latest versions from
+    # PYPI_BASE_URL/{name}/json, fetched through one pooled client, are cached
+    # in-process and in Redis for STALENESS_CACHE_TTL_SECONDS (unknown packages
+    # and failed lookups for STALENESS_NEGATIVE_TTL_SECONDS). Submissions never
+    # wait on PyPI: new traces are checked in the background, and every
+    # STALENESS_REFRESH_MINUTES a job re-checks all referenced
+    # library/library_version pairs, STALENESS_BATCH_SIZE at a time.
+    pypi_base_url: str = "https://pypi.org/pypi"
+    staleness_http_timeout_seconds: float = 3.0
+    staleness_http_concurrency: int = 8
+    staleness_cache_ttl_seconds: int = 21600
+    staleness_negative_ttl_seconds: int = 3600
+    staleness_refresh_minutes: int = 360
+    staleness_batch_size: int = 100
+
+    # CPU executor (app.services.cpu_executor): CPU-bound request work (secret
+    # scanning, metadata enrichment) runs on a pool of CPU_EXECUTOR_WORKERS
+    # "thread" or "process" workers instead of the event loop. A call not
+    # finished within CPU_EXECUTOR_TIMEOUT_SECONDS (queueing included) fails.
+    cpu_executor_kind: str = "thread"
+    cpu_executor_workers: int = 2
+    cpu_executor_timeout_seconds: float = 10.0
+
     # Savings & Impact — USD per 1M tokens. Single published price constant;
     # the skill's DEFAULT_PRICE_PER_MTOK mirrors this value. Override via
     # the SAVINGS_PRICE_PER_MTOK env var.
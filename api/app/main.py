@@ -15,7 +15,13 @@ from app.middleware.body_limit import BodySizeLimitMiddleware
 from app.routers import admin, amendments, analytics, auth, invitations, moderation, reputation, search, tags, telemetry, traces, votes
 from app.worker.consolidation_worker import consolidation_worker_loop
 from app.worker.embedding_worker import process_batch
+from app.worker.scheduler import start_scheduled_jobs
+from app.services.cpu_executor import shutdown_cpu_executor
 from app.services.embedding import EmbeddingService
+from app.services.reembed import refresh_active_embedding_model
+from app.services.staleness import close_http_client, set_version_cache_redis
+from app.services.tag_index import load_tag_index_in_background
+from app.services.vector_search import load_vector_index_in_background
 
 log = structlog.get_logger(__name__)
 
@@ -50,17 +56,44 @@ async def lifespan(app: FastAPI):
     app.state.redis = aioredis.from_url(
         settings.redis_url, encoding="utf-8", decode_responses=True
     )
+    # PyPI latest-version cache is shared across processes through Redis
+    set_version_cache_redis(app.state.redis)
+
+    # Embed with the model of the last switched re-embedding migration (if
+    # any) from the first request on; the scheduled job keeps it current.
+    try:
+        from app.database import async_session_factory
+        async with async_session_factory() as db:
+            await refresh_active_embedding_model(db)
+    except Exception:
+        log.warning("embedding_model_refresh_failed", exc_info=True)
 
     # Start background workers — stored on app.state so /health can inspect
     # their liveness (informational only; a dead worker is not a fatal health
     # state, see health_check).
     app.state.embedding_worker_task = asyncio.create_task(_embedding_worker_loop())
     app.state.consolidation_worker_task = asyncio.create_task(consolidation_worker_loop())
+    app.state.scheduled_tasks = start_scheduled_jobs()
+    # In-process tag and vector indexes: built in the background; search
+    # filters tags in SQL / uses pgvector until they are ready.
+    if settings.tag_index_enabled:
+        app.state.scheduled_tasks["tag_index_load"] = asyncio.create_task(
+            load_tag_index_in_background()
+        )
+    if settings.vector_search_backend == "memory":
+        app.state.scheduled_tasks["vector_index_load"] = asyncio.create_task(
+            load_vector_index_in_background()
+        )
     try:
         yield
     finally:
         app.state.embedding_worker_task.cancel()
         app.state.consolidation_worker_task.cancel()
+        for task in app.state.scheduled_tasks.values():
+            task.cancel()
+        await close_http_client()
+        set_version_cache_redis(None)
+        shutdown_cpu_executor()
         # Shutdown: close Redis connection
         await app.state.redis.aclose()
 
@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
 from fastapi.responses import Response
 
 # Embedding worker metrics
@@ -15,10 +15,68 @@ embedding_duration = Histogram(
     buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 10.0],
 )
 
+embedding_cache_lookups = Counter(
+    "commontrace_embedding_cache_lookups_total",
+    "Distinct texts resolved per embedding-cache tier",
+    ["tier"],  # tier: memory | database | miss
+)
+
 # NOTE: Search endpoint metrics (search_requests, search_duration) are defined
 # directly in api/app/routers/search.py by Plan 03-02. Do NOT duplicate them here
 # to avoid prometheus_client duplicate registration errors.
 
+# Vector search planner metrics (app.services.vector_search.PgvectorBackend)
+search_ef_search = Histogram(
+    "commontrace_search_ef_search",
+    "hnsw.ef_search chosen per ANN probe",
+    ["filtered"],
+    buckets=[40, 64, 100, 200, 400, 700, 1000],
+)
+
+search_candidate_yield = Histogram(
+    "commontrace_search_candidate_yield_ratio",
+    "Rows returned / rows expected per ANN probe",
+    ["filtered"],
+    buckets=[0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0],
+)
+
+search_candidate_shortfall = Counter(
+    "commontrace_search_candidate_shortfall_total",
+    "ANN probes that returned fewer rows than were eligible",
+    ["filtered"],
+)
+
+search_iterative_scans = Counter(
+    "commontrace_search_iterative_scans_total",
+    "Tag-filtered ANN probes retried with hnsw.iterative_scan",
+)
+
+# CPU executor metrics (app.services.cpu_executor)
+cpu_executor_inflight = Gauge(
+    "commontrace_cpu_executor_inflight",
+    "CPU tasks submitted and awaited but not finished (running or queued)",
+)
+
+cpu_executor_queue_wait = Histogram(
+    "commontrace_cpu_executor_queue_wait_seconds",
+    "Time a CPU task waited for a free worker",
+    ["task"],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0],
+)
+
+cpu_executor_duration = Histogram(
+    "commontrace_cpu_executor_duration_seconds",
+    "Time a CPU task ran on its worker",
+    ["task"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0],
+)
+
+cpu_executor_tasks = Counter(
+    "commontrace_cpu_executor_tasks_total",
+    "CPU tasks by outcome",
+    ["task", "status"],  # status: ok | error | timeout
+)
+
 # HTTP request metrics (from middleware)
 http_requests = Counter(
     "commontrace_http_requests_total",
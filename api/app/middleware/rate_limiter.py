@@ -22,13 +22,15 @@ from app.models.user import User
 # ARGV[1] = max_tokens (integer capacity of the bucket)
 # ARGV[2] = refill_rate (tokens per second, float)
 # ARGV[3] = now (current Unix timestamp, float)
+# ARGV[4] = cost (tokens the request consumes)
 #
-# Returns: 1 if allowed (token consumed), 0 if rejected (bucket empty)
+# Returns: 1 if allowed (tokens consumed), 0 if rejected (not enough tokens)
 RATE_LIMIT_LUA = """
 local key = KEYS[1]
 local max_tokens = tonumber(ARGV[1])
 local refill_rate = tonumber(ARGV[2])
 local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
 
 -- Load current bucket state
 local data = redis.call('HGETALL', key)
@@ -52,10 +54,10 @@ if new_tokens > max_tokens then
     new_tokens = max_tokens
 end
 
--- Attempt to consume 1 token
+-- Attempt to consume `cost` tokens (all or nothing)
 local allowed = 0
-if new_tokens >= 1 then
-    new_tokens = new_tokens - 1
+if new_tokens >= cost then
+    new_tokens = new_tokens - cost
     allowed = 1
 end
 
@@ -72,8 +74,9 @@ async def check_rate_limit(
     redis_client: aioredis.Redis,
     bucket_type: str,
     app_settings: Settings,
+    cost: int = 1,
 ) -> None:
-    """Check and consume a token from the user's rate limit bucket.
+    """Check and consume tokens from the user's rate limit bucket.
 
     Raises HTTP 429 with Retry-After header if the bucket is empty.
 
@@ -82,6 +85,7 @@ async def check_rate_limit(
         redis_client: Async Redis client from app.state.
         bucket_type: "read" or "write" — selects the capacity setting.
         app_settings: Application settings for max token values.
+        cost: Tokens to consume — one per operation a batched request performs.
     """
     key = f"rl:{user.id}:{bucket_type}"
 
@@ -100,6 +104,7 @@ async def check_rate_limit(
         max_tokens,
         refill_rate,
         time.time(),
+        cost,
     )
 
     if not allowed:
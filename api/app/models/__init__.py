@@ -14,6 +14,19 @@ from .rif_shadow import RifShadow
 from .invitation import Invitation
 from .search_miss import SearchMiss
 from .savings_ledger import SavingsLedger
+from .cluster_scan import ClusterScan
+from .tag_activity import TagActivityHourly
+from .job_watermark import JobWatermark
+from .analytics_rollup import (
+    AnalyticsContributor,
+    AnalyticsDaily,
+    AnalyticsGauge,
+    AnalyticsTagDaily,
+)
+from .health_pair import HealthPair, HealthPairScan
+from .report_snapshot import ReportSnapshot
+from .embedding_cache import EmbeddingCacheEntry
+from .embedding_migration import EmbeddingMigration
 
 __all__ = [
     "Base",
@@ -36,4 +49,16 @@ __all__ = [
     "Invitation",
     "SearchMiss",
     "SavingsLedger",
+    "ClusterScan",
+    "TagActivityHourly",
+    "JobWatermark",
+    "AnalyticsDaily",
+    "AnalyticsTagDaily",
+    "AnalyticsContributor",
+    "AnalyticsGauge",
+    "HealthPair",
+    "HealthPairScan",
+    "ReportSnapshot",
+    "EmbeddingCacheEntry",
+    "EmbeddingMigration",
 ]
@@ -0,0 +1,64 @@
+"""Analytics rollup models.
+
+Pre-aggregated tables behind the owner dashboard (/api/v1/analytics),
+maintained by app.services.analytics_rollups. Daily tables are refreshed
+incrementally; contributors and gauges are snapshots advanced from a
+watermark and reconciled in full once a day.
+"""
+
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, Index, Integer, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class AnalyticsDaily(Base):
+    __tablename__ = "analytics_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    signups: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    traces: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    votes: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    amendments: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    search_sessions: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    retrievals: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class AnalyticsTagDaily(Base):
+    __tablename__ = "analytics_tag_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    tag_name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    retrievals: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    new_traces: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+
+class AnalyticsContributor(Base):
+    __tablename__ = "analytics_contributors"
+    __table_args__ = (
+        Index("ix_analytics_contributors_trace_count", "trace_count"),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    trace_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    total_retrievals: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class AnalyticsGauge(Base):
+    __tablename__ = "analytics_gauges"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
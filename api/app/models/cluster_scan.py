@@ -0,0 +1,28 @@
+"""Convergence cluster scan model.
+
+Signature of a convergence cluster (member ids, trust bands and
+embedded_at) at the time its pairs were last scored for ALTERNATIVE_TO / CONTRADICTS relationships. Lets the
+consolidation worker skip clusters that have not changed since.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class ClusterScan(Base):
+    __tablename__ = "convergence_cluster_scans"
+
+    cluster_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True
+    )
+    member_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    member_hash: Mapped[str] = mapped_column(String(32), nullable=False)
+    scanned_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
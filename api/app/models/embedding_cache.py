@@ -0,0 +1,27 @@
+"""Embedding cache model.
+
+Content-addressed store of computed embeddings: one row per (model, SHA-256
+of the exact input text). The embedding worker looks texts up here before
+calling the embedding backend, so repeated context strings, duplicate
+solutions and re-imported seed text are embedded once per model.
+"""
+
+from datetime import datetime
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import DateTime, LargeBinary, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class EmbeddingCacheEntry(Base):
+    __tablename__ = "embedding_cache"
+
+    model_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    text_hash: Mapped[bytes] = mapped_column(LargeBinary(32), primary_key=True)
+    embedding: Mapped[list[float]] = mapped_column(Vector(1536), nullable=False)
+    model_version: Mapped[str] = mapped_column(String(100), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -0,0 +1,47 @@
+"""Embedding migration model.
+
+One row per re-embedding run (app.services.reembed): the target backend
+and model, the keyset checkpoint into traces, progress counters and the
+lifecycle status embedding -> indexed -> switched (or aborted), and the
+traces the target model rejected (failed_trace_ids). The most
+recently switched row names the model the corpus is embedded with.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class EmbeddingMigration(Base):
+    __tablename__ = "embedding_migrations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    backend: Mapped[str] = mapped_column(String(20), nullable=False)
+    local_model: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    local_dimensions: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    target_model_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, index=True)
+    checkpoint_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), nullable=True
+    )
+    embedded_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    failed_trace_ids: Mapped[list[uuid.UUID]] = mapped_column(
+        ARRAY(UUID(as_uuid=True)), nullable=False, default=list, server_default="{}"
+    )
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    switched_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -0,0 +1,50 @@
+"""Knowledge-health pair models.
+
+HealthPair is one early-warning finding between two traces (a_id < b_id):
+a near-duplicate or a same-problem/divergent-fix conflict, with the three
+cosine distances it was classified on. HealthPairScan records when a trace's
+neighbourhood was last scanned (app.services.health_pairs).
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import CheckConstraint, DateTime, Float, ForeignKey, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class HealthPair(Base):
+    __tablename__ = "health_pairs"
+    __table_args__ = (CheckConstraint("a_id < b_id", name="ck_health_pairs_ordered"),)
+
+    a_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("traces.id", ondelete="CASCADE"), primary_key=True
+    )
+    b_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("traces.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    # "duplicate" | "conflict"
+    kind: Mapped[str] = mapped_column(String(20), nullable=False, index=True)
+    distance: Mapped[float] = mapped_column(Float, nullable=False)
+    context_distance: Mapped[float] = mapped_column(Float, nullable=False)
+    solution_distance: Mapped[float] = mapped_column(Float, nullable=False)
+    found_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class HealthPairScan(Base):
+    __tablename__ = "health_pair_scans"
+
+    trace_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("traces.id", ondelete="CASCADE"), primary_key=True
+    )
+    scanned_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -0,0 +1,28 @@
+"""Job watermark model.
+
+High-water mark of an incremental background job over an append-only
+source table: the job processes rows in (watermark, now - lag] and then
+advances the mark in the same transaction.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class JobWatermark(Base):
+    __tablename__ = "job_watermarks"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,23 @@
+"""Report snapshot model.
+
+Last materialized payload of an expensive dashboard report, keyed by report
+name (e.g. "knowledge_health"), with the time it was generated.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class ReportSnapshot(Base):
+    __tablename__ = "report_snapshots"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    generated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
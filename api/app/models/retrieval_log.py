@@ -1,7 +1,8 @@
 """Retrieval log model.
 
 Records individual retrieval events for co-retrieval detection.
-Pruned after 30 days by the consolidation worker.
+Range-partitioned by day on retrieved_at (migration 0027); partitions older
+than 30 days are dropped whole (app.services.partitions).
 """
 
 import uuid
@@ -18,6 +19,7 @@ from .base import Base
 
 class RetrievalLog(Base):
     __tablename__ = "retrieval_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (retrieved_at)"}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -31,6 +33,7 @@ class RetrievalLog(Base):
     result_position: Mapped[Optional[int]] = mapped_column(
         Integer, nullable=True
     )
+    # Partition key — part of the primary key, as Postgres requires.
     retrieved_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False
     )
@@ -0,0 +1,27 @@
+"""Hourly tag activity rollup model.
+
+Trace counts per tag per hour, maintained incrementally by a scheduled job
+(app.worker.scheduler). Backs the hourly window of GET /api/v1/tags/trending.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class TagActivityHourly(Base):
+    __tablename__ = "tag_activity_hourly"
+    __table_args__ = (
+        Index("ix_tag_activity_hourly_bucket_start", "bucket_start"),
+    )
+
+    tag_name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+    trace_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
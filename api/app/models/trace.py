@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text, func
-from sqlalchemy.dialects.postgresql import JSON, UUID
+from sqlalchemy.dialects.postgresql import JSON, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from pgvector.sqlalchemy import Vector
 
@@ -35,6 +35,10 @@ class Trace(Base):
     embedding: Mapped[Optional[list[float]]] = mapped_column(Vector(1536), nullable=True)
     embedding_model_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     embedding_model_version: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    # When the worker last wrote any of the vectors; health-pair rescans key on it
+    embedded_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     # Trust state machine — every trace starts pending (DATA-04)
     status: Mapped[str] = mapped_column(
@@ -115,6 +119,12 @@ class Trace(Base):
         Vector(1536), nullable=True
     )
 
+    # Weighted full-text vector over title/context/solution, maintained by a
+    # trigger (migration 0033). Deferred: only the lexical search leg reads it.
+    search_tsv: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR, nullable=True, deferred=True
+    )
+
     # Categorical impact level — permanent decay floor (migration 0015)
     impact_level: Mapped[str] = mapped_column(
         String(10), nullable=False, server_default="normal"
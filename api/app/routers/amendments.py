@@ -13,7 +13,8 @@ from app.middleware.rate_limiter import WriteRateLimit
 from app.models.amendment import Amendment
 from app.models.trace import Trace
 from app.schemas.amendment import AmendmentCreate, AmendmentResponse
-from app.services.scanner import SecretDetectedError, scan_amendment_submission
+from app.services.cpu_executor import CpuTaskTimeout
+from app.services.submission import prepare_amendment_submission
 
 router = APIRouter(prefix="/api/v1", tags=["amendments"])
 
@@ -45,11 +46,13 @@ async def submit_amendment(
     if trace is None:
         raise HTTPException(status_code=404, detail="Trace not found")
 
-    # PII scan gate — runs before any DB write
+    # PII scan gate — before any DB write, on the CPU executor
     try:
-        scan_amendment_submission(body.improved_solution, body.explanation)
-    except SecretDetectedError as e:
-        raise HTTPException(status_code=422, detail=f"Content rejected: {e}")
+        rejection = await prepare_amendment_submission(body.improved_solution, body.explanation)
+    except CpuTaskTimeout:
+        raise HTTPException(status_code=503, detail="Submission processing timed out — retry shortly")
+    if rejection:
+        raise HTTPException(status_code=422, detail=rejection)
 
     # Create the amendment row
     amendment = Amendment(
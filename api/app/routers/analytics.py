@@ -9,6 +9,12 @@ public. Two exceptions:
 
 No PII (emails, raw IPs, individual API keys) is surfaced by any endpoint.
 
+summary / timeline / topics / top-contributors read the pre-aggregated
+analytics_* rollups (app.services.analytics_rollups), refreshed every
+ANALYTICS_ROLLUP_INTERVAL_MINUTES, so their cost is independent of table size.
+They never refresh the rollups themselves: until the scheduled job's first
+run they return empty data with rollups_pending set.
+
 Endpoints (all gated unless noted):
   GET /api/v1/analytics/summary
   GET /api/v1/analytics/timeline?days=30
@@ -21,26 +27,26 @@ Endpoints (all gated unless noted):
   GET /api/v1/analytics/topics?limit=20
   GET /api/v1/analytics/assisted-resolution
   GET /api/v1/analytics/knowledge-health
+  POST /api/v1/analytics/knowledge-health/refresh
   GET /api/v1/analytics/savings           (PUBLIC — homepage counter)
   GET /api/v1/analytics/impact/outbound   (API-key auth, owner-scoped)
 """
 
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Response
 from sqlalchemy import func, select, text
 
 from app.dependencies import DbSession, require_admin_token
-from app.models.amendment import Amendment
-from app.models.retrieval_log import RetrievalLog
+from app.models.analytics_rollup import AnalyticsDaily, AnalyticsGauge, AnalyticsTagDaily
 from app.models.trace import Trace
-from app.models.user import User
-from app.models.vote import Vote
 from app.models.savings_ledger import SavingsLedger
 from app.dependencies import CurrentUser
 from app.middleware.rate_limiter import ReadRateLimit
 from app.schemas.savings import OutboundImpactResponse
-from app.services.health import compute_knowledge_health
+from app.services.analytics_rollups import rollups_ready
+from app.services.concurrent_reads import gather_reads
+from app.services import health_snapshot
 from app.services.outbound_impact import compute_outbound_impact
 from app.config import settings
 
@@ -53,120 +59,120 @@ def _utcnow() -> datetime:
 
 @router.get("/summary", dependencies=[Depends(require_admin_token)])
 async def get_summary(db: DbSession) -> dict:
-    """Top-level totals plus 7-day / 30-day deltas."""
-    now = _utcnow()
-    d7 = now - timedelta(days=7)
-    d30 = now - timedelta(days=30)
-    d1 = now - timedelta(days=1)
-
-    async def _scalar(stmt) -> int:
-        result = await db.execute(stmt)
-        return int(result.scalar() or 0)
-
-    total_users = await _scalar(select(func.count()).select_from(User))
-    users_7d = await _scalar(
-        select(func.count()).select_from(User).where(User.created_at >= d7)
-    )
-    users_30d = await _scalar(
-        select(func.count()).select_from(User).where(User.created_at >= d30)
-    )
-    users_with_email = await _scalar(
-        select(func.count()).select_from(User).where(User.email.is_not(None))
-    )
-
-    # Daily active = users seen in last 24h (requires last_seen_at populated)
-    dau = await _scalar(
-        select(func.count()).select_from(User).where(User.last_seen_at >= d1)
-    )
-    wau = await _scalar(
-        select(func.count()).select_from(User).where(User.last_seen_at >= d7)
-    )
-    mau = await _scalar(
-        select(func.count()).select_from(User).where(User.last_seen_at >= d30)
-    )
-
-    total_traces = await _scalar(select(func.count()).select_from(Trace))
-    traces_7d = await _scalar(
-        select(func.count()).select_from(Trace).where(Trace.created_at >= d7)
-    )
-    traces_30d = await _scalar(
-        select(func.count()).select_from(Trace).where(Trace.created_at >= d30)
-    )
-
-    total_votes = await _scalar(select(func.count()).select_from(Vote))
-    votes_7d = await _scalar(
-        select(func.count()).select_from(Vote).where(Vote.created_at >= d7)
-    )
+    """Top-level totals plus 7-day / 30-day deltas.
 
-    total_amendments = await _scalar(select(func.count()).select_from(Amendment))
-    amendments_7d = await _scalar(
-        select(func.count()).select_from(Amendment).where(Amendment.created_at >= d7)
-    )
+    Read from the analytics rollups: totals are gauges refreshed every
+    ANALYTICS_ROLLUP_INTERVAL_MINUTES, deltas sum the last 7 / 30 UTC days.
+    """
+    now = _utcnow()
+    d7 = now.date() - timedelta(days=6)
+    d30 = now.date() - timedelta(days=29)
 
-    # Search activity from retrieval_logs (30-day rolling, pruned by worker)
-    searches_7d = await _scalar(
-        select(func.count(func.distinct(RetrievalLog.search_session_id)))
-        .where(RetrievalLog.retrieved_at >= d7)
-    )
-    searches_30d = await _scalar(
-        select(func.count(func.distinct(RetrievalLog.search_session_id)))
-        .where(RetrievalLog.retrieved_at >= d30)
-    )
-    retrievals_7d = await _scalar(
-        select(func.count()).select_from(RetrievalLog).where(
-            RetrievalLog.retrieved_at >= d7
-        )
-    )
+    def _sum(column, since):
+        return func.coalesce(func.sum(column).filter(AnalyticsDaily.day >= since), 0)
 
-    # Total cumulative retrievals (from traces.retrieval_count)
-    total_retrievals_result = await db.execute(
-        select(func.coalesce(func.sum(Trace.retrieval_count), 0))
+    rows = await gather_reads(
+        db,
+        {
+            "gauges": select(
+                AnalyticsGauge.name, AnalyticsGauge.value, AnalyticsGauge.refreshed_at
+            ),
+            "window": select(
+                _sum(AnalyticsDaily.signups, d7).label("users_7d"),
+                _sum(AnalyticsDaily.signups, d30).label("users_30d"),
+                _sum(AnalyticsDaily.traces, d7).label("traces_7d"),
+                _sum(AnalyticsDaily.traces, d30).label("traces_30d"),
+                _sum(AnalyticsDaily.votes, d7).label("votes_7d"),
+                _sum(AnalyticsDaily.amendments, d7).label("amendments_7d"),
+                _sum(AnalyticsDaily.search_sessions, d7).label("searches_7d"),
+                _sum(AnalyticsDaily.search_sessions, d30).label("searches_30d"),
+                _sum(AnalyticsDaily.retrievals, d7).label("retrievals_7d"),
+            ).where(AnalyticsDaily.day >= d30),
+        },
     )
-    total_retrievals = int(total_retrievals_result.scalar() or 0)
+    gauges = {row.name: int(row.value) for row in rows["gauges"]}
+    refreshed_at = min((row.refreshed_at for row in rows["gauges"]), default=None)
+    window = rows["window"][0]
 
     return {
         "generated_at": now.isoformat(),
+        "rollup_refreshed_at": refreshed_at.isoformat() if refreshed_at else None,
+        "rollups_pending": refreshed_at is None,
         "users": {
-            "total": total_users,
-            "with_email": users_with_email,
-            "new_7d": users_7d,
-            "new_30d": users_30d,
-            "dau": dau,
-            "wau": wau,
-            "mau": mau,
+            "total": gauges.get("users_total", 0),
+            "with_email": gauges.get("users_with_email", 0),
+            "new_7d": int(window.users_7d),
+            "new_30d": int(window.users_30d),
+            "dau": gauges.get("users_dau", 0),
+            "wau": gauges.get("users_wau", 0),
+            "mau": gauges.get("users_mau", 0),
         },
         "traces": {
-            "total": total_traces,
-            "new_7d": traces_7d,
-            "new_30d": traces_30d,
-            "total_retrievals": total_retrievals,
+            "total": gauges.get("traces_total", 0),
+            "new_7d": int(window.traces_7d),
+            "new_30d": int(window.traces_30d),
+            "total_retrievals": gauges.get("retrievals_total", 0),
         },
         "votes": {
-            "total": total_votes,
-            "new_7d": votes_7d,
+            "total": gauges.get("votes_total", 0),
+            "new_7d": int(window.votes_7d),
         },
         "amendments": {
-            "total": total_amendments,
-            "new_7d": amendments_7d,
+            "total": gauges.get("amendments_total", 0),
+            "new_7d": int(window.amendments_7d),
         },
         "searches": {
-            "distinct_sessions_7d": searches_7d,
-            "distinct_sessions_30d": searches_30d,
-            "retrievals_7d": retrievals_7d,
+            # Each search session's logs share one timestamp, so summing the
+            # per-day distinct counts is exact.
+            "distinct_sessions_7d": int(window.searches_7d),
+            "distinct_sessions_30d": int(window.searches_30d),
+            "retrievals_7d": int(window.retrievals_7d),
         },
     }
 
 
+def _health_response(snapshot: health_snapshot.HealthSnapshot, response: Response) -> dict:
+    response.headers["Cache-Control"] = health_snapshot.cache_control()
+    return {
+        **snapshot.payload,
+        "generated_at": snapshot.generated_at.isoformat(),
+        "snapshot_pending": False,
+    }
+
+
 @router.get("/knowledge-health", dependencies=[Depends(require_admin_token)])
-async def get_knowledge_health(db: DbSession) -> dict:
+async def get_knowledge_health(
+    db: DbSession, response: Response, background_tasks: BackgroundTasks
+) -> dict:
     """Knowledge-base self-maintenance signals for the owner dashboard.
 
     Combines the sleep cycle's stored signals (trust, temperature, convergence,
-    relationships) with an on-demand early-warning pass that finds conflicts and
-    near-duplicates at any scale — before the background worker's GROWING-tier
-    gate would. Read-only.
+    relationships) with the early-warning conflicts and near-duplicates that
+    the health_pairs job finds at any scale — before the background worker's
+    GROWING-tier gate would.
+
+    Served from the last materialized snapshot (see generated_at). A snapshot
+    older than KNOWLEDGE_HEALTH_REFRESH_MINUTES is still returned, and one
+    background refresh is started. Before the first snapshot exists the
+    response only carries snapshot_pending (the same background refresh
+    builds it); POST /knowledge-health/refresh computes it inline.
     """
-    return await compute_knowledge_health(db)
+    snapshot = await health_snapshot.load_health_snapshot(db)
+    if snapshot is None:
+        background_tasks.add_task(health_snapshot.refresh_in_background)
+        response.headers["Cache-Control"] = "no-store"
+        return {"generated_at": None, "snapshot_pending": True}
+    if health_snapshot.is_stale(snapshot.generated_at):
+        background_tasks.add_task(health_snapshot.refresh_in_background)
+    return _health_response(snapshot, response)
+
+
+@router.post("/knowledge-health/refresh", dependencies=[Depends(require_admin_token)])
+async def refresh_knowledge_health(db: DbSession, response: Response) -> dict:
+    """Recompute the knowledge-health snapshot now and return it."""
+    snapshot = await health_snapshot.store_health_snapshot(db)
+    await db.commit()
+    return _health_response(snapshot, response)
 
 
 @router.get("/timeline", dependencies=[Depends(require_admin_token)])
@@ -174,49 +180,38 @@ async def get_timeline(
     db: DbSession,
     days: int = Query(30, ge=1, le=365),
 ) -> dict:
-    """Daily counts for signups, traces, votes, searches over N days."""
+    """Daily counts for signups, traces, votes, searches over N days (from analytics_daily)."""
     now = _utcnow()
-    since = now - timedelta(days=days)
-
-    async def _daily(table_name: str, ts_col: str, filter_sql: str = "") -> dict:
-        # Use raw SQL with date_trunc — fast and DB-agnostic-ish for postgres
-        sql = text(
-            f"SELECT date_trunc('day', {ts_col}) AS day, COUNT(*) AS n "
-            f"FROM {table_name} "
-            f"WHERE {ts_col} >= :since {filter_sql} "
-            f"GROUP BY day ORDER BY day ASC"
-        )
-        result = await db.execute(sql, {"since": since})
-        return {row[0].date().isoformat(): int(row[1]) for row in result.fetchall()}
+    since = (now - timedelta(days=days)).date()
+    pending = not await rollups_ready(db)
 
-    signups = await _daily("users", "created_at")
-    traces = await _daily("traces", "created_at")
-    votes = await _daily("votes", "created_at")
-    # retrieval_logs: unique search sessions per day
-    sql = text(
-        "SELECT date_trunc('day', retrieved_at) AS day, "
-        "COUNT(DISTINCT search_session_id) AS n "
-        "FROM retrieval_logs WHERE retrieved_at >= :since "
-        "GROUP BY day ORDER BY day ASC"
+    result = await db.execute(
+        select(
+            AnalyticsDaily.day,
+            AnalyticsDaily.signups,
+            AnalyticsDaily.traces,
+            AnalyticsDaily.votes,
+            AnalyticsDaily.search_sessions,
+        ).where(AnalyticsDaily.day >= since)
     )
-    res = await db.execute(sql, {"since": since})
-    searches = {row[0].date().isoformat(): int(row[1]) for row in res.fetchall()}
+    by_day = {row.day.isoformat(): row for row in result.all()}
 
     # Build full date series so missing days appear as 0
     series = []
     for i in range(days, -1, -1):
         d = (now - timedelta(days=i)).date().isoformat()
+        row = by_day.get(d)
         series.append(
             {
                 "date": d,
-                "signups": signups.get(d, 0),
-                "traces": traces.get(d, 0),
-                "votes": votes.get(d, 0),
-                "search_sessions": searches.get(d, 0),
+                "signups": row.signups if row else 0,
+                "traces": row.traces if row else 0,
+                "votes": row.votes if row else 0,
+                "search_sessions": row.search_sessions if row else 0,
             }
         )
 
-    return {"days": days, "series": series}
+    return {"days": days, "series": series, "rollups_pending": pending}
 
 
 @router.get("/top-tags", dependencies=[Depends(require_admin_token)])
@@ -273,14 +268,16 @@ async def get_top_contributors(
     db: DbSession,
     limit: int = Query(20, ge=1, le=100),
 ) -> dict:
-    """Top contributors by trace count. Surfaces display_name only — no emails."""
+    """Top contributors by trace count. Surfaces display_name only — no emails.
+
+    Counts come from the analytics_contributors snapshot.
+    """
+    pending = not await rollups_ready(db)
     sql = text(
         "SELECT COALESCE(u.display_name, 'anon-' || LEFT(u.id::text, 8)) AS name, "
-        "u.reputation_score, COUNT(t.id) AS trace_count, "
-        "COALESCE(SUM(t.retrieval_count), 0) AS total_retrievals "
-        "FROM users u JOIN traces t ON t.contributor_id = u.id "
-        "GROUP BY u.id, u.display_name, u.reputation_score "
-        "ORDER BY trace_count DESC LIMIT :lim"
+        "u.reputation_score, c.trace_count, c.total_retrievals "
+        "FROM analytics_contributors c JOIN users u ON u.id = c.user_id "
+        "ORDER BY c.trace_count DESC LIMIT :lim"
     )
     result = await db.execute(sql, {"lim": limit})
     return {
@@ -292,7 +289,8 @@ async def get_top_contributors(
                 "total_retrievals": int(row[3]),
             }
             for row in result.fetchall()
-        ]
+        ],
+        "rollups_pending": pending,
     }
 
 
@@ -312,26 +310,30 @@ async def get_geo(db: DbSession) -> dict:
 
 @router.get("/platforms", dependencies=[Depends(require_admin_token)])
 async def get_platforms(db: DbSession) -> dict:
-    """Breakdown by platform + skill_version."""
-    sql_p = text(
-        "SELECT COALESCE(platform, 'unknown'), COUNT(*) FROM users "
-        "GROUP BY platform ORDER BY 2 DESC"
-    )
-    sql_v = text(
-        "SELECT COALESCE(skill_version, 'unknown'), COUNT(*) FROM users "
-        "GROUP BY skill_version ORDER BY 2 DESC LIMIT 20"
-    )
-    sql_s = text(
-        "SELECT COALESCE(install_source, 'unknown'), COUNT(*) FROM users "
-        "GROUP BY install_source ORDER BY 2 DESC LIMIT 20"
+    """Breakdown by platform + skill_version + install source.
+
+    The three GROUP BYs are independent, so they run concurrently.
+    """
+    rows = await gather_reads(
+        db,
+        {
+            "platforms": text(
+                "SELECT COALESCE(platform, 'unknown'), COUNT(*) FROM users "
+                "GROUP BY platform ORDER BY 2 DESC"
+            ),
+            "versions": text(
+                "SELECT COALESCE(skill_version, 'unknown'), COUNT(*) FROM users "
+                "GROUP BY skill_version ORDER BY 2 DESC LIMIT 20"
+            ),
+            "sources": text(
+                "SELECT COALESCE(install_source, 'unknown'), COUNT(*) FROM users "
+                "GROUP BY install_source ORDER BY 2 DESC LIMIT 20"
+            ),
+        },
     )
-    rp = (await db.execute(sql_p)).fetchall()
-    rv = (await db.execute(sql_v)).fetchall()
-    rs = (await db.execute(sql_s)).fetchall()
     return {
-        "platforms": [{"name": r[0], "users": int(r[1])} for r in rp],
-        "versions": [{"name": r[0], "users": int(r[1])} for r in rv],
-        "sources": [{"name": r[0], "users": int(r[1])} for r in rs],
+        key: [{"name": r[0], "users": int(r[1])} for r in result]
+        for key, result in rows.items()
     }
 
 
@@ -380,29 +382,23 @@ async def get_topics(db: DbSession, limit: int = Query(20, ge=1, le=50)) -> dict
     """Ambient presence: per-tag activity counters, trailing 7 days (spec §4.4).
 
     Aggregate-only — tag names and counts, nothing user-identifying.
+    Read from analytics_tag_daily (last 7 UTC days).
     """
-    since = _utcnow() - timedelta(days=7)
-
-    retrieval_sql = text(
-        "SELECT tg.name, COUNT(*) AS retrievals "
-        "FROM retrieval_logs rl "
-        "JOIN trace_tags tt ON tt.trace_id = rl.trace_id "
-        "JOIN tags tg ON tg.id = tt.tag_id "
-        "WHERE rl.retrieved_at >= :since "
-        "GROUP BY tg.name"
-    )
-    new_traces_sql = text(
-        "SELECT tg.name, COUNT(DISTINCT t.id) AS new_traces "
-        "FROM traces t "
-        "JOIN trace_tags tt ON tt.trace_id = t.id "
-        "JOIN tags tg ON tg.id = tt.tag_id "
-        "WHERE t.created_at >= :since "
-        "GROUP BY tg.name"
+    since = (_utcnow() - timedelta(days=6)).date()
+    pending = not await rollups_ready(db)
+
+    result = await db.execute(
+        select(
+            AnalyticsTagDaily.tag_name,
+            func.sum(AnalyticsTagDaily.retrievals).label("retrievals"),
+            func.sum(AnalyticsTagDaily.new_traces).label("new_traces"),
+        )
+        .where(AnalyticsTagDaily.day >= since)
+        .group_by(AnalyticsTagDaily.tag_name)
     )
-    retrieval_rows = (await db.execute(retrieval_sql, {"since": since})).fetchall()
-    new_trace_rows = (await db.execute(new_traces_sql, {"since": since})).fetchall()
-    retrievals = {r[0]: int(r[1]) for r in retrieval_rows}
-    new_traces = {r[0]: int(r[1]) for r in new_trace_rows}
+    rows = result.all()
+    retrievals = {r.tag_name: int(r.retrievals) for r in rows if r.retrievals}
+    new_traces = {r.tag_name: int(r.new_traces) for r in rows if r.new_traces}
 
     topics = [
         {
@@ -413,7 +409,7 @@ async def get_topics(db: DbSession, limit: int = Query(20, ge=1, le=50)) -> dict
         for tag in set(retrievals) | set(new_traces)
     ]
     topics.sort(key=lambda x: (-x["retrievals_7d"], -x["new_traces_7d"], x["tag"]))
-    return {"window_days": 7, "topics": topics[:limit]}
+    return {"window_days": 7, "topics": topics[:limit], "rollups_pending": pending}
 
 
 @router.get("/assisted-resolution", dependencies=[Depends(require_admin_token)])
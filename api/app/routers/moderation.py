@@ -17,6 +17,8 @@ from app.models.amendment import Amendment
 from app.models.trace import Trace
 from app.models.vote import Vote
 from app.schemas.trace import TraceResponse
+from app.services.tag_index import remove_trace_from_tag_index
+from app.services.vector_search import remove_trace_from_index
 
 router = APIRouter(prefix="/api/v1", tags=["moderation"])
 
@@ -80,6 +82,7 @@ async def flag_trace(
         .execution_options(synchronize_session=False)
     )
     await db.commit()
+    remove_trace_from_index(trace_id)
 
     return {
         "trace_id": str(trace_id),
@@ -197,5 +200,7 @@ async def remove_trace(
     # 7. Delete the trace itself
     await db.delete(trace)
     await db.commit()
+    remove_trace_from_index(trace_id)
+    remove_trace_from_tag_index(trace_id)
 
     return {"deleted": True, "trace_id": str(trace_id)}
@@ -1,11 +1,19 @@
 """Hybrid semantic + tag search endpoint.
 
 POST /api/v1/traces/search -- search traces by natural language query, tags, or both.
+POST /api/v1/traces/search/batch -- several searches sharing one embedding call,
+  one rate-limit check and one retrieval-recording pass.
 
 Search modes:
-  - Semantic-only (q provided, tags empty): cosine ANN over pgvector embeddings, trust re-ranked
+  - Semantic-only (q provided, tags empty): cosine ANN (VECTOR_SEARCH_BACKEND:
+    pgvector HNSW or the in-process index, app.services.vector_search), trust re-ranked
   - Tag-only (q omitted, tags provided): SQL filter ordered by trust_score DESC, no embed call
   - Hybrid (q + tags): cosine ANN with tag pre-filter, trust re-ranked
+  - mode="multi_vector" (with q): content, solution and context-string ANN legs
+    fused by reciprocal rank fusion, then trust re-ranked on the fused score
+  - Lexical leg (q provided, SEARCH_LEXICAL_ENABLED): a full-text ts_rank_cd
+    query runs concurrently and is RRF-fused with the ANN hits; it alone
+    answers when embedding the query times out or is not configured
   - Both empty: 422 validation error
 """
 
@@ -19,10 +27,13 @@ from fastapi import APIRouter, HTTPException
 from sqlalchemy import select, func, text
 from sqlalchemy.orm import selectinload
 from prometheus_client import Counter, Histogram
-from app.dependencies import CurrentUser, DbSession
-from app.middleware.rate_limiter import ReadRateLimit
+from app.database import async_session_factory
+from app.dependencies import CurrentUser, DbSession, RedisClient
+from app.middleware.rate_limiter import ReadRateLimit, check_rate_limit
 from app.schemas.search import (
     RelatedTrace,
+    TraceSearchBatchRequest,
+    TraceSearchBatchResponse,
     TraceSearchRequest,
     TraceSearchResult,
     TraceSearchResponse,
@@ -36,10 +47,14 @@ from app.services.activation import (
     compute_activation_boost,
     MAX_ACTIVATION_SOURCES,
 )
-from app.services.context import compute_context_alignment
+from app.services.background import track_task
+from app.services.context import build_context_string, compute_context_alignment
 from app.services.decay import temporal_decay_factor
 from app.services.embedding import EmbeddingService, EmbeddingSkippedError
+from app.services.embedding_cache import embed_cached
+from app.services.lexical_search import fuse_lexical, run_lexical_leg
 from app.services.retrieval import (
+    record_batch_retrievals,
     record_co_retrievals,
     record_retrieval_logs,
     record_retrievals,
@@ -48,18 +63,9 @@ from app.services.retrieval import (
 from app.services.tags import normalize_tag
 from app.services.diversity import apply_diversity_sampling
 from app.services.temperature import get_temperature_multiplier
+from app.services.vector_search import candidate_limit, get_search_backend, multi_vector_search
 from app.config import settings
 
-# Track background tasks to prevent GC before completion
-_background_tasks: set[asyncio.Task] = set()
-
-
-def _track_task(coro) -> None:
-    """Create a tracked background task that removes itself when done."""
-    task = asyncio.create_task(coro)
-    _background_tasks.add(task)
-    task.add_done_callback(_background_tasks.discard)
-
 log = structlog.get_logger()
 _embedding_svc = EmbeddingService()
 
@@ -77,14 +83,27 @@ search_duration = Histogram(
 
 router = APIRouter(prefix="/api/v1", tags=["search"])
 
-# Over-fetch from ANN before re-ranking to ensure we have enough candidates
-SEARCH_LIMIT_ANN = 100
-
 # Impact level multipliers and permanent decay floors (Principle 12 — Emotional Salience)
 IMPACT_MULT = {"critical": 1.2, "high": 1.1, "normal": 1.0, "low": 0.95}
 IMPACT_FLOOR = {"critical": 0.7, "high": 0.5, "normal": 0.3, "low": 0.3}
 
 
+async def _embed_query(text: str) -> tuple[list[float], str, str]:
+    """Embed search text, reusing the in-process embedding cache."""
+    (embedded,) = await embed_cached(_embedding_svc, [text])
+    return embedded
+
+
+async def _embed_context(context_text: str) -> Optional[list[float]]:
+    """Embed the searcher's context string; None (no context leg) on failure."""
+    try:
+        vector, _, _ = await _embed_query(context_text)
+        return vector
+    except Exception:
+        log.warning("context_embedding_failed", exc_info=True)
+        return None
+
+
 async def _apply_spreading_activation(
     db: AsyncSession,
     results: list[TraceSearchResult],
@@ -272,121 +291,134 @@ async def _apply_somatic_floor(
         return results
 
 
-@router.post("/traces/search", response_model=TraceSearchResponse)
-async def search_traces(
-    body: TraceSearchRequest,
-    user: CurrentUser,
-    db: DbSession,
-    _rate: ReadRateLimit,
-) -> TraceSearchResponse:
-    """Search traces by natural language query, tags, or both.
+def _start_lexical_leg(
+    body: TraceSearchRequest, normalized_tags: list[str], now_utc: datetime
+) -> Optional[asyncio.Task]:
+    """Start the full-text leg on its own session (None when disabled or tag-only)."""
+    if body.q is None or not settings.search_lexical_enabled:
+        return None
+    return asyncio.create_task(run_lexical_leg(
+        body.q,
+        limit=settings.search_lexical_limit,
+        tags=normalized_tags,
+        include_expired=body.include_expired,
+        now=now_utc,
+    ))
 
-    Search modes:
-    - q only: cosine ANN over pgvector embeddings, trust-weighted re-ranking
-    - tags only: SQL tag filter ordered by trust_score DESC (no embedding service call)
-    - q + tags: cosine ANN with tag pre-filter, trust-weighted re-ranking
-    - neither: 422 validation error
 
-    Flagged traces are always excluded. Traces with embedding IS NULL are excluded
-    only when q is provided (semantic ranking requires an embedding).
-    """
-    start = time.monotonic()
-    search_requests.labels(has_tags=str(bool(body.tags)).lower()).inc()
+def _context_text(body: TraceSearchRequest) -> str:
+    """The context string multi-vector mode embeds ("" when not used)."""
+    if body.q is not None and body.mode == "multi_vector" and body.context:
+        return build_context_string(body.context)
+    return ""
 
-    # Step A: Embed the query text (only when q is provided)
-    query_vector: Optional[list[float]] = None
-    if body.q is not None:
-        try:
-            query_vector, _, _ = await _embedding_svc.embed(body.q)
-        except EmbeddingSkippedError:
+
+async def _await_embeddings(embed, *, lexical_fallback: bool):
+    """Await an embedding call; None when it failed but lexical can answer.
+
+    With the lexical leg enabled the call is bounded by
+    SEARCH_EMBEDDING_TIMEOUT_SECONDS and any failure (unconfigured backend,
+    timeout, provider outage) falls back to it; without it, an unconfigured
+    backend is a 503 and other errors propagate.
+    """
+    try:
+        if lexical_fallback:
+            return await asyncio.wait_for(embed, settings.search_embedding_timeout_seconds)
+        return await embed
+    except EmbeddingSkippedError:
+        if not lexical_fallback:
             raise HTTPException(
                 status_code=503,
                 detail="Search unavailable — embedding service not configured (OPENAI_API_KEY required)",
             )
-    else:
-        # Tag-only mode: validate that at least tags are provided
-        if not body.tags:
-            raise HTTPException(
-                status_code=422,
-                detail="At least one of 'q' or 'tags' must be provided",
-            )
+        log.warning("search_embedding_fallback", reason="EmbeddingSkippedError")
+        return None
+    except Exception as exc:
+        if not lexical_fallback:
+            raise
+        log.warning("search_embedding_fallback", reason=type(exc).__name__, error=str(exc))
+        return None
 
-    # Step B: Set HNSW search parameters (only when using vector search)
-    if query_vector is not None:
-        await db.execute(text("SET LOCAL hnsw.ef_search = 64"))
 
-    # Extract searcher context and expiry preferences
+async def _run_search(
+    db: AsyncSession,
+    body: TraceSearchRequest,
+    *,
+    normalized_tags: list[str],
+    now_utc: datetime,
+    query_vector: Optional[list[float]],
+    context_vector: Optional[list[float]],
+    lexical_task: Optional[asyncio.Task],
+) -> list[TraceSearchResult]:
+    """Rank one search request (Steps C–G.6) once its query is embedded."""
     searcher_fp = body.context
     include_expired = body.include_expired
-    now_utc = datetime.now(timezone.utc)
-
-    # Normalize tags for consistent matching
-    normalized_tags = [normalize_tag(t) for t in body.tags]
 
     results: list[TraceSearchResult] = []
     _trace_embeddings: dict[uuid_mod.UUID, list[float]] = {}
 
-    if query_vector is not None:
-        # Step C Path 1: Semantic search (q is provided, query_vector exists)
-        distance_col = Trace.embedding.cosine_distance(query_vector).label("distance")
-
-        stmt = (
-            select(Trace, distance_col)
-            .where(Trace.embedding.is_not(None))
-            .where(Trace.embedding_model_id == "text-embedding-3-small")
-            .where(Trace.is_flagged.is_(False))
-            .options(selectinload(Trace.tags))
-            .order_by(distance_col)
-            .limit(SEARCH_LIMIT_ANN)
-        )
-
-        # Exclude expired traces when include_expired=False
-        if not include_expired:
-            from sqlalchemy import or_
-            stmt = stmt.where(
-                or_(Trace.valid_until.is_(None), Trace.valid_until >= now_utc)
+    if body.q is not None:
+        # Step C Path 1: Semantic search (q is provided).
+        # The backend (pgvector HNSW or the in-process index) applies the
+        # flagged / expiry / tag pre-filters and returns hydrated hits;
+        # multi-vector mode fuses content, solution and context kNN instead.
+        # The lexical ranking is then fused in; without a query vector it
+        # is the only ranking.
+        rows = []
+        if query_vector is not None and body.mode == "multi_vector":
+            rows = await multi_vector_search(
+                db,
+                query_vector,
+                context_vector,
+                limit=candidate_limit(body.limit),
+                tags=normalized_tags,
+                include_expired=include_expired,
+                now=now_utc,
             )
-
-        # Step D: Tag pre-filter (if tags provided) — Path 1
-        if normalized_tags:
-            stmt = (
-                stmt
-                .join(trace_tags, trace_tags.c.trace_id == Trace.id)
-                .join(Tag, Tag.id == trace_tags.c.tag_id)
-                .where(Tag.name.in_(normalized_tags))
-                .group_by(Trace.id, Trace.embedding.cosine_distance(query_vector))
-                .having(func.count(func.distinct(Tag.id)) == len(normalized_tags))
+        elif query_vector is not None:
+            rows = await get_search_backend().search(
+                db,
+                query_vector,
+                limit=candidate_limit(body.limit),
+                tags=normalized_tags,
+                include_expired=include_expired,
+                now=now_utc,
+            )
+        if lexical_task is not None:
+            rows = await fuse_lexical(
+                db,
+                rows,
+                await lexical_task,
+                limit=candidate_limit(body.limit),
+                include_expired=include_expired,
+                now=now_utc,
             )
-
-        # Step E: Execute and re-rank
-        result = await db.execute(stmt)
-        rows = result.all()  # list of Row(Trace, distance)
-
         # Trust-weighted re-ranking with depth, decay, context, convergence, temperature, validity, impact
         def _rank_score(r):
-            sim = 1.0 - r.distance
-            trust = math.log1p(max(0.0, r.Trace.trust_score) + 1)
-            depth = 1 + 0.1 * r.Trace.depth_score
+            # Fused hits rank on their RRF score, others on cosine similarity.
+            sim = r.fused if r.fused is not None else 1.0 - r.distance
+            trust = math.log1p(max(0.0, r.trace.trust_score) + 1)
+            depth = 1 + 0.1 * r.trace.depth_score
             decay = temporal_decay_factor(
-                r.Trace.created_at,
-                r.Trace.last_retrieved_at,
-                r.Trace.half_life_days,
+                r.trace.created_at,
+                r.trace.last_retrieved_at,
+                r.trace.half_life_days,
             )
-            il = getattr(r.Trace, 'impact_level', 'normal') or 'normal'
+            il = getattr(r.trace, 'impact_level', 'normal') or 'normal'
             decay = max(IMPACT_FLOOR.get(il, 0.3), decay)
             impact_mult = IMPACT_MULT.get(il, 1.0)
             ctx_boost = 1.0
-            if searcher_fp and r.Trace.context_fingerprint:
-                alignment = compute_context_alignment(searcher_fp, r.Trace.context_fingerprint)
+            if searcher_fp and r.trace.context_fingerprint:
+                alignment = compute_context_alignment(searcher_fp, r.trace.context_fingerprint)
                 ctx_boost = 1.0 + 0.3 * alignment
             convergence_boost = 1.0
-            if r.Trace.convergence_level is not None:
-                convergence_boost = 1.0 + 0.05 * (4 - r.Trace.convergence_level)
-            temp_mult = get_temperature_multiplier(r.Trace.memory_temperature)
+            if r.trace.convergence_level is not None:
+                convergence_boost = 1.0 + 0.05 * (4 - r.trace.convergence_level)
+            temp_mult = get_temperature_multiplier(r.trace.memory_temperature)
             validity_factor = 1.0
-            if r.Trace.valid_until is not None and r.Trace.valid_until < now_utc:
+            if r.trace.valid_until is not None and r.trace.valid_until < now_utc:
                 validity_factor = 0.5
-            somatic_mult = 1.0 + 0.3 * r.Trace.somatic_intensity
+            somatic_mult = 1.0 + 0.3 * r.trace.somatic_intensity
             return sim * trust * depth * decay * ctx_boost * convergence_boost * temp_mult * validity_factor * somatic_mult * impact_mult
 
         ranked = sorted(rows, key=_rank_score, reverse=True)[:body.limit]
@@ -395,32 +427,32 @@ async def search_traces(
         for row in ranked:
             similarity = 1.0 - row.distance
             combined = _rank_score(row)
-            tag_names = [tag.name for tag in row.Trace.tags]
-            if row.Trace.embedding is not None:
-                _trace_embeddings[row.Trace.id] = row.Trace.embedding
+            tag_names = [tag.name for tag in row.trace.tags]
+            if row.trace.embedding is not None:
+                _trace_embeddings[row.trace.id] = row.trace.embedding
             results.append(
                 TraceSearchResult(
-                    id=row.Trace.id,
-                    title=row.Trace.title,
-                    context_text=row.Trace.context_text,
-                    solution_text=row.Trace.solution_text,
-                    trust_score=row.Trace.trust_score,
-                    status=row.Trace.status,
+                    id=row.trace.id,
+                    title=row.trace.title,
+                    context_text=row.trace.context_text,
+                    solution_text=row.trace.solution_text,
+                    trust_score=row.trace.trust_score,
+                    status=row.trace.status,
                     tags=tag_names,
                     similarity_score=similarity,
                     combined_score=combined,
-                    contributor_id=row.Trace.contributor_id,
-                    created_at=row.Trace.created_at,
-                    retrieval_count=row.Trace.retrieval_count,
-                    depth_score=row.Trace.depth_score,
-                    somatic_intensity=row.Trace.somatic_intensity,
-                    impact_level=getattr(row.Trace, 'impact_level', 'normal') or 'normal',
-                    trace_type=row.Trace.trace_type,
-                    context_fingerprint=row.Trace.context_fingerprint,
-                    convergence_level=row.Trace.convergence_level,
-                    memory_temperature=row.Trace.memory_temperature,
-                    valid_from=row.Trace.valid_from,
-                    valid_until=row.Trace.valid_until,
+                    contributor_id=row.trace.contributor_id,
+                    created_at=row.trace.created_at,
+                    retrieval_count=row.trace.retrieval_count,
+                    depth_score=row.trace.depth_score,
+                    somatic_intensity=row.trace.somatic_intensity,
+                    impact_level=getattr(row.trace, 'impact_level', 'normal') or 'normal',
+                    trace_type=row.trace.trace_type,
+                    context_fingerprint=row.trace.context_fingerprint,
+                    convergence_level=row.trace.convergence_level,
+                    memory_temperature=row.trace.memory_temperature,
+                    valid_from=row.trace.valid_from,
+                    valid_until=row.trace.valid_until,
                 )
             )
 
@@ -531,63 +563,142 @@ async def search_traces(
             include_expired=include_expired, normalized_tags=normalized_tags,
         )
 
+    return results
+
+
+async def _attach_provenance(db: AsyncSession, results: list[TraceSearchResult]) -> None:
+    """Attach related traces and contributor names, one query each for all `results`."""
+    if not results:
+        return
+
+    # Attach related traces (top 3 per result by relationship strength)
+    result_ids = list({r.id for r in results})
+    related_rows = await db.execute(
+        text(
+            "SELECT tr.source_trace_id, tr.target_trace_id, tr.relationship_type, "
+            "tr.strength, t.title "
+            "FROM trace_relationships tr "
+            "JOIN traces t ON t.id = tr.target_trace_id "
+            "WHERE tr.source_trace_id = ANY(:ids) "
+            "ORDER BY tr.strength DESC"
+        ),
+        {"ids": result_ids},
+    )
+    # Group by source, take top 3 per result
+    related_by_source: dict[str, list[RelatedTrace]] = {}
+    for row in related_rows:
+        src = str(row.source_trace_id)
+        if src not in related_by_source:
+            related_by_source[src] = []
+        if len(related_by_source[src]) < 3:
+            related_by_source[src].append(
+                RelatedTrace(
+                    id=row.target_trace_id,
+                    title=row.title,
+                    relationship_type=row.relationship_type,
+                    strength=row.strength,
+                )
+            )
+    for r in results:
+        r.related_traces = related_by_source.get(str(r.id), [])
+
+    # Contributor provenance (spec §4.2): batched display-name lookup
+    contributor_ids = list({r.contributor_id for r in results})
+    name_rows = await db.execute(
+        text(
+            "SELECT id, COALESCE(display_name, 'anon-' || LEFT(id::text, 8)) "
+            "AS name FROM users WHERE id = ANY(:ids)"
+        ),
+        {"ids": contributor_ids},
+    )
+    names_by_id = {row.id: row.name for row in name_rows}
+    for r in results:
+        r.contributor_name = names_by_id.get(r.contributor_id)
+
+
+@router.post("/traces/search", response_model=TraceSearchResponse)
+async def search_traces(
+    body: TraceSearchRequest,
+    user: CurrentUser,
+    db: DbSession,
+    _rate: ReadRateLimit,
+) -> TraceSearchResponse:
+    """Search traces by natural language query, tags, or both.
+
+    Search modes:
+    - q only: cosine ANN over pgvector embeddings, trust-weighted re-ranking
+    - tags only: SQL tag filter ordered by trust_score DESC (no embedding service call)
+    - q + tags: cosine ANN with tag pre-filter, trust-weighted re-ranking
+    - neither: 422 validation error
+
+    With q, a full-text leg runs alongside and is fused with the ANN hits;
+    if the embedding call times out or fails, the full-text ranking is
+    served on its own.
+
+    Flagged traces are always excluded. Traces with embedding IS NULL are excluded
+    only when q is provided (semantic ranking requires an embedding), except
+    from the full-text leg.
+    """
+    start = time.monotonic()
+    search_requests.labels(has_tags=str(bool(body.tags)).lower()).inc()
+
+    # Tag-only mode: validate that at least tags are provided
+    if body.q is None and not body.tags:
+        raise HTTPException(
+            status_code=422,
+            detail="At least one of 'q' or 'tags' must be provided",
+        )
+
+    now_utc = datetime.now(timezone.utc)
+    # Normalize tags for consistent matching
+    normalized_tags = [normalize_tag(t) for t in body.tags]
+
+    # Step A: Embed the query text (only when q is provided). Multi-vector
+    # mode also embeds the searcher's context string, concurrently. The
+    # lexical leg starts first, on its own session, and overlaps both the
+    # embedding call and the vector query.
+    query_vector: Optional[list[float]] = None
+    context_vector: Optional[list[float]] = None
+    lexical_task = _start_lexical_leg(body, normalized_tags, now_utc)
+    try:
+        if body.q is not None:
+            context_text = _context_text(body)
+            if context_text:
+                embed = asyncio.gather(_embed_query(body.q), _embed_context(context_text))
+            else:
+                embed = asyncio.gather(_embed_query(body.q))
+            embedded = await _await_embeddings(embed, lexical_fallback=lexical_task is not None)
+            if embedded is not None:
+                query_vector = embedded[0][0]
+                if context_text:
+                    context_vector = embedded[1]
+
+        results = await _run_search(
+            db, body,
+            normalized_tags=normalized_tags,
+            now_utc=now_utc,
+            query_vector=query_vector,
+            context_vector=context_vector,
+            lexical_task=lexical_task,
+        )
+    finally:
+        # Not awaited when the embedding wait or the search raised
+        if lexical_task is not None and not lexical_task.done():
+            lexical_task.cancel()
+
     # Fire-and-forget: record retrievals + co-retrieval patterns
-    # Tasks are tracked in _background_tasks set to prevent GC before completion
+    # Tasks are tracked (app.services.background) to prevent GC before completion
     if results:
         trace_ids = [r.id for r in results]
         search_session_id = str(uuid_mod.uuid4())
-        _track_task(record_retrievals(trace_ids))
-        _track_task(record_retrieval_logs(trace_ids, search_session_id))
-        _track_task(record_co_retrievals(trace_ids))
+        track_task(record_retrievals(trace_ids))
+        track_task(record_retrieval_logs(trace_ids, search_session_id))
+        track_task(record_co_retrievals(trace_ids))
     else:
         # Zero-result search = Wanted Board demand signal (spec §6.3)
-        _track_task(record_search_miss(body.q, normalized_tags, searcher_fp))
-
-    # Attach related traces (top 3 per result by relationship strength)
-    if results:
-        result_ids = [r.id for r in results]
-        related_rows = await db.execute(
-            text(
-                "SELECT tr.source_trace_id, tr.target_trace_id, tr.relationship_type, "
-                "tr.strength, t.title "
-                "FROM trace_relationships tr "
-                "JOIN traces t ON t.id = tr.target_trace_id "
-                "WHERE tr.source_trace_id = ANY(:ids) "
-                "ORDER BY tr.strength DESC"
-            ),
-            {"ids": result_ids},
-        )
-        # Group by source, take top 3 per result
-        related_by_source: dict[str, list[RelatedTrace]] = {}
-        for row in related_rows:
-            src = str(row.source_trace_id)
-            if src not in related_by_source:
-                related_by_source[src] = []
-            if len(related_by_source[src]) < 3:
-                related_by_source[src].append(
-                    RelatedTrace(
-                        id=row.target_trace_id,
-                        title=row.title,
-                        relationship_type=row.relationship_type,
-                        strength=row.strength,
-                    )
-                )
-        for r in results:
-            r.related_traces = related_by_source.get(str(r.id), [])
+        track_task(record_search_miss(body.q, normalized_tags, body.context))
 
-    # Contributor provenance (spec §4.2): batched display-name lookup
-    if results:
-        contributor_ids = list({r.contributor_id for r in results})
-        name_rows = await db.execute(
-            text(
-                "SELECT id, COALESCE(display_name, 'anon-' || LEFT(id::text, 8)) "
-                "AS name FROM users WHERE id = ANY(:ids)"
-            ),
-            {"ids": contributor_ids},
-        )
-        names_by_id = {row.id: row.name for row in name_rows}
-        for r in results:
-            r.contributor_name = names_by_id.get(r.contributor_id)
+    await _attach_provenance(db, results)
 
     # Step H: Search metrics instrumentation
     search_duration.observe(time.monotonic() - start)
@@ -599,3 +710,103 @@ async def search_traces(
     )
 
     return TraceSearchResponse(results=results, total=len(results), query=body.q)
+
+
+@router.post("/traces/search/batch", response_model=TraceSearchBatchResponse)
+async def search_traces_batch(
+    body: TraceSearchBatchRequest,
+    user: CurrentUser,
+    db: DbSession,
+    redis_client: RedisClient,
+) -> TraceSearchBatchResponse:
+    """Run several searches in one request.
+
+    Each entry is ranked exactly as POST /traces/search would rank it, and
+    the responses come back in request order. What is shared:
+
+    - auth, and one read rate-limit check that consumes a token per search
+      (all or nothing), so batching is no way around the limit;
+    - one embedding call for every query and context string in the batch;
+    - the searches run concurrently, at most SEARCH_BATCH_CONCURRENCY at a
+      time; each running search holds its own pooled session plus one for
+      its lexical leg, so a batch uses at most twice that many;
+    - related traces, contributor names and retrieval recording are one
+      set of queries for the whole batch.
+    """
+    start = time.monotonic()
+    for index, search in enumerate(body.searches):
+        if search.q is None and not search.tags:
+            raise HTTPException(
+                status_code=422,
+                detail=f"searches[{index}]: at least one of 'q' or 'tags' must be provided",
+            )
+    await check_rate_limit(user, redis_client, "read", settings, cost=len(body.searches))
+    for search in body.searches:
+        search_requests.labels(has_tags=str(bool(search.tags)).lower()).inc()
+
+    now_utc = datetime.now(timezone.utc)
+    normalized = [[normalize_tag(t) for t in search.tags] for search in body.searches]
+
+    # Step A, batched: every query and context string in one embedding call
+    # (embed_cached dedupes repeats and serves cached ones from memory).
+    contexts = [_context_text(search) for search in body.searches]
+    texts = [search.q for search in body.searches if search.q is not None]
+    texts += [ctx for ctx in contexts if ctx]
+    vectors: dict[str, list[float]] = {}
+    if texts:
+        embedded = await _await_embeddings(
+            embed_cached(_embedding_svc, texts),
+            lexical_fallback=settings.search_lexical_enabled,
+        )
+        if embedded is not None:
+            vectors = {t: vector for t, (vector, _, _) in zip(texts, embedded)}
+
+    semaphore = asyncio.Semaphore(max(1, settings.search_batch_concurrency))
+
+    async def _run_one(index: int) -> list[TraceSearchResult]:
+        search = body.searches[index]
+        async with semaphore:
+            # Started under the semaphore so its session counts against the bound
+            lexical_task = _start_lexical_leg(search, normalized[index], now_utc)
+            try:
+                async with async_session_factory() as session:
+                    return await _run_search(
+                        session, search,
+                        normalized_tags=normalized[index],
+                        now_utc=now_utc,
+                        query_vector=vectors.get(search.q) if search.q is not None else None,
+                        context_vector=vectors.get(contexts[index]) if contexts[index] else None,
+                        lexical_task=lexical_task,
+                    )
+            finally:
+                # Not awaited when the search failed or the group was cancelled
+                if lexical_task is not None and not lexical_task.done():
+                    lexical_task.cancel()
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(_run_one(i)) for i in range(len(body.searches))]
+    except ExceptionGroup as errors:
+        raise errors.exceptions[0]
+    result_sets = [task.result() for task in tasks]
+
+    # Fire-and-forget: one recording pass for every non-empty result set;
+    # each empty one is a Wanted Board demand signal (spec §6.3)
+    track_task(record_batch_retrievals([[r.id for r in rs] for rs in result_sets if rs]))
+    for search, tags, rs in zip(body.searches, normalized, result_sets):
+        if not rs:
+            track_task(record_search_miss(search.q, tags, search.context))
+
+    await _attach_provenance(db, [r for rs in result_sets for r in rs])
+
+    search_duration.observe(time.monotonic() - start)
+    log.info(
+        "search_batch_executed",
+        search_count=len(body.searches),
+        result_counts=[len(rs) for rs in result_sets],
+    )
+
+    return TraceSearchBatchResponse(responses=[
+        TraceSearchResponse(results=rs, total=len(rs), query=search.q)
+        for search, rs in zip(body.searches, result_sets)
+    ])
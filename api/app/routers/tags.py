@@ -1,15 +1,18 @@
 """Tags listing endpoint.
 
 GET /api/v1/tags -- return all distinct tag names from the database.
+GET /api/v1/tags/trending -- weekly (default) or hourly trending tags.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import select
 
+from app.config import settings
 from app.dependencies import CurrentUser, DbSession
 from app.middleware.rate_limiter import ReadRateLimit
 from app.models.tag import Tag
 from app.models.tag_trend import TagTrend
+from app.services.trends import hourly_tag_trends
 
 router = APIRouter(prefix="/api/v1", tags=["tags"])
 
@@ -35,11 +38,23 @@ async def list_trending_tags(
     user: CurrentUser,
     db: DbSession,
     _rate: ReadRateLimit,
+    window: str = Query("weekly", pattern="^(weekly|hourly)$"),
 ) -> dict:
     """Return top 10 trending tags from the latest trend detection period.
 
-    Trending = growth_rate > 2.0 AND >= 3 traces in the current 7-day window.
+    Trending = growth_rate > 2.0 AND >= 3 traces in the current window.
+    window=weekly compares 7-day windows (computed by the consolidation
+    worker); window=hourly compares the last TAG_TRENDS_HOURLY_WINDOW_HOURS
+    against the hours before, read from the hourly rollup.
     """
+    if window == "hourly":
+        if not settings.tag_trends_hourly_enabled:
+            raise HTTPException(
+                status_code=503,
+                detail="Hourly tag trends disabled. Set TAG_TRENDS_HOURLY_ENABLED=true.",
+            )
+        return {"trending": await hourly_tag_trends(db)}
+
     result = await db.execute(
         select(
             TagTrend.tag_name,
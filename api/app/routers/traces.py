@@ -1,7 +1,8 @@
 """Trace submission and retrieval endpoints.
 
-POST /api/v1/traces      -- submit a new trace (auth + rate limit + PII scan)
-GET  /api/v1/traces/{id} -- retrieve a trace with its tags
+POST /api/v1/traces       -- submit a new trace (auth + rate limit + PII scan)
+POST /api/v1/traces/batch -- submit several traces in one transaction, per-item status
+GET  /api/v1/traces/{id}  -- retrieve a trace with its tags
 """
 
 import uuid
@@ -10,22 +11,33 @@ from fastapi import APIRouter, HTTPException
 from sqlalchemy import insert, select, text
 from sqlalchemy.orm import selectinload
 
-from app.dependencies import CurrentUser, DbSession, RequireContributor
-from app.middleware.rate_limiter import ReadRateLimit, WriteRateLimit
-from app.models.tag import Tag, trace_tags
+from app.config import settings
+from app.dependencies import CurrentUser, DbSession, RedisClient, RequireContributor
+from app.middleware.rate_limiter import ReadRateLimit, WriteRateLimit, check_rate_limit
 from app.models.trace import Trace
-from app.schemas.trace import TraceAccepted, TraceCreate, TraceResponse
+from app.schemas.trace import (
+    TraceAccepted,
+    TraceBatchAccepted,
+    TraceBatchCreate,
+    TraceBatchItem,
+    TraceCreate,
+    TraceResponse,
+)
 
-from app.services.context import build_context_fingerprint
-from app.services.decay import compute_half_life
-from app.services.enrichment import auto_enrich_metadata, coerce_tokens_to_resolution, compute_depth_score, compute_impact_level, compute_somatic_intensity
-from app.services.scanner import SecretDetectedError, scan_trace_submission
-from app.services.staleness import check_trace_staleness
-from app.services.tags import normalize_tag, validate_tag
+from app.services.background import track_task
+from app.services.cpu_executor import CpuTaskTimeout
+from app.services.staleness import flag_stale_traces, library_reference
+from app.services.submission import prepare_trace_batch, prepare_trace_submission
+from app.services.tag_index import index_trace_tags
+from app.services.tags import tag_traces
 
 router = APIRouter(prefix="/api/v1", tags=["traces"])
 
 
+def _submission_timeout() -> HTTPException:
+    return HTTPException(status_code=503, detail="Submission processing timed out — retry shortly")
+
+
 @router.post("/traces", response_model=TraceAccepted, status_code=202)
 async def submit_trace(
     body: TraceCreate,
@@ -40,16 +52,24 @@ async def submit_trace(
     2. Write rate limit (WriteRateLimit dependency)
     3. PII / secrets scan (scan_trace_submission)
 
-    Tags are normalized, validated, and created if not already present.
-    A staleness check is performed on metadata_json library references.
+    The scan and all fields derived from the submitted text (enrichment,
+    scores, context fingerprint) are computed in one call on the CPU
+    executor, off the event loop.
+
+    Tags are normalized, validated, and created if not already present
+    (app.services.tags: one upsert for the list, one multi-row link insert).
+    A staleness check on metadata_json library references runs in the
+    background once the trace is committed (it only ever sets is_stale).
 
     Returns 202 Accepted with the trace ID in pending state.
     """
-    # Gate 3: PII scan — runs synchronously before any DB write
+    # Gate 3: PII scan, plus the derived fields — before any DB write
     try:
-        scan_trace_submission(body.title, body.context_text, body.solution_text)
-    except SecretDetectedError as e:
-        raise HTTPException(status_code=422, detail=f"Content rejected: {e}")
+        prepared = await prepare_trace_submission(body)
+    except CpuTaskTimeout:
+        raise _submission_timeout()
+    if prepared.rejection:
+        raise HTTPException(status_code=422, detail=prepared.rejection)
 
     # Create the trace row first (without tags — we'll link them after)
     trace = Trace(
@@ -63,47 +83,16 @@ async def submit_trace(
         contributor_id=user.id,
     )
 
-    # Staleness check — never blocks submission, just sets the flag
-    is_stale = await check_trace_staleness(body.metadata_json)
-    if is_stale:
-        trace.is_stale = True
-
     db.add(trace)
     # Flush to get trace.id before inserting tag associations
     await db.flush()
 
-    # Tag processing: normalize -> validate -> get-or-create -> associate
-    for raw_tag in body.tags:
-        normalized = normalize_tag(raw_tag)
-        if not validate_tag(normalized):
-            # Skip invalid tags silently — schema allows any string input,
-            # but we only persist tags that pass normalization + validation
-            continue
-
-        # Get or create the Tag row
-        result = await db.execute(select(Tag).where(Tag.name == normalized))
-        tag = result.scalar_one_or_none()
-        if tag is None:
-            tag = Tag(name=normalized)
-            db.add(tag)
-            await db.flush()  # Flush to get tag.id
-
-        # Direct join-table insert (avoids MissingGreenlet from relationship.append)
-        await db.execute(
-            insert(trace_tags).values(trace_id=trace.id, tag_id=tag.id)
-        )
+    tag_names = prepared.tag_names
+    for field, value in prepared.fields.items():
+        setattr(trace, field, value)
 
-    # Enrich metadata with auto-detected language/framework, compute depth and decay rate
-    tag_names = [normalize_tag(t) for t in body.tags if validate_tag(normalize_tag(t))]
-    base_meta = coerce_tokens_to_resolution(body.metadata_json, body.tokens_to_resolution)
-    enriched = auto_enrich_metadata(base_meta, body.solution_text)
-    trace.metadata_json = enriched
-    trace.depth_score = compute_depth_score(enriched, body.solution_text)
-    trace.somatic_intensity = compute_somatic_intensity(enriched)
-    trace.impact_level = compute_impact_level(enriched, tag_names)
-    trace.half_life_days = compute_half_life(tag_names)
-    trace.context_fingerprint = build_context_fingerprint(enriched, tag_names)
-    trace.memory_temperature = "WARM"  # New traces start warm
+    # Tags: resolve the whole list in one upsert, then one multi-row link insert
+    await tag_traces(db, {trace.id: tag_names})
 
     # Prospective memory fields
     if body.review_after:
@@ -113,6 +102,12 @@ async def submit_trace(
 
     await db.commit()
     await db.refresh(trace)
+    index_trace_tags(trace.id, tag_names)
+
+    # Staleness check — off the request path, just sets the flag
+    reference = library_reference(body.metadata_json)
+    if reference is not None:
+        track_task(flag_stale_traces({trace.id: reference}))
 
     # Set valid_from after refresh (mirrors created_at)
     if trace.valid_from is None:
@@ -156,6 +151,136 @@ async def submit_trace(
     return TraceAccepted(id=trace.id, status="pending")
 
 
+@router.post("/traces/batch", response_model=TraceBatchAccepted, status_code=202)
+async def submit_traces_batch(
+    body: TraceBatchCreate,
+    user: RequireContributor,
+    db: DbSession,
+    redis_client: RedisClient,
+) -> TraceBatchAccepted:
+    """Submit several traces at once, e.g. a session's discoveries or a seed import.
+
+    Each item passes the same gates as POST /traces and is stored the same
+    way, but an item that fails its PII scan or names a supersede target the
+    user does not own is reported as rejected instead of failing the whole
+    request. The write rate limit is charged one token per item.
+
+    All accepted items are written in one transaction: tags are resolved
+    with a single upsert, and traces, tag links and SUPERSEDES edges are
+    multi-row inserts. Staleness checks run in the background afterwards.
+    """
+    await check_rate_limit(user, redis_client, "write", settings, cost=len(body.traces))
+
+    outcomes: dict[int, TraceBatchItem] = {}
+
+    def _reject(index: int, error: str) -> None:
+        outcomes[index] = TraceBatchItem(index=index, status="rejected", error=error)
+
+    # Gate 3: PII scan, plus the derived fields — every item in one CPU
+    # executor call, before any DB write
+    try:
+        prepared = await prepare_trace_batch(body.traces)
+    except CpuTaskTimeout:
+        raise _submission_timeout()
+    for index, item in enumerate(prepared):
+        if item.rejection:
+            _reject(index, item.rejection)
+
+    # H5: only the original contributor can supersede a trace — one lookup for the batch
+    targets = {
+        item.supersedes_trace_id
+        for index, item in enumerate(body.traces)
+        if index not in outcomes and item.supersedes_trace_id
+    }
+    owners: dict[uuid.UUID, uuid.UUID] = {}
+    if targets:
+        owner_rows = await db.execute(
+            select(Trace.id, Trace.contributor_id).where(Trace.id.in_(targets))
+        )
+        owners = {row.id: row.contributor_id for row in owner_rows}
+    for index, item in enumerate(body.traces):
+        if index in outcomes or item.supersedes_trace_id is None:
+            continue
+        owner = owners.get(item.supersedes_trace_id)
+        if owner is None:
+            _reject(index, "Superseded trace not found")
+        elif owner != user.id:
+            _reject(index, "Can only supersede your own traces")
+
+    accepted = [index for index in range(len(body.traces)) if index not in outcomes]
+    if accepted:
+        rows: list[dict] = []
+        tags_by_trace: dict[uuid.UUID, list[str]] = {}
+        references: dict[uuid.UUID, tuple[str, str]] = {}
+        superseded: list[tuple[uuid.UUID, uuid.UUID]] = []
+        for index in accepted:
+            item = body.traces[index]
+            tag_names, derived = prepared[index].tag_names, prepared[index].fields
+            trace_id = uuid.uuid4()
+            rows.append({
+                "id": trace_id,
+                "title": item.title,
+                "context_text": item.context_text,
+                "solution_text": item.solution_text,
+                "agent_model": item.agent_model,
+                "agent_version": item.agent_version,
+                "status": "pending",
+                "contributor_id": user.id,
+                "review_after": item.review_after,
+                "watch_condition": item.watch_condition,
+                **derived,
+            })
+            tags_by_trace[trace_id] = tag_names
+            reference = library_reference(item.metadata_json)
+            if reference is not None:
+                references[trace_id] = reference
+            if item.supersedes_trace_id:
+                superseded.append((trace_id, item.supersedes_trace_id))
+            outcomes[index] = TraceBatchItem(index=index, status="pending", id=trace_id)
+
+        await db.execute(insert(Trace), rows)
+        await tag_traces(db, tags_by_trace)
+        # valid_from mirrors created_at, as for single submissions
+        await db.execute(
+            text(
+                "UPDATE traces SET valid_from = created_at "
+                "WHERE id = ANY(:ids) AND valid_from IS NULL"
+            ),
+            {"ids": [row["id"] for row in rows]},
+        )
+        if superseded:
+            await db.execute(
+                text(
+                    "INSERT INTO trace_relationships "
+                    "(id, source_trace_id, target_trace_id, relationship_type, strength) "
+                    "VALUES (gen_random_uuid(), :new_id, :old_id, 'SUPERSEDES', 1.0) "
+                    "ON CONFLICT (source_trace_id, target_trace_id, relationship_type) DO NOTHING"
+                ),
+                [{"new_id": str(new_id), "old_id": str(old_id)} for new_id, old_id in superseded],
+            )
+            # Close validity windows of superseded traces
+            await db.execute(
+                text(
+                    "UPDATE traces SET valid_until = now() "
+                    "WHERE id = ANY(:ids) AND valid_until IS NULL"
+                ),
+                {"ids": [old_id for _, old_id in superseded]},
+            )
+        await db.commit()
+        for trace_id, names in tags_by_trace.items():
+            index_trace_tags(trace_id, names)
+        # Staleness check — off the request path, just sets the flag
+        if references:
+            track_task(flag_stale_traces(references))
+
+    results = [outcomes[index] for index in range(len(body.traces))]
+    return TraceBatchAccepted(
+        results=results,
+        accepted=len(accepted),
+        rejected=len(results) - len(accepted),
+    )
+
+
 @router.get("/traces/{trace_id}", response_model=TraceResponse)
 async def get_trace(
     trace_id: uuid.UUID,
@@ -1,8 +1,11 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 import uuid
 from datetime import datetime
 
+# Most searches POST /traces/search/batch accepts in one request.
+MAX_BATCH_SEARCHES = 10
+
 
 class TraceSearchRequest(BaseModel):
     q: Optional[str] = Field(default=None, max_length=2000, description="Natural language search query (omit for tag-only search)")
@@ -10,6 +13,11 @@ class TraceSearchRequest(BaseModel):
     limit: int = Field(default=10, ge=1, le=50, description="Max results to return")
     context: Optional[dict] = Field(default=None, description="Searcher's environment context for relevance boosting")
     include_expired: bool = Field(default=True, description="Include expired traces (de-ranked) or exclude entirely")
+    mode: Literal["content", "multi_vector"] = Field(
+        default="content",
+        description="content: ANN over the trace embedding; multi_vector: content, solution "
+        "and context (from `context`) embeddings fused by reciprocal rank fusion",
+    )
 
 
 class RelatedTrace(BaseModel):
@@ -49,3 +57,14 @@ class TraceSearchResponse(BaseModel):
     results: list[TraceSearchResult]
     total: int  # number of results returned
     query: Optional[str] = None  # echo back the query (None for tag-only search)
+
+
+class TraceSearchBatchRequest(BaseModel):
+    searches: list[TraceSearchRequest] = Field(
+        min_length=1, max_length=MAX_BATCH_SEARCHES,
+        description="Searches to run; each is ranked as POST /traces/search would rank it",
+    )
+
+
+class TraceSearchBatchResponse(BaseModel):
+    responses: list[TraceSearchResponse]  # one per search, in request order
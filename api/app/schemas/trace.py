@@ -3,10 +3,13 @@
 import json
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
+# Most traces POST /traces/batch accepts in one request.
+MAX_BATCH_TRACES = 20
+
 
 class TraceCreate(BaseModel):
     """Request schema for submitting a new trace."""
@@ -70,3 +73,26 @@ class TraceAccepted(BaseModel):
     id: uuid.UUID
     status: str = "pending"
     message: str = "Trace accepted for processing"
+
+
+class TraceBatchCreate(BaseModel):
+    """Request schema for submitting several traces at once."""
+
+    traces: list[TraceCreate] = Field(min_length=1, max_length=MAX_BATCH_TRACES)
+
+
+class TraceBatchItem(BaseModel):
+    """Outcome of one item of a batch submission, by position in the request."""
+
+    index: int
+    status: Literal["pending", "rejected"]
+    id: Optional[uuid.UUID] = None
+    error: Optional[str] = None
+
+
+class TraceBatchAccepted(BaseModel):
+    """Response after a batch submission: accepted items are pending like single submits."""
+
+    results: list[TraceBatchItem]
+    accepted: int
+    rejected: int
@@ -0,0 +1,276 @@
+"""Analytics rollups for the owner dashboard.
+
+Keeps the analytics_* tables (migration 0028) up to date so dashboard
+endpoints read a few pre-aggregated rows instead of scanning users, traces,
+votes and retrieval_logs on every load:
+
+  * analytics_daily / analytics_tag_daily — recomputed incrementally: only
+    days from the day before the "analytics_daily" watermark onward (late
+    rows for yesterday are still picked up). The first run backfills
+    ANALYTICS_BACKFILL_DAYS. Days older than the retrieval-log retention
+    keep their search counts after the logs themselves are dropped.
+  * analytics_contributors / analytics_gauges — snapshots advanced from the
+    "analytics_snapshots" watermark: only contributors with traces created
+    or retrieved since then are recomputed, and row totals add the rows
+    created in the window. The first run of each UTC day reconciles both
+    in full (deleted rows, emails added to existing users). DAU/WAU/MAU
+    are index range counts on users.last_seen_at.
+
+Runs are serialized across processes with a transaction-scoped advisory
+lock; a run that finds it held is skipped. Dashboard reads never refresh —
+until the scheduled job's first run they report rollups_pending.
+
+All days are UTC calendar days.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.watermarks import get_watermark, set_watermark
+
+log = structlog.get_logger(__name__)
+
+WATERMARK_NAME = "analytics_daily"
+SNAPSHOT_WATERMARK_NAME = "analytics_snapshots"
+
+# pg_try_advisory_xact_lock key for refresh runs ("anly").
+_LOCK_KEY = 0x616E6C79
+
+# Rows committed late (long transactions) still land in the next window.
+INGEST_LAG = timedelta(minutes=5)
+
+# Row-count gauges maintained by adding rows created since the last run:
+# gauge -> (table, extra condition).
+_ROW_TOTALS = {
+    "users_total": ("users", ""),
+    "users_with_email": ("users", "AND email IS NOT NULL"),
+    "votes_total": ("votes", ""),
+    "amendments_total": ("amendments", ""),
+}
+
+_CONTRIBUTOR_UPSERT = (
+    "INSERT INTO analytics_contributors (user_id, trace_count, total_retrievals, refreshed_at) "
+    "SELECT contributor_id, COUNT(*), COALESCE(SUM(retrieval_count), 0), now() "
+    "FROM traces {where} GROUP BY contributor_id "
+    "ON CONFLICT (user_id) DO UPDATE SET "
+    "trace_count = EXCLUDED.trace_count, "
+    "total_retrievals = EXCLUDED.total_retrievals, "
+    "refreshed_at = EXCLUDED.refreshed_at"
+)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def refresh_window(watermark: datetime | None, today: date) -> date:
+    """First day to recompute: the day before the watermark, or the backfill start."""
+    if watermark is None:
+        return today - timedelta(days=settings.analytics_backfill_days)
+    return min(watermark.date() - timedelta(days=1), today)
+
+
+async def _refresh_daily(session: AsyncSession, since: date, today: date) -> None:
+    await session.execute(
+        text(
+            """
+            WITH days AS (
+                SELECT generate_series(CAST(:since AS date), CAST(:today AS date), interval '1 day')::date AS day
+            ),
+            signups AS (
+                SELECT (created_at AT TIME ZONE 'UTC')::date AS day, COUNT(*) AS n
+                FROM users WHERE created_at >= :since_ts GROUP BY 1
+            ),
+            new_traces AS (
+                SELECT (created_at AT TIME ZONE 'UTC')::date AS day, COUNT(*) AS n
+                FROM traces WHERE created_at >= :since_ts GROUP BY 1
+            ),
+            new_votes AS (
+                SELECT (created_at AT TIME ZONE 'UTC')::date AS day, COUNT(*) AS n
+                FROM votes WHERE created_at >= :since_ts GROUP BY 1
+            ),
+            new_amendments AS (
+                SELECT (created_at AT TIME ZONE 'UTC')::date AS day, COUNT(*) AS n
+                FROM amendments WHERE created_at >= :since_ts GROUP BY 1
+            ),
+            searches AS (
+                SELECT (retrieved_at AT TIME ZONE 'UTC')::date AS day,
+                    COUNT(DISTINCT search_session_id) AS sessions,
+                    COUNT(*) AS retrievals
+                FROM retrieval_logs WHERE retrieved_at >= :since_ts GROUP BY 1
+            )
+            INSERT INTO analytics_daily
+                (day, signups, traces, votes, amendments, search_sessions, retrievals, refreshed_at)
+            SELECT d.day,
+                COALESCE(s.n, 0), COALESCE(t.n, 0), COALESCE(v.n, 0), COALESCE(a.n, 0),
+                COALESCE(r.sessions, 0), COALESCE(r.retrievals, 0), now()
+            FROM days d
+            LEFT JOIN signups s ON s.day = d.day
+            LEFT JOIN new_traces t ON t.day = d.day
+            LEFT JOIN new_votes v ON v.day = d.day
+            LEFT JOIN new_amendments a ON a.day = d.day
+            LEFT JOIN searches r ON r.day = d.day
+            ON CONFLICT (day) DO UPDATE SET
+                signups = EXCLUDED.signups,
+                traces = EXCLUDED.traces,
+                votes = EXCLUDED.votes,
+                amendments = EXCLUDED.amendments,
+                search_sessions = EXCLUDED.search_sessions,
+                retrievals = EXCLUDED.retrievals,
+                refreshed_at = EXCLUDED.refreshed_at
+            """
+        ),
+        {"since": since, "today": today, "since_ts": _day_start(since)},
+    )
+
+
+async def _refresh_tag_daily(session: AsyncSession, since: date) -> None:
+    # Recomputed days are replaced wholesale so tags that dropped to zero vanish.
+    await session.execute(
+        text("DELETE FROM analytics_tag_daily WHERE day >= :since"),
+        {"since": since},
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO analytics_tag_daily (day, tag_name, retrievals, new_traces)
+            SELECT day, tag_name, SUM(retrievals), SUM(new_traces)
+            FROM (
+                SELECT (rl.retrieved_at AT TIME ZONE 'UTC')::date AS day, tg.name AS tag_name,
+                    COUNT(*) AS retrievals, 0 AS new_traces
+                FROM retrieval_logs rl
+                JOIN trace_tags tt ON tt.trace_id = rl.trace_id
+                JOIN tags tg ON tg.id = tt.tag_id
+                WHERE rl.retrieved_at >= :since_ts
+                GROUP BY 1, 2
+                UNION ALL
+                SELECT (t.created_at AT TIME ZONE 'UTC')::date, tg.name,
+                    0, COUNT(DISTINCT t.id)
+                FROM traces t
+                JOIN trace_tags tt ON tt.trace_id = t.id
+                JOIN tags tg ON tg.id = tt.tag_id
+                WHERE t.created_at >= :since_ts
+                GROUP BY 1, 2
+            ) activity
+            GROUP BY day, tag_name
+            """
+        ),
+        {"since_ts": _day_start(since)},
+    )
+
+
+async def _reconcile_snapshots(session: AsyncSession, until: datetime) -> None:
+    """Recompute every contributor and row total (daily, and on the first run)."""
+    await session.execute(text(_CONTRIBUTOR_UPSERT.format(where="")))
+    await session.execute(
+        text(
+            "DELETE FROM analytics_contributors c "
+            "WHERE NOT EXISTS (SELECT 1 FROM traces t WHERE t.contributor_id = c.user_id)"
+        )
+    )
+    totals = ", ".join(
+        f"('{name}', (SELECT COUNT(*) FROM {table} WHERE created_at <= :until {condition}))"
+        for name, (table, condition) in _ROW_TOTALS.items()
+    )
+    await session.execute(
+        text(
+            "INSERT INTO analytics_gauges (name, value, refreshed_at) "
+            f"SELECT name, value, now() FROM (VALUES {totals}) AS g(name, value) "
+            "ON CONFLICT (name) DO UPDATE SET "
+            "value = EXCLUDED.value, refreshed_at = EXCLUDED.refreshed_at"
+        ),
+        {"until": until},
+    )
+
+
+async def _advance_snapshots(session: AsyncSession, since: datetime, until: datetime) -> None:
+    """Fold in what changed in (since, until]."""
+    # Recomputing a contributor is idempotent, so the lag overlap is harmless;
+    # both columns are indexed.
+    await session.execute(
+        text(_CONTRIBUTOR_UPSERT.format(where=(
+            "WHERE contributor_id IN (SELECT contributor_id FROM traces "
+            "WHERE created_at > :changed OR last_retrieved_at > :changed)"
+        ))),
+        {"changed": since - INGEST_LAG},
+    )
+    deltas = ", ".join(
+        f"('{name}', (SELECT COUNT(*) FROM {table} "
+        f"WHERE created_at > :since AND created_at <= :until {condition}))"
+        for name, (table, condition) in _ROW_TOTALS.items()
+    )
+    await session.execute(
+        text(
+            "UPDATE analytics_gauges g SET value = g.value + d.delta, refreshed_at = now() "
+            f"FROM (VALUES {deltas}) AS d(name, delta) WHERE g.name = d.name"
+        ),
+        {"since": since, "until": until},
+    )
+
+
+async def _refresh_snapshots(session: AsyncSession, now: datetime) -> None:
+    until = now - INGEST_LAG
+    since = await get_watermark(session, SNAPSHOT_WATERMARK_NAME)
+    if since is None or since.date() < until.date():
+        await _reconcile_snapshots(session, until)
+    elif since < until:
+        await _advance_snapshots(session, since, until)
+    await set_watermark(session, SNAPSHOT_WATERMARK_NAME, max(until, since or until))
+
+    # Derived from the contributor snapshot, plus index range counts
+    await session.execute(
+        text(
+            """
+            INSERT INTO analytics_gauges (name, value, refreshed_at)
+            SELECT name, value, now()
+            FROM (VALUES
+                ('users_dau', (SELECT COUNT(*) FROM users WHERE last_seen_at >= :d1)),
+                ('users_wau', (SELECT COUNT(*) FROM users WHERE last_seen_at >= :d7)),
+                ('users_mau', (SELECT COUNT(*) FROM users WHERE last_seen_at >= :d30)),
+                ('traces_total', (SELECT COALESCE(SUM(trace_count), 0) FROM analytics_contributors)),
+                ('retrievals_total', (SELECT COALESCE(SUM(total_retrievals), 0) FROM analytics_contributors))
+            ) AS g(name, value)
+            ON CONFLICT (name) DO UPDATE SET
+                value = EXCLUDED.value,
+                refreshed_at = EXCLUDED.refreshed_at
+            """
+        ),
+        {
+            "d1": now - timedelta(days=1),
+            "d7": now - timedelta(days=7),
+            "d30": now - timedelta(days=30),
+        },
+    )
+
+
+async def refresh_analytics_rollups(session: AsyncSession) -> dict:
+    """Bring every rollup table up to date. Not committed — the caller
+    (the scheduler job) owns the transaction, which also holds the lock."""
+    locked = await session.execute(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _LOCK_KEY}
+    )
+    if not locked.scalar():
+        log.info("analytics_rollups_skipped", reason="refresh already running")
+        return {"skipped": True}
+
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    since = refresh_window(await get_watermark(session, WATERMARK_NAME), today)
+
+    await _refresh_daily(session, since, today)
+    await _refresh_tag_daily(session, since)
+    await _refresh_snapshots(session, now)
+    await set_watermark(session, WATERMARK_NAME, _day_start(today))
+
+    days = (today - since).days + 1
+    log.info("analytics_rollups_refreshed", days_recomputed=days)
+    return {"days_recomputed": days}
+
+
+async def rollups_ready(session: AsyncSession) -> bool:
+    """Whether the scheduled job has populated the rollups at least once."""
+    return await get_watermark(session, WATERMARK_NAME) is not None
@@ -0,0 +1,18 @@
+"""Fire-and-forget tasks started from request handlers.
+
+The event loop only keeps weak references to tasks, so a task nobody
+holds can be garbage-collected before it finishes. track_task keeps a
+strong reference until the task is done.
+"""
+
+import asyncio
+from collections.abc import Coroutine
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+def track_task(coro: Coroutine) -> None:
+    """Create a tracked background task that removes itself when done."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
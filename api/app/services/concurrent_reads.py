@@ -0,0 +1,68 @@
+"""Run independent read-only queries concurrently on pooled connections.
+
+An AsyncSession wraps a single connection, so N aggregates awaited one after
+another on the request session cost the *sum* of their latencies. Dashboard
+endpoints whose aggregates do not depend on each other hand them to
+gather_reads instead: each query runs on its own short-lived session (and so
+its own pooled connection), and the endpoint waits only for the slowest one.
+
+Concurrency is capped by ANALYTICS_QUERY_CONCURRENCY so one dashboard load
+cannot drain the connection pool; at 1 (or when only one query is given)
+the queries run sequentially on the caller's session, as before.
+
+Only use this for reads that need no uncommitted state from the caller's
+transaction — every query sees its own snapshot.
+"""
+
+import asyncio
+from collections.abc import Mapping
+from typing import Any
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable
+
+from app.config import settings
+from app.database import async_session_factory
+
+# A statement, or (statement, bind params).
+ReadQuery = Executable | tuple[Executable, Mapping[str, Any]]
+
+
+def _split(query: ReadQuery) -> tuple[Executable, Mapping[str, Any] | None]:
+    if isinstance(query, tuple):
+        return query
+    return query, None
+
+
+async def gather_reads(
+    session: AsyncSession, queries: Mapping[str, ReadQuery]
+) -> dict[str, list[Row]]:
+    """Execute every query and return its fetched rows, keyed like `queries`.
+
+    Rows are fetched inside each query's session, so the returned lists stay
+    valid after the per-query sessions close. The first failure cancels the
+    remaining queries and is re-raised.
+    """
+    limit = settings.analytics_query_concurrency
+    if limit <= 1 or len(queries) <= 1:
+        rows = {}
+        for name, query in queries.items():
+            stmt, params = _split(query)
+            rows[name] = (await session.execute(stmt, params)).all()
+        return rows
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(query: ReadQuery) -> list[Row]:
+        stmt, params = _split(query)
+        async with semaphore:
+            async with async_session_factory() as read_session:
+                return (await read_session.execute(stmt, params)).all()
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = {name: group.create_task(_run(query)) for name, query in queries.items()}
+    except ExceptionGroup as errors:
+        raise errors.exceptions[0]
+    return {name: task.result() for name, task in tasks.items()}
@@ -3,14 +3,27 @@
 Finds traces within the same convergence cluster that offer different
 solutions (ALTERNATIVE_TO) or directly conflict (CONTRADICTS).
 
-Uses pgvector cosine distance on solution_embedding (or main embedding
-as fallback) to measure solution divergence within clusters.
+Measures cosine distance between solution_embedding (or main embedding as
+fallback) within clusters. Only clusters whose signature changed since
+their last scan (convergence_cluster_scans) are re-scored: the signature
+covers each member's id, trust band (the CONTRADICTS thresholds) and
+embedded_at, so membership changes, votes that move a member across
+TRUST_HIGH/TRUST_LOW and re-embedded solutions all trigger a rescan. Each
+cluster's vectors are loaded once and every pair is scored in a single
+NumPy matrix product instead of a SQL self-join; a rescan drops the
+cluster's edges that no longer hold.
 """
 
+import uuid
+
+import numpy as np
 import structlog
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.services.knn import parse_vector, unit_matrix
+
 log = structlog.get_logger(__name__)
 
 # Minimum cosine distance between solution embeddings to consider them different approaches
@@ -20,80 +33,235 @@ ALTERNATIVE_DISTANCE_THRESHOLD = 0.4
 TRUST_HIGH = 1.0
 TRUST_LOW = -0.5
 
+# Clusters whose members are loaded per query, and relationship rows per INSERT.
+_CLUSTERS_PER_QUERY = 100
+_ROWS_PER_INSERT = 5000
 
-async def detect_alternatives(session: AsyncSession) -> int:
-    """Detect ALTERNATIVE_TO and CONTRADICTS relationships within convergence clusters.
-
-    For each cluster with 2+ traces that have embeddings:
-    - ALTERNATIVE_TO: solution embeddings differ significantly (cosine distance > 0.4)
-    - CONTRADICTS: additionally, trust scores conflict (one > 1.0, other < -0.5)
 
-    Uses pgvector <=> operator for distance computation in SQL.
-    Upserts with ON CONFLICT DO NOTHING for idempotency.
+def score_cluster_pairs(
+    ids: list[uuid.UUID], trust: list[float], vectors: list
+) -> list[tuple[uuid.UUID, uuid.UUID, str]]:
+    """Score every pair in one cluster and classify the divergent ones.
 
-    Returns count of new relationships created.
+    Returns (trace_a, trace_b, relationship_type) for each unordered pair whose
+    solution distance exceeds ALTERNATIVE_DISTANCE_THRESHOLD: CONTRADICTS when
+    one side is trusted (> TRUST_HIGH) and the other distrusted (< TRUST_LOW),
+    ALTERNATIVE_TO otherwise.
     """
-    # Find all cluster pairs where solution divergence exceeds threshold
-    # Uses solution_embedding if available, falls back to main embedding
+    if len(ids) < 2:
+        return []
+    matrix = unit_matrix(vectors)
+    distances = 1.0 - matrix @ matrix.T
+    rows, cols = np.nonzero(np.triu(distances > ALTERNATIVE_DISTANCE_THRESHOLD, k=1))
+
+    trust_arr = np.asarray(trust, dtype=np.float64)
+    high = trust_arr > TRUST_HIGH
+    low = trust_arr < TRUST_LOW
+    contradicts = (high[rows] & low[cols]) | (high[cols] & low[rows])
+
+    return [
+        (ids[i], ids[j], "CONTRADICTS" if c else "ALTERNATIVE_TO")
+        for i, j, c in zip(rows.tolist(), cols.tolist(), contradicts.tolist())
+    ]
+
+
+async def _changed_clusters(session: AsyncSession) -> list:
+    """Clusters (2+ eligible members) whose signature differs from the last scan."""
     result = await session.execute(
         text(
             """
-            WITH cluster_pairs AS (
+            WITH current_clusters AS (
                 SELECT
-                    a.id AS trace_a_id,
-                    b.id AS trace_b_id,
-                    a.trust_score AS trust_a,
-                    b.trust_score AS trust_b,
-                    COALESCE(a.solution_embedding, a.embedding) <=>
-                    COALESCE(b.solution_embedding, b.embedding) AS solution_distance
-                FROM traces a
-                JOIN traces b ON a.convergence_cluster_id = b.convergence_cluster_id
-                    AND a.id < b.id
-                WHERE a.convergence_cluster_id IS NOT NULL
-                    AND COALESCE(a.solution_embedding, a.embedding) IS NOT NULL
-                    AND COALESCE(b.solution_embedding, b.embedding) IS NOT NULL
-                    AND a.is_flagged = false
-                    AND b.is_flagged = false
+                    convergence_cluster_id AS cluster_id,
+                    COUNT(*) AS member_count,
+                    md5(string_agg(
+                        id::text
+                        || CASE WHEN trust_score > :high THEN ':h'
+                                WHEN trust_score < :low THEN ':l'
+                                ELSE ':m' END
+                        || ':' || COALESCE(extract(epoch FROM embedded_at)::text, ''),
+                        ',' ORDER BY id
+                    )) AS member_hash
+                FROM traces
+                WHERE convergence_cluster_id IS NOT NULL
+                    AND COALESCE(solution_embedding, embedding) IS NOT NULL
+                    AND is_flagged = false
+                GROUP BY convergence_cluster_id
+                HAVING COUNT(*) >= 2
             )
-            SELECT trace_a_id, trace_b_id, trust_a, trust_b, solution_distance
-            FROM cluster_pairs
-            WHERE solution_distance > :threshold
+            SELECT c.cluster_id, c.member_count, c.member_hash
+            FROM current_clusters c
+            LEFT JOIN convergence_cluster_scans s ON s.cluster_id = c.cluster_id
+            WHERE s.cluster_id IS NULL OR s.member_hash != c.member_hash
+            """
+        ),
+        {"high": TRUST_HIGH, "low": TRUST_LOW},
+    )
+    return result.all()
+
+
+async def _load_members(
+    session: AsyncSession, cluster_ids: list[uuid.UUID], cap: int
+) -> dict[uuid.UUID, list]:
+    """Load (id, trust, solution vector) per cluster, at most `cap` members each.
+
+    Oversized clusters are sampled in SQL by md5(id) order — pseudo-random but
+    stable across runs, so the same sample is re-scored until membership changes.
+    """
+    result = await session.execute(
+        text(
+            """
+            SELECT cluster_id, id, trust_score, vec
+            FROM (
+                SELECT
+                    t.convergence_cluster_id AS cluster_id,
+                    t.id,
+                    t.trust_score,
+                    COALESCE(t.solution_embedding, t.embedding) AS vec,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY t.convergence_cluster_id ORDER BY md5(t.id::text)
+                    ) AS rn
+                FROM traces t
+                WHERE t.convergence_cluster_id = ANY(:cluster_ids)
+                    AND COALESCE(t.solution_embedding, t.embedding) IS NOT NULL
+                    AND t.is_flagged = false
+            ) members
+            WHERE rn <= :cap
             """
         ),
-        {"threshold": ALTERNATIVE_DISTANCE_THRESHOLD},
+        {"cluster_ids": cluster_ids, "cap": cap},
     )
-    rows = result.all()
+    members: dict[uuid.UUID, list] = {}
+    for row in result.all():
+        members.setdefault(row.cluster_id, []).append(row)
+    return members
+
+
+async def detect_alternatives(session: AsyncSession) -> int:
+    """Detect ALTERNATIVE_TO and CONTRADICTS relationships within convergence clusters.
+
+    For each cluster whose signature changed since its last scan:
+    - ALTERNATIVE_TO: solution embeddings differ significantly (cosine distance > 0.4)
+    - CONTRADICTS: additionally, trust scores conflict (one > 1.0, other < -0.5)
+
+    Edges between a re-scored cluster's members that no longer classify
+    the same way are deleted; relationships are bulk-inserted in both
+    directions with ON CONFLICT DO NOTHING for idempotency, and every
+    scanned cluster's signature is recorded.
+
+    Returns count of new relationships created.
+    """
+    changed = await _changed_clusters(session)
+    if not changed:
+        return 0
+
+    cap = settings.alternatives_max_cluster_size
+    to_score = [
+        c.cluster_id for c in changed
+        if c.member_count <= cap or settings.alternatives_sample_oversized
+    ]
+    skipped = len(changed) - len(to_score)
+
+    sources: list[uuid.UUID] = []
+    targets: list[uuid.UUID] = []
+    rel_types: list[str] = []
+    member_ids: list[uuid.UUID] = []
+    member_clusters: list[uuid.UUID] = []
+    pairs_evaluated = 0
+    for start in range(0, len(to_score), _CLUSTERS_PER_QUERY):
+        members = await _load_members(session, to_score[start:start + _CLUSTERS_PER_QUERY], cap)
+        for cluster_id, rows in members.items():
+            member_ids.extend(r.id for r in rows)
+            member_clusters.extend(cluster_id for _ in rows)
+            n = len(rows)
+            pairs_evaluated += n * (n - 1) // 2
+            pairs = score_cluster_pairs(
+                [r.id for r in rows],
+                [r.trust_score for r in rows],
+                [parse_vector(r.vec) for r in rows],
+            )
+            for a, b, rel_type in pairs:
+                sources.extend((a, b))
+                targets.extend((b, a))
+                rel_types.extend((rel_type, rel_type))
+
+    # Edges within a re-scored cluster that the new scores no longer support
+    # (a CONTRADICTS whose trust conflict resolved, a pair that converged).
+    removed = 0
+    if member_ids:
+        result = await session.execute(
+            text(
+                "DELETE FROM trace_relationships r "
+                "USING unnest(CAST(:ids AS uuid[]), CAST(:clusters AS uuid[])) AS a(id, cluster_id), "
+                "unnest(CAST(:ids AS uuid[]), CAST(:clusters AS uuid[])) AS b(id, cluster_id) "
+                "WHERE r.source_trace_id = a.id AND r.target_trace_id = b.id "
+                "AND a.cluster_id = b.cluster_id "
+                "AND r.relationship_type IN ('ALTERNATIVE_TO', 'CONTRADICTS') "
+                "AND NOT EXISTS ("
+                "SELECT 1 FROM unnest(CAST(:src AS uuid[]), CAST(:tgt AS uuid[]), "
+                "CAST(:rel_type AS varchar[])) AS v(src, tgt, rel_type) "
+                "WHERE v.src = r.source_trace_id AND v.tgt = r.target_trace_id "
+                "AND v.rel_type = r.relationship_type)"
+            ),
+            {
+                "ids": member_ids,
+                "clusters": member_clusters,
+                "src": sources,
+                "tgt": targets,
+                "rel_type": rel_types,
+            },
+        )
+        removed = max(result.rowcount or 0, 0)
 
     created = 0
-    for row in rows:
-        trace_a = row.trace_a_id
-        trace_b = row.trace_b_id
-        trust_a = row.trust_a
-        trust_b = row.trust_b
-
-        # Determine relationship type
-        is_contradiction = (
-            (trust_a > TRUST_HIGH and trust_b < TRUST_LOW)
-            or (trust_b > TRUST_HIGH and trust_a < TRUST_LOW)
+    for start in range(0, len(sources), _ROWS_PER_INSERT):
+        end = start + _ROWS_PER_INSERT
+        result = await session.execute(
+            text(
+                "INSERT INTO trace_relationships "
+                "(id, source_trace_id, target_trace_id, relationship_type, strength) "
+                "SELECT gen_random_uuid(), v.src, v.tgt, v.rel_type, 1.0 "
+                "FROM unnest(CAST(:src AS uuid[]), CAST(:tgt AS uuid[]), "
+                "CAST(:rel_type AS varchar[])) AS v(src, tgt, rel_type) "
+                "ON CONFLICT (source_trace_id, target_trace_id, relationship_type) "
+                "DO NOTHING"
+            ),
+            {
+                "src": sources[start:end],
+                "tgt": targets[start:end],
+                "rel_type": rel_types[start:end],
+            },
         )
-        rel_type = "CONTRADICTS" if is_contradiction else "ALTERNATIVE_TO"
-
-        # Upsert both directions
-        for src, tgt in [(trace_a, trace_b), (trace_b, trace_a)]:
-            result = await session.execute(
-                text(
-                    "INSERT INTO trace_relationships "
-                    "(id, source_trace_id, target_trace_id, relationship_type, strength) "
-                    "VALUES (gen_random_uuid(), :src, :tgt, :rel_type, 1.0) "
-                    "ON CONFLICT (source_trace_id, target_trace_id, relationship_type) "
-                    "DO NOTHING"
-                ),
-                {"src": str(src), "tgt": str(tgt), "rel_type": rel_type},
-            )
-            if result.rowcount > 0:
-                created += 1
+        created += max(result.rowcount or 0, 0)
 
-    if created > 0:
-        log.info("alternatives_detected", new_relationships=created, pairs_evaluated=len(rows))
+    # Record signatures for every changed cluster — including skipped giants,
+    # so they are not reconsidered until their signature changes again.
+    await session.execute(
+        text(
+            "INSERT INTO convergence_cluster_scans "
+            "(cluster_id, member_count, member_hash, scanned_at) "
+            "SELECT v.cluster_id, v.member_count, v.member_hash, now() "
+            "FROM unnest(CAST(:cluster_ids AS uuid[]), CAST(:counts AS int[]), "
+            "CAST(:hashes AS varchar[])) AS v(cluster_id, member_count, member_hash) "
+            "ON CONFLICT (cluster_id) DO UPDATE SET "
+            "member_count = EXCLUDED.member_count, "
+            "member_hash = EXCLUDED.member_hash, "
+            "scanned_at = EXCLUDED.scanned_at"
+        ),
+        {
+            "cluster_ids": [c.cluster_id for c in changed],
+            "counts": [c.member_count for c in changed],
+            "hashes": [c.member_hash for c in changed],
+        },
+    )
+
+    log.info(
+        "alternatives_detected",
+        new_relationships=created,
+        stale_relationships_removed=removed,
+        clusters_scanned=len(to_score),
+        clusters_skipped=skipped,
+        pairs_evaluated=pairs_evaluated,
+    )
 
     return created
@@ -12,12 +12,16 @@ Runs as part of the consolidation worker sleep cycle.
 """
 
 import uuid as uuid_mod
+from collections import Counter
 
 import structlog
-from sqlalchemy import select, text, update
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.trace import Trace
+from app.services.health import cluster_pairs
+from app.services.knn import hnsw_neighbors, top_k_cosine, unit_matrix
 
 log = structlog.get_logger(__name__)
 
@@ -59,124 +63,185 @@ def classify_convergence_level(cluster_fingerprints: list[dict]) -> int:
     return 4
 
 
+def plan_clusters(
+    edges: list[tuple[str, str]],
+    cluster_of: dict[str, uuid_mod.UUID | None],
+) -> dict[uuid_mod.UUID, list[str]]:
+    """Group neighbour edges into connected components and pick a cluster id.
+
+    A component that already touches a clustered trace joins the existing
+    cluster with the most members in the component (ties broken by id so
+    reruns are deterministic); otherwise it gets a fresh cluster id. Two
+    components that land on the same existing cluster are merged.
+
+    Returns:
+        Mapping of target cluster id -> trace ids (as str) in its components.
+    """
+    plan: dict[uuid_mod.UUID, list[str]] = {}
+    for component in cluster_pairs(edges):
+        existing = Counter(
+            cluster_of[node] for node in component if cluster_of.get(node) is not None
+        )
+        if existing:
+            cluster_id = min(existing, key=lambda cid: (-existing[cid], str(cid)))
+        else:
+            cluster_id = uuid_mod.uuid4()
+        plan.setdefault(cluster_id, []).extend(component)
+    return plan
+
+
+async def _numpy_edges(
+    session: AsyncSession, source_ids: list[uuid_mod.UUID], k: int
+) -> list[tuple[uuid_mod.UUID, uuid_mod.UUID, float]]:
+    """Exact in-memory kNN: load every embedding once, in keyset chunks."""
+    ids: list[uuid_mod.UUID] = []
+    vectors: list = []
+    after = None
+    while True:
+        stmt = (
+            select(Trace.id, Trace.embedding)
+            .where(Trace.embedding.is_not(None))
+            .order_by(Trace.id)
+            .limit(settings.convergence_batch_size)
+        )
+        if after is not None:
+            stmt = stmt.where(Trace.id > after)
+        rows = (await session.execute(stmt)).all()
+        if not rows:
+            break
+        for row in rows:
+            ids.append(row.id)
+            vectors.append(row.embedding)
+        after = rows[-1].id
+
+    corpus = unit_matrix(vectors)
+    position = {trace_id: i for i, trace_id in enumerate(ids)}
+    sources = [trace_id for trace_id in source_ids if trace_id in position]
+    source_rows = [position[trace_id] for trace_id in sources]
+    if not sources:
+        return []
+
+    neighbours = top_k_cosine(
+        corpus[source_rows],
+        corpus,
+        k,
+        max_distance=_SIMILARITY_THRESHOLD,
+        self_index=source_rows,
+    )
+    return [
+        (source, ids[col], dist)
+        for source, hits in zip(sources, neighbours)
+        for col, dist in hits
+    ]
+
+
 async def detect_convergence_clusters(session: AsyncSession) -> int:
-    """Detect convergence clusters using pgvector similarity.
+    """Detect convergence clusters using batched kNN.
 
-    Groups traces with very similar content embeddings into clusters,
-    then classifies each cluster's convergence level.
+    Finds neighbours for every unclustered trace in a few batched queries
+    (HNSW LATERAL probes, or an in-memory NumPy pass when
+    CONVERGENCE_KNN_BACKEND=numpy), unions the edges into components,
+    classifies each cluster and writes all assignments in bulk — a constant
+    number of statements per batch instead of several per trace.
 
     Returns:
         Count of newly clustered traces.
     """
-    # Find traces with embeddings that haven't been clustered yet
     unclustered = await session.execute(
-        select(Trace.id, Trace.context_fingerprint)
+        select(Trace.id)
         .where(Trace.embedding.is_not(None))
         .where(Trace.convergence_cluster_id.is_(None))
+        .order_by(Trace.id)
     )
-    unclustered_traces = unclustered.all()
-
-    if not unclustered_traces:
+    source_ids = list(unclustered.scalars().all())
+    if not source_ids:
         return 0
 
-    newly_clustered = 0
-
-    for trace_row in unclustered_traces:
-        trace_id = trace_row.id
-
-        # Check if this trace was clustered in a previous iteration of this loop
-        check = await session.execute(
-            select(Trace.convergence_cluster_id).where(Trace.id == trace_id)
+    k = settings.convergence_neighbors
+    if settings.convergence_knn_backend == "numpy":
+        edges = await _numpy_edges(session, source_ids, k)
+    else:
+        edges = await hnsw_neighbors(
+            session,
+            source_ids,
+            k=k,
+            max_distance=_SIMILARITY_THRESHOLD,
+            batch_size=settings.convergence_batch_size,
         )
-        current_cluster = check.scalar_one_or_none()
-        if current_cluster is not None:
-            continue
-
-        # Find similar traces within cosine distance threshold
-        neighbors = await session.execute(
-            text(
-                "SELECT t.id, t.convergence_cluster_id, t.context_fingerprint "
-                "FROM traces t "
-                "WHERE t.embedding IS NOT NULL "
-                "AND t.id != :trace_id "
-                "AND t.embedding <=> (SELECT embedding FROM traces WHERE id = :trace_id) < :threshold "
-                "LIMIT 50"
-            ),
-            {"trace_id": str(trace_id), "threshold": _SIMILARITY_THRESHOLD},
-        )
-        neighbor_rows = neighbors.all()
-
-        if not neighbor_rows:
-            continue  # No similar traces — skip
-
-        # Greedy clustering: join existing cluster if any neighbor has one
-        existing_cluster_id = None
-        for n in neighbor_rows:
-            if n.convergence_cluster_id is not None:
-                existing_cluster_id = n.convergence_cluster_id
-                break
-
-        cluster_id = existing_cluster_id or uuid_mod.uuid4()
+    if not edges:
+        return 0
 
-        # Collect all fingerprints for classification
-        all_fingerprints = []
-        trace_fp_result = await session.execute(
-            select(Trace.context_fingerprint).where(Trace.id == trace_id)
-        )
-        trace_fp = trace_fp_result.scalar_one_or_none()
-        if trace_fp:
-            all_fingerprints.append(trace_fp)
-
-        # Gather neighbor fingerprints
-        neighbor_ids = [n.id for n in neighbor_rows]
-        for n in neighbor_rows:
-            if n.context_fingerprint:
-                all_fingerprints.append(n.context_fingerprint)
-
-        # If joining existing cluster, also gather fingerprints from existing cluster members
-        if existing_cluster_id:
-            existing_members = await session.execute(
-                select(Trace.context_fingerprint)
-                .where(Trace.convergence_cluster_id == existing_cluster_id)
-                .where(Trace.context_fingerprint.is_not(None))
-            )
-            for row in existing_members:
-                all_fingerprints.append(row.context_fingerprint)
-
-        # Classify convergence level
-        level = classify_convergence_level(all_fingerprints)
-
-        # Assign this trace to the cluster
-        await session.execute(
-            update(Trace)
-            .where(Trace.id == trace_id)
-            .values(convergence_cluster_id=cluster_id, convergence_level=level)
+    # Current cluster + fingerprint of every trace touched by an edge.
+    node_ids = list({n for a, b, _ in edges for n in (a, b)})
+    cluster_of: dict[str, uuid_mod.UUID | None] = {}
+    fingerprint_of: dict[str, dict | None] = {}
+    for start in range(0, len(node_ids), settings.convergence_batch_size):
+        chunk = node_ids[start:start + settings.convergence_batch_size]
+        rows = await session.execute(
+            select(Trace.id, Trace.convergence_cluster_id, Trace.context_fingerprint)
+            .where(Trace.id.in_(chunk))
         )
-        newly_clustered += 1
-
-        # Also assign unclustered neighbors to this cluster
-        for n in neighbor_rows:
-            if n.convergence_cluster_id is None:
-                await session.execute(
-                    update(Trace)
-                    .where(Trace.id == n.id)
-                    .values(convergence_cluster_id=cluster_id, convergence_level=level)
-                )
-                newly_clustered += 1
-
-        # Update convergence level for all members of this cluster
-        await session.execute(
-            update(Trace)
-            .where(Trace.convergence_cluster_id == cluster_id)
-            .values(convergence_level=level)
+        for row in rows.all():
+            cluster_of[str(row.id)] = row.convergence_cluster_id
+            fingerprint_of[str(row.id)] = row.context_fingerprint
+
+    plan = plan_clusters([(str(a), str(b)) for a, b, _ in edges], cluster_of)
+
+    # Fingerprints of members already in the clusters being joined.
+    existing_fps: dict[uuid_mod.UUID, list[dict]] = {}
+    joined = [cid for cid, members in plan.items() if any(cluster_of.get(m) == cid for m in members)]
+    if joined:
+        rows = await session.execute(
+            select(Trace.convergence_cluster_id, Trace.context_fingerprint)
+            .where(Trace.convergence_cluster_id.in_(joined))
+            .where(Trace.context_fingerprint.is_not(None))
         )
+        for row in rows.all():
+            existing_fps.setdefault(row.convergence_cluster_id, []).append(row.context_fingerprint)
+
+    assign_ids: list[uuid_mod.UUID] = []
+    assign_clusters: list[uuid_mod.UUID] = []
+    level_clusters: list[uuid_mod.UUID] = []
+    levels: list[int] = []
+    for cluster_id, members in plan.items():
+        fingerprints = [fingerprint_of[m] for m in members if fingerprint_of.get(m)]
+        fingerprints.extend(existing_fps.get(cluster_id, []))
+        level = classify_convergence_level(fingerprints)
+        level_clusters.append(cluster_id)
+        levels.append(level)
+
+        for member in members:
+            if cluster_of.get(member) is None:
+                assign_ids.append(uuid_mod.UUID(member))
+                assign_clusters.append(cluster_id)
 
         log.info(
             "convergence_cluster_updated",
             cluster_id=str(cluster_id),
             level=level,
-            member_count=len(neighbor_rows) + 1,
+            member_count=len(members),
         )
 
+    if assign_ids:
+        await session.execute(
+            text(
+                "UPDATE traces AS t SET convergence_cluster_id = v.cluster_id "
+                "FROM unnest(CAST(:ids AS uuid[]), CAST(:cluster_ids AS uuid[])) "
+                "AS v(id, cluster_id) "
+                "WHERE t.id = v.id"
+            ),
+            {"ids": assign_ids, "cluster_ids": assign_clusters},
+        )
+    # Refresh the level of every member (old and new) of each touched cluster.
+    await session.execute(
+        text(
+            "UPDATE traces AS t SET convergence_level = v.level "
+            "FROM unnest(CAST(:cluster_ids AS uuid[]), CAST(:levels AS int[])) "
+            "AS v(cluster_id, level) "
+            "WHERE t.convergence_cluster_id = v.cluster_id"
+        ),
+        {"cluster_ids": level_clusters, "levels": levels},
+    )
+
     await session.flush()
-    return newly_clustered
+    return len(assign_ids)
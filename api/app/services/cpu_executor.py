@@ -0,0 +1,111 @@
+"""CPU executor: CPU-bound request work, off the event loop.
+
+Secret scanning and metadata enrichment are pure Python and can take tens
+of milliseconds on a large submission; run on the loop, they stall every
+concurrent request of the worker. run_cpu hands such a call to a shared
+pool of CPU_EXECUTOR_WORKERS threads or processes (CPU_EXECUTOR_KIND) and
+awaits it with a timeout.
+
+- "thread" (default) keeps calls cheap and shares process state (scanner
+  setup, caches); the GIL still serializes the Python work, but the loop
+  keeps serving I/O in between. "process" gives real parallelism: the
+  callable must be a module-level function and its arguments, result and
+  exceptions picklable. Process workers are spawned (not forked from the
+  running loop) and set themselves up on first use.
+- A call that times out raises CpuTaskTimeout. A call that had not started
+  is dropped; one already running finishes in the background.
+- Metrics: inflight gauge, queue wait and run time per task, outcomes.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.config import settings
+from app.metrics import (
+    cpu_executor_duration,
+    cpu_executor_inflight,
+    cpu_executor_queue_wait,
+    cpu_executor_tasks,
+)
+
+_executor: Optional[Executor] = None
+
+
+class CpuTaskTimeout(Exception):
+    """Raised when a CPU task does not finish within its timeout."""
+
+    def __init__(self, task: str, timeout: float) -> None:
+        self.task = task
+        self.timeout = timeout
+        super().__init__(f"CPU task {task!r} did not finish within {timeout}s")
+
+    def __reduce__(self):
+        return type(self), (self.task, self.timeout)
+
+
+def _get_executor() -> Executor:
+    """Lazy-initialize the shared pool on first use."""
+    global _executor
+    if _executor is None:
+        workers = max(1, settings.cpu_executor_workers)
+        if settings.cpu_executor_kind == "process":
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cpu")
+    return _executor
+
+
+def shutdown_cpu_executor() -> None:
+    """Stop the shared pool (app shutdown); queued calls are cancelled."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple[float, float, Any]:
+    """(started, finished, result) of fn(*args, **kwargs); wall clock, comparable across processes."""
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return started, time.time(), result
+
+
+async def run_cpu(task: str, fn: Callable, *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+    """Run fn(*args, **kwargs) on the CPU executor and return its result.
+
+    Args:
+        task: Metrics label naming the kind of work (e.g. "trace_submission").
+        fn: The callable; module-level and picklable for a process pool.
+        timeout: Seconds to wait, queueing included
+            (default CPU_EXECUTOR_TIMEOUT_SECONDS).
+
+    Raises:
+        CpuTaskTimeout: The call did not finish in time.
+        Exception: Whatever fn raised, unchanged.
+    """
+    timeout = settings.cpu_executor_timeout_seconds if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    submitted = time.time()
+    cpu_executor_inflight.inc()
+    try:
+        started, finished, result = await asyncio.wait_for(
+            loop.run_in_executor(_get_executor(), _timed_call, fn, args, kwargs), timeout,
+        )
+    except TimeoutError:
+        cpu_executor_tasks.labels(task=task, status="timeout").inc()
+        raise CpuTaskTimeout(task, timeout) from None
+    except Exception:
+        cpu_executor_tasks.labels(task=task, status="error").inc()
+        raise
+    finally:
+        cpu_executor_inflight.dec()
+
+    cpu_executor_queue_wait.labels(task=task).observe(max(0.0, started - submitted))
+    cpu_executor_duration.labels(task=task).observe(finished - started)
+    cpu_executor_tasks.labels(task=task, status="ok").inc()
+    return result
@@ -1,3 +1,30 @@
+"""Text embeddings for traces and search queries.
+
+EmbeddingService delegates to the backend named by EMBEDDING_BACKEND:
+
+  * "openai" (default) — text-embedding-3-small over the OpenAI API.
+  * "local" — a sentence-transformers model on CPU, run in a process pool
+    so encoding never blocks the event loop. Needs the optional
+    `local-embeddings` extra; no network, no per-token cost.
+
+Every vector is stored in the 1536-wide `vector` columns. Local models are
+narrower and are zero-padded, which leaves cosine distance unchanged. Each
+backend tags its vectors with its own embedding_model_id, and search only
+compares vectors from the active model (active_embedding_model), so
+switching backends never mixes embedding spaces: traces embedded by the
+previous model drop out of semantic search until they are re-embedded.
+To move the corpus without that gap, re-embed it into shadow columns first
+(app.services.reembed); its switch then sets the active model for every
+process via set_active_embedding_model.
+"""
+
+import asyncio
+import importlib.util
+from abc import ABC, abstractmethod
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
 import structlog
 from openai import AsyncOpenAI
 
@@ -8,59 +35,243 @@ log = structlog.get_logger(__name__)
 OPENAI_MODEL = "text-embedding-3-small"
 OPENAI_DIMENSIONS = 1536
 
+# Loaded sentence-transformers models, per pool process.
+_local_models: dict[tuple[str, int], object] = {}
+
+# (backend, local model, local dimensions) switched to by a re-embedding
+# migration; overrides EMBEDDING_BACKEND / LOCAL_EMBEDDING_* once loaded.
+_active_override: Optional[tuple[str, Optional[str], Optional[int]]] = None
+# One backend instance per configuration (each owns a client or a pool).
+_backend_instances: dict[tuple, "EmbeddingBackend"] = {}
+
 
 class EmbeddingSkippedError(Exception):
-    """Raised when embedding is skipped (no API key configured)."""
+    """Raised when embedding is skipped (backend not configured)."""
     pass
 
 
-class EmbeddingService:
-    """Generates text embeddings via OpenAI text-embedding-3-small.
+def pad_vector(vector: list[float], width: int = OPENAI_DIMENSIONS) -> list[float]:
+    """Zero-pad a vector to the storage width (cosine-preserving)."""
+    if len(vector) > width:
+        raise ValueError(f"embedding has {len(vector)} dimensions, storage holds {width}")
+    return list(vector) + [0.0] * (width - len(vector))
 
-    When OPENAI_API_KEY is not set, all embed() calls raise EmbeddingSkippedError
-    rather than crashing — traces remain with embedding=NULL until a key is configured.
-    """
+
+def _get_local_model(name: str, truncate_dim: int):
+    model = _local_models.get((name, truncate_dim))
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(name, device="cpu", truncate_dim=truncate_dim or None)
+        _local_models[(name, truncate_dim)] = model
+    return model
+
+
+def _encode_local(name: str, truncate_dim: int, texts: list[str]) -> list[list[float]]:
+    """Pool-process entry point: encode one batch to unit vectors."""
+    model = _get_local_model(name, truncate_dim)
+    vectors = model.encode(texts, batch_size=len(texts), normalize_embeddings=True)
+    return [vector.tolist() for vector in vectors]
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into storage-width vectors tagged with a model id."""
+
+    name = "base"
+    model_id = ""
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def embed_batch(self, texts: list[str]) -> tuple[list[list[float]], str]:
+        """(vectors in input order, model_version) for `texts`."""
+
+
+class OpenAIBackend(EmbeddingBackend):
+    name = "openai"
+    model_id = OPENAI_MODEL
 
     def __init__(self) -> None:
-        if not settings.openai_api_key:
-            self._skip = True
-            log.warning(
-                "openai_api_key_missing",
-                message=(
-                    "OPENAI_API_KEY not set — embedding worker will skip trace embedding. "
-                    "Traces will not appear in semantic search until API key is configured."
-                ),
-            )
-        else:
-            self._skip = False
         self._client: AsyncOpenAI | None = None
 
+    def available(self) -> bool:
+        return bool(settings.openai_api_key)
+
     def _get_client(self) -> AsyncOpenAI:
         """Lazy-initialize AsyncOpenAI client on first use."""
         if self._client is None:
             self._client = AsyncOpenAI(api_key=settings.openai_api_key)
         return self._client
 
-    async def embed(self, text: str) -> tuple[list[float], str, str]:
-        """Generate embedding for the given text.
+    async def embed_batch(self, texts):
+        response = await self._get_client().embeddings.create(
+            input=texts,
+            model=OPENAI_MODEL,
+            dimensions=OPENAI_DIMENSIONS,
+        )
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return [item.embedding for item in ordered], response.model
+
+
+class LocalBackend(EmbeddingBackend):
+    """sentence-transformers on CPU in a process pool.
+
+    Texts are split into LOCAL_EMBEDDING_BATCH_SIZE chunks, encoded
+    concurrently across LOCAL_EMBEDDING_WORKERS processes (each loads the
+    model once), truncated to LOCAL_EMBEDDING_DIMENSIONS when set
+    (Matryoshka-trained models) and zero-padded to storage width.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        *,
+        dimensions: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.model = model or settings.local_embedding_model
+        self.dimensions = settings.local_embedding_dimensions if dimensions is None else dimensions
+        self.batch_size = batch_size or settings.local_embedding_batch_size
+        suffix = f"@{self.dimensions}" if self.dimensions else ""
+        self.model_id = f"local/{self.model}{suffix}"
+        self._executor = executor
+        self._available: Optional[bool] = None
+
+    def available(self) -> bool:
+        if self._available is None:
+            self._available = importlib.util.find_spec("sentence_transformers") is not None
+        return self._available
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and threads
+            # is unsafe.
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.local_embedding_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def embed_batch(self, texts):
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(
+                executor, _encode_local, self.model, self.dimensions,
+                texts[start:start + self.batch_size],
+            )
+            for start in range(0, len(texts), self.batch_size)
+        ))
+        return [pad_vector(vector) for chunk in chunks for vector in chunk], self.model_id
+
+
+def make_embedding_backend(
+    name: str, model: Optional[str] = None, dimensions: Optional[int] = None
+) -> EmbeddingBackend:
+    """A new backend instance; model/dimensions apply to "local" only."""
+    if name == "openai":
+        return OpenAIBackend()
+    if name == "local":
+        return LocalBackend(model, dimensions=dimensions)
+    raise ValueError(f"unknown embedding backend {name!r}")
+
+
+def _active_config() -> tuple[str, Optional[str], Optional[int]]:
+    if _active_override is not None:
+        return _active_override
+    if settings.embedding_backend == "local":
+        return ("local", settings.local_embedding_model, settings.local_embedding_dimensions)
+    return (settings.embedding_backend, None, None)
+
+
+def set_active_embedding_model(
+    name: Optional[str], model: Optional[str] = None, dimensions: Optional[int] = None
+) -> None:
+    """Serve `name` (with model/dimensions) from now on; None = settings."""
+    global _active_override
+    _active_override = None if name is None else (name, model, dimensions)
+
+
+def get_embedding_backend() -> EmbeddingBackend:
+    """The active backend (shared instance per configuration)."""
+    config = _active_config()
+    backend = _backend_instances.get(config)
+    if backend is None:
+        backend = _backend_instances[config] = make_embedding_backend(*config)
+    return backend
+
+
+def active_embedding_model() -> str:
+    """embedding_model_id of the vectors search compares against."""
+    name, model, dimensions = _active_config()
+    if name == "local":
+        return LocalBackend(model, dimensions=dimensions).model_id
+    return OPENAI_MODEL
+
+
+class EmbeddingService:
+    """Generates text embeddings with the active backend.
+
+    Without an explicit backend it follows the active model, so a
+    re-embedding switch takes effect without a restart.
+
+    When the backend cannot run (no OPENAI_API_KEY, or sentence-transformers
+    not installed), all embed() calls raise EmbeddingSkippedError rather than
+    crashing — traces remain with embedding=NULL until it is configured.
+    """
+
+    def __init__(self, backend: Optional[EmbeddingBackend] = None) -> None:
+        self._fixed = backend
+        if not self._backend.available():
+            log.warning(
+                "embedding_backend_unavailable",
+                backend=self._backend.name,
+                message=(
+                    "OPENAI_API_KEY not set (openai) or sentence-transformers not "
+                    "installed (local) — embedding worker will skip trace embedding. "
+                    "Traces will not appear in semantic search until it is configured."
+                ),
+            )
+
+    @property
+    def _backend(self) -> EmbeddingBackend:
+        return self._fixed or get_embedding_backend()
+
+    @property
+    def model_id(self) -> str:
+        return self._backend.model_id
+
+    async def embed_batch(self, texts: list[str]) -> tuple[list[list[float]], str, str]:
+        """Embed several texts in as few backend calls as possible.
 
         Returns:
-            (embedding_vector, model_id, model_version)
+            (vectors in input order, model_id, model_version)
 
         Raises:
-            EmbeddingSkippedError: When no OPENAI_API_KEY is configured.
+            EmbeddingSkippedError: When the backend is not configured.
         """
-        if self._skip:
+        backend = self._backend
+        if not backend.available():
             raise EmbeddingSkippedError(
-                "Embedding skipped: OPENAI_API_KEY not configured."
+                f"Embedding skipped: {backend.name} backend not configured."
             )
+        if not texts:
+            return [], backend.model_id, backend.model_id
+        vectors, model_version = await backend.embed_batch(texts)
+        return vectors, backend.model_id, model_version
 
-        client = self._get_client()
-        response = await client.embeddings.create(
-            input=text,
-            model=OPENAI_MODEL,
-            dimensions=OPENAI_DIMENSIONS,
-        )
-        vector = response.data[0].embedding
-        model_version = response.model
-        return (vector, OPENAI_MODEL, model_version)
+    async def embed(self, text: str) -> tuple[list[float], str, str]:
+        """Generate embedding for the given text.
+
+        Returns:
+            (embedding_vector, model_id, model_version)
+
+        Raises:
+            EmbeddingSkippedError: When the backend is not configured.
+        """
+        vectors, model_id, model_version = await self.embed_batch([text])
+        return (vectors[0], model_id, model_version)
@@ -0,0 +1,167 @@
+"""Content-addressed embedding reuse.
+
+Embeddings are a pure function of (model, text), and a lot of embedded
+text repeats: context strings come from a few hundred language / framework
+/ OS combinations, pattern traces and seed imports reuse solutions. Before
+calling the embedding backend, texts are looked up by SHA-256 in two tiers:
+
+  * an in-process LRU (EMBEDDING_CACHE_MEMORY_ENTRIES), which also serves
+    search queries and context strings with no database round trip;
+  * the embedding_cache table (migration 0034), shared by every process.
+
+Only the misses reach the backend, deduplicated and in one embed_batch
+call; their vectors are written back to both tiers.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.metrics import embedding_cache_lookups
+from app.models.embedding_cache import EmbeddingCacheEntry
+from app.services.embedding import EmbeddingService, EmbeddingSkippedError
+
+log = structlog.get_logger(__name__)
+
+# (vector, model_id, model_version) — the shape EmbeddingService.embed returns.
+Embedded = tuple[list[float], str, str]
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class _LRU:
+    def __init__(self) -> None:
+        self._entries: OrderedDict[tuple[str, bytes], Embedded] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple[str, bytes]) -> Optional[Embedded]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple[str, bytes], entry: Embedded) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > settings.embedding_cache_memory_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_memory = _LRU()
+
+
+async def embed_cached(
+    svc: EmbeddingService,
+    texts: list[str],
+    db: Optional[AsyncSession] = None,
+) -> list[Embedded]:
+    """Embed `texts` (in order), reusing cached vectors for repeated text.
+
+    With a session, the embedding_cache table is read and new vectors are
+    inserted on it (the caller commits); without one only the in-process
+    tier is used. Raises like EmbeddingService.embed_batch for the misses.
+    """
+    if not settings.embedding_cache_enabled:
+        vectors, model_id, model_version = await svc.embed_batch(texts)
+        return [(vector, model_id, model_version) for vector in vectors]
+
+    model_id = svc.model_id
+    keys = [(model_id, text_hash(text)) for text in texts]
+    found: dict[tuple[str, bytes], Embedded] = {}
+    for key in set(keys):
+        entry = _memory.get(key)
+        if entry is not None:
+            found[key] = entry
+    embedding_cache_lookups.labels(tier="memory").inc(len(found))
+
+    if db is not None and len(found) < len(set(keys)):
+        wanted = [key[1] for key in set(keys) if key not in found]
+        result = await db.execute(
+            select(
+                EmbeddingCacheEntry.text_hash,
+                EmbeddingCacheEntry.embedding,
+                EmbeddingCacheEntry.model_version,
+            )
+            .where(EmbeddingCacheEntry.model_id == model_id)
+            .where(EmbeddingCacheEntry.text_hash.in_(wanted))
+        )
+        rows = result.all()
+        for row in rows:
+            key = (model_id, row.text_hash)
+            found[key] = (list(row.embedding), model_id, row.model_version)
+            _memory.put(key, found[key])
+        embedding_cache_lookups.labels(tier="database").inc(len(rows))
+
+    missing: dict[tuple[str, bytes], str] = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+    if missing:
+        embedding_cache_lookups.labels(tier="miss").inc(len(missing))
+        vectors, model_id, model_version = await svc.embed_batch(list(missing.values()))
+        for key, vector in zip(missing, vectors):
+            found[key] = (vector, model_id, model_version)
+            _memory.put(key, found[key])
+        if db is not None:
+            await db.execute(
+                pg_insert(EmbeddingCacheEntry)
+                .values([
+                    {
+                        "model_id": model_id,
+                        "text_hash": key[1],
+                        "embedding": vector,
+                        "model_version": model_version,
+                    }
+                    for key, vector in zip(missing, vectors)
+                ])
+                .on_conflict_do_nothing()
+            )
+    return [found[key] for key in keys]
+
+
+async def embed_cached_each(
+    svc: EmbeddingService,
+    texts: list[str],
+    db: Optional[AsyncSession] = None,
+) -> list[Optional[Embedded]]:
+    """embed_cached, isolating the texts the backend rejects.
+
+    The whole list goes out in one call first. If that call fails, each
+    text is retried on its own (cached texts cost nothing), so one bad
+    input (e.g. over the model's token limit) does not fail the others.
+    A text that still fails maps to None. EmbeddingSkippedError propagates.
+    """
+    try:
+        return list(await embed_cached(svc, texts, db))
+    except EmbeddingSkippedError:
+        raise
+    except Exception as exc:
+        if len(texts) == 1:
+            log.error("embedding_text_failed", chars=len(texts[0]), error=str(exc))
+            return [None]
+        log.warning("embedding_batch_failed_retrying_each", texts=len(texts), error=str(exc))
+
+    embedded: list[Optional[Embedded]] = []
+    for text in texts:
+        try:
+            (one,) = await embed_cached(svc, [text], db)
+        except EmbeddingSkippedError:
+            raise
+        except Exception as exc:
+            log.error("embedding_text_failed", chars=len(text), error=str(exc))
+            one = None
+        embedded.append(one)
+    return embedded
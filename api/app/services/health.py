@@ -4,17 +4,18 @@ Surfaces the knowledge base's self-maintenance signals in one place — trust
 distribution, memory-temperature distribution, convergence clusters, stale
 traces, and stored contradiction/alternative relationships. All read-only.
 
-On top of the *stored* signals it runs an **early-warning pass**: the same
+On top of the *stored* signals it reports an **early-warning pass**: the same
 pgvector cosine analysis the consolidation "sleep cycle" performs
 (context-embedding proximity = same problem, solution-embedding divergence =
 different fix, plus near-duplicate clustering), but with small-corpus
-thresholds, **un-gated by maturity tier**, computed on demand and never
-persisted. The sleep cycle defers convergence/contradiction detection until the
-GROWING tier (1,000+ traces); this lets the owner curate conflicts and
-duplicates from the very first traces instead.
-
-Reuses the 1536-dim embeddings already stored on each trace. No LLM calls, no
-writes, no schema changes — a pure additive view over what already exists.
+thresholds and **un-gated by maturity tier**. The sleep cycle defers
+convergence/contradiction detection until the GROWING tier (1,000+ traces);
+this lets the owner curate conflicts and duplicates from the very first traces
+instead. The pairs are found incrementally in the background by per-trace HNSW
+kNN (app.services.health_pairs) and read here from health_pairs.
+
+Reuses the 1536-dim embeddings already stored on each trace. No LLM calls and
+no writes from this module.
 """
 
 import re
@@ -216,6 +217,17 @@ async def _solutions_map(db: AsyncSession, ids: set[str]) -> dict[str, str]:
     return {str(tid): (sol or "") for tid, sol in rows.all()}
 
 
+async def _titles_map(db: AsyncSession, ids: set[str]) -> dict[str, str]:
+    """Titles for a set of trace ids, in one bulk query."""
+    if not ids:
+        return {}
+    rows = await db.execute(
+        select(Trace.id, Trace.title)
+        .where(Trace.id.in_([uuid.UUID(i) for i in ids]))
+    )
+    return {str(tid): title for tid, title in rows.all()}
+
+
 async def _completeness_map(db: AsyncSession, ids: set[str]) -> dict[str, float]:
     """completeness() per trace id (solution length + fenced code + tag count)."""
     if not ids:
@@ -233,22 +245,24 @@ async def _completeness_map(db: AsyncSession, ids: set[str]) -> dict[str, float]
     }
 
 
-async def _duplicate_clusters(db: AsyncSession, titles: dict[str, str]) -> list[dict]:
-    """Near-identical trace pairs → clusters (early-warning dedup)."""
+async def _duplicate_clusters(db: AsyncSession) -> list[dict]:
+    """Near-identical trace pairs → clusters (early-warning dedup).
+
+    Pairs come from health_pairs (kept current by app.services.health_pairs);
+    flagged traces are excluded here, at read time.
+    """
     result = await db.execute(
         text(
             """
-            SELECT a.id AS a_id, b.id AS b_id,
-                   a.embedding <=> b.embedding AS dist
-            FROM traces a
-            JOIN traces b ON a.id < b.id
-            WHERE a.embedding IS NOT NULL AND b.embedding IS NOT NULL
+            SELECT p.a_id, p.b_id, p.distance AS dist
+            FROM health_pairs p
+            JOIN traces a ON a.id = p.a_id
+            JOIN traces b ON b.id = p.b_id
+            WHERE p.kind = 'duplicate'
               AND a.is_flagged = false AND b.is_flagged = false
-              AND a.embedding <=> b.embedding < :dup
-            ORDER BY dist ASC
+            ORDER BY p.distance ASC
             """
-        ),
-        {"dup": DUP_DISTANCE},
+        )
     )
     edges: list[tuple[str, str]] = []
     closest: dict[frozenset, float] = {}
@@ -261,6 +275,7 @@ async def _duplicate_clusters(db: AsyncSession, titles: dict[str, str]) -> list[
     # Canonical "keeper" per cluster = most complete member (one bulk lookup).
     member_ids = {m for members in raw_clusters for m in members}
     comp = await _completeness_map(db, member_ids)
+    titles = await _titles_map(db, member_ids)
     clusters = []
     for members in raw_clusters:
         # Tightest similarity inside this cluster, for a headline number.
@@ -282,41 +297,31 @@ async def _duplicate_clusters(db: AsyncSession, titles: dict[str, str]) -> list[
     return clusters
 
 
-async def _conflict_pairs(db: AsyncSession, titles: dict[str, str]) -> list[dict]:
-    """Same problem, divergent fix — early-warning conflict detection."""
+async def _conflict_pairs(db: AsyncSession) -> list[dict]:
+    """Same problem, divergent fix — early-warning conflict detection (from health_pairs)."""
     result = await db.execute(
         text(
             """
-            SELECT a.id AS a_id, b.id AS b_id,
+            SELECT p.a_id, p.b_id,
                    a.trust_score AS trust_a, b.trust_score AS trust_b,
-                   COALESCE(a.context_embedding, a.embedding) <=>
-                   COALESCE(b.context_embedding, b.embedding) AS ctx_dist,
-                   COALESCE(a.solution_embedding, a.embedding) <=>
-                   COALESCE(b.solution_embedding, b.embedding) AS sol_dist
-            FROM traces a
-            JOIN traces b ON a.id < b.id
-            WHERE a.embedding IS NOT NULL AND b.embedding IS NOT NULL
+                   p.context_distance AS ctx_dist,
+                   p.solution_distance AS sol_dist
+            FROM health_pairs p
+            JOIN traces a ON a.id = p.a_id
+            JOIN traces b ON b.id = p.b_id
+            WHERE p.kind = 'conflict'
               AND a.is_flagged = false AND b.is_flagged = false
-              AND (COALESCE(a.context_embedding, a.embedding) <=>
-                   COALESCE(b.context_embedding, b.embedding)) < :same
-              AND (COALESCE(a.solution_embedding, a.embedding) <=>
-                   COALESCE(b.solution_embedding, b.embedding)) > :diverge
-              AND (a.embedding <=> b.embedding) >= :dup
-            ORDER BY ctx_dist ASC
+            ORDER BY p.context_distance ASC
             LIMIT :lim
             """
         ),
-        {
-            "same": SAME_PROBLEM_DISTANCE,
-            "diverge": DIVERGENT_SOLUTION_DISTANCE,
-            "dup": DUP_DISTANCE,
-            "lim": MAX_PAIRS,
-        },
+        {"lim": MAX_PAIRS},
     )
     rows = result.all()
     # Solution text for every involved trace, one bulk query, for divergence.
     ids = {str(r.a_id) for r in rows} | {str(r.b_id) for r in rows}
     sols = await _solutions_map(db, ids)
+    titles = await _titles_map(db, ids)
     pairs = []
     for row in rows:
         a, b = str(row.a_id), str(row.b_id)
@@ -333,12 +338,12 @@ async def _conflict_pairs(db: AsyncSession, titles: dict[str, str]) -> list[dict
 
 
 async def compute_knowledge_health(db: AsyncSession) -> dict:
-    """Assemble the full knowledge-health report for the owner dashboard."""
-    total = int((await db.execute(select(func.count()).select_from(Trace))).scalar() or 0)
+    """Assemble the full knowledge-health report for the owner dashboard.
 
-    # Titles once, for labelling pairs/clusters cheaply.
-    title_rows = await db.execute(select(Trace.id, Trace.title))
-    titles = {str(tid): title for tid, title in title_rows.all()}
+    Several full-table aggregates — run by the snapshot job
+    (app.services.health_snapshot), not per request.
+    """
+    total = int((await db.execute(select(func.count()).select_from(Trace))).scalar() or 0)
 
     # --- Trust ---
     trust_rows = await db.execute(
@@ -403,8 +408,8 @@ async def compute_knowledge_health(db: AsyncSession) -> dict:
     relationships = {rt: int(c) for rt, c in rel_rows.all()}
 
     # --- Early-warning pass (Sentinel layer) ---
-    duplicate_clusters = await _duplicate_clusters(db, titles)
-    conflicts = await _conflict_pairs(db, titles)
+    duplicate_clusters = await _duplicate_clusters(db)
+    conflicts = await _conflict_pairs(db)
     duplicate_traces = sum(c["size"] for c in duplicate_clusters)
 
     # --- Last sleep cycle ---
@@ -443,7 +448,7 @@ async def compute_knowledge_health(db: AsyncSession) -> dict:
         "relationships": relationships,
         "early_warning": {
             "note": (
-                "Conflict and duplicate detection runs on demand at every scale. "
+                "Conflict and duplicate detection runs in the background at every scale. "
                 "The background sleep cycle defers this to the GROWING tier "
                 "(1,000+ traces); here it curates from trace #1."
             ),
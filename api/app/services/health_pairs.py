@@ -0,0 +1,180 @@
+"""Incremental scan behind the knowledge-health early-warning pairs.
+
+The dashboard used to self-join every embedded trace against every other
+one on each request (O(N²) distance computations). Instead, this job finds
+candidates per trace through the pgvector HNSW indexes and stores the
+classified pairs in health_pairs:
+
+  1. Sources — embedded traces never scanned, or re-embedded since their
+     last scan (traces.embedded_at vs health_pair_scans), capped at
+     HEALTH_SCAN_MAX_TRACES per run. Pairs depend only on the vectors, so
+     retrieval bumps and other updated_at writes do not trigger a rescan.
+  2. Candidates — kNN neighbours within SAME_PROBLEM_DISTANCE on both the
+     full embedding and the context embedding (knn.hnsw_neighbors), plus
+     every stored pair touching a source so it is re-checked.
+  3. Exact scoring — the three cosine distances the early-warning pass
+     classifies on, computed only for those candidate pairs.
+  4. Pairs touching a source are replaced by the newly classified set and
+     the sources' scan times advance.
+
+Flag state is not baked in: the dashboard filters flagged traces at read
+time, so flagging/unflagging takes effect without a rescan.
+"""
+
+import uuid
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.health import (
+    DIVERGENT_SOLUTION_DISTANCE,
+    DUP_DISTANCE,
+    SAME_PROBLEM_DISTANCE,
+)
+from app.services.knn import hnsw_neighbors
+
+log = structlog.get_logger(__name__)
+
+DUPLICATE = "duplicate"
+CONFLICT = "conflict"
+
+# Candidate pairs scored / pairs inserted per statement.
+_ROWS_PER_STATEMENT = 5000
+
+
+def classify_pair(distance: float, context_distance: float, solution_distance: float) -> str | None:
+    """Early-warning class for a pair from its cosine distances, or None."""
+    if distance < DUP_DISTANCE:
+        return DUPLICATE
+    if context_distance < SAME_PROBLEM_DISTANCE and solution_distance > DIVERGENT_SOLUTION_DISTANCE:
+        return CONFLICT
+    return None
+
+
+def _ordered(a: uuid.UUID, b: uuid.UUID) -> tuple[uuid.UUID, uuid.UUID]:
+    # uuid.UUID orders like Postgres' uuid type, matching the a_id < b_id check.
+    return (a, b) if a < b else (b, a)
+
+
+async def _sources(session: AsyncSession) -> list[uuid.UUID]:
+    result = await session.execute(
+        text(
+            """
+            SELECT t.id
+            FROM traces t
+            LEFT JOIN health_pair_scans s ON s.trace_id = t.id
+            WHERE t.embedding IS NOT NULL
+              AND (s.trace_id IS NULL OR t.embedded_at > s.scanned_at)
+            ORDER BY COALESCE(t.embedded_at, t.created_at)
+            LIMIT :lim
+            """
+        ),
+        {"lim": settings.health_scan_max_traces},
+    )
+    return list(result.scalars().all())
+
+
+async def _score(
+    session: AsyncSession, pairs: list[tuple[uuid.UUID, uuid.UUID]]
+) -> list[tuple[uuid.UUID, uuid.UUID, str, float, float, float]]:
+    """Exact distances for the candidate pairs, keeping only classified ones."""
+    stmt = text(
+        """
+        SELECT p.a_id, p.b_id,
+               a.embedding <=> b.embedding AS dist,
+               COALESCE(a.context_embedding, a.embedding) <=>
+               COALESCE(b.context_embedding, b.embedding) AS ctx_dist,
+               COALESCE(a.solution_embedding, a.embedding) <=>
+               COALESCE(b.solution_embedding, b.embedding) AS sol_dist
+        FROM unnest(CAST(:a AS uuid[]), CAST(:b AS uuid[])) AS p(a_id, b_id)
+        JOIN traces a ON a.id = p.a_id
+        JOIN traces b ON b.id = p.b_id
+        WHERE a.embedding IS NOT NULL AND b.embedding IS NOT NULL
+        """
+    )
+    found = []
+    for start in range(0, len(pairs), _ROWS_PER_STATEMENT):
+        chunk = pairs[start:start + _ROWS_PER_STATEMENT]
+        result = await session.execute(
+            stmt, {"a": [a for a, _ in chunk], "b": [b for _, b in chunk]}
+        )
+        for row in result.all():
+            dist, ctx, sol = float(row.dist), float(row.ctx_dist), float(row.sol_dist)
+            kind = classify_pair(dist, ctx, sol)
+            if kind is not None:
+                found.append((row.a_id, row.b_id, kind, dist, ctx, sol))
+    return found
+
+
+async def refresh_health_pairs(session: AsyncSession) -> dict:
+    """Rescan new/updated traces and update health_pairs. Not committed."""
+    sources = await _sources(session)
+    if not sources:
+        return {"health_traces_scanned": 0, "health_pairs_found": 0}
+
+    candidates: set[tuple[uuid.UUID, uuid.UUID]] = set()
+    for column in ("embedding", "context_embedding"):
+        edges = await hnsw_neighbors(
+            session,
+            sources,
+            k=settings.health_scan_neighbors,
+            max_distance=SAME_PROBLEM_DISTANCE,
+            column=column,
+        )
+        candidates.update(_ordered(src, nbr) for src, nbr, _ in edges)
+
+    existing = await session.execute(
+        text("SELECT a_id, b_id FROM health_pairs WHERE a_id = ANY(:ids) OR b_id = ANY(:ids)"),
+        {"ids": sources},
+    )
+    candidates.update((row.a_id, row.b_id) for row in existing.all())
+
+    found = await _score(session, sorted(candidates))
+
+    await session.execute(
+        text("DELETE FROM health_pairs WHERE a_id = ANY(:ids) OR b_id = ANY(:ids)"),
+        {"ids": sources},
+    )
+    for start in range(0, len(found), _ROWS_PER_STATEMENT):
+        chunk = found[start:start + _ROWS_PER_STATEMENT]
+        await session.execute(
+            text(
+                "INSERT INTO health_pairs "
+                "(a_id, b_id, kind, distance, context_distance, solution_distance, found_at) "
+                "SELECT a, b, k, d, c, s, now() "
+                "FROM unnest(CAST(:a AS uuid[]), CAST(:b AS uuid[]), CAST(:kind AS text[]), "
+                "CAST(:dist AS float8[]), CAST(:ctx AS float8[]), CAST(:sol AS float8[])) "
+                "AS p(a, b, k, d, c, s) "
+                "ON CONFLICT (a_id, b_id) DO UPDATE SET "
+                "kind = EXCLUDED.kind, distance = EXCLUDED.distance, "
+                "context_distance = EXCLUDED.context_distance, "
+                "solution_distance = EXCLUDED.solution_distance, found_at = EXCLUDED.found_at"
+            ),
+            {
+                "a": [p[0] for p in chunk],
+                "b": [p[1] for p in chunk],
+                "kind": [p[2] for p in chunk],
+                "dist": [p[3] for p in chunk],
+                "ctx": [p[4] for p in chunk],
+                "sol": [p[5] for p in chunk],
+            },
+        )
+
+    await session.execute(
+        text(
+            "INSERT INTO health_pair_scans (trace_id, scanned_at) "
+            "SELECT unnest(CAST(:ids AS uuid[])), now() "
+            "ON CONFLICT (trace_id) DO UPDATE SET scanned_at = EXCLUDED.scanned_at"
+        ),
+        {"ids": sources},
+    )
+
+    log.info(
+        "health_pairs_refreshed",
+        traces_scanned=len(sources),
+        candidates=len(candidates),
+        pairs_found=len(found),
+    )
+    return {"health_traces_scanned": len(sources), "health_pairs_found": len(found)}
@@ -0,0 +1,102 @@
+"""Materialized knowledge-health report.
+
+compute_knowledge_health runs several full-table aggregates plus a regex
+pass over trace text — too heavy for every dashboard load. The report is
+stored in report_snapshots instead:
+
+  * the scheduler refreshes it every KNOWLEDGE_HEALTH_REFRESH_MINUTES;
+  * GET /analytics/knowledge-health returns the stored snapshot with its
+    generated_at and, when it is older than the refresh interval, kicks off
+    one background refresh (stale-while-revalidate). Before the first
+    snapshot exists it answers snapshot_pending and starts that refresh;
+  * POST /analytics/knowledge-health/refresh recomputes it synchronously.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory
+from app.models.report_snapshot import ReportSnapshot
+from app.services.health import compute_knowledge_health
+
+log = structlog.get_logger(__name__)
+
+SNAPSHOT_NAME = "knowledge_health"
+
+# Set while a background refresh is running, so a burst of stale reads
+# triggers one recomputation rather than one each.
+_refresh_in_flight = False
+
+
+class HealthSnapshot(NamedTuple):
+    payload: dict
+    generated_at: datetime
+
+
+def is_stale(generated_at: datetime, now: datetime | None = None) -> bool:
+    now = now or datetime.now(timezone.utc)
+    return now - generated_at >= timedelta(minutes=settings.knowledge_health_refresh_minutes)
+
+
+def cache_control() -> str:
+    """Cache-Control for the report: fresh for one refresh interval, then
+    servable while a revalidation is under way."""
+    return (
+        f"private, max-age={settings.knowledge_health_refresh_minutes * 60}, "
+        f"stale-while-revalidate={settings.knowledge_health_stale_while_revalidate_seconds}"
+    )
+
+
+async def load_health_snapshot(session: AsyncSession) -> HealthSnapshot | None:
+    result = await session.execute(
+        select(ReportSnapshot.payload, ReportSnapshot.generated_at)
+        .where(ReportSnapshot.name == SNAPSHOT_NAME)
+    )
+    row = result.first()
+    return HealthSnapshot(row.payload, row.generated_at) if row else None
+
+
+async def store_health_snapshot(session: AsyncSession) -> HealthSnapshot:
+    """Recompute the report and upsert the snapshot. Not committed."""
+    generated_at = datetime.now(timezone.utc)
+    payload = await compute_knowledge_health(session)
+    await session.execute(
+        pg_insert(ReportSnapshot)
+        .values(name=SNAPSHOT_NAME, payload=payload, generated_at=generated_at)
+        .on_conflict_do_update(
+            index_elements=[ReportSnapshot.name],
+            set_={"payload": payload, "generated_at": generated_at},
+        )
+    )
+    return HealthSnapshot(payload, generated_at)
+
+
+async def refresh_health_snapshot(session: AsyncSession) -> dict:
+    """Scheduled-job entry point; returns a small summary for the job log."""
+    snapshot = await store_health_snapshot(session)
+    return {
+        "health_score": snapshot.payload["health_score"],
+        "total_traces": snapshot.payload["total_traces"],
+    }
+
+
+async def refresh_in_background() -> None:
+    """Revalidate a stale snapshot on its own session (FastAPI background task)."""
+    global _refresh_in_flight
+    if _refresh_in_flight:
+        return
+    _refresh_in_flight = True
+    try:
+        async with async_session_factory() as session:
+            await store_health_snapshot(session)
+            await session.commit()
+    except Exception:
+        log.error("knowledge_health_refresh_failed", exc_info=True)
+    finally:
+        _refresh_in_flight = False
@@ -0,0 +1,149 @@
+"""Batched nearest-neighbour search shared by the consolidation jobs.
+
+Per-trace kNN queries cost one round trip per trace, which is what made the
+sleep cycle grow linearly with corpus size. This module answers kNN for a
+whole batch of source traces at once, with two interchangeable engines:
+
+  * pgvector HNSW — one LATERAL query per chunk of source ids; every inner
+    probe is an index-ordered `ORDER BY <=> LIMIT k`, so the HNSW index is
+    used and a pass over N traces costs N / batch_size round trips.
+  * in-memory NumPy — exact cosine top-k over an L2-normalised float32
+    matrix, computed in blocks so memory stays bounded. Used where the
+    corpus fits comfortably in RAM, and by the unit tests.
+"""
+
+import uuid
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Columns that carry an HNSW index (migrations 0001, 0007, 0032) and may be probed.
+_INDEXED_COLUMNS = {"embedding", "context_embedding", "solution_embedding"}
+
+# Query rows scored per matrix product in the NumPy engine.
+_BLOCK_ROWS = 256
+
+
+def parse_vector(value) -> np.ndarray:
+    """Coerce a pgvector value to a float32 array.
+
+    ORM-typed selects return a list (or ndarray); raw `text()` selects return
+    the textual form "[0.1,0.2,...]" because the asyncpg codec is text-mode.
+    """
+    if isinstance(value, str):
+        return np.array(value.strip("[]").split(","), dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+def unit_matrix(vectors) -> np.ndarray:
+    """Stack vectors into an L2-normalised float32 matrix (zero rows stay zero)."""
+    if len(vectors) == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    matrix = np.vstack([parse_vector(v) for v in vectors])
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_cosine(
+    queries: np.ndarray,
+    corpus: np.ndarray,
+    k: int,
+    max_distance: float | None = None,
+    self_index: list[int] | None = None,
+) -> list[list[tuple[int, float]]]:
+    """Exact cosine kNN of each query row against the corpus rows.
+
+    Both matrices must already be unit-normalised (see unit_matrix).
+    `self_index[i]` is the corpus row of query i (excluded from its own
+    neighbours), or -1 when the query is not part of the corpus.
+
+    Returns, per query, up to k (corpus_row, cosine_distance) pairs nearest
+    first, keeping only those with distance < max_distance when given.
+    """
+    results: list[list[tuple[int, float]]] = []
+    n_corpus = corpus.shape[0]
+    if n_corpus == 0 or k <= 0:
+        return [[] for _ in range(queries.shape[0])]
+    k = min(k, n_corpus)
+
+    for start in range(0, queries.shape[0], _BLOCK_ROWS):
+        block = queries[start:start + _BLOCK_ROWS]
+        distances = 1.0 - block @ corpus.T
+        if self_index is not None:
+            for offset in range(block.shape[0]):
+                own = self_index[start + offset]
+                if own >= 0:
+                    distances[offset, own] = np.inf
+
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        for offset in range(block.shape[0]):
+            cols = nearest[offset]
+            row_dist = distances[offset, cols]
+            order = np.argsort(row_dist, kind="stable")
+            hits = []
+            for col, dist in zip(cols[order], row_dist[order]):
+                if not np.isfinite(dist):
+                    continue
+                if max_distance is not None and dist >= max_distance:
+                    break
+                hits.append((int(col), float(dist)))
+            results.append(hits)
+    return results
+
+
+async def hnsw_neighbors(
+    session: AsyncSession,
+    source_ids: list[uuid.UUID],
+    *,
+    k: int,
+    max_distance: float,
+    batch_size: int = 500,
+    column: str = "embedding",
+) -> list[tuple[uuid.UUID, uuid.UUID, float]]:
+    """Batched kNN through the pgvector HNSW index.
+
+    Returns (source_id, neighbor_id, cosine_distance) edges with distance
+    below max_distance, at most k per source.
+    """
+    if column not in _INDEXED_COLUMNS:
+        raise ValueError(f"no HNSW index on traces.{column}")
+    if not source_ids:
+        return []
+
+    # ef_search bounds how many candidates one HNSW probe can return; keep it
+    # at least k so the LIMIT is not silently truncated (pgvector default 40).
+    await session.execute(text(f"SET LOCAL hnsw.ef_search = {max(int(k), 40)}"))
+
+    # The distance filter sits outside the LATERAL: a WHERE on the distance
+    # inside it would stop the planner from using the index ordering.
+    stmt = text(
+        f"""
+        SELECT s.id AS source_id, n.id AS neighbor_id, n.distance
+        FROM traces s
+        CROSS JOIN LATERAL (
+            SELECT t.id, t.{column} <=> s.{column} AS distance
+            FROM traces t
+            WHERE t.{column} IS NOT NULL
+              AND t.id != s.id
+            ORDER BY t.{column} <=> s.{column}
+            LIMIT :k
+        ) n
+        WHERE s.id = ANY(:ids)
+          AND s.{column} IS NOT NULL
+          AND n.distance < :max_distance
+        """
+    )
+
+    edges: list[tuple[uuid.UUID, uuid.UUID, float]] = []
+    for start in range(0, len(source_ids), batch_size):
+        chunk = source_ids[start:start + batch_size]
+        result = await session.execute(
+            stmt, {"ids": chunk, "k": k, "max_distance": max_distance}
+        )
+        edges.extend(
+            (row.source_id, row.neighbor_id, float(row.distance))
+            for row in result.all()
+        )
+    return edges
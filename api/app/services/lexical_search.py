@@ -0,0 +1,122 @@
+"""Full-text lexical leg of POST /api/v1/traces/search.
+
+Cosine kNN misses exact-token queries (error codes, flag names, package
+versions) that a keyword match finds trivially. This leg ranks traces by
+ts_rank_cd over `traces.search_tsv`, a weighted tsvector (title A, context
+B, solution C) kept current by a trigger and served by a GIN index
+(migration 0033). The router runs it concurrently with embedding + vector
+search on its own pooled session and fuses both rankings with reciprocal
+rank fusion (fuse_lexical).
+
+It needs no embedding, so it is also the fallback when the embedding call
+exceeds SEARCH_EMBEDDING_TIMEOUT_SECONDS or is not configured: the lexical
+ranking alone is returned, and traces not yet embedded are searchable too.
+"""
+
+import uuid
+from datetime import datetime
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory
+from app.services.vector_search import (
+    SearchHit,
+    hydrate_hits,
+    reciprocal_rank_fusion,
+    sql_filters,
+    tag_filter_ids,
+)
+
+log = structlog.get_logger(__name__)
+
+# ts_rank_cd normalization 32: rank / (rank + 1), so scores fall in [0, 1).
+_RANK_NORMALIZATION = 32
+
+
+async def lexical_search(
+    db: AsyncSession,
+    query: str,
+    *,
+    limit: int,
+    tags: list[str],
+    include_expired: bool,
+    now: datetime,
+) -> list[tuple[uuid.UUID, float]]:
+    """(id, ts_rank_cd) of the best full-text matches for `query`, best first.
+
+    The query is parsed with websearch_to_tsquery, so quoted phrases, OR
+    and -exclusions work and stray punctuation never raises a syntax error.
+    Applies the same flag / expiry / AND-tag filters as the vector probes.
+    """
+    candidate_ids = tag_filter_ids(tags)
+    if candidate_ids == []:
+        return []
+    filters, params = sql_filters(tags, candidate_ids, include_expired=include_expired, now=now)
+    params.update(q=query, limit=limit)
+    result = await db.execute(
+        text(
+            f"SELECT t.id, ts_rank_cd(t.search_tsv, query, {_RANK_NORMALIZATION}) AS rank "
+            "FROM traces t, websearch_to_tsquery('english', :q) query "
+            f"WHERE t.search_tsv @@ query AND {' AND '.join(filters)} "
+            "ORDER BY rank DESC LIMIT :limit"
+        ),
+        params,
+    )
+    return [(row.id, float(row.rank)) for row in result.all()]
+
+
+async def run_lexical_leg(
+    query: str,
+    *,
+    limit: int,
+    tags: list[str],
+    include_expired: bool,
+    now: datetime,
+) -> list[tuple[uuid.UUID, float]]:
+    """lexical_search on its own session, so it can overlap the request's
+    embedding call and vector query. Best-effort: [] on failure."""
+    try:
+        async with async_session_factory() as session:
+            return await lexical_search(
+                session, query, limit=limit, tags=tags,
+                include_expired=include_expired, now=now,
+            )
+    except Exception:
+        log.warning("lexical_search_failed", exc_info=True)
+        return []
+
+
+async def fuse_lexical(
+    db: AsyncSession,
+    hits: list[SearchHit],
+    lexical: list[tuple[uuid.UUID, float]],
+    *,
+    limit: int,
+    include_expired: bool,
+    now: datetime,
+) -> list[SearchHit]:
+    """Fuse vector hits with the lexical ranking by reciprocal rank fusion.
+
+    Every returned hit carries the fused score. Lexical-only traces are
+    hydrated here with distance 1.0 (no measured similarity). With no
+    lexical matches the vector hits come back unchanged.
+    """
+    if not lexical:
+        return hits
+    rankings = {"lexical": [trace_id for trace_id, _ in lexical]}
+    if hits:
+        rankings["vector"] = [hit.trace.id for hit in hits]
+    fused = reciprocal_rank_fusion(rankings, k=settings.search_rrf_k)[:limit]
+
+    by_id = {hit.trace.id: hit for hit in hits}
+    missing = [(trace_id, 1.0) for trace_id, _ in fused if trace_id not in by_id]
+    for hit in await hydrate_hits(db, missing, include_expired=include_expired, now=now):
+        by_id[hit.trace.id] = hit
+    return [
+        SearchHit(by_id[trace_id].trace, by_id[trace_id].distance, score)
+        for trace_id, score in fused
+        if trace_id in by_id
+    ]
@@ -0,0 +1,113 @@
+"""Daily range partitions for retrieval_logs.
+
+retrieval_logs is partitioned by retrieved_at (migration 0027), one
+partition per UTC day named retrieval_logs_pYYYYMMDD. Partitions are
+created RETRIEVAL_LOG_PARTITIONS_AHEAD days in advance, and retention is
+enforced by detaching + dropping whole partitions instead of DELETE — no
+dead tuples, no vacuum debt, no index bloat.
+
+Both maintenance steps take an ACCESS EXCLUSIVE lock on the parent, so
+callers run them in their own short transaction (see
+maintain_retrieval_log_partitions), never inside the long consolidation one.
+"""
+
+import re
+from datetime import date, datetime, timedelta, timezone
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+log = structlog.get_logger(__name__)
+
+PARENT_TABLE = "retrieval_logs"
+_NAME_RE = re.compile(rf"^{PARENT_TABLE}_p(\d{{8}})$")
+
+
+def partition_name(day: date) -> str:
+    return f"{PARENT_TABLE}_p{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> date | None:
+    """Day covered by a partition, or None for tables not named by this module."""
+    match = _NAME_RE.match(name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y%m%d").date()
+
+
+def partitions_to_create(existing: set[str], today: date, ahead: int) -> list[date]:
+    """Days from today through today + ahead that have no partition yet."""
+    return [
+        today + timedelta(days=offset)
+        for offset in range(ahead + 1)
+        if partition_name(today + timedelta(days=offset)) not in existing
+    ]
+
+
+def partitions_to_drop(existing: set[str], cutoff: datetime) -> list[str]:
+    """Partitions whose whole day range ends at or before the cutoff."""
+    expired = []
+    for name in sorted(existing):
+        day = partition_day(name)
+        if day is None:
+            continue
+        upper = datetime.combine(day + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        if upper <= cutoff:
+            expired.append(name)
+    return expired
+
+
+async def _existing_partitions(session: AsyncSession) -> set[str]:
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return set(result.scalars().all())
+
+
+async def ensure_partitions(session: AsyncSession, today: date | None = None) -> int:
+    """Create any missing partitions for today .. today + ahead. Returns count created."""
+    today = today or datetime.now(timezone.utc).date()
+    existing = await _existing_partitions(session)
+    missing = partitions_to_create(existing, today, settings.retrieval_log_partitions_ahead)
+    for day in missing:
+        # Identifiers/bounds come from dates formatted here, never from input.
+        await session.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(day)} "
+                f"PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+                f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+            )
+        )
+    return len(missing)
+
+
+async def drop_expired_partitions(session: AsyncSession, cutoff: datetime) -> int:
+    """Detach and drop partitions entirely older than cutoff. Returns count dropped."""
+    existing = await _existing_partitions(session)
+    expired = partitions_to_drop(existing, cutoff)
+    for name in expired:
+        await session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        await session.execute(text(f"DROP TABLE {name}"))
+    return len(expired)
+
+
+async def maintain_retrieval_log_partitions(session: AsyncSession) -> dict:
+    """Create upcoming partitions and drop expired ones; commits immediately
+    so the parent's exclusive lock is held only for the DDL itself."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.retrieval_log_retention_days)
+    created = await ensure_partitions(session)
+    dropped = await drop_expired_partitions(session, cutoff)
+    await session.commit()
+    if created or dropped:
+        log.info("retrieval_log_partitions_maintained", created=created, dropped=dropped)
+    return {"log_partitions_created": created, "log_partitions_dropped": dropped}
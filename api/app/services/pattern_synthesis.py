@@ -13,10 +13,15 @@ from collections import Counter
 
 import structlog
 from sqlalchemy import select, text, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.trace import Trace
+from app.models.trace_relationship import TraceRelationship
+from app.services.embedding import EmbeddingService
+from app.services.tags import link_trace_tags
+from app.services.trace_embedding import embed_traces, index_after_commit
 
 log = structlog.get_logger(__name__)
 
@@ -27,32 +32,48 @@ SYSTEM_USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 MIN_CLUSTER_SIZE = 3
 MIN_CLUSTER_TRUST = 0.5
 
+# Members (highest trust first) a pattern is synthesized from and linked to
+MAX_PATTERN_SOURCES = 20
+
 # Impact level hierarchy for aggregation
 _IMPACT_HIERARCHY = {"critical": 4, "high": 3, "normal": 2, "low": 1}
 
 
-async def generate_pattern_traces(session: AsyncSession) -> int:
+async def generate_pattern_traces(
+    session: AsyncSession, embedder: EmbeddingService | None = None
+) -> int:
     """Generate pattern traces from qualifying convergence clusters.
 
-    Qualifying clusters: >= 3 members, average trust >= 0.5.
-    Skips clusters that already have a pattern trace.
+    Qualifying clusters: >= 3 members, average trust >= 0.5, and no pattern
+    trace yet (anti-join in the cluster query). Members of every qualifying
+    cluster are loaded in one query; PATTERN_SOURCE edges and tag links are
+    written as multi-row INSERTs.
+
+    When an embedder is given, the new pattern traces are embedded in the
+    same transaction so they are searchable as soon as the cycle commits,
+    instead of waiting for the embedding worker's next poll.
 
     Returns count of pattern traces generated.
     """
-    # Find qualifying clusters
+    # Find qualifying clusters that do not have a pattern trace yet
     cluster_result = await session.execute(
         text(
             """
             SELECT
-                convergence_cluster_id AS cluster_id,
+                t.convergence_cluster_id AS cluster_id,
                 COUNT(*) AS member_count,
-                AVG(trust_score) AS avg_trust
-            FROM traces
-            WHERE convergence_cluster_id IS NOT NULL
-                AND is_flagged = false
-                AND trace_type = 'episodic'
-            GROUP BY convergence_cluster_id
-            HAVING COUNT(*) >= :min_size AND AVG(trust_score) >= :min_trust
+                AVG(t.trust_score) AS avg_trust
+            FROM traces t
+            WHERE t.convergence_cluster_id IS NOT NULL
+                AND t.is_flagged = false
+                AND t.trace_type = 'episodic'
+                AND NOT EXISTS (
+                    SELECT 1 FROM traces p
+                    WHERE p.trace_type = 'pattern'
+                        AND p.convergence_cluster_id = t.convergence_cluster_id
+                )
+            GROUP BY t.convergence_cluster_id
+            HAVING COUNT(*) >= :min_size AND AVG(t.trust_score) >= :min_trust
             """
         ),
         {"min_size": MIN_CLUSTER_SIZE, "min_trust": MIN_CLUSTER_TRUST},
@@ -62,33 +83,44 @@ async def generate_pattern_traces(session: AsyncSession) -> int:
     if not clusters:
         return 0
 
-    generated = 0
-    for cluster in clusters:
-        cluster_id = cluster.cluster_id
-
-        # Skip if pattern trace already exists for this cluster
-        existing = await session.execute(
-            select(func.count()).select_from(Trace).where(
-                Trace.trace_type == "pattern",
-                Trace.convergence_cluster_id == cluster_id,
+    # Load top-20 members (by trust) of every qualifying cluster, with tags
+    ranked = (
+        select(
+            Trace.id,
+            func.row_number()
+            .over(
+                partition_by=Trace.convergence_cluster_id,
+                order_by=Trace.trust_score.desc(),
             )
+            .label("rn"),
         )
-        if existing.scalar() > 0:
-            continue
+        .where(
+            Trace.convergence_cluster_id.in_([c.cluster_id for c in clusters]),
+            Trace.is_flagged.is_(False),
+            Trace.trace_type == "episodic",
+        )
+        .subquery()
+    )
+    member_result = await session.execute(
+        select(Trace)
+        .join(ranked, ranked.c.id == Trace.id)
+        .where(ranked.c.rn <= MAX_PATTERN_SOURCES)
+        .options(selectinload(Trace.tags))
+    )
+    members_by_cluster: dict[uuid.UUID, list[Trace]] = {}
+    for member in member_result.scalars().all():
+        members_by_cluster.setdefault(member.convergence_cluster_id, []).append(member)
 
-        # Load top-20 members with tags, ordered by trust
-        member_result = await session.execute(
-            select(Trace)
-            .where(
-                Trace.convergence_cluster_id == cluster_id,
-                Trace.is_flagged.is_(False),
-                Trace.trace_type == "episodic",
-            )
-            .options(selectinload(Trace.tags))
-            .order_by(Trace.trust_score.desc())
-            .limit(20)
+    patterns: list[Trace] = []
+    edge_rows: list[dict] = []
+    tag_rows: list[dict] = []
+    for cluster in clusters:
+        cluster_id = cluster.cluster_id
+        members = sorted(
+            members_by_cluster.get(cluster_id, []),
+            key=lambda m: m.trust_score,
+            reverse=True,
         )
-        members = list(member_result.scalars().all())
 
         if len(members) < MIN_CLUSTER_SIZE:
             continue
@@ -96,8 +128,9 @@ async def generate_pattern_traces(session: AsyncSession) -> int:
         # Synthesize pattern content
         synth = _synthesize_pattern(members, cluster_id)
 
-        # Create pattern trace
+        # Create pattern trace (id assigned up front so edges can reference it)
         pattern_trace = Trace(
+            id=uuid.uuid4(),
             title=synth["title"],
             context_text=synth["context"],
             solution_text=synth["solution"],
@@ -114,38 +147,29 @@ async def generate_pattern_traces(session: AsyncSession) -> int:
             somatic_intensity=max(m.somatic_intensity for m in members),
         )
         session.add(pattern_trace)
-        await session.flush()
-
-        # Create PATTERN_SOURCE relationships to all members
-        for member in members:
-            await session.execute(
-                text(
-                    "INSERT INTO trace_relationships "
-                    "(id, source_trace_id, target_trace_id, relationship_type, strength) "
-                    "VALUES (gen_random_uuid(), :pattern_id, :member_id, 'PATTERN_SOURCE', 1.0) "
-                    "ON CONFLICT (source_trace_id, target_trace_id, relationship_type) DO NOTHING"
-                ),
-                {"pattern_id": str(pattern_trace.id), "member_id": str(member.id)},
-            )
+        patterns.append(pattern_trace)
+
+        # PATTERN_SOURCE relationships to all members
+        edge_rows.extend(
+            {
+                "source_trace_id": pattern_trace.id,
+                "target_trace_id": member.id,
+                "relationship_type": "PATTERN_SOURCE",
+                "strength": 1.0,
+            }
+            for member in members
+        )
 
         # Link tags (union of member tags, top 10 by frequency)
         tag_counter: Counter = Counter()
         for member in members:
             for tag in member.tags:
                 tag_counter[tag.id] += 1
+        tag_rows.extend(
+            {"trace_id": pattern_trace.id, "tag_id": tag_id}
+            for tag_id, _ in tag_counter.most_common(10)
+        )
 
-        top_tag_ids = [tid for tid, _ in tag_counter.most_common(10)]
-        for tag_id in top_tag_ids:
-            await session.execute(
-                text(
-                    "INSERT INTO trace_tags (trace_id, tag_id) "
-                    "VALUES (:trace_id, :tag_id) "
-                    "ON CONFLICT DO NOTHING"
-                ),
-                {"trace_id": str(pattern_trace.id), "tag_id": str(tag_id)},
-            )
-
-        generated += 1
         log.info(
             "pattern_trace_generated",
             cluster_id=str(cluster_id),
@@ -153,7 +177,25 @@ async def generate_pattern_traces(session: AsyncSession) -> int:
             pattern_trace_id=str(pattern_trace.id),
         )
 
-    return generated
+    if not patterns:
+        return 0
+
+    await session.flush()
+
+    await session.execute(
+        pg_insert(TraceRelationship)
+        .values(edge_rows)
+        .on_conflict_do_nothing(constraint="uq_trace_relationships_source_target_type")
+    )
+    await link_trace_tags(session, tag_rows)
+
+    if embedder is not None:
+        embedded = await embed_traces(session, embedder, patterns)
+        # The consolidation run commits; the memory index follows it.
+        index_after_commit(session, embedded.index_updates)
+        log.info("pattern_traces_embedded", count=embedded.processed, generated=len(patterns))
+
+    return len(patterns)
 
 
 def _synthesize_pattern(members: list, cluster_id: uuid.UUID) -> dict:
@@ -0,0 +1,414 @@
+"""Zero-downtime migration of the corpus to a new embedding model.
+
+Search only compares vectors of the active model, so pointing
+EMBEDDING_BACKEND at a new model would hide every trace until the worker
+had re-embedded it. Instead a run goes through these stages; scripts/reembed.py
+drives each one:
+
+  1. start  — record an embedding_migrations row for the target backend /
+     model.
+  2. run    — keyset-page through embedded traces, embed their content,
+     context and solution texts with the target model (via the embedding
+     cache) into the shadow *_next columns (migration 0035). The checkpoint
+     and counters are committed with every batch, so an interrupted run
+     resumes where it stopped. REEMBED_MAX_PER_SECOND caps the rate. Each
+     pass that reaches the end starts another over traces embedded since,
+     until none are left. A trace whose texts the target model rejects is
+     recorded in failed_trace_ids and skipped instead of stopping the run;
+     each `run` invocation retries the recorded ones.
+  3. index  — CREATE INDEX CONCURRENTLY the shadow twins of every live
+     vector index (same definitions as migrations 0001/0007/0031/0032).
+  4. switch — in one short transaction holding the traces lock: re-check
+     that every embedded trace is covered (recorded failures go live
+     without vectors, for the embedding worker to retry), then rename the live columns
+     and indexes to *_prev and the shadows to the live names. Readers see
+     the old or the new corpus, never a mix or a gap. Health-pair and
+     cluster scan records are cleared so everything is rescanned. The switched row
+     becomes the active model; each process picks it up within
+     EMBEDDING_MODEL_REFRESH_SECONDS (refresh_active_embedding_model), and
+     until then its vector leg matches nothing and the lexical leg answers.
+  5. cleanup — once every process has refreshed: clear vectors a stale
+     process wrote with the old model (the worker re-embeds them), drop
+     the *_prev columns with their indexes and re-add empty shadows.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import structlog
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory, engine
+from app.models.embedding_migration import EmbeddingMigration
+from app.services.embedding import (
+    OPENAI_DIMENSIONS,
+    EmbeddingService,
+    active_embedding_model,
+    make_embedding_backend,
+    set_active_embedding_model,
+)
+from app.services.embedding_cache import embed_cached_each
+from app.services.trace_embedding import embedding_inputs
+from app.services.vector_search import load_vector_index, vector_index
+
+log = structlog.get_logger(__name__)
+
+# Statuses of a run that still owns the shadow columns.
+ACTIVE_STATUSES = ("embedding", "indexed")
+# How long the switch waits for the traces lock before giving up.
+_SWITCH_LOCK_TIMEOUT = "5s"
+
+# (live, shadow, parked-after-switch) column names.
+_SWAPPED_COLUMNS = [
+    ("embedding", "embedding_next", "embedding_prev"),
+    ("context_embedding", "context_embedding_next", "context_embedding_prev"),
+    ("solution_embedding", "solution_embedding_next", "solution_embedding_prev"),
+    ("embedding_model_id", "embedding_next_model_id", "embedding_prev_model_id"),
+    ("embedding_model_version", "embedding_next_model_version", "embedding_prev_model_version"),
+]
+
+# Live vector index -> USING hnsw definition of its shadow twin.
+_SHADOW_INDEXES = {
+    "ix_traces_embedding_hnsw": "embedding_next vector_cosine_ops",
+    "ix_traces_embedding_halfvec_hnsw": (
+        f"(CAST(embedding_next AS halfvec({OPENAI_DIMENSIONS}))) halfvec_cosine_ops"
+    ),
+    "ix_traces_embedding_binary_hnsw": (
+        f"(CAST(binary_quantize(embedding_next) AS bit({OPENAI_DIMENSIONS}))) bit_hamming_ops"
+    ),
+    "ix_traces_context_embedding_hnsw": "context_embedding_next vector_cosine_ops",
+    "ix_traces_solution_embedding_hnsw": "solution_embedding_next vector_cosine_ops",
+}
+
+_UNCOVERED = (
+    "embedding IS NOT NULL AND embedding_next_model_id IS DISTINCT FROM :target "
+    "AND NOT (id = ANY(CAST(:failed AS uuid[])))"
+)
+
+_WRITE_SHADOW = text(
+    """
+    UPDATE traces SET
+        embedding_next = :embedding,
+        context_embedding_next = :context_embedding,
+        solution_embedding_next = :solution_embedding,
+        embedding_next_model_id = :model_id,
+        embedding_next_model_version = :model_version
+    WHERE id = :id
+    """
+).bindparams(*(
+    bindparam(name, type_=Vector(OPENAI_DIMENSIONS))
+    for name in ("embedding", "context_embedding", "solution_embedding")
+))
+
+
+def _uncovered_params(migration: EmbeddingMigration) -> dict:
+    return {"target": migration.target_model_id, "failed": list(migration.failed_trace_ids)}
+
+
+def shadow_index_name(live: str) -> str:
+    return live.replace("ix_traces_", "ix_traces_next_", 1)
+
+
+def parked_index_name(live: str) -> str:
+    return live.replace("ix_traces_", "ix_traces_prev_", 1)
+
+
+def target_service(migration: EmbeddingMigration) -> EmbeddingService:
+    """An EmbeddingService pinned to the migration's target model."""
+    return EmbeddingService(make_embedding_backend(
+        migration.backend, migration.local_model, migration.local_dimensions,
+    ))
+
+
+async def current_migration(session: AsyncSession) -> Optional[EmbeddingMigration]:
+    """The run that owns the shadow columns, if any."""
+    result = await session.execute(
+        select(EmbeddingMigration)
+        .where(EmbeddingMigration.status.in_(ACTIVE_STATUSES))
+        .order_by(EmbeddingMigration.id.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def last_switched(session: AsyncSession) -> Optional[EmbeddingMigration]:
+    result = await session.execute(
+        select(EmbeddingMigration)
+        .where(EmbeddingMigration.status == "switched")
+        .order_by(EmbeddingMigration.switched_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def uncovered_count(session: AsyncSession, migration: EmbeddingMigration) -> int:
+    """Embedded traces without a shadow vector from the target model (recorded failures excluded)."""
+    result = await session.execute(
+        text(f"SELECT COUNT(*) FROM traces WHERE {_UNCOVERED}"),
+        _uncovered_params(migration),
+    )
+    return int(result.scalar() or 0)
+
+
+async def start_migration(
+    session: AsyncSession,
+    backend: str,
+    model: Optional[str] = None,
+    dimensions: Optional[int] = None,
+) -> EmbeddingMigration:
+    """Record a new run towards `backend` (/ local model, dimensions)."""
+    target = make_embedding_backend(backend, model, dimensions)
+    if target.model_id == active_embedding_model():
+        raise ValueError(f"{target.model_id} is already the active embedding model")
+    running = await current_migration(session)
+    if running is not None:
+        raise ValueError(
+            f"migration {running.id} to {running.target_model_id} is still {running.status}"
+        )
+    # Shadow vectors left behind by an aborted run towards another model.
+    await session.execute(
+        text(
+            "UPDATE traces SET embedding_next = NULL, context_embedding_next = NULL, "
+            "solution_embedding_next = NULL, embedding_next_model_id = NULL, "
+            "embedding_next_model_version = NULL "
+            "WHERE embedding_next_model_id IS NOT NULL AND embedding_next_model_id <> :target"
+        ),
+        {"target": target.model_id},
+    )
+    migration = EmbeddingMigration(
+        backend=backend,
+        local_model=getattr(target, "model", None),
+        local_dimensions=getattr(target, "dimensions", None),
+        target_model_id=target.model_id,
+        status="embedding",
+        embedded_count=0,
+        failed_trace_ids=[],
+    )
+    session.add(migration)
+    await session.flush()
+    return migration
+
+
+async def reembed_batch(
+    session: AsyncSession,
+    migration: EmbeddingMigration,
+    svc: EmbeddingService,
+    batch_size: int,
+) -> int:
+    """Shadow-embed the next page after the checkpoint and advance it.
+
+    The page goes to the backend in one call; if that fails, its texts are
+    retried one by one. A trace with a text that still fails is recorded
+    in failed_trace_ids and skipped, so one input the target model rejects
+    cannot stall the run.
+
+    Returns the traces processed (written or recorded); 0 means the pass
+    reached the end.
+    """
+    sql = f"SELECT id, title, context_text, solution_text, context_fingerprint FROM traces WHERE {_UNCOVERED}"
+    params: dict = {**_uncovered_params(migration), "limit": batch_size}
+    if migration.checkpoint_id is not None:
+        sql += " AND id > :after"
+        params["after"] = migration.checkpoint_id
+    result = await session.execute(
+        text(sql + " ORDER BY id LIMIT :limit").columns(context_fingerprint=JSON), params
+    )
+    rows = result.all()
+    if not rows:
+        return 0
+
+    inputs = [embedding_inputs(row) for row in rows]
+    embedded = iter(await embed_cached_each(
+        svc, [text for fields in inputs for text in fields.values()], session,
+    ))
+    updates = []
+    failed = []
+    for row, fields in zip(rows, inputs):
+        values = {"id": row.id, "context_embedding": None, "solution_embedding": None}
+        results = [next(embedded) for _ in fields]
+        if None in results:
+            failed.append(row.id)
+            continue
+        for column, (vector, model_id, model_version) in zip(fields, results):
+            values[column] = vector
+            values["model_id"], values["model_version"] = model_id, model_version
+        updates.append(values)
+    if updates:
+        await session.execute(_WRITE_SHADOW, updates)
+    if failed:
+        log.error("reembed_traces_failed", migration=migration.id, trace_ids=[str(i) for i in failed])
+        migration.failed_trace_ids = [*migration.failed_trace_ids, *failed]
+
+    migration.checkpoint_id = rows[-1].id
+    migration.embedded_count += len(updates)
+    migration.updated_at = datetime.now(timezone.utc)
+    return len(rows)
+
+
+async def run_migration(
+    migration_id: int,
+    *,
+    batch_size: Optional[int] = None,
+    max_per_second: Optional[float] = None,
+) -> int:
+    """Shadow-embed until every embedded trace is covered or recorded as failed. Resumable.
+
+    Traces recorded as failed by an earlier call are retried. Commits after
+    every batch. Returns the traces processed by this call; the failures
+    stay in the migration's failed_trace_ids.
+    """
+    batch_size = batch_size or settings.reembed_batch_size
+    max_per_second = max_per_second or settings.reembed_max_per_second
+    written = 0
+    svc: Optional[EmbeddingService] = None
+    retry_failed = True
+    while True:
+        started = time.monotonic()
+        async with async_session_factory() as session:
+            migration = await session.get(EmbeddingMigration, migration_id)
+            if migration is None or migration.status not in ACTIVE_STATUSES:
+                raise ValueError(f"migration {migration_id} is not running")
+            if retry_failed:
+                migration.failed_trace_ids = []
+                retry_failed = False
+            svc = svc or target_service(migration)
+            count = await reembed_batch(session, migration, svc, batch_size)
+            if count == 0:
+                if migration.checkpoint_id is None:
+                    return written
+                # End of a pass: sweep again for traces embedded meanwhile.
+                migration.checkpoint_id = None
+            await session.commit()
+        written += count
+        if count:
+            log.info(
+                "reembed_batch",
+                migration=migration_id, traces=count, embedded=migration.embedded_count,
+                failed=len(migration.failed_trace_ids),
+            )
+            await asyncio.sleep(max(0.0, count / max_per_second - (time.monotonic() - started)))
+
+
+async def build_shadow_indexes(migration_id: int) -> list[str]:
+    """CREATE INDEX CONCURRENTLY every shadow index (skipping valid ones).
+
+    An invalid leftover of an interrupted build is dropped and rebuilt.
+    Returns the indexes built by this call.
+    """
+    built = []
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for live, definition in _SHADOW_INDEXES.items():
+            name = shadow_index_name(live)
+            valid = (await conn.execute(
+                text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+                {"name": name},
+            )).scalar()
+            if valid:
+                continue
+            if valid is False:
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY {name}"))
+            log.info("reembed_index_build_started", index=name)
+            await conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY {name} ON traces "
+                f"USING hnsw ({definition}) WITH (m = 16, ef_construction = 64)"
+            ))
+            built.append(name)
+    async with async_session_factory() as session:
+        migration = await session.get(EmbeddingMigration, migration_id)
+        migration.status = "indexed"
+        migration.updated_at = datetime.now(timezone.utc)
+        await session.commit()
+    return built
+
+
+async def switch_migration(session: AsyncSession, migration: EmbeddingMigration) -> None:
+    """Atomically swap the shadow columns and indexes in. Commits.
+
+    Raises ValueError (nothing changed) unless the shadow indexes are
+    built and every embedded trace has a target-model shadow vector or is
+    recorded in failed_trace_ids; the latter go live without vectors and
+    the embedding worker retries them.
+    """
+    if migration.status != "indexed":
+        raise ValueError(f"migration {migration.id} is {migration.status}; build the indexes first")
+    await session.execute(text(f"SET LOCAL lock_timeout = '{_SWITCH_LOCK_TIMEOUT}'"))
+    await session.execute(text("LOCK TABLE traces IN ACCESS EXCLUSIVE MODE"))
+    missing = await uncovered_count(session, migration)
+    if missing:
+        await session.rollback()
+        raise ValueError(f"{missing} embedded traces are not re-embedded yet; run the migration again")
+    for live, shadow, parked in _SWAPPED_COLUMNS:
+        await session.execute(text(f"ALTER TABLE traces RENAME COLUMN {live} TO {parked}"))
+        await session.execute(text(f"ALTER TABLE traces RENAME COLUMN {shadow} TO {live}"))
+    for live in _SHADOW_INDEXES:
+        await session.execute(text(f"ALTER INDEX {live} RENAME TO {parked_index_name(live)}"))
+        await session.execute(text(f"ALTER INDEX {shadow_index_name(live)} RENAME TO {live}"))
+    # Every live vector just changed; the health-pair and cluster scans start over.
+    await session.execute(text("DELETE FROM health_pair_scans"))
+    await session.execute(text("DELETE FROM convergence_cluster_scans"))
+    migration.status = "switched"
+    migration.switched_at = datetime.now(timezone.utc)
+    await session.commit()
+    set_active_embedding_model(migration.backend, migration.local_model, migration.local_dimensions)
+    log.info(
+        "embedding_model_switched",
+        model=migration.target_model_id, migration=migration.id,
+        failed=len(migration.failed_trace_ids),
+    )
+
+
+async def cleanup_migration(session: AsyncSession, migration: EmbeddingMigration) -> int:
+    """Retire the previous model's columns after a switch. Commits.
+
+    Returns the traces whose stale old-model vectors were cleared for the
+    worker to re-embed.
+    """
+    grace = timedelta(seconds=2 * settings.embedding_model_refresh_seconds)
+    if migration.status != "switched" or migration.switched_at + grace > datetime.now(timezone.utc):
+        raise ValueError("cleanup runs once every process has picked up the switch")
+    result = await session.execute(
+        text(
+            "UPDATE traces SET embedding = NULL, context_embedding = NULL, "
+            "solution_embedding = NULL, embedding_model_id = NULL, embedding_model_version = NULL "
+            "WHERE embedding IS NOT NULL AND embedding_model_id IS DISTINCT FROM :target"
+        ),
+        {"target": migration.target_model_id},
+    )
+    dropped = ", ".join(f"DROP COLUMN IF EXISTS {parked}" for _, _, parked in _SWAPPED_COLUMNS)
+    await session.execute(text(f"ALTER TABLE traces {dropped}"))
+    await session.execute(text(
+        "ALTER TABLE traces "
+        f"ADD COLUMN IF NOT EXISTS embedding_next vector({OPENAI_DIMENSIONS}), "
+        f"ADD COLUMN IF NOT EXISTS context_embedding_next vector({OPENAI_DIMENSIONS}), "
+        f"ADD COLUMN IF NOT EXISTS solution_embedding_next vector({OPENAI_DIMENSIONS}), "
+        "ADD COLUMN IF NOT EXISTS embedding_next_model_id varchar(100), "
+        "ADD COLUMN IF NOT EXISTS embedding_next_model_version varchar(100)"
+    ))
+    await session.commit()
+    return result.rowcount
+
+
+async def refresh_active_embedding_model(session: AsyncSession) -> dict:
+    """Scheduled job (and startup): adopt the most recently switched model.
+
+    Reloads the in-process vector index when the model changes.
+    """
+    previous = active_embedding_model()
+    switched = await last_switched(session)
+    if switched is None:
+        set_active_embedding_model(None)
+    else:
+        set_active_embedding_model(switched.backend, switched.local_model, switched.local_dimensions)
+    current = active_embedding_model()
+    if current != previous:
+        log.info("embedding_model_switched", model=current, previous=previous)
+        if vector_index.ready:
+            await load_vector_index(session)
+    return {"embedding_model": current}
@@ -27,6 +27,59 @@ log = structlog.get_logger()
 MAX_CO_RETRIEVAL_TRACES = 10
 
 
+_CO_RETRIEVED_UPSERT = text(
+    "INSERT INTO trace_relationships "
+    "(id, source_trace_id, target_trace_id, relationship_type, strength) "
+    "VALUES (gen_random_uuid(), :src, :tgt, 'CO_RETRIEVED', 1.0) "
+    "ON CONFLICT (source_trace_id, target_trace_id, relationship_type) "
+    "DO UPDATE SET strength = trace_relationships.strength + 1, "
+    "updated_at = now()"
+)
+
+
+def _retrieval_update(trace_ids: list[uuid.UUID]):
+    return (
+        update(Trace)
+        .where(Trace.id.in_(trace_ids))
+        .values(
+            retrieval_count=Trace.retrieval_count + 1,
+            last_retrieved_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+def _retrieval_log_values(trace_ids: list[uuid.UUID], search_session_id: str) -> list[dict]:
+    return [
+        {
+            "trace_id": str(tid),
+            "search_session_id": search_session_id,
+            "result_position": idx,
+        }
+        for idx, tid in enumerate(trace_ids)
+    ]
+
+
+async def _insert_retrieval_logs(session, values: list[dict]) -> None:
+    await session.execute(
+        text(
+            "INSERT INTO retrieval_logs (id, trace_id, search_session_id, result_position) "
+            "VALUES (gen_random_uuid(), :trace_id, :search_session_id, :result_position)"
+        ),
+        values,
+    )
+
+
+def _co_retrieval_pairs(trace_ids: list[uuid.UUID]) -> list[tuple[uuid.UUID, uuid.UUID]]:
+    return list(combinations(trace_ids[:MAX_CO_RETRIEVAL_TRACES], 2))
+
+
+async def _upsert_co_retrievals(session, pairs: list[tuple[uuid.UUID, uuid.UUID]]) -> None:
+    for a, b in pairs:
+        # Upsert both directions
+        await session.execute(_CO_RETRIEVED_UPSERT, {"src": str(a), "tgt": str(b)})
+        await session.execute(_CO_RETRIEVED_UPSERT, {"src": str(b), "tgt": str(a)})
+
+
 async def record_retrievals(trace_ids: list[uuid.UUID]) -> None:
     """Bump retrieval_count and last_retrieved_at for retrieved traces.
 
@@ -38,15 +91,7 @@ async def record_retrievals(trace_ids: list[uuid.UUID]) -> None:
 
     try:
         async with async_session_factory() as session:
-            stmt = (
-                update(Trace)
-                .where(Trace.id.in_(trace_ids))
-                .values(
-                    retrieval_count=Trace.retrieval_count + 1,
-                    last_retrieved_at=datetime.now(timezone.utc),
-                )
-            )
-            await session.execute(stmt)
+            await session.execute(_retrieval_update(trace_ids))
             await session.commit()
     except Exception:
         log.warning("retrieval_tracking_failed", trace_count=len(trace_ids), exc_info=True)
@@ -65,20 +110,8 @@ async def record_retrieval_logs(
 
     try:
         async with async_session_factory() as session:
-            values = [
-                {
-                    "trace_id": str(tid),
-                    "search_session_id": search_session_id,
-                    "result_position": idx,
-                }
-                for idx, tid in enumerate(trace_ids)
-            ]
-            await session.execute(
-                text(
-                    "INSERT INTO retrieval_logs (id, trace_id, search_session_id, result_position) "
-                    "VALUES (gen_random_uuid(), :trace_id, :search_session_id, :result_position)"
-                ),
-                values,
+            await _insert_retrieval_logs(
+                session, _retrieval_log_values(trace_ids, search_session_id)
             )
             await session.commit()
     except Exception:
@@ -101,40 +134,51 @@ async def record_co_retrievals(trace_ids: list[uuid.UUID]) -> None:
     if len(trace_ids) < 2:
         return
 
-    capped = trace_ids[:MAX_CO_RETRIEVAL_TRACES]
-    pairs = list(combinations(capped, 2))
+    pairs = _co_retrieval_pairs(trace_ids)
 
     try:
         async with async_session_factory() as session:
-            for a, b in pairs:
-                # Upsert both directions
-                await session.execute(
-                    text(
-                        "INSERT INTO trace_relationships "
-                        "(id, source_trace_id, target_trace_id, relationship_type, strength) "
-                        "VALUES (gen_random_uuid(), :src, :tgt, 'CO_RETRIEVED', 1.0) "
-                        "ON CONFLICT (source_trace_id, target_trace_id, relationship_type) "
-                        "DO UPDATE SET strength = trace_relationships.strength + 1, "
-                        "updated_at = now()"
-                    ),
-                    {"src": str(a), "tgt": str(b)},
-                )
-                await session.execute(
-                    text(
-                        "INSERT INTO trace_relationships "
-                        "(id, source_trace_id, target_trace_id, relationship_type, strength) "
-                        "VALUES (gen_random_uuid(), :src, :tgt, 'CO_RETRIEVED', 1.0) "
-                        "ON CONFLICT (source_trace_id, target_trace_id, relationship_type) "
-                        "DO UPDATE SET strength = trace_relationships.strength + 1, "
-                        "updated_at = now()"
-                    ),
-                    {"src": str(b), "tgt": str(a)},
-                )
+            await _upsert_co_retrievals(session, pairs)
             await session.commit()
     except Exception:
         log.warning("co_retrieval_tracking_failed", pair_count=len(pairs), exc_info=True)
 
 
+async def record_batch_retrievals(result_sets: list[list[uuid.UUID]]) -> None:
+    """Record every result set of a batch search in one session and commit.
+
+    Equivalent to the three recorders above per result set, except that a
+    trace returned by several searches of the batch is counted once. Each
+    set keeps its own search_session_id, so co-retrieval analysis still
+    pairs only traces returned together by the same search.
+    """
+    result_sets = [ids for ids in result_sets if ids]
+    if not result_sets:
+        return
+
+    retrieved = list(dict.fromkeys(tid for ids in result_sets for tid in ids))
+    log_values = [
+        value
+        for ids in result_sets
+        for value in _retrieval_log_values(ids, str(uuid.uuid4()))
+    ]
+    pairs = [pair for ids in result_sets for pair in _co_retrieval_pairs(ids)]
+
+    try:
+        async with async_session_factory() as session:
+            await session.execute(_retrieval_update(retrieved))
+            await _insert_retrieval_logs(session, log_values)
+            await _upsert_co_retrievals(session, pairs)
+            await session.commit()
+    except Exception:
+        log.warning(
+            "batch_retrieval_tracking_failed",
+            search_count=len(result_sets),
+            trace_count=len(retrieved),
+            exc_info=True,
+        )
+
+
 async def record_search_miss(
     query_text: str | None, tags: list[str], context: dict | None
 ) -> None:
@@ -1,32 +1,59 @@
 """Retrieval-induced forgetting (RIF) detection service.
 
 Tracks which traces consistently lose to the same competitor across
-search sessions. When a trace appears at position > 0 while another
-trace wins position 0 in the same session >= 3 times, a rif_shadow
-entry is created or updated.
+search sessions. Every time a trace appears at position > 0 while another
+trace wins position 0 in the same session, the pair's rif_shadows
+loss_count grows; pairs at >= 3 losses are shadows.
+
+Runs incrementally: each run only reads retrieval_logs newer than the
+"rif_shadows" watermark, so loss counts accumulate exactly once per log row.
 
 Based on Principle 6 — Retrieval-Induced Forgetting from cognitive neuroscience.
 """
 
+from datetime import datetime, timedelta, timezone
+
 import structlog
-from sqlalchemy import text
+from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.rif_shadow import RifShadow
+from app.services.watermarks import get_watermark, set_watermark
+
 log = structlog.get_logger(__name__)
 
-# Minimum co-occurrence count before creating a shadow
+# Minimum co-occurrence count before a pair counts as a shadow
 MIN_CO_OCCURRENCE = 3
 
+WATERMARK_NAME = "rif_shadows"
+
+# Retrieval logs are written fire-and-forget after the search response; leave
+# this much slack so rows still in flight are picked up by the next run
+# instead of being skipped by the advancing watermark.
+INGEST_LAG = timedelta(minutes=5)
+
 
 async def detect_rif_shadows(session: AsyncSession) -> int:
-    """Detect RIF shadow relationships from retrieval logs.
+    """Accumulate RIF loss counts from retrieval logs since the last run.
 
     Joins winners (position=0) with losers (position>0) in the same
-    search_session_id, counts co-occurrences, and upserts into rif_shadows
-    for pairs meeting the minimum threshold.
+    search_session_id over the window (watermark, now - INGEST_LAG], then
+    adds each pair's count to rif_shadows in one INSERT ... SELECT ... ON
+    CONFLICT. A session's log rows share one retrieved_at (inserted in one
+    transaction), so a session never straddles the window boundary.
 
-    Returns count of new or updated shadow entries.
+    Returns count of upserted pairs that are now shadows (>= MIN_CO_OCCURRENCE).
     """
+    since = await get_watermark(session, WATERMARK_NAME)
+    if since is None:
+        # First incremental run: logs up to the previous (non-incremental)
+        # run's last_observed were already counted in full.
+        result = await session.execute(select(func.max(RifShadow.last_observed)))
+        since = result.scalar() or datetime.min.replace(tzinfo=timezone.utc)
+    until = datetime.now(timezone.utc) - INGEST_LAG
+    if until <= since:
+        return 0
+
     result = await session.execute(
         text(
             """
@@ -38,45 +65,39 @@ async def detect_rif_shadows(session: AsyncSession) -> int:
                 FROM retrieval_logs w
                 JOIN retrieval_logs l
                     ON w.search_session_id = l.search_session_id
-                    AND w.result_position = 0
                     AND l.result_position > 0
-                    AND w.trace_id != l.trace_id
-                WHERE w.result_position IS NOT NULL
-                    AND l.result_position IS NOT NULL
+                    AND l.trace_id != w.trace_id
+                    AND l.retrieved_at > :since AND l.retrieved_at <= :until
+                WHERE w.result_position = 0
+                    AND w.retrieved_at > :since AND w.retrieved_at <= :until
                 GROUP BY w.trace_id, l.trace_id
-                HAVING COUNT(*) >= :min_co_occurrence
+            ),
+            upserted AS (
+                INSERT INTO rif_shadows (id, loser_trace_id, winner_trace_id, loss_count, last_observed)
+                SELECT gen_random_uuid(), loser_id, winner_id, co_occurrence, now()
+                FROM winner_loser
+                ON CONFLICT (loser_trace_id, winner_trace_id)
+                DO UPDATE SET
+                    loss_count = rif_shadows.loss_count + EXCLUDED.loss_count,
+                    last_observed = now()
+                RETURNING loss_count
             )
-            SELECT winner_id, loser_id, co_occurrence
-            FROM winner_loser
+            SELECT
+                COUNT(*) AS pairs_upserted,
+                COUNT(*) FILTER (WHERE loss_count >= :min_count) AS shadow_count
+            FROM upserted
             """
         ),
-        {"min_co_occurrence": MIN_CO_OCCURRENCE},
+        {"since": since, "until": until, "min_count": MIN_CO_OCCURRENCE},
     )
-    rows = result.all()
+    row = result.one()
+    await set_watermark(session, WATERMARK_NAME, until)
 
-    updated = 0
-    for row in rows:
-        res = await session.execute(
-            text(
-                """
-                INSERT INTO rif_shadows (id, loser_trace_id, winner_trace_id, loss_count, last_observed)
-                VALUES (gen_random_uuid(), :loser_id, :winner_id, :count, now())
-                ON CONFLICT (loser_trace_id, winner_trace_id)
-                DO UPDATE SET
-                    loss_count = rif_shadows.loss_count + :count,
-                    last_observed = now()
-                """
-            ),
-            {
-                "loser_id": str(row.loser_id),
-                "winner_id": str(row.winner_id),
-                "count": row.co_occurrence,
-            },
+    if row.pairs_upserted > 0:
+        log.info(
+            "rif_shadows_detected",
+            shadow_count=row.shadow_count,
+            pairs_evaluated=row.pairs_upserted,
         )
-        if res.rowcount > 0:
-            updated += 1
-
-    if updated > 0:
-        log.info("rif_shadows_detected", shadow_count=updated, pairs_evaluated=len(rows))
 
-    return updated
+    return row.shadow_count
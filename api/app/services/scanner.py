@@ -16,12 +16,31 @@ Design note on false positives (see research open question 3):
 - KeywordDetector IS enabled on solution_text. If someone writes
   password = "hunter2" in their solution, that is an actual credential leak
   and should be blocked.
+- Plugins and their filters are expensive to run per line, so scan_content
+  first runs one combined prefilter over the whole text and only fully scans
+  the lines it flags. The prefilter matches a superset of what the plugins
+  report, so the detections are the same as scanning every line.
+- detect-secrets settings and plugin instances are set up once per process.
+  Scanning is CPU-bound; the submission routers run it on the CPU executor
+  (app.services.submission).
 """
 
+import bisect
+import re
+import threading
+from typing import Optional
+
+from detect_secrets.core.plugins.util import get_mapping_from_secret_type_to_class
 from detect_secrets.core.scan import _scan_line
-from detect_secrets.settings import default_settings, get_plugins
+from detect_secrets.plugins.base import RegexBasedDetector
+from detect_secrets.settings import configure_settings_from_baseline, get_plugins
 from detect_secrets.util.code_snippet import CodeSnippet
 
+_setup_lock = threading.Lock()
+_plugins: Optional[list] = None
+# None = some plugin has no known prefilter; every line is scanned in full.
+_prefilter: Optional[re.Pattern] = None
+
 
 class SecretDetectedError(Exception):
     """Raised when a scan detects one or more potential secrets in submitted text.
@@ -39,6 +58,118 @@ class SecretDetectedError(Exception):
             "Remove credentials before submitting."
         )
 
+    def __reduce__(self):
+        # Keep secret_types when raised in a process-pool worker
+        return type(self), (self.secret_types,)
+
+
+# Cheap necessary conditions per detect-secrets plugin: every line a plugin
+# can report (with enable_eager_search=False) matches its entry. Most are the
+# literal the plugin's patterns are anchored on, so the combined regex stays
+# fast; tests/test_scanner.py checks detections against a full scan.
+_PREFILTERS = {
+    "ArtifactoryDetector": r"AKC|AP",
+    "AWSKeyDetector": r"A3T|ABIA|ACCA|AKIA|ASIA|(?i:aws)",
+    "AzureStorageKeyDetector": r"(?i:key)",
+    "BasicAuthDetector": r"://",
+    "CloudantDetector": r"(?i:key|pw|pass|token)|://",
+    "DiscordBotTokenDetector": r"[MNO][a-zA-Z\d_-]{23,25}\.",
+    "GitHubTokenDetector": r"gh[pousr]_",
+    "GitLabTokenDetector": r"gl[a-z]{2,5}-|GR1348941",
+    # Without eager search the entropy plugins only look inside quotes.
+    "Base64HighEntropyString": r"'[\w+/\\=-]+'|\"[\w+/\\=-]+\"",
+    "HexHighEntropyString": r"'[0-9a-fA-F]+'|\"[0-9a-fA-F]+\"",
+    "IbmCloudIamDetector": r"(?i:key|pass|pwd|token)",
+    "IbmCosHmacDetector": r"(?i:key)",
+    "IPPublicDetector": r"(?:\d{1,3}\.){3}\d",
+    "JwtTokenDetector": r"eyJ",
+    "KeywordDetector": r"(?i:key|pass|pwd|secret|contrase)",
+    "MailchimpDetector": r"-us\d",
+    "NpmDetector": r"(?i:token)",
+    "OpenAIDetector": r"T3BlbkFJ",
+    "PrivateKeyDetector": r"(?i:key)",
+    "PypiTokenDetector": r"pypi-",
+    "SendGridDetector": r"SG\.",
+    "SlackDetector": r"(?i:xox)|://",
+    "SoftlayerDetector": r"(?i:key|pass|pwd|token)|://",
+    "SquareOAuthDetector": r"sq0csp-",
+    "StripeDetector": r"[rs]k_live_",
+    "TelegramBotTokenDetector": r"\d{8}:",
+    "TwilioKeyDetector": r"(?:AC|SK)[a-z0-9]{32}",
+}
+
+
+def _scoped(pattern: re.Pattern) -> str:
+    """`pattern` as a group carrying its own inline flags, for use in an alternation."""
+    flags = "".join(
+        letter for flag, letter in ((re.IGNORECASE, "i"), (re.VERBOSE, "x"), (re.DOTALL, "s"))
+        if pattern.flags & flag
+    )
+    # A verbose pattern may end in a comment; close the group on a new line.
+    body = pattern.pattern + ("\n" if pattern.flags & re.VERBOSE else "")
+    return f"(?{flags}:{body})" if flags else f"(?:{body})"
+
+
+def _plugin_prefilter(plugin) -> Optional[str]:
+    """A pattern matching every line `plugin` can report (None if unknown)."""
+    known = _PREFILTERS.get(type(plugin).__name__)
+    if known is not None:
+        return known
+    if isinstance(plugin, RegexBasedDetector):
+        # A plugin added by a detect-secrets upgrade: its own (slower) patterns.
+        return "|".join(_scoped(regex) for regex in plugin.denylist)
+    return None
+
+
+def _ensure_configured() -> list:
+    """Enable every detect-secrets plugin once and cache the instances and prefilter."""
+    global _plugins, _prefilter
+    if _plugins is not None:
+        return _plugins
+    with _setup_lock:
+        if _plugins is None:
+            configure_settings_from_baseline({
+                "plugins_used": [
+                    {"name": plugin_type.__name__}
+                    for plugin_type in get_mapping_from_secret_type_to_class().values()
+                ],
+            })
+            plugins = list(get_plugins())
+            patterns = [_plugin_prefilter(plugin) for plugin in plugins]
+            _prefilter = (
+                None if None in patterns
+                else re.compile("|".join(dict.fromkeys(patterns)), re.MULTILINE)
+            )
+            _plugins = plugins
+    return _plugins
+
+
+def _candidate_lines(lines: list[str]) -> list[str]:
+    """The lines the prefilter flags, searching the joined text once per hit.
+
+    After a hit the search restarts at the next line, so a match running
+    across a line break cannot hide a candidate on the following line.
+    """
+    if _prefilter is None:
+        return lines
+    text = "\n".join(lines)
+    starts = [0]
+    for line in lines[:-1]:
+        starts.append(starts[-1] + len(line) + 1)
+
+    candidates = []
+    position = 0
+    while True:
+        match = _prefilter.search(text, position)
+        if match is None:
+            break
+        index = bisect.bisect_right(starts, match.start()) - 1
+        candidates.append(lines[index])
+        if index + 1 >= len(lines):
+            break
+        position = starts[index + 1]
+    return candidates
+
 
 def scan_content(text: str) -> None:
     """Scan a block of text for potential secrets or credentials.
@@ -54,23 +185,23 @@ def scan_content(text: str) -> None:
         SecretDetectedError: If any potential secret is found. The exception
             carries the set of detected secret type names but NOT the values.
     """
+    plugins = _ensure_configured()
     found_types: set[str] = set()
 
-    with default_settings():
-        for line in text.splitlines():
-            if not line.strip():
-                continue
-            context = CodeSnippet(snippet=[line], start_line=1, target_index=0)
-            for plugin in get_plugins():
-                for secret in _scan_line(
-                    plugin=plugin,
-                    filename="user-input",
-                    line=line,
-                    line_number=0,
-                    context=context,
-                    enable_eager_search=False,  # Requires quotes or explicit patterns
-                ):
-                    found_types.add(secret.type)
+    for line in _candidate_lines(text.splitlines()):
+        if not line.strip():
+            continue
+        context = CodeSnippet(snippet=[line], start_line=1, target_index=0)
+        for plugin in plugins:
+            for secret in _scan_line(
+                plugin=plugin,
+                filename="user-input",
+                line=line,
+                line_number=0,
+                context=context,
+                enable_eager_search=False,  # Requires quotes or explicit patterns
+            ):
+                found_types.add(secret.type)
 
     if found_types:
         raise SecretDetectedError(secret_types=found_types)
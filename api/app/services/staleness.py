@@ -10,12 +10,136 @@ Design notes:
 - The staleness check compares only major.minor (not patch) because patch
   releases are typically backwards-compatible bugfixes and their presence
   does not invalidate the advice in a trace.
-- The PyPI JSON API is used (https://pypi.org/pypi/{name}/json) with a 3-second
-  timeout to avoid blocking the request path.
+- The PyPI JSON API is used (PYPI_BASE_URL/{name}/json) through one shared,
+  pooled httpx client.
+- Latest versions are cached for STALENESS_CACHE_TTL_SECONDS in-process and
+  in Redis (shared across processes). Unknown packages and failed lookups
+  are cached too, for STALENESS_NEGATIVE_TTL_SECONDS, so a bad name is not
+  fetched on every check; transient failures stay in-process only.
+- Nothing here runs on the request path: submissions schedule
+  flag_stale_traces after committing, and refresh_trace_staleness (a
+  scheduled job) re-checks every referenced library/library_version pair.
 """
 
+import asyncio
+import re
+import time
+import uuid
+from collections.abc import Mapping
+from typing import Optional
+
 import httpx
+import redis.asyncio as aioredis
+import structlog
 from packaging.version import InvalidVersion, Version
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory
+
+log = structlog.get_logger(__name__)
+
+_REDIS_PREFIX = "pypi:latest:"
+
+_client: Optional[httpx.AsyncClient] = None
+_redis: Optional[aioredis.Redis] = None
+# normalized name -> (expires at, latest version string or None)
+_latest: dict[str, tuple[float, Optional[str]]] = {}
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Lazy-initialize the shared client on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=settings.pypi_base_url,
+            timeout=settings.staleness_http_timeout_seconds,
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def set_version_cache_redis(redis_client: Optional[aioredis.Redis]) -> None:
+    """Share cached versions across processes through `redis_client` (None = in-process only)."""
+    global _redis
+    _redis = redis_client
+
+
+def _normalize_name(name: str) -> str:
+    """PEP 503 project name normalization."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _remember(name: str, latest: Optional[str]) -> None:
+    ttl = settings.staleness_cache_ttl_seconds if latest else settings.staleness_negative_ttl_seconds
+    _latest[name] = (time.monotonic() + ttl, latest)
+
+
+async def _fetch_latest(name: str) -> tuple[Optional[str], bool]:
+    """(latest version, whether the answer is definitive) from the PyPI JSON API."""
+    try:
+        response = await _get_client().get(f"/{name}/json")
+        if response.status_code == 404:
+            return None, True
+        if response.status_code != 200:
+            return None, False
+        latest = response.json().get("info", {}).get("version", "")
+        Version(latest)
+        return latest, True
+    except InvalidVersion:
+        return None, True
+    except Exception:
+        # Network issues, rate limits, malformed bodies: not stale, retry later
+        return None, False
+
+
+async def latest_version(library_name: str) -> Optional[str]:
+    """Latest PyPI version of `library_name`, None when unknown or unavailable.
+
+    Concurrent lookups of the same uncached name share one fetch.
+    """
+    name = _normalize_name(library_name)
+    cached = _latest.get(name)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    lookup = _inflight.get(name)
+    if lookup is None:
+        lookup = _inflight[name] = asyncio.ensure_future(_lookup(name))
+        lookup.add_done_callback(lambda _: _inflight.pop(name, None))
+    return await asyncio.shield(lookup)
+
+
+async def _lookup(name: str) -> Optional[str]:
+    if _redis is not None:
+        try:
+            shared = await _redis.get(_REDIS_PREFIX + name)
+        except Exception:
+            shared = None
+            log.warning("staleness_cache_read_failed", exc_info=True)
+        if shared is not None:
+            _remember(name, shared or None)
+            return shared or None
+
+    latest, definitive = await _fetch_latest(name)
+    _remember(name, latest)
+    if definitive and _redis is not None:
+        ttl = settings.staleness_cache_ttl_seconds if latest else settings.staleness_negative_ttl_seconds
+        try:
+            await _redis.set(_REDIS_PREFIX + name, latest or "", ex=ttl)
+        except Exception:
+            log.warning("staleness_cache_write_failed", exc_info=True)
+    return latest
 
 
 async def check_library_staleness(library_name: str, stored_version_str: str) -> bool:
@@ -34,37 +158,35 @@ async def check_library_staleness(library_name: str, stored_version_str: str) ->
     except InvalidVersion:
         return False
 
-    try:
-        async with httpx.AsyncClient(timeout=3.0) as client:
-            response = await client.get(
-                f"https://pypi.org/pypi/{library_name}/json",
-                follow_redirects=True,
-            )
-            if response.status_code != 200:
-                return False
-
-            data = response.json()
-            latest_version_str = data.get("info", {}).get("version", "")
-            if not latest_version_str:
-                return False
-
-            latest_version = Version(latest_version_str)
-    except Exception:
-        # Never block or fail on a staleness check — network issues, parsing errors,
-        # rate limits, etc. should all result in a graceful "not stale" result.
+    latest_version_str = await latest_version(library_name)
+    if not latest_version_str:
         return False
+    latest = Version(latest_version_str)
 
     stored_major_minor = (stored_version.major, stored_version.minor)
-    latest_major_minor = (latest_version.major, latest_version.minor)
+    latest_major_minor = (latest.major, latest.minor)
 
     return stored_major_minor < latest_major_minor
 
 
+def library_reference(metadata_json: dict | None) -> Optional[tuple[str, str]]:
+    """(library, library_version) referenced by a trace's metadata, if any."""
+    if not metadata_json:
+        return None
+
+    library_name = metadata_json.get("library")
+    library_version = metadata_json.get("library_version")
+
+    if not library_name or not library_version:
+        return None
+
+    return str(library_name), str(library_version)
+
+
 async def check_trace_staleness(metadata_json: dict | None) -> bool:
     """Convenience wrapper that extracts library metadata and checks staleness.
 
-    Intended to be called at submission time to determine whether the referenced
-    library is current. A missing or malformed metadata_json simply returns False.
+    A missing or malformed metadata_json simply returns False.
 
     Args:
         metadata_json: The trace's metadata_json field value. Expected to contain
@@ -74,13 +196,85 @@ async def check_trace_staleness(metadata_json: dict | None) -> bool:
         True if the library is stale (stored version behind PyPI latest major.minor).
         False if metadata is absent, keys are missing, or any error occurs.
     """
-    if not metadata_json:
+    reference = library_reference(metadata_json)
+    if reference is None:
         return False
+    return await check_library_staleness(*reference)
 
-    library_name = metadata_json.get("library")
-    library_version = metadata_json.get("library_version")
 
-    if not library_name or not library_version:
-        return False
+async def _stale_references(references: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """The references whose version is behind PyPI, looked up concurrently."""
+    semaphore = asyncio.Semaphore(max(1, settings.staleness_http_concurrency))
+
+    async def _check(reference: tuple[str, str]) -> bool:
+        async with semaphore:
+            return await check_library_staleness(*reference)
+
+    stale = await asyncio.gather(*(_check(reference) for reference in references))
+    return [reference for reference, is_stale in zip(references, stale) if is_stale]
+
+
+async def flag_stale_traces(references: Mapping[uuid.UUID, tuple[str, str]]) -> None:
+    """Set is_stale on just-submitted traces whose library reference is behind.
+
+    Fire-and-forget after a submission commits: opens its own session and
+    never raises.
+    """
+    if not references:
+        return
+    try:
+        stale = set(await _stale_references(list(set(references.values()))))
+        stale_ids = [trace_id for trace_id, reference in references.items() if reference in stale]
+        if not stale_ids:
+            return
+        async with async_session_factory() as session:
+            await session.execute(
+                text("UPDATE traces SET is_stale = true WHERE id = ANY(:ids)"),
+                {"ids": stale_ids},
+            )
+            await session.commit()
+    except Exception:
+        log.warning("staleness_flag_failed", trace_count=len(references), exc_info=True)
+
+
+async def refresh_trace_staleness(session: AsyncSession) -> dict:
+    """Re-check every library/library_version pair referenced by non-stale traces.
+
+    Pairs are checked STALENESS_BATCH_SIZE at a time, and each batch flags
+    its traces with one UPDATE and commits, so progress survives a failed
+    run. Only ever sets is_stale: the consolidation worker owns clearing it
+    (memory temperature).
+    """
+    rows = await session.execute(text(
+        "SELECT DISTINCT metadata_json->>'library' AS library, "
+        "metadata_json->>'library_version' AS version "
+        "FROM traces "
+        "WHERE NOT is_stale "
+        "AND metadata_json->>'library' IS NOT NULL "
+        "AND metadata_json->>'library_version' IS NOT NULL"
+    ))
+    references = [(row.library, row.version) for row in rows]
+
+    stale_pairs = flagged = 0
+    batch_size = max(1, settings.staleness_batch_size)
+    for start in range(0, len(references), batch_size):
+        stale = await _stale_references(references[start:start + batch_size])
+        if not stale:
+            continue
+        stale_pairs += len(stale)
+        result = await session.execute(
+            text(
+                "UPDATE traces SET is_stale = true "
+                "WHERE NOT is_stale "
+                "AND (metadata_json->>'library', metadata_json->>'library_version') IN ("
+                "SELECT * FROM unnest(CAST(:libraries AS text[]), CAST(:versions AS text[])))"
+            ),
+            {
+                "libraries": [library for library, _ in stale],
+                "versions": [version for _, version in stale],
+            },
+        )
+        flagged += result.rowcount
+        await session.commit()
 
-    return await check_library_staleness(library_name, str(library_version))
+    return {"pairs": len(references), "stale_pairs": stale_pairs, "flagged": flagged}
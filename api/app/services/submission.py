@@ -0,0 +1,88 @@
+"""CPU-bound preparation of trace and amendment submissions.
+
+Everything a submission needs before it touches the database — the
+PII/secrets scan, tag cleaning, metadata enrichment (language/framework
+detection), depth and impact scores, decay rate and context fingerprint —
+runs as one call on the CPU executor (app.services.cpu_executor) per
+submission, batch submissions included. The prepare_* functions are
+module-level and take and return plain picklable values, so the executor
+may be a process pool.
+"""
+
+from typing import NamedTuple, Optional
+
+from app.schemas.trace import TraceCreate
+from app.services.context import build_context_fingerprint
+from app.services.cpu_executor import run_cpu
+from app.services.decay import compute_half_life
+from app.services.enrichment import (
+    auto_enrich_metadata,
+    coerce_tokens_to_resolution,
+    compute_depth_score,
+    compute_impact_level,
+    compute_somatic_intensity,
+)
+from app.services.scanner import SecretDetectedError, scan_amendment_submission, scan_trace_submission
+from app.services.tags import clean_tags
+
+
+class PreparedTrace(NamedTuple):
+    """A scanned trace submission and the fields derived from it."""
+    tag_names: list[str]
+    fields: dict
+    rejection: Optional[str] = None  # set when the PII scan rejected the content
+
+
+def derive_trace_fields(body: TraceCreate) -> tuple[list[str], dict]:
+    """Valid normalized tag names, and the trace fields computed from the submission."""
+    # Enrich metadata with auto-detected language/framework, compute depth and decay rate
+    tag_names = clean_tags(body.tags)
+    base_meta = coerce_tokens_to_resolution(body.metadata_json, body.tokens_to_resolution)
+    enriched = auto_enrich_metadata(base_meta, body.solution_text)
+    return tag_names, {
+        "metadata_json": enriched,
+        "depth_score": compute_depth_score(enriched, body.solution_text),
+        "somatic_intensity": compute_somatic_intensity(enriched),
+        "impact_level": compute_impact_level(enriched, tag_names),
+        "half_life_days": compute_half_life(tag_names),
+        "context_fingerprint": build_context_fingerprint(enriched, tag_names),
+        "memory_temperature": "WARM",  # New traces start warm
+    }
+
+
+def prepare_trace(body: TraceCreate) -> PreparedTrace:
+    """Scan one trace submission and derive its fields (skipped when rejected)."""
+    try:
+        scan_trace_submission(body.title, body.context_text, body.solution_text)
+    except SecretDetectedError as e:
+        return PreparedTrace([], {}, f"Content rejected: {e}")
+    return PreparedTrace(*derive_trace_fields(body))
+
+
+def prepare_traces(bodies: list[TraceCreate]) -> list[PreparedTrace]:
+    """prepare_trace for each submission of a batch, in order."""
+    return [prepare_trace(body) for body in bodies]
+
+
+def prepare_amendment(improved_solution: str, explanation: str) -> Optional[str]:
+    """The rejection message for an amendment that fails the PII scan, else None."""
+    try:
+        scan_amendment_submission(improved_solution, explanation)
+    except SecretDetectedError as e:
+        return f"Content rejected: {e}"
+    return None
+
+
+async def prepare_trace_submission(body: TraceCreate) -> PreparedTrace:
+    """prepare_trace on the CPU executor. Raises CpuTaskTimeout."""
+    return await run_cpu("trace_submission", prepare_trace, body)
+
+
+async def prepare_trace_batch(bodies: list[TraceCreate]) -> list[PreparedTrace]:
+    """prepare_traces on the CPU executor, one call for the batch. Raises CpuTaskTimeout."""
+    return await run_cpu("trace_batch_submission", prepare_traces, bodies)
+
+
+async def prepare_amendment_submission(improved_solution: str, explanation: str) -> Optional[str]:
+    """prepare_amendment on the CPU executor. Raises CpuTaskTimeout."""
+    return await run_cpu("amendment_submission", prepare_amendment, improved_solution, explanation)
@@ -0,0 +1,211 @@
+"""In-process tag → trace bitsets for the search tag pre-filter.
+
+Hybrid search used to resolve "carries every one of these tags" with a
+JOIN over trace_tags/tags, GROUP BY and HAVING COUNT(DISTINCT) on every
+query. Here each tag instead holds a packed NumPy bitset over dense trace
+row numbers, so an AND filter is a handful of bitwise ANDs. The resulting
+candidate ids go to the vector search as `id = ANY(:ids)` (pgvector) or
+as a row mask (the in-process index).
+
+The index is rebuilt from trace_tags at startup and every
+TAG_INDEX_REFRESH_MINUTES (rebuild_tag_index), which also picks up tags
+written by other processes (seed import, pattern synthesis). Submissions
+and moderator deletes in this process update it immediately. A change
+that lands while a rebuild is reading is journaled and replayed onto the
+rebuilt index, so it is not lost.
+"""
+
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Optional
+
+import numpy as np
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory
+
+log = structlog.get_logger(__name__)
+
+# trace_tags rows per keyset page during a rebuild.
+_REBUILD_PAGE = 50_000
+
+
+class TagIndex:
+    """Packed bitset per tag over dense trace rows.
+
+    Row numbers are assigned on first sight and never reused; a trace
+    whose tags are cleared keeps its row with no bits set.
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self._ids: list[uuid.UUID] = []
+        self._rows: dict[uuid.UUID, int] = {}
+        self._row_tags: dict[int, tuple[str, ...]] = {}
+        self._bits: dict[str, np.ndarray] = {}
+        self._journal: Optional[list[tuple[uuid.UUID, tuple[str, ...]]]] = None
+
+    def __len__(self) -> int:
+        """Traces currently carrying at least one tag."""
+        return len(self._row_tags)
+
+    @property
+    def tag_count(self) -> int:
+        return len(self._bits)
+
+    @property
+    def rebuilding(self) -> bool:
+        return self._journal is not None
+
+    def _set_bit(self, tag: str, row: int) -> None:
+        bits = self._bits.get(tag)
+        needed = (row >> 3) + 1
+        if bits is None or len(bits) < needed:
+            grown = np.zeros(max(needed, 2 * len(bits) if bits is not None else needed), dtype=np.uint8)
+            if bits is not None:
+                grown[:len(bits)] = bits
+            self._bits[tag] = bits = grown
+        bits[row >> 3] |= np.uint8(1 << (row & 7))
+
+    def _clear_bit(self, tag: str, row: int) -> None:
+        bits = self._bits.get(tag)
+        if bits is not None and (row >> 3) < len(bits):
+            bits[row >> 3] &= np.uint8(~(1 << (row & 7)) & 0xFF)
+
+    def _apply(self, trace_id: uuid.UUID, tags: Iterable[str]) -> None:
+        tags = tuple(sorted(set(tags)))
+        row = self._rows.get(trace_id)
+        if row is None:
+            if not tags:
+                return
+            row = len(self._ids)
+            self._ids.append(trace_id)
+            self._rows[trace_id] = row
+        for tag in self._row_tags.pop(row, ()):
+            self._clear_bit(tag, row)
+        for tag in tags:
+            self._set_bit(tag, row)
+        if tags:
+            self._row_tags[row] = tags
+
+    def set_tags(self, trace_id: uuid.UUID, tags: Iterable[str]) -> None:
+        """Replace a trace's tag set (an empty set removes it)."""
+        tags = tuple(tags)
+        if self._journal is not None:
+            self._journal.append((trace_id, tags))
+        self._apply(trace_id, tags)
+
+    def remove(self, trace_id: uuid.UUID) -> None:
+        self.set_tags(trace_id, ())
+
+    def tag_names(self) -> list[str]:
+        return list(self._bits)
+
+    def count(self, tag: str) -> int:
+        bits = self._bits.get(tag)
+        return int(np.unpackbits(bits).sum()) if bits is not None else 0
+
+    def resolve(self, tags: Iterable[str]) -> list[uuid.UUID]:
+        """Ids of the traces carrying every tag in `tags` (AND)."""
+        bitsets = [self._bits.get(tag) for tag in set(tags)]
+        if not bitsets or any(bits is None for bits in bitsets):
+            return []
+        # Bitsets grow independently; bytes past the shortest are all zero
+        # in the intersection anyway.
+        length = min(len(bits) for bits in bitsets)
+        combined = bitsets[0][:length].copy()
+        for bits in bitsets[1:]:
+            np.bitwise_and(combined, bits[:length], out=combined)
+        rows = np.flatnonzero(np.unpackbits(combined, bitorder="little"))
+        ids = self._ids
+        return [ids[row] for row in rows]
+
+    def begin_rebuild(self) -> None:
+        self._journal = []
+
+    def abort_rebuild(self) -> None:
+        self._journal = None
+
+    def finish_rebuild(self, trace_tag_sets: dict[uuid.UUID, list[str]]) -> None:
+        """Swap in an index built from `trace_tag_sets`, then replay the
+        changes journaled since begin_rebuild."""
+        fresh = TagIndex()
+        for trace_id, tags in trace_tag_sets.items():
+            fresh._apply(trace_id, tags)
+        journal, self._journal = self._journal or [], None
+        self._ids, self._rows = fresh._ids, fresh._rows
+        self._row_tags, self._bits = fresh._row_tags, fresh._bits
+        for trace_id, tags in journal:
+            self._apply(trace_id, tags)
+        self.ready = True
+
+
+tag_index = TagIndex()
+
+
+def tag_candidates(tags: list[str]) -> Optional[list[uuid.UUID]]:
+    """Candidate trace ids for an AND-tag filter from the in-process index.
+
+    None when the index cannot answer (disabled or not loaded yet); the
+    caller then falls back to filtering in SQL.
+    """
+    if not settings.tag_index_enabled or not tag_index.ready:
+        return None
+    return tag_index.resolve(tags)
+
+
+def index_trace_tags(trace_id: uuid.UUID, tags: Iterable[str]) -> None:
+    """Record a just-committed trace's tags."""
+    tag_index.set_tags(trace_id, tags)
+
+
+def remove_trace_from_tag_index(trace_id: uuid.UUID) -> None:
+    """Drop a just-deleted trace from the tag index."""
+    tag_index.remove(trace_id)
+
+
+async def rebuild_tag_index(session: AsyncSession) -> dict:
+    """Scheduled job (and startup load): rebuild from trace_tags."""
+    if tag_index.rebuilding:
+        return {"tag_index_skipped": True}
+    tag_index.begin_rebuild()
+    try:
+        trace_tag_sets: dict[uuid.UUID, list[str]] = defaultdict(list)
+        params: dict = {"page": _REBUILD_PAGE}
+        keyset = ""
+        while True:
+            result = await session.execute(
+                text(
+                    "SELECT tt.trace_id, tt.tag_id, g.name "
+                    "FROM trace_tags tt JOIN tags g ON g.id = tt.tag_id "
+                    f"{keyset}"
+                    "ORDER BY tt.trace_id, tt.tag_id LIMIT :page"
+                ),
+                params,
+            )
+            rows = result.all()
+            for row in rows:
+                trace_tag_sets[row.trace_id].append(row.name)
+            if len(rows) < _REBUILD_PAGE:
+                break
+            keyset = "WHERE (tt.trace_id, tt.tag_id) > (:last_trace, :last_tag) "
+            params.update(last_trace=rows[-1].trace_id, last_tag=rows[-1].tag_id)
+    except BaseException:
+        tag_index.abort_rebuild()
+        raise
+    tag_index.finish_rebuild(trace_tag_sets)
+    return {"tag_index_traces": len(tag_index), "tag_index_tags": tag_index.tag_count}
+
+
+async def load_tag_index_in_background() -> None:
+    """Startup task: build the index without delaying app startup."""
+    try:
+        async with async_session_factory() as session:
+            result = await rebuild_tag_index(session)
+        log.info("tag_index_loaded", **result)
+    except Exception:
+        log.error("tag_index_load_failed", exc_info=True)
@@ -1,4 +1,13 @@
 import re
+import uuid
+from collections.abc import Iterable, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.tag import Tag, trace_tags
 
 
 def normalize_tag(raw: str) -> str:
@@ -29,3 +38,80 @@ def validate_tag(normalized: str) -> bool:
     if not normalized:
         return False
     return bool(_VALID_TAG_PATTERN.match(normalized))
+
+
+def clean_tags(raw_tags: Iterable[str]) -> list[str]:
+    """Normalize and validate submitted tags once: valid names, deduplicated, in order.
+
+    Invalid tags are dropped silently — schemas accept any string, but only
+    tags that pass normalization + validation are persisted.
+    """
+    names = (normalize_tag(raw) for raw in raw_tags)
+    return list(dict.fromkeys(name for name in names if validate_tag(name)))
+
+
+# Process-wide name -> id cache. Tags are never deleted or renamed, so an
+# entry stays valid once its row is committed; ids are only cached when
+# read back from another transaction's committed row (see resolve_tag_ids).
+_tag_ids: dict[str, uuid.UUID] = {}
+
+
+def _cache_tag_ids(ids: Mapping[str, uuid.UUID]) -> None:
+    if len(_tag_ids) + len(ids) > settings.tag_id_cache_entries:
+        _tag_ids.clear()
+    _tag_ids.update(ids)
+
+
+async def resolve_tag_ids(db: AsyncSession, names: Iterable[str]) -> dict[str, uuid.UUID]:
+    """Map clean tag names to Tag ids, creating the missing ones.
+
+    Cached names cost nothing; the rest take one INSERT ... ON CONFLICT DO
+    NOTHING RETURNING (the tags this call creates) and, for names that
+    already existed, one SELECT. Concurrent submits of the same new tag
+    cannot fail on the unique name: the loser's INSERT waits for the
+    winner and the SELECT, a new statement, then sees the committed row.
+
+    Tags created here belong to the caller's transaction and may yet roll
+    back, so they are remembered on the session (db.info) and only cached
+    once a later resolution reads them from a committed row.
+    """
+    names = list(dict.fromkeys(names))
+    ids = {name: _tag_ids[name] for name in names if name in _tag_ids}
+    missing = [name for name in names if name not in ids]
+    if not missing:
+        return ids
+
+    created: set[str] = db.info.setdefault("created_tags", set())
+    rows = await db.execute(
+        pg_insert(Tag)
+        .values([{"name": name} for name in missing])
+        .on_conflict_do_nothing(index_elements=[Tag.name])
+        .returning(Tag.id, Tag.name)
+    )
+    for row in rows:
+        ids[row.name] = row.id
+        created.add(row.name)
+
+    existing = [name for name in missing if name not in ids]
+    if existing:
+        rows = await db.execute(select(Tag.id, Tag.name).where(Tag.name.in_(existing)))
+        found = {row.name: row.id for row in rows}
+        ids.update(found)
+        _cache_tag_ids({name: tag_id for name, tag_id in found.items() if name not in created})
+    return ids
+
+
+async def link_trace_tags(db: AsyncSession, rows: list[dict]) -> None:
+    """Insert trace_tags rows ({"trace_id", "tag_id"}) in one multi-row statement."""
+    if rows:
+        await db.execute(pg_insert(trace_tags).values(rows).on_conflict_do_nothing())
+
+
+async def tag_traces(db: AsyncSession, tags_by_trace: Mapping[uuid.UUID, list[str]]) -> None:
+    """Resolve every clean tag name of every trace and link them all at once."""
+    tag_ids = await resolve_tag_ids(db, (name for names in tags_by_trace.values() for name in names))
+    await link_trace_tags(db, [
+        {"trace_id": trace_id, "tag_id": tag_ids[name]}
+        for trace_id, names in tags_by_trace.items()
+        for name in names
+    ])
@@ -0,0 +1,163 @@
+"""Embedding a trace's vectors: the texts each vector column is built from,
+and embed_traces, which fills in whatever a trace is missing.
+
+Shared by the embedding worker (claimed batches), pattern synthesis (fresh
+traces made searchable in the same cycle) and re-embedding migrations
+(embedding_inputs for the shadow columns).
+"""
+
+import time
+import uuid
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+import structlog
+from sqlalchemy import event, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.metrics import embeddings_processed, embedding_duration
+from app.models.trace import Trace
+from app.services.context import build_context_string
+from app.services.embedding import EmbeddingService, EmbeddingSkippedError
+from app.services.embedding_cache import embed_cached_each
+from app.services.vector_search import index_trace_embedding
+
+log = structlog.get_logger(__name__)
+
+
+class IndexUpdate(NamedTuple):
+    """A stored content vector, for the in-process index once it is committed."""
+    trace_id: uuid.UUID
+    vector: list[float]
+    model_id: str
+    flagged: bool
+    valid_until: Optional[datetime]
+
+
+class EmbeddedTraces(NamedTuple):
+    processed: int
+    index_updates: list[IndexUpdate]
+
+
+def apply_index_updates(updates: list[IndexUpdate]) -> None:
+    """Apply committed vectors to the memory index (no-op when it is not in use)."""
+    for u in updates:
+        index_trace_embedding(u.trace_id, u.vector, u.model_id, flagged=u.flagged, valid_until=u.valid_until)
+
+
+def index_after_commit(db: AsyncSession, updates: list[IndexUpdate]) -> None:
+    """Apply `updates` when the caller's transaction commits; drop them on rollback."""
+    if not updates:
+        return
+    pending = list(updates)
+
+    def _committed(session) -> None:
+        apply_index_updates(pending)
+        pending.clear()
+
+    def _rolled_back(session, previous_transaction) -> None:
+        pending.clear()
+
+    event.listen(db.sync_session, "after_commit", _committed, once=True)
+    event.listen(db.sync_session, "after_soft_rollback", _rolled_back, once=True)
+
+
+def embedding_inputs(trace) -> dict[str, str]:
+    """Vector column -> the text it is embedded from, for one trace.
+
+    The context vector needs a fingerprint; solutions under 20 characters
+    are not embedded.
+    """
+    inputs = {"embedding": f"{trace.title}\n{trace.context_text}\n{trace.solution_text}"}
+    if trace.context_fingerprint:
+        inputs["context_embedding"] = build_context_string(trace.context_fingerprint)
+    if len(trace.solution_text) >= 20:
+        inputs["solution_embedding"] = trace.solution_text
+    return inputs
+
+
+async def embed_traces(db: AsyncSession, svc: EmbeddingService, traces) -> EmbeddedTraces:
+    """Embed the given traces' missing content/context/solution vectors.
+
+    Issues the UPDATEs on `db` but does not commit — the caller owns the
+    transaction, and applies the returned index updates once it commits
+    (apply_index_updates / index_after_commit), so the memory index never
+    serves a vector that was rolled back. Used by process_batch for claimed
+    rows, and by pattern synthesis to make freshly generated traces
+    searchable in the same cycle.
+
+    Every text the batch needs is resolved in one embed_cached call, so
+    repeated texts (shared context strings, duplicate solutions) come from
+    the embedding cache and only new ones reach the backend, batched. If
+    that call fails, the texts are retried one by one (embed_cached_each):
+    a column that still fails is logged and left NULL for the next cycle,
+    and the trace's other columns and the other traces are stored.
+
+    Returns:
+        Number of traces updated, and their memory-index updates.
+    """
+    # Per trace: the columns it is missing, and the text each is embedded from.
+    wanted: list[tuple] = []
+    for trace in traces:
+        fields = {
+            column: text
+            for column, text in embedding_inputs(trace).items()
+            if getattr(trace, column) is None
+        }
+        if fields:
+            wanted.append((trace, fields))
+    if not wanted:
+        return EmbeddedTraces(0, [])
+
+    texts = [text for _, fields in wanted for text in fields.values()]
+    start = time.monotonic()
+    try:
+        embedded = iter(await embed_cached_each(svc, texts, db))
+    except EmbeddingSkippedError:
+        log.warning(
+            "embedding_skipped_no_api_key",
+            message="Embedding backend not configured — skipping entire batch.",
+        )
+        embeddings_processed.labels(model="none", status="skipped").inc()
+        return EmbeddedTraces(0, [])
+    embedding_duration.labels(model=svc.model_id).observe(time.monotonic() - start)
+
+    processed = 0
+    index_updates: list[IndexUpdate] = []
+    for trace, fields in wanted:
+        values: dict = {}
+        failed: list[str] = []
+        for column in fields:
+            result = next(embedded)
+            if result is None:
+                failed.append(column)
+                continue
+            vector, model_id, model_version = result
+            values[column] = vector
+            if column == "embedding":
+                values["embedding_model_id"] = model_id
+                values["embedding_model_version"] = model_version
+        if failed:
+            log.error("embedding_error", trace_id=str(trace.id), columns=failed)
+            embeddings_processed.labels(model=svc.model_id, status="error").inc()
+        if not values:
+            continue
+        values["embedded_at"] = func.now()
+
+        update_stmt = (
+            update(Trace)
+            .where(Trace.id == trace.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(update_stmt)
+        embeddings_processed.labels(model=svc.model_id, status="success").inc()
+        if "embedding" in values:
+            index_updates.append(IndexUpdate(
+                trace.id, values["embedding"], values["embedding_model_id"],
+                trace.is_flagged, trace.valid_until,
+            ))
+        log.info("embedding_stored", trace_id=str(trace.id), columns=sorted(c for c in fields if c in values))
+        processed += 1
+
+    return EmbeddedTraces(processed, index_updates)
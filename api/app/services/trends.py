@@ -3,6 +3,9 @@
 Compares trace counts per tag over rolling 7-day windows to detect
 emerging topics (Principle 10 — Stigmergy). Tags with growth_rate > 2.0
 and at least 3 traces in the current period are marked as trending.
+
+Optionally (TAG_TRENDS_HOURLY_ENABLED) maintains an hourly per-tag rollup,
+so fresher hourly windows can be served straight from tag_activity_hourly.
 """
 
 from datetime import datetime, timedelta, timezone
@@ -11,6 +14,8 @@ import structlog
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+
 log = structlog.get_logger(__name__)
 
 # Minimum traces in current period to qualify as trending
@@ -22,90 +27,169 @@ MIN_GROWTH_RATE = 2.0
 async def detect_tag_trends(session: AsyncSession) -> int:
     """Compute tag trends by comparing last 7 days vs prior 7 days.
 
-    Upserts into tag_trends table. Returns count of trending tags detected.
+    Counts both windows in one pass and upserts every tag_trends row in the
+    same INSERT ... SELECT ... ON CONFLICT statement.
+    Returns count of trending tags detected.
     """
     now = datetime.now(timezone.utc)
     period_end = now
     period_start = now - timedelta(days=7)
     prior_start = period_start - timedelta(days=7)
 
-    # Count traces per tag in current period and prior period
     result = await session.execute(
         text(
             """
-            WITH current_period AS (
-                SELECT tg.name AS tag_name, COUNT(DISTINCT t.id) AS cnt
+            WITH counts AS (
+                SELECT
+                    tg.name AS tag_name,
+                    COUNT(DISTINCT t.id) FILTER (WHERE t.created_at >= :period_start) AS count_current,
+                    COUNT(DISTINCT t.id) FILTER (WHERE t.created_at < :period_start) AS count_prior
                 FROM tags tg
                 JOIN trace_tags tt ON tt.tag_id = tg.id
                 JOIN traces t ON t.id = tt.trace_id
-                WHERE t.created_at >= :period_start AND t.created_at < :period_end
+                WHERE t.created_at >= :prior_start AND t.created_at < :period_end
                 GROUP BY tg.name
             ),
-            prior_period AS (
-                SELECT tg.name AS tag_name, COUNT(DISTINCT t.id) AS cnt
-                FROM tags tg
-                JOIN trace_tags tt ON tt.tag_id = tg.id
-                JOIN traces t ON t.id = tt.trace_id
-                WHERE t.created_at >= :prior_start AND t.created_at < :period_start
-                GROUP BY tg.name
+            scored AS (
+                SELECT
+                    tag_name,
+                    count_current,
+                    count_prior,
+                    count_current::float / GREATEST(count_prior, 1) AS growth_rate
+                FROM counts
+            ),
+            upserted AS (
+                INSERT INTO tag_trends (id, tag_name, period_start, period_end,
+                    trace_count_period, trace_count_prior, growth_rate, is_trending)
+                SELECT gen_random_uuid(), tag_name, :period_start, :period_end,
+                    count_current, count_prior, growth_rate,
+                    growth_rate > :min_growth AND count_current >= :min_count
+                FROM scored
+                ON CONFLICT (tag_name, period_end)
+                DO UPDATE SET
+                    trace_count_period = EXCLUDED.trace_count_period,
+                    trace_count_prior = EXCLUDED.trace_count_prior,
+                    growth_rate = EXCLUDED.growth_rate,
+                    is_trending = EXCLUDED.is_trending
+                RETURNING is_trending
             )
             SELECT
-                COALESCE(c.tag_name, p.tag_name) AS tag_name,
-                COALESCE(c.cnt, 0) AS count_current,
-                COALESCE(p.cnt, 0) AS count_prior
-            FROM current_period c
-            FULL OUTER JOIN prior_period p ON c.tag_name = p.tag_name
-            WHERE COALESCE(c.cnt, 0) > 0 OR COALESCE(p.cnt, 0) > 0
+                COUNT(*) AS tags_evaluated,
+                COUNT(*) FILTER (WHERE is_trending) AS trending_count
+            FROM upserted
             """
         ),
         {
             "period_start": period_start,
             "period_end": period_end,
             "prior_start": prior_start,
+            "min_growth": MIN_GROWTH_RATE,
+            "min_count": MIN_TRENDING_COUNT,
         },
     )
-    rows = result.all()
+    row = result.one()
 
-    trending_count = 0
-    for row in rows:
-        tag_name = row.tag_name
-        count_current = row.count_current
-        count_prior = row.count_prior
+    if row.trending_count > 0:
+        log.info(
+            "tag_trends_detected",
+            trending_count=row.trending_count,
+            tags_evaluated=row.tags_evaluated,
+        )
 
-        growth_rate = count_current / max(count_prior, 1)
-        is_trending = growth_rate > MIN_GROWTH_RATE and count_current >= MIN_TRENDING_COUNT
+    return row.trending_count
 
-        if is_trending:
-            trending_count += 1
 
-        # Upsert into tag_trends
-        await session.execute(
-            text(
-                """
-                INSERT INTO tag_trends (id, tag_name, period_start, period_end,
-                    trace_count_period, trace_count_prior, growth_rate, is_trending)
-                VALUES (gen_random_uuid(), :tag_name, :period_start, :period_end,
-                    :count_current, :count_prior, :growth_rate, :is_trending)
-                ON CONFLICT (tag_name, period_end)
-                DO UPDATE SET
-                    trace_count_period = :count_current,
-                    trace_count_prior = :count_prior,
-                    growth_rate = :growth_rate,
-                    is_trending = :is_trending
-                """
-            ),
-            {
-                "tag_name": tag_name,
-                "period_start": period_start,
-                "period_end": period_end,
-                "count_current": count_current,
-                "count_prior": count_prior,
-                "growth_rate": growth_rate,
-                "is_trending": is_trending,
-            },
-        )
+async def refresh_tag_activity_rollup(session: AsyncSession) -> int:
+    """Incrementally refresh the hourly per-tag rollup.
+
+    Recomputes buckets from the newest stored bucket onward (it may have been
+    partial at the last refresh) and drops buckets older than two windows.
+    On first run it backfills two windows. Returns rows upserted.
+    """
+    retention_hours = 2 * settings.tag_trends_hourly_window_hours
+    result = await session.execute(
+        text(
+            """
+            WITH since AS (
+                SELECT COALESCE(
+                    MAX(bucket_start),
+                    date_trunc('hour', now()) - make_interval(hours => :retention_hours)
+                ) AS ts
+                FROM tag_activity_hourly
+            )
+            INSERT INTO tag_activity_hourly (tag_name, bucket_start, trace_count)
+            SELECT tg.name, date_trunc('hour', t.created_at), COUNT(DISTINCT t.id)
+            FROM traces t
+            JOIN trace_tags tt ON tt.trace_id = t.id
+            JOIN tags tg ON tg.id = tt.tag_id
+            WHERE t.created_at >= (SELECT ts FROM since)
+            GROUP BY tg.name, date_trunc('hour', t.created_at)
+            ON CONFLICT (tag_name, bucket_start)
+            DO UPDATE SET trace_count = EXCLUDED.trace_count
+            """
+        ),
+        {"retention_hours": retention_hours},
+    )
+    upserted = result.rowcount
+    await session.execute(
+        text(
+            "DELETE FROM tag_activity_hourly "
+            "WHERE bucket_start < date_trunc('hour', now()) - make_interval(hours => :retention_hours)"
+        ),
+        {"retention_hours": retention_hours},
+    )
+    return upserted
+
+
+async def hourly_tag_trends(session: AsyncSession, limit: int = 10) -> list[dict]:
+    """Trending tags over the last N hours vs the N hours before, from the rollup.
 
-    if trending_count > 0:
-        log.info("tag_trends_detected", trending_count=trending_count, tags_evaluated=len(rows))
+    Same thresholds as the weekly detection (growth > 2.0, >= 3 traces).
+    """
+    window = settings.tag_trends_hourly_window_hours
+    now = datetime.now(timezone.utc)
+    current_start = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=window - 1)
+    prior_start = current_start - timedelta(hours=window)
 
-    return trending_count
+    result = await session.execute(
+        text(
+            """
+            WITH counts AS (
+                SELECT
+                    tag_name,
+                    COALESCE(SUM(trace_count) FILTER (WHERE bucket_start >= :current_start), 0) AS count_current,
+                    COALESCE(SUM(trace_count) FILTER (WHERE bucket_start < :current_start), 0) AS count_prior
+                FROM tag_activity_hourly
+                WHERE bucket_start >= :prior_start
+                GROUP BY tag_name
+            )
+            SELECT
+                tag_name,
+                count_current,
+                count_prior,
+                count_current::float / GREATEST(count_prior, 1) AS growth_rate
+            FROM counts
+            WHERE count_current >= :min_count
+                AND count_current::float / GREATEST(count_prior, 1) > :min_growth
+            ORDER BY growth_rate DESC, count_current DESC
+            LIMIT :limit
+            """
+        ),
+        {
+            "current_start": current_start,
+            "prior_start": prior_start,
+            "min_count": MIN_TRENDING_COUNT,
+            "min_growth": MIN_GROWTH_RATE,
+            "limit": limit,
+        },
+    )
+    return [
+        {
+            "tag": row.tag_name,
+            "growth_rate": row.growth_rate,
+            "trace_count": int(row.count_current),
+            "prior_count": int(row.count_prior),
+            "period_end": now.isoformat(),
+        }
+        for row in result.all()
+    ]
@@ -0,0 +1,752 @@
+"""Pluggable vector-search engines behind POST /api/v1/traces/search.
+
+The semantic path of search_traces asks a backend for the nearest traces to
+the query vector and gets back hydrated (Trace, cosine distance) hits:
+
+  * "pgvector" (default) — one HNSW-ordered query in Postgres with the
+    tag / flag / expiry pre-filters and an ef_search planned per query
+    (limit, tag selectivity, observed yield; see PgvectorBackend).
+    With VECTOR_QUANTIZATION set it instead shortlists limit ×
+    VECTOR_RESCORE_FACTOR candidates from a compact halfvec or binary
+    index (migration 0031) and re-ranks them by exact cosine distance.
+  * "memory" — an in-process NumPy index over every trace's `embedding`,
+    loaded in the background at startup. The kNN is an exact matrix-vector
+    product over unit vectors (brute force is fast enough for the
+    corpus sizes this runs at: ~6 KB of RAM and ~1.5 MFLOP per trace);
+    flagged and expired traces are masked with boolean/timestamp arrays,
+    and Postgres is only asked to hydrate the top-k rows by primary key.
+
+multi_vector_search (mode="multi_vector") runs the content, solution and
+context legs as one UNION ALL statement against pgvector and fuses their
+rankings with reciprocal rank fusion.
+
+The memory index is kept current three ways: the in-process embedding
+worker upserts each new vector once it is committed
+(index_trace_embedding), moderation drops flagged/removed traces
+immediately, and a scheduled resync
+(sync_vector_index) applies every trace updated since the previous sync —
+which also covers traces embedded or flagged by other processes. Tag
+filters are resolved by the in-process tag index (app.services.tag_index)
+into a row mask. Until the vector index is loaded (and, for tag-filtered
+queries, the tag index) the memory backend defers to pgvector. Hydration re-checks is_flagged / valid_until, so a stale index can
+cost recall for a few minutes but never returns a hidden trace.
+"""
+
+import asyncio
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+import numpy as np
+import structlog
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import any_, bindparam, func, or_, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.database import async_session_factory
+from app.metrics import (
+    search_candidate_shortfall,
+    search_candidate_yield,
+    search_ef_search,
+    search_iterative_scans,
+)
+from app.models.tag import Tag, trace_tags
+from app.models.trace import Trace
+from app.services.embedding import OPENAI_DIMENSIONS, active_embedding_model
+from app.services.knn import parse_vector
+from app.services.tag_index import tag_candidates
+
+log = structlog.get_logger(__name__)
+
+# Rows per keyset page when loading / resyncing the memory index.
+_LOAD_PAGE = 5000
+# Resync window overlap — re-applying a row is idempotent, missing one is not.
+_SYNC_OVERLAP = timedelta(minutes=1)
+# hnsw.ef_search bounds: pgvector's default, and the most it accepts.
+_MIN_EF_SEARCH = 40
+_MAX_EF_SEARCH = 1000
+
+# VECTOR_QUANTIZATION mode -> ORDER BY expression matching its expression
+# index in migration 0031 (the planner only uses the index on an exact match).
+_QUANTIZED_ORDER_BY = {
+    "halfvec": (
+        f"CAST(t.embedding AS halfvec({OPENAI_DIMENSIONS})) "
+        f"<=> CAST(:query AS halfvec({OPENAI_DIMENSIONS}))"
+    ),
+    "binary": (
+        f"CAST(binary_quantize(t.embedding) AS bit({OPENAI_DIMENSIONS})) "
+        f"<~> binary_quantize(CAST(:query AS vector({OPENAI_DIMENSIONS})))"
+    ),
+}
+
+
+class SearchHit(NamedTuple):
+    trace: Trace
+    distance: float
+    # Normalised reciprocal-rank-fusion score (0-1] for multi-vector hits;
+    # None for single-vector hits, which rank on 1 - distance.
+    fused: Optional[float] = None
+
+
+class VectorSearchBackend(ABC):
+    """Nearest-trace lookup for the semantic search path."""
+
+    name = "base"
+
+    @abstractmethod
+    async def search(
+        self,
+        db: AsyncSession,
+        query_vector: list[float],
+        *,
+        limit: int,
+        tags: list[str],
+        include_expired: bool,
+        now: datetime,
+    ) -> list[SearchHit]:
+        """Up to `limit` non-flagged traces nearest the query, nearest first.
+
+        Only traces carrying every tag in `tags` qualify; expired traces
+        (valid_until < now) are excluded unless include_expired.
+        """
+
+
+async def hydrate_hits(
+    db: AsyncSession,
+    nearest: list[tuple[uuid.UUID, float]],
+    *,
+    include_expired: bool,
+    now: datetime,
+) -> list[SearchHit]:
+    """Load the traces for (id, distance) pairs, keeping their order.
+
+    Re-checks flag and expiry, so ids from a stale or approximate source
+    never surface a hidden trace.
+    """
+    if not nearest:
+        return []
+    stmt = (
+        select(Trace)
+        .where(Trace.id.in_([trace_id for trace_id, _ in nearest]))
+        .where(Trace.is_flagged.is_(False))
+        .options(selectinload(Trace.tags))
+    )
+    if not include_expired:
+        stmt = stmt.where(or_(Trace.valid_until.is_(None), Trace.valid_until >= now))
+    result = await db.execute(stmt)
+    traces = {trace.id: trace for trace in result.scalars().all()}
+    return [
+        SearchHit(traces[trace_id], distance)
+        for trace_id, distance in nearest
+        if trace_id in traces
+    ]
+
+
+class _YieldTracker:
+    """EWMA of rows returned / rows expected for recent HNSW probes.
+
+    HNSW applies WHERE clauses after the graph walk, so a probe visiting
+    ef_search rows can come back short. The observed ratio, kept per query
+    shape, feeds back into the next probe's ef_search.
+    """
+
+    def __init__(self, alpha: float = 0.2, floor: float = 0.05) -> None:
+        self.alpha = alpha
+        self.floor = floor
+        self._values: dict[str, float] = {}
+
+    def get(self, key: str) -> float:
+        return self._values.get(key, 1.0)
+
+    def observe(self, key: str, returned: int, expected: int) -> None:
+        if expected <= 0:
+            return
+        ratio = min(returned / expected, 1.0)
+        value = (1 - self.alpha) * self.get(key) + self.alpha * ratio
+        self._values[key] = max(value, self.floor)
+
+
+_observed_yield = _YieldTracker()
+
+# Eligible-row counts per tag set: tuple(sorted tags) -> (expires_at, count).
+# () is the unfiltered count.
+_eligible_counts: dict[tuple[str, ...], tuple[float, int]] = {}
+_ELIGIBLE_CACHE_MAX = 1024
+
+# Traces carrying every tag in :tags (same semantics as the tag pre-filter).
+_TAGGED_SQL = (
+    "SELECT tt.trace_id FROM trace_tags tt JOIN tags g ON g.id = tt.tag_id "
+    "WHERE g.name = ANY(:tags) GROUP BY tt.trace_id "
+    "HAVING COUNT(DISTINCT g.id) = :tag_count"
+)
+
+
+def candidate_limit(limit: int) -> int:
+    """ANN candidates to fetch so re-ranking can pick the best `limit`."""
+    ceiling = max(settings.search_max_candidates, limit)
+    return min(max(limit * settings.search_overfetch_factor, limit), ceiling)
+
+
+def plan_ef_search(candidates: int, selectivity: float, observed_yield: float = 1.0) -> int:
+    """hnsw.ef_search for a probe that should produce `candidates` rows.
+
+    A probe visiting ef rows yields about ef × selectivity rows that pass
+    the filters; observed_yield corrects the estimate by how short recent
+    probes of the same shape actually came back.
+    """
+    effective = max(selectivity * observed_yield, 1e-6)
+    ef_search = max(math.ceil(candidates / effective), candidates, _MIN_EF_SEARCH)
+    return min(ef_search, _MAX_EF_SEARCH)
+
+
+async def _eligible_count(
+    db: AsyncSession,
+    tags: list[str],
+    candidate_ids: Optional[list[uuid.UUID]] = None,
+) -> int:
+    """Embedded, unflagged traces carrying every tag (cached briefly).
+
+    candidate_ids, when the tag index resolved the filter, replaces the
+    tag join with a primary-key lookup.
+    """
+    key = tuple(sorted(tags))
+    cached = _eligible_counts.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    sql = (
+        "SELECT COUNT(*) FROM traces t WHERE t.embedding IS NOT NULL "
+        "AND t.embedding_model_id = :model AND t.is_flagged = false"
+    )
+    params: dict = {"model": active_embedding_model()}
+    if candidate_ids is not None:
+        sql += " AND t.id = ANY(:ids)"
+        params["ids"] = candidate_ids
+    elif tags:
+        sql += f" AND t.id IN ({_TAGGED_SQL})"
+        params.update(tags=list(key), tag_count=len(key))
+    count = int((await db.execute(text(sql), params)).scalar() or 0)
+
+    if len(_eligible_counts) >= _ELIGIBLE_CACHE_MAX:
+        _eligible_counts.clear()
+    _eligible_counts[key] = (time.monotonic() + settings.search_selectivity_cache_seconds, count)
+    return count
+
+
+def tag_filter_ids(tags: list[str]) -> Optional[list[uuid.UUID]]:
+    """Candidate ids for a tag filter, or None to filter in SQL instead.
+
+    [] means no trace carries every tag, so there is nothing to search.
+    """
+    if not tags:
+        return None
+    candidate_ids = tag_candidates(tags)
+    if candidate_ids is not None and len(candidate_ids) > settings.tag_index_max_candidates:
+        # A huge ANY() array costs more than the semi-join.
+        return None
+    return candidate_ids
+
+
+def sql_filters(
+    tags: list[str],
+    candidate_ids: Optional[list[uuid.UUID]],
+    *,
+    include_expired: bool,
+    now: datetime,
+) -> tuple[list[str], dict]:
+    """WHERE clauses (on alias t) and params shared by the raw-SQL probes.
+
+    Visibility and tags only; the vector probes add their own embedding
+    model filter, the lexical leg needs none.
+    """
+    filters = ["t.is_flagged = false"]
+    params: dict = {}
+    if not include_expired:
+        filters.append("(t.valid_until IS NULL OR t.valid_until >= :now)")
+        params["now"] = now
+    if candidate_ids is not None:
+        filters.append("t.id = ANY(:ids)")
+        params["ids"] = candidate_ids
+    elif tags:
+        filters.append(f"t.id IN ({_TAGGED_SQL})")
+        params["tags"] = list(tags)
+        params["tag_count"] = len(tags)
+    return filters, params
+
+
+class PgvectorBackend(VectorSearchBackend):
+    """HNSW search in Postgres with a per-query ef_search.
+
+    Tag filters resolve through the in-process tag index to an
+    `id = ANY(:ids)` filter when it is loaded and the match set is at most
+    TAG_INDEX_MAX_CANDIDATES ids; broader filters and an unloaded index use
+    the SQL semi-join. ef_search is planned from the candidate count, the
+    tag filter's selectivity (eligible rows / all embedded rows) and the
+    observed yield of recent probes. A tag-filtered probe that still returns fewer rows
+    than are eligible is retried once with pgvector's iterative index scan
+    (hnsw.iterative_scan = strict_order), which keeps walking the graph
+    until the LIMIT is met.
+    """
+
+    name = "pgvector"
+
+    def __init__(
+        self,
+        quantization: Optional[str] = None,
+        rescore_factor: Optional[int] = None,
+    ) -> None:
+        # None = follow settings at query time (the benchmark pins both).
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+
+    async def search(self, db, query_vector, *, limit, tags, include_expired, now):
+        quantization = self.quantization or settings.vector_quantization
+        if quantization in _QUANTIZED_ORDER_BY:
+            factor = self.rescore_factor or settings.vector_rescore_factor
+            probe_rows = max(limit, limit * factor)
+        else:
+            probe_rows = limit
+
+        candidate_ids = tag_filter_ids(tags)
+        if candidate_ids == []:
+            return []
+
+        shape = "filtered" if tags else "unfiltered"
+        total = await _eligible_count(db, [])
+        eligible = await _eligible_count(db, tags, candidate_ids) if tags else total
+        selectivity = eligible / total if total else 1.0
+        ef_search = plan_ef_search(probe_rows, selectivity, _observed_yield.get(shape))
+        search_ef_search.labels(filtered=str(bool(tags)).lower()).observe(ef_search)
+        await db.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+
+        async def probe() -> list[SearchHit]:
+            if quantization in _QUANTIZED_ORDER_BY:
+                return await self._search_quantized(
+                    db, query_vector, quantization, probe_rows,
+                    limit=limit, tags=tags, candidate_ids=candidate_ids,
+                    include_expired=include_expired, now=now,
+                )
+            return await self._search_exact(
+                db, query_vector, limit=limit, tags=tags, candidate_ids=candidate_ids,
+                include_expired=include_expired, now=now,
+            )
+
+        hits = await probe()
+        expected = min(limit, eligible)
+        _observed_yield.observe(shape, len(hits), expected)
+        if expected:
+            search_candidate_yield.labels(filtered=str(bool(tags)).lower()).observe(
+                min(len(hits) / expected, 1.0)
+            )
+        if len(hits) >= expected:
+            return hits
+
+        search_candidate_shortfall.labels(filtered=str(bool(tags)).lower()).inc()
+        log.info(
+            "vector_search_shortfall",
+            returned=len(hits), expected=expected, ef_search=ef_search, tags=tags,
+        )
+        if not tags or not settings.search_iterative_scan:
+            return hits
+        # Expired traces are counted as eligible, so a shortfall can be
+        # legitimate; the retry costs one more probe in that case.
+        await db.execute(text("SET LOCAL hnsw.iterative_scan = strict_order"))
+        search_iterative_scans.inc()
+        return await probe()
+
+    async def _search_exact(
+        self, db, query_vector, *, limit, tags, candidate_ids, include_expired, now
+    ) -> list[SearchHit]:
+        """Order by full-precision distance on the float32 HNSW index."""
+        distance_col = Trace.embedding.cosine_distance(query_vector).label("distance")
+
+        stmt = (
+            select(Trace, distance_col)
+            .where(Trace.embedding.is_not(None))
+            .where(Trace.embedding_model_id == active_embedding_model())
+            .where(Trace.is_flagged.is_(False))
+            .options(selectinload(Trace.tags))
+            .order_by(distance_col)
+            .limit(limit)
+        )
+        if not include_expired:
+            stmt = stmt.where(or_(Trace.valid_until.is_(None), Trace.valid_until >= now))
+        if candidate_ids is not None:
+            stmt = stmt.where(
+                Trace.id == any_(bindparam("ids", candidate_ids, type_=ARRAY(UUID(as_uuid=True))))
+            )
+        elif tags:
+            # A semi-join rather than JOIN ... GROUP BY, so the planner can
+            # still walk the HNSW index and filter as it goes.
+            tagged = (
+                select(trace_tags.c.trace_id)
+                .join(Tag, Tag.id == trace_tags.c.tag_id)
+                .where(Tag.name.in_(tags))
+                .group_by(trace_tags.c.trace_id)
+                .having(func.count(func.distinct(Tag.id)) == len(tags))
+            )
+            stmt = stmt.where(Trace.id.in_(tagged))
+
+        result = await db.execute(stmt)
+        return [SearchHit(row.Trace, float(row.distance)) for row in result.all()]
+
+    async def _search_quantized(
+        self, db, query_vector, quantization, candidates, *,
+        limit, tags, candidate_ids, include_expired, now,
+    ) -> list[SearchHit]:
+        """Shortlist from the compact index, re-rank by exact cosine distance."""
+        filters, params = sql_filters(
+            tags, candidate_ids, include_expired=include_expired, now=now,
+        )
+        filters[:0] = ["t.embedding IS NOT NULL", "t.embedding_model_id = :model"]
+        params.update(model=active_embedding_model(), query=query_vector, candidates=candidates, limit=limit)
+
+        stmt = text(
+            f"""
+            SELECT c.id, c.embedding <=> CAST(:query AS vector({OPENAI_DIMENSIONS})) AS distance
+            FROM (
+                SELECT t.id, t.embedding
+                FROM traces t
+                WHERE {" AND ".join(filters)}
+                ORDER BY {_QUANTIZED_ORDER_BY[quantization]}
+                LIMIT :candidates
+            ) c
+            ORDER BY distance
+            LIMIT :limit
+            """
+        ).bindparams(bindparam("query", type_=Vector(OPENAI_DIMENSIONS)))
+
+        result = await db.execute(stmt, params)
+        nearest = [(row.id, float(row.distance)) for row in result.all()]
+        return await hydrate_hits(db, nearest, include_expired=include_expired, now=now)
+
+
+def reciprocal_rank_fusion(
+    rankings: dict[str, list[uuid.UUID]], k: int = 60
+) -> list[tuple[uuid.UUID, float]]:
+    """Fuse ranked id lists: score(d) = Σ 1 / (k + rank), rank from 1.
+
+    Scores are divided by the best possible score (first in every list),
+    so they fall in (0, 1]. Returns (id, score) best first.
+    """
+    scores: dict[uuid.UUID, float] = {}
+    for ranked in rankings.values():
+        for rank, trace_id in enumerate(ranked, start=1):
+            scores[trace_id] = scores.get(trace_id, 0.0) + 1.0 / (k + rank)
+    best = len(rankings) / (k + 1)
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [(trace_id, score / best) for trace_id, score in fused]
+
+
+async def multi_vector_search(
+    db: AsyncSession,
+    query_vector: list[float],
+    context_vector: Optional[list[float]],
+    *,
+    limit: int,
+    tags: list[str],
+    include_expired: bool,
+    now: datetime,
+) -> list[SearchHit]:
+    """Content, solution and (optionally) context kNN fused by RRF.
+
+    The query vector probes `embedding` (limit rows) and
+    `solution_embedding` (SEARCH_MULTI_VECTOR_LEG_LIMIT rows); the context
+    vector, when given, probes `context_embedding`. All legs run as one
+    UNION ALL statement, one round trip with every leg on its own HNSW
+    index. Hits carry their smallest leg distance and the fused score.
+    """
+    candidate_ids = tag_filter_ids(tags)
+    if candidate_ids == []:
+        return []
+
+    leg_limit = min(settings.search_multi_vector_leg_limit, limit)
+    legs = [("content", "embedding", "query", limit), ("solution", "solution_embedding", "query", leg_limit)]
+    if context_vector is not None:
+        legs.append(("context", "context_embedding", "context", leg_limit))
+
+    total = await _eligible_count(db, [])
+    eligible = await _eligible_count(db, tags, candidate_ids) if tags else total
+    selectivity = eligible / total if total else 1.0
+    await db.execute(text(f"SET LOCAL hnsw.ef_search = {plan_ef_search(limit, selectivity)}"))
+    if tags and settings.search_iterative_scan:
+        # No second round trip on a shortfall here: let each filtered leg
+        # keep walking its graph until its LIMIT is met.
+        await db.execute(text("SET LOCAL hnsw.iterative_scan = strict_order"))
+
+    filters, params = sql_filters(tags, candidate_ids, include_expired=include_expired, now=now)
+    filters.insert(0, "t.embedding_model_id = :model")
+    params.update(model=active_embedding_model(), query=query_vector)
+    if context_vector is not None:
+        params["context"] = context_vector
+    selects = []
+    for leg, column, vector_param, leg_rows in legs:
+        distance = f"t.{column} <=> CAST(:{vector_param} AS vector({OPENAI_DIMENSIONS}))"
+        params[f"{leg}_limit"] = leg_rows
+        selects.append(
+            f"(SELECT '{leg}' AS leg, t.id, {distance} AS distance "
+            f"FROM traces t WHERE t.{column} IS NOT NULL AND {' AND '.join(filters)} "
+            f"ORDER BY {distance} LIMIT :{leg}_limit)"
+        )
+    stmt = text("\nUNION ALL\n".join(selects)).bindparams(*(
+        bindparam(name, type_=Vector(OPENAI_DIMENSIONS))
+        for name in ("query", "context") if name in params
+    ))
+
+    rows = (await db.execute(stmt, params)).all()
+    by_leg: dict[str, list[tuple[float, uuid.UUID]]] = {leg[0]: [] for leg in legs}
+    best_distance: dict[uuid.UUID, float] = {}
+    for row in rows:
+        distance = float(row.distance)
+        by_leg[row.leg].append((distance, row.id))
+        best_distance[row.id] = min(distance, best_distance.get(row.id, distance))
+
+    rankings = {
+        leg: [trace_id for _, trace_id in sorted(hits, key=lambda hit: hit[0])]
+        for leg, hits in by_leg.items()
+    }
+    fused = reciprocal_rank_fusion(rankings, k=settings.search_rrf_k)[:limit]
+    hits = await hydrate_hits(
+        db, [(trace_id, best_distance[trace_id]) for trace_id, _ in fused],
+        include_expired=include_expired, now=now,
+    )
+    scores = dict(fused)
+    return [SearchHit(hit.trace, hit.distance, scores[hit.trace.id]) for hit in hits]
+
+
+class MemoryVectorIndex:
+    """Exact cosine kNN over unit-normalised float32 rows, with row masks.
+
+    Rows are appended in place (capacity doubles as needed); a trace that
+    loses its embedding or is flagged is masked out rather than compacted.
+    Not thread-safe for concurrent writers — all mutation happens on the
+    event loop; searches read a consistent snapshot of the arrays.
+    """
+
+    def __init__(self, dim: int = OPENAI_DIMENSIONS, capacity: int = 1024) -> None:
+        self.dim = dim
+        self.ready = False
+        self._ids: list[uuid.UUID] = []
+        self._rows: dict[uuid.UUID, int] = {}
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._active = np.zeros(capacity, dtype=bool)
+        # valid_until as epoch seconds; +inf = never expires.
+        self._valid_until = np.full(capacity, np.inf, dtype=np.float64)
+        self.synced_through: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return int(self._active[:len(self._ids)].sum())
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:len(self._ids)] = self._vectors[:len(self._ids)]
+        active = np.zeros(capacity, dtype=bool)
+        active[:len(self._ids)] = self._active[:len(self._ids)]
+        valid_until = np.full(capacity, np.inf, dtype=np.float64)
+        valid_until[:len(self._ids)] = self._valid_until[:len(self._ids)]
+        self._vectors, self._active, self._valid_until = vectors, active, valid_until
+
+    def upsert(
+        self,
+        trace_id: uuid.UUID,
+        vector,
+        *,
+        flagged: bool = False,
+        valid_until: Optional[datetime] = None,
+    ) -> None:
+        row = self._rows.get(trace_id)
+        if row is None:
+            row = len(self._ids)
+            self._grow(row + 1)
+            self._ids.append(trace_id)
+            self._rows[trace_id] = row
+        unit = parse_vector(vector)
+        norm = float(np.linalg.norm(unit))
+        self._vectors[row] = unit / norm if norm else unit
+        self._active[row] = not flagged
+        self._valid_until[row] = valid_until.timestamp() if valid_until else np.inf
+
+    def remove(self, trace_id: uuid.UUID) -> None:
+        row = self._rows.get(trace_id)
+        if row is not None:
+            self._active[row] = False
+
+    def search(
+        self,
+        query_vector,
+        k: int,
+        *,
+        now: datetime,
+        include_expired: bool,
+        allowed_ids: Optional[list[uuid.UUID]] = None,
+    ) -> list[tuple[uuid.UUID, float]]:
+        """(trace_id, cosine_distance) for the k nearest active rows,
+        restricted to allowed_ids when given."""
+        n = len(self._ids)
+        vectors, active, valid_until = self._vectors, self._active, self._valid_until
+        if n == 0 or k <= 0:
+            return []
+        query = parse_vector(query_vector)
+        norm = float(np.linalg.norm(query))
+        if norm:
+            query = query / norm
+
+        mask = active[:n].copy()
+        if not include_expired:
+            mask &= valid_until[:n] >= now.timestamp()
+        if allowed_ids is not None:
+            rows = self._rows
+            allowed = np.zeros(n, dtype=bool)
+            allowed[[rows[i] for i in allowed_ids if i in rows and rows[i] < n]] = True
+            mask &= allowed
+        eligible = int(mask.sum())
+        if eligible == 0:
+            return []
+
+        # Score every row (a view, no copy of the matrix), then mask.
+        similarity = vectors[:n] @ query
+        similarity[~mask] = -np.inf
+        k = min(k, eligible)
+        top = np.argpartition(-similarity, k - 1)[:k]
+        top = top[np.argsort(-similarity[top], kind="stable")]
+        ids = self._ids
+        return [(ids[i], float(1.0 - similarity[i])) for i in top]
+
+
+class MemoryBackend(VectorSearchBackend):
+    name = "memory"
+
+    def __init__(self, index: MemoryVectorIndex, fallback: VectorSearchBackend) -> None:
+        self.index = index
+        self.fallback = fallback
+
+    async def search(self, db, query_vector, *, limit, tags, include_expired, now):
+        allowed_ids = tag_candidates(tags) if tags else None
+        if not self.index.ready or (tags and allowed_ids is None):
+            return await self.fallback.search(
+                db, query_vector, limit=limit, tags=tags,
+                include_expired=include_expired, now=now,
+            )
+        if allowed_ids == []:
+            return []
+
+        # The matrix product releases the GIL; keep it off the event loop.
+        nearest = await asyncio.to_thread(
+            self.index.search, query_vector, limit,
+            now=now, include_expired=include_expired, allowed_ids=allowed_ids,
+        )
+        return await hydrate_hits(db, nearest, include_expired=include_expired, now=now)
+
+
+vector_index = MemoryVectorIndex()
+_pgvector_backend = PgvectorBackend()
+_memory_backend = MemoryBackend(vector_index, _pgvector_backend)
+
+
+def get_search_backend() -> VectorSearchBackend:
+    """The backend selected by VECTOR_SEARCH_BACKEND."""
+    if settings.vector_search_backend == "memory":
+        return _memory_backend
+    return _pgvector_backend
+
+
+def index_trace_embedding(
+    trace_id: uuid.UUID,
+    vector,
+    model_id: str,
+    *,
+    flagged: bool = False,
+    valid_until: Optional[datetime] = None,
+) -> None:
+    """Apply a freshly stored embedding to the memory index, if it is in use."""
+    if not vector_index.ready:
+        return
+    if model_id != active_embedding_model():
+        vector_index.remove(trace_id)
+        return
+    vector_index.upsert(trace_id, vector, flagged=flagged, valid_until=valid_until)
+
+
+def remove_trace_from_index(trace_id: uuid.UUID) -> None:
+    """Hide a just-flagged or deleted trace from the memory index immediately."""
+    vector_index.remove(trace_id)
+
+
+async def _apply_rows(session: AsyncSession, since: Optional[datetime]) -> int:
+    """Page through traces (all, or updated since `since`) into the index."""
+    applied = 0
+    model = active_embedding_model()
+    last_id: Optional[uuid.UUID] = None
+    while True:
+        stmt = (
+            select(
+                Trace.id,
+                Trace.embedding,
+                Trace.embedding_model_id,
+                Trace.is_flagged,
+                Trace.valid_until,
+            )
+            .order_by(Trace.id)
+            .limit(_LOAD_PAGE)
+        )
+        if since is None:
+            stmt = stmt.where(Trace.embedding.is_not(None))
+        else:
+            stmt = stmt.where(Trace.updated_at >= since)
+        if last_id is not None:
+            stmt = stmt.where(Trace.id > last_id)
+
+        rows = (await session.execute(stmt)).all()
+        for row in rows:
+            if row.embedding is None or row.embedding_model_id != model:
+                vector_index.remove(row.id)
+            else:
+                vector_index.upsert(
+                    row.id, row.embedding,
+                    flagged=row.is_flagged, valid_until=row.valid_until,
+                )
+            applied += 1
+        if len(rows) < _LOAD_PAGE:
+            return applied
+        last_id = rows[-1].id
+
+
+async def load_vector_index(session: AsyncSession) -> int:
+    """Full load of the memory index; marks it ready. Returns rows indexed."""
+    started = datetime.now(timezone.utc)
+    loaded = await _apply_rows(session, since=None)
+    vector_index.synced_through = started
+    vector_index.ready = True
+    log.info("vector_index_loaded", traces=len(vector_index))
+    return loaded
+
+
+async def load_vector_index_in_background() -> None:
+    """Startup task: build the index without delaying app startup."""
+    try:
+        async with async_session_factory() as session:
+            await load_vector_index(session)
+    except Exception:
+        log.error("vector_index_load_failed", exc_info=True)
+
+
+async def sync_vector_index(session: AsyncSession) -> dict:
+    """Scheduled job: apply traces updated since the last sync."""
+    if not vector_index.ready:
+        return {"vector_index_synced": 0}
+    started = datetime.now(timezone.utc)
+    since = vector_index.synced_through - _SYNC_OVERLAP
+    synced = await _apply_rows(session, since=since)
+    vector_index.synced_through = started
+    return {"vector_index_synced": synced, "vector_index_size": len(vector_index)}
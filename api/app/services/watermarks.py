@@ -0,0 +1,30 @@
+"""Read/advance job watermarks (see app.models.job_watermark)."""
+
+from datetime import datetime
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job_watermark import JobWatermark
+
+
+async def get_watermark(session: AsyncSession, name: str) -> datetime | None:
+    """Return the job's watermark, or None if it has never run."""
+    result = await session.execute(
+        select(JobWatermark.watermark).where(JobWatermark.name == name)
+    )
+    return result.scalar_one_or_none()
+
+
+async def set_watermark(session: AsyncSession, name: str, value: datetime) -> None:
+    """Upsert the job's watermark. Not committed — advance it in the same
+    transaction as the work it covers."""
+    await session.execute(
+        text(
+            "INSERT INTO job_watermarks (name, watermark, updated_at) "
+            "VALUES (:name, :value, now()) "
+            "ON CONFLICT (name) DO UPDATE SET "
+            "watermark = EXCLUDED.watermark, updated_at = now()"
+        ),
+        {"name": name, "value": value},
+    )
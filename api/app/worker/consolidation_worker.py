@@ -4,7 +4,7 @@ Runs periodically to maintain knowledge health:
 1. Trust downscaling (prevents unbounded inflation)
 2. Memory temperature computation (HOT→WARM→COOL→COLD→FROZEN classification)
 3. Co-retrieval relationship building from retrieval logs
-4. Log pruning (removes retrieval logs older than 30 days)
+4. Log pruning (drops retrieval-log partitions older than 30 days)
 5. Prospective memory checks (marks traces FROZEN when review_after passes)
 6. Convergence detection (clusters similar traces, classifies convergence level)
 7. RIF shadow detection (retrieval-induced forgetting patterns)
@@ -26,7 +26,9 @@ from app.models.trace import Trace
 
 from app.services.contradiction import detect_alternatives
 from app.services.convergence import detect_convergence_clusters
+from app.services.embedding import EmbeddingService
 from app.services.maturity import MaturityTier, get_decay_multiplier, get_maturity_tier, should_apply_temporal_decay
+from app.services.partitions import maintain_retrieval_log_partitions
 from app.services.pattern_synthesis import generate_pattern_traces
 from app.services.rif import detect_rif_shadows
 from app.services.temperature import classify_temperature
@@ -148,14 +150,14 @@ async def _build_co_retrieval_links(session) -> int:
     return link_count
 
 
-async def _prune_retrieval_logs(session) -> int:
-    """Delete retrieval logs older than 30 days."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=30)
-    result = await session.execute(
-        text("DELETE FROM retrieval_logs WHERE retrieved_at < :cutoff"),
-        {"cutoff": cutoff},
-    )
-    return result.rowcount
+async def _prune_retrieval_logs(session) -> dict:
+    """Drop retrieval-log partitions past retention; pre-create upcoming ones.
+
+    Runs in its own short transaction: partition DDL takes an exclusive lock
+    on retrieval_logs that must not be held for the rest of the cycle.
+    """
+    async with async_session_factory() as ddl_session:
+        return await maintain_retrieval_log_partitions(ddl_session)
 
 
 async def _check_prospective_memory(session) -> int:
@@ -213,7 +215,7 @@ async def run_consolidation_cycle() -> dict:
             ("trust_downscaled", _trust_downscaling(session, decay_factor)),
             ("temperature_computation", _compute_temperatures(session)),
             ("co_retrieval_links", _build_co_retrieval_links(session)),
-            ("logs_pruned", _prune_retrieval_logs(session)),
+            ("log_partitions", _prune_retrieval_logs(session)),
             ("prospective_staled", _check_prospective_memory(session)),
             ("rif_shadows_detected", detect_rif_shadows(session)),
             ("tag_trends_detected", detect_tag_trends(session)),
@@ -223,7 +225,10 @@ async def run_consolidation_cycle() -> dict:
         if tier in (MaturityTier.GROWING, MaturityTier.MATURE):
             jobs.append(("convergence_detected", _detect_convergence(session)))
             jobs.append(("alternatives_detected", detect_alternatives(session)))
-            jobs.append(("patterns_generated", generate_pattern_traces(session)))
+            jobs.append((
+                "patterns_generated",
+                generate_pattern_traces(session, EmbeddingService()),
+            ))
 
         for job_name, coro in jobs:
             try:
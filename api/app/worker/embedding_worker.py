@@ -1,21 +1,19 @@
-"""Embedding worker: polls for unembedded traces and stores OpenAI vectors.
+"""Embedding worker: polls for unembedded traces and stores their vectors.
 
 Uses FOR UPDATE SKIP LOCKED to safely claim batches, allowing multiple worker
 instances to run without double-processing the same trace.
 """
 import asyncio
-import time
 
 import structlog
-from sqlalchemy import select, update
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import async_session_factory
 from app.logging_config import configure_logging
-from app.metrics import embeddings_processed, embedding_duration
 from app.models.trace import Trace
-from app.services.context import build_context_string
-from app.services.embedding import EmbeddingService, EmbeddingSkippedError, OPENAI_MODEL
+from app.services.embedding import EmbeddingService
+from app.services.trace_embedding import apply_index_updates, embed_traces
 
 log = structlog.get_logger(__name__)
 
@@ -50,144 +48,25 @@ async def process_batch(db: AsyncSession, svc: EmbeddingService) -> int:
     if not traces:
         return 0
 
-    processed = 0
-    for trace in traces:
-        # Content embedding (if missing)
-        if trace.embedding is None:
-            text = f"{trace.title}\n{trace.context_text}\n{trace.solution_text}"
-            start = time.monotonic()
-            try:
-                vector, model_id, model_version = await svc.embed(text)
-            except EmbeddingSkippedError:
-                log.warning(
-                    "embedding_skipped_no_api_key",
-                    message="OPENAI_API_KEY not configured — skipping entire batch.",
-                )
-                embeddings_processed.labels(model="none", status="skipped").inc()
-                return 0
-            except Exception as exc:
-                log.error(
-                    "embedding_error",
-                    trace_id=str(trace.id),
-                    error=str(exc),
-                )
-                embeddings_processed.labels(model=OPENAI_MODEL, status="error").inc()
-                embedding_duration.labels(model=OPENAI_MODEL).observe(time.monotonic() - start)
-                continue
-
-            embeddings_processed.labels(model=model_id, status="success").inc()
-            embedding_duration.labels(model=model_id).observe(time.monotonic() - start)
-
-            values = dict(
-                embedding=vector,
-                embedding_model_id=model_id,
-                embedding_model_version=model_version,
-            )
-
-            # Also embed solution text if long enough
-            if trace.solution_embedding is None and len(trace.solution_text) >= 20:
-                try:
-                    sol_vector, _, _ = await svc.embed(trace.solution_text)
-                    values["solution_embedding"] = sol_vector
-                    log.info("solution_embedding_stored", trace_id=str(trace.id))
-                except Exception as exc:
-                    log.error("solution_embedding_error", trace_id=str(trace.id), error=str(exc))
-
-            # Also embed context if fingerprint exists
-            if trace.context_fingerprint and trace.context_embedding is None:
-                ctx_text = build_context_string(trace.context_fingerprint)
-                try:
-                    ctx_vector, _, _ = await svc.embed(ctx_text)
-                    values["context_embedding"] = ctx_vector
-                    log.info("context_embedding_stored", trace_id=str(trace.id))
-                except Exception as exc:
-                    log.error("context_embedding_error", trace_id=str(trace.id), error=str(exc))
-
-            update_stmt = (
-                update(Trace)
-                .where(Trace.id == trace.id)
-                .values(**values)
-                .execution_options(synchronize_session=False)
-            )
-            await db.execute(update_stmt)
-            log.info("embedding_stored", trace_id=str(trace.id), model=model_id)
-            processed += 1
-
-        # Context embedding only (content already embedded)
-        elif trace.context_fingerprint and trace.context_embedding is None:
-            ctx_text = build_context_string(trace.context_fingerprint)
-            start = time.monotonic()
-            try:
-                ctx_vector, model_id, _ = await svc.embed(ctx_text)
-            except EmbeddingSkippedError:
-                embeddings_processed.labels(model="none", status="skipped").inc()
-                return 0
-            except Exception as exc:
-                log.error("context_embedding_error", trace_id=str(trace.id), error=str(exc))
-                continue
-
-            embeddings_processed.labels(model=model_id, status="success").inc()
-            embedding_duration.labels(model=model_id).observe(time.monotonic() - start)
-
-            update_values: dict = {"context_embedding": ctx_vector}
-
-            # Also embed solution if missing and long enough
-            if trace.solution_embedding is None and len(trace.solution_text) >= 20:
-                try:
-                    sol_vector, _, _ = await svc.embed(trace.solution_text)
-                    update_values["solution_embedding"] = sol_vector
-                    log.info("solution_embedding_stored", trace_id=str(trace.id))
-                except Exception as exc:
-                    log.error("solution_embedding_error", trace_id=str(trace.id), error=str(exc))
-
-            update_stmt = (
-                update(Trace)
-                .where(Trace.id == trace.id)
-                .values(**update_values)
-                .execution_options(synchronize_session=False)
-            )
-            await db.execute(update_stmt)
-            log.info("context_embedding_stored", trace_id=str(trace.id))
-            processed += 1
-
-        # Solution embedding only (content + context already embedded)
-        elif trace.solution_embedding is None and len(trace.solution_text) >= 20:
-            start = time.monotonic()
-            try:
-                sol_vector, model_id, _ = await svc.embed(trace.solution_text)
-            except EmbeddingSkippedError:
-                embeddings_processed.labels(model="none", status="skipped").inc()
-                return 0
-            except Exception as exc:
-                log.error("solution_embedding_error", trace_id=str(trace.id), error=str(exc))
-                continue
-
-            embeddings_processed.labels(model=model_id, status="success").inc()
-            embedding_duration.labels(model=model_id).observe(time.monotonic() - start)
-
-            update_stmt = (
-                update(Trace)
-                .where(Trace.id == trace.id)
-                .values(solution_embedding=sol_vector)
-                .execution_options(synchronize_session=False)
-            )
-            await db.execute(update_stmt)
-            log.info("solution_embedding_stored", trace_id=str(trace.id))
-            processed += 1
-
+    embedded = await embed_traces(db, svc, traces)
     await db.commit()
-    return processed
+    apply_index_updates(embedded.index_updates)
+    return embedded.processed
 
 
 async def run_worker() -> None:
     """Main polling loop: claims and embeds unembedded traces every POLL_INTERVAL_SECONDS."""
+    from app.services.reembed import refresh_active_embedding_model
+
     configure_logging()
     svc = EmbeddingService()
     log.info("embedding_worker_started", poll_interval=POLL_INTERVAL_SECONDS, batch_size=BATCH_SIZE)
 
     # Drift detection: warn if existing traces used a different model
+    # (scripts/reembed.py migrates them without a search outage)
     async with async_session_factory() as db:
         from sqlalchemy import func, select as sa_select
+        await refresh_active_embedding_model(db)
         result = await db.execute(
             sa_select(Trace.embedding_model_id, func.count())
             .where(Trace.embedding_model_id.is_not(None))
@@ -195,17 +74,20 @@ async def run_worker() -> None:
         )
         model_counts = result.all()
         for model_id, count in model_counts:
-            if model_id != OPENAI_MODEL:
+            if model_id != svc.model_id:
                 log.warning(
                     "embedding_model_drift_detected",
                     existing_model=model_id,
-                    current_model=OPENAI_MODEL,
+                    current_model=svc.model_id,
                     trace_count=count,
                 )
 
     while True:
         try:
             async with async_session_factory() as db:
+                # Follow re-embedding switches (the API process does this
+                # from its scheduler).
+                await refresh_active_embedding_model(db)
                 count = await process_batch(db, svc)
                 if count > 0:
                     log.info("batch_processed", count=count)
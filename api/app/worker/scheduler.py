@@ -0,0 +1,116 @@
+"""Lightweight periodic jobs that run inside the API process.
+
+The consolidation cycle runs once a day; some derived tables need fresher
+upkeep than that (retrieval-log partitions, dashboard and tag rollups,
+knowledge-health pairs and report, ...). Each job here is an async callable
+taking an AsyncSession; the loop opens a session per run, commits on
+success, and logs (never raises) on failure so one bad run doesn't kill the
+loop.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory
+from app.services.analytics_rollups import refresh_analytics_rollups
+from app.services.health_pairs import refresh_health_pairs
+from app.services.health_snapshot import refresh_health_snapshot
+from app.services.partitions import maintain_retrieval_log_partitions
+from app.services.reembed import refresh_active_embedding_model
+from app.services.staleness import refresh_trace_staleness
+from app.services.tag_index import rebuild_tag_index
+from app.services.trends import refresh_tag_activity_rollup
+from app.services.vector_search import sync_vector_index
+
+log = structlog.get_logger(__name__)
+
+Job = Callable[[AsyncSession], Awaitable[Any]]
+
+
+async def run_job(name: str, job: Job) -> Any:
+    """Run one job in its own session and commit. Returns the job's result."""
+    async with async_session_factory() as session:
+        result = await job(session)
+        await session.commit()
+    log.info("scheduled_job_completed", job=name, result=result)
+    return result
+
+
+async def periodic_job_loop(
+    name: str, job: Job, interval_seconds: float, initial_delay: float = 30
+) -> None:
+    """Run `job` every `interval_seconds` until cancelled."""
+    log.info("scheduled_job_started", job=name, interval_seconds=interval_seconds)
+    await asyncio.sleep(initial_delay)
+    while True:
+        try:
+            await run_job(name, job)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.error("scheduled_job_failed", job=name, exc_info=True)
+        await asyncio.sleep(interval_seconds)
+
+
+def start_scheduled_jobs() -> dict[str, asyncio.Task]:
+    """Create a task per enabled job. Called from the app lifespan."""
+    jobs: list[tuple[str, Job, float]] = [
+        (
+            "retrieval_log_partitions",
+            maintain_retrieval_log_partitions,
+            settings.retrieval_log_partition_check_hours * 3600,
+        ),
+        (
+            "analytics_rollups",
+            refresh_analytics_rollups,
+            settings.analytics_rollup_interval_minutes * 60,
+        ),
+        (
+            "health_pairs",
+            refresh_health_pairs,
+            settings.health_scan_interval_minutes * 60,
+        ),
+        (
+            "knowledge_health_snapshot",
+            refresh_health_snapshot,
+            settings.knowledge_health_refresh_minutes * 60,
+        ),
+        (
+            "embedding_model",
+            refresh_active_embedding_model,
+            settings.embedding_model_refresh_seconds,
+        ),
+        (
+            "trace_staleness",
+            refresh_trace_staleness,
+            settings.staleness_refresh_minutes * 60,
+        ),
+    ]
+    if settings.tag_trends_hourly_enabled:
+        jobs.append((
+            "tag_activity_rollup",
+            refresh_tag_activity_rollup,
+            settings.tag_trends_hourly_refresh_minutes * 60,
+        ))
+    if settings.tag_index_enabled:
+        jobs.append((
+            "tag_index",
+            rebuild_tag_index,
+            settings.tag_index_refresh_minutes * 60,
+        ))
+    if settings.vector_search_backend == "memory":
+        jobs.append((
+            "vector_index_sync",
+            sync_vector_index,
+            settings.vector_index_sync_minutes * 60,
+        ))
+
+    return {
+        name: asyncio.create_task(periodic_job_loop(name, job, interval))
+        for name, job, interval in jobs
+    }
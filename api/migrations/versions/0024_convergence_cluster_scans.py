@@ -0,0 +1,38 @@
+"""Create convergence_cluster_scans table.
+
+Remembers the membership signature (member count + md5 of sorted member
+ids) each convergence cluster had when detect_alternatives last scored its
+pairs, so the consolidation cycle only re-scores clusters whose membership
+changed since then.
+
+Revision ID: 240a1b2c3d4e
+Revises: 230a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "240a1b2c3d4e"
+down_revision: str = "230a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "convergence_cluster_scans",
+        sa.Column("cluster_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("member_count", sa.Integer(), nullable=False),
+        sa.Column("member_hash", sa.String(32), nullable=False),
+        sa.Column(
+            "scanned_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("convergence_cluster_scans")
@@ -0,0 +1,36 @@
+"""Create tag_activity_hourly rollup table.
+
+Per-tag trace counts bucketed by hour. Refreshed incrementally (only the
+newest buckets are recomputed) so hourly trending windows can be served
+without scanning traces x trace_tags on every request.
+
+Revision ID: 250a1b2c3d4e
+Revises: 240a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "250a1b2c3d4e"
+down_revision: str = "240a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tag_activity_hourly",
+        sa.Column("tag_name", sa.String(50), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("trace_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_tag_activity_hourly_bucket_start",
+        "tag_activity_hourly",
+        ["bucket_start"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tag_activity_hourly_bucket_start", table_name="tag_activity_hourly")
+    op.drop_table("tag_activity_hourly")
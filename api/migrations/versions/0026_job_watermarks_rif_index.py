@@ -0,0 +1,50 @@
+"""Create job_watermarks; index retrieval_logs on (session, position).
+
+job_watermarks records how far an incremental consolidation job has
+processed an append-only source (e.g. RIF detection over retrieval_logs),
+so each run only reads rows newer than the last one.
+
+The composite (search_session_id, result_position) index serves the RIF
+winner/loser self-join; it supersedes the single-column session index.
+
+Revision ID: 260a1b2c3d4e
+Revises: 250a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "260a1b2c3d4e"
+down_revision: str = "250a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_watermarks",
+        sa.Column("name", sa.String(100), primary_key=True),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index(
+        "ix_retrieval_logs_session_position",
+        "retrieval_logs",
+        ["search_session_id", "result_position"],
+    )
+    op.drop_index("ix_retrieval_logs_session", table_name="retrieval_logs")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_retrieval_logs_session",
+        "retrieval_logs",
+        ["search_session_id"],
+    )
+    op.drop_index("ix_retrieval_logs_session_position", table_name="retrieval_logs")
+    op.drop_table("job_watermarks")
@@ -0,0 +1,122 @@
+"""Range-partition retrieval_logs by day.
+
+Replaces the plain retrieval_logs table with one partitioned by RANGE
+(retrieved_at), one partition per UTC day (retrieval_logs_pYYYYMMDD).
+Partitions are created for the 30-day retention window plus 14 days ahead;
+afterwards app.services.partitions keeps them ahead and drops expired ones,
+so pruning no longer DELETEs rows and time-bounded analytics queries get
+partition pruning.
+
+The primary key becomes (id, retrieved_at) because a partitioned table's
+unique constraints must include the partition key. Rows still inside the
+retention window are copied over; older rows are discarded (they were due
+for pruning anyway).
+
+Revision ID: 270a1b2c3d4e
+Revises: 260a1b2c3d4e
+"""
+
+from alembic import op
+
+revision: str = "270a1b2c3d4e"
+down_revision: str = "260a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+RETENTION_DAYS = 30
+DAYS_AHEAD = 14
+
+
+def upgrade() -> None:
+    # Move the old table (and its index names) out of the way.
+    op.execute("ALTER TABLE retrieval_logs RENAME TO retrieval_logs_legacy")
+    op.execute("ALTER INDEX retrieval_logs_pkey RENAME TO retrieval_logs_legacy_pkey")
+    op.execute("DROP INDEX ix_retrieval_logs_session_position")
+    op.execute("DROP INDEX ix_retrieval_logs_retrieved_at")
+
+    op.execute(
+        """
+        CREATE TABLE retrieval_logs (
+            id UUID NOT NULL,
+            trace_id UUID NOT NULL REFERENCES traces (id),
+            search_session_id VARCHAR(100) NOT NULL,
+            result_position INTEGER,
+            retrieved_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, retrieved_at)
+        ) PARTITION BY RANGE (retrieved_at)
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_retrieval_logs_session_position "
+        "ON retrieval_logs (search_session_id, result_position)"
+    )
+    op.execute(
+        "CREATE INDEX ix_retrieval_logs_retrieved_at ON retrieval_logs (retrieved_at)"
+    )
+
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            d date;
+        BEGIN
+            FOR d IN
+                SELECT generate_series(
+                    (now() AT TIME ZONE 'UTC')::date - {RETENTION_DAYS},
+                    (now() AT TIME ZONE 'UTC')::date + {DAYS_AHEAD},
+                    interval '1 day'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF retrieval_logs FOR VALUES FROM (%L) TO (%L)',
+                    'retrieval_logs_p' || to_char(d, 'YYYYMMDD'),
+                    d::text || ' 00:00:00+00',
+                    (d + 1)::text || ' 00:00:00+00'
+                );
+            END LOOP;
+        END $$
+        """
+    )
+
+    op.execute(
+        f"""
+        INSERT INTO retrieval_logs (id, trace_id, search_session_id, result_position, retrieved_at)
+        SELECT id, trace_id, search_session_id, result_position, retrieved_at
+        FROM retrieval_logs_legacy
+        WHERE retrieved_at >= ((now() AT TIME ZONE 'UTC')::date - {RETENTION_DAYS})::timestamp AT TIME ZONE 'UTC'
+        """
+    )
+    op.execute("DROP TABLE retrieval_logs_legacy")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE retrieval_logs RENAME TO retrieval_logs_partitioned")
+    op.execute("ALTER INDEX retrieval_logs_pkey RENAME TO retrieval_logs_partitioned_pkey")
+    op.execute("DROP INDEX ix_retrieval_logs_session_position")
+    op.execute("DROP INDEX ix_retrieval_logs_retrieved_at")
+
+    op.execute(
+        """
+        CREATE TABLE retrieval_logs (
+            id UUID PRIMARY KEY,
+            trace_id UUID NOT NULL REFERENCES traces (id),
+            search_session_id VARCHAR(100) NOT NULL,
+            result_position INTEGER,
+            retrieved_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute(
+        "INSERT INTO retrieval_logs "
+        "SELECT id, trace_id, search_session_id, result_position, retrieved_at "
+        "FROM retrieval_logs_partitioned"
+    )
+    # Dropping the parent drops every partition with it.
+    op.execute("DROP TABLE retrieval_logs_partitioned")
+    op.execute(
+        "CREATE INDEX ix_retrieval_logs_session_position "
+        "ON retrieval_logs (search_session_id, result_position)"
+    )
+    op.execute(
+        "CREATE INDEX ix_retrieval_logs_retrieved_at ON retrieval_logs (retrieved_at)"
+    )
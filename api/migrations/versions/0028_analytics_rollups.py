@@ -0,0 +1,79 @@
+"""Create analytics rollup tables for the owner dashboard.
+
+  * analytics_daily        — per-UTC-day event counts (signups, traces,
+                             votes, amendments, search sessions, retrievals)
+  * analytics_tag_daily    — per-day, per-tag retrievals and new traces
+  * analytics_contributors — per-contributor trace/retrieval totals snapshot
+  * analytics_gauges       — point-in-time totals (users, traces, DAU, ...)
+
+Kept up to date incrementally by app.services.analytics_rollups on a
+schedule; /api/v1/analytics endpoints read these instead of base tables.
+
+Revision ID: 280a1b2c3d4e
+Revises: 270a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "280a1b2c3d4e"
+down_revision: str = "270a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def _refreshed_at() -> sa.Column:
+    return sa.Column(
+        "refreshed_at",
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analytics_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("signups", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("traces", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("votes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("amendments", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("search_sessions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("retrievals", sa.Integer(), nullable=False, server_default="0"),
+        _refreshed_at(),
+    )
+    op.create_table(
+        "analytics_tag_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("tag_name", sa.String(50), primary_key=True),
+        sa.Column("retrievals", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("new_traces", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "analytics_contributors",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("trace_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_retrievals", sa.BigInteger(), nullable=False, server_default="0"),
+        _refreshed_at(),
+    )
+    op.create_index(
+        "ix_analytics_contributors_trace_count",
+        "analytics_contributors",
+        ["trace_count"],
+    )
+    op.create_table(
+        "analytics_gauges",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False, server_default="0"),
+        _refreshed_at(),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("analytics_gauges")
+    op.drop_index("ix_analytics_contributors_trace_count", table_name="analytics_contributors")
+    op.drop_table("analytics_contributors")
+    op.drop_table("analytics_tag_daily")
+    op.drop_table("analytics_daily")
@@ -0,0 +1,74 @@
+"""Create health_pairs and health_pair_scans tables.
+
+Stores the knowledge-health early-warning pairs (near-duplicates and
+same-problem/divergent-fix conflicts) found by per-trace HNSW kNN, so the
+dashboard reads them instead of self-joining every trace on each request.
+health_pair_scans records when each trace was last scanned; only traces
+created or updated since are rescanned.
+
+Revision ID: 290a1b2c3d4e
+Revises: 280a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "290a1b2c3d4e"
+down_revision: str = "280a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "health_pairs",
+        sa.Column(
+            "a_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("traces.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "b_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("traces.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("distance", sa.Float(), nullable=False),
+        sa.Column("context_distance", sa.Float(), nullable=False),
+        sa.Column("solution_distance", sa.Float(), nullable=False),
+        sa.Column(
+            "found_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.CheckConstraint("a_id < b_id", name="ck_health_pairs_ordered"),
+    )
+    op.create_index("ix_health_pairs_b_id", "health_pairs", ["b_id"])
+    op.create_index("ix_health_pairs_kind", "health_pairs", ["kind"])
+
+    op.create_table(
+        "health_pair_scans",
+        sa.Column(
+            "trace_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("traces.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "scanned_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("health_pair_scans")
+    op.drop_index("ix_health_pairs_kind", table_name="health_pairs")
+    op.drop_index("ix_health_pairs_b_id", table_name="health_pairs")
+    op.drop_table("health_pairs")
@@ -0,0 +1,31 @@
+"""Create report_snapshots table.
+
+Holds the last materialized copy of expensive dashboard reports (the
+knowledge-health report first), refreshed by a background job so the
+endpoint returns the stored payload instead of recomputing it per request.
+
+Revision ID: 300a1b2c3d4e
+Revises: 290a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "300a1b2c3d4e"
+down_revision: str = "290a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_snapshots",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("payload", postgresql.JSON(), nullable=False),
+        sa.Column("generated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("report_snapshots")
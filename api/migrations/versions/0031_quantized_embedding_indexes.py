@@ -0,0 +1,47 @@
+"""Add compact (quantized) HNSW indexes on traces.embedding.
+
+Two expression indexes alongside the full-precision ix_traces_embedding_hnsw,
+used when VECTOR_QUANTIZATION selects them (app.services.vector_search):
+
+  * halfvec — the embedding cast to 16-bit floats, half the index size;
+  * binary  — binary_quantize(embedding), one bit per dimension (1/32 the
+    size), searched by Hamming distance.
+
+Both only shortlist candidates; the search re-ranks the shortlist by exact
+cosine distance on the float32 column, so the table keeps full precision.
+Requires pgvector >= 0.7.
+
+Revision ID: 310a1b2c3d4e
+Revises: 300a1b2c3d4e
+"""
+
+from alembic import op
+
+revision: str = "310a1b2c3d4e"
+down_revision: str = "300a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE INDEX ix_traces_embedding_halfvec_hnsw
+        ON traces
+        USING hnsw ((CAST(embedding AS halfvec(1536))) halfvec_cosine_ops)
+        WITH (m = 16, ef_construction = 64)
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX ix_traces_embedding_binary_hnsw
+        ON traces
+        USING hnsw ((CAST(binary_quantize(embedding) AS bit(1536))) bit_hamming_ops)
+        WITH (m = 16, ef_construction = 64)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_traces_embedding_binary_hnsw")
+    op.execute("DROP INDEX IF EXISTS ix_traces_embedding_halfvec_hnsw")
@@ -0,0 +1,30 @@
+"""Add an HNSW index on traces.solution_embedding.
+
+Multi-vector search probes solution_embedding alongside embedding and
+context_embedding; without an index that leg would be a sequential scan.
+
+Revision ID: 320a1b2c3d4e
+Revises: 310a1b2c3d4e
+"""
+
+from alembic import op
+
+revision: str = "320a1b2c3d4e"
+down_revision: str = "310a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_traces_solution_embedding_hnsw",
+        "traces",
+        ["solution_embedding"],
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"solution_embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_traces_solution_embedding_hnsw", table_name="traces")
@@ -0,0 +1,60 @@
+"""Add traces.search_tsv full-text column, trigger and GIN index.
+
+search_tsv holds a weighted tsvector: title (A), context (B) and
+solution (C). A BEFORE INSERT/UPDATE trigger keeps it in sync, so every
+writer gets it for free, including the ORM, the seed import and raw SQL.
+It backs the lexical leg of POST /traces/search (app.services.lexical_search).
+
+Revision ID: 330a1b2c3d4e
+Revises: 320a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "330a1b2c3d4e"
+down_revision: str = "320a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+_TSV_EXPRESSION = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A')
+    || setweight(to_tsvector('english', coalesce({row}context_text, '')), 'B')
+    || setweight(to_tsvector('english', coalesce({row}solution_text, '')), 'C')
+"""
+
+
+def upgrade() -> None:
+    op.add_column("traces", sa.Column("search_tsv", postgresql.TSVECTOR(), nullable=True))
+    op.execute(
+        f"""
+        CREATE FUNCTION traces_search_tsv_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_tsv := {_TSV_EXPRESSION.format(row="NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER traces_search_tsv_update
+        BEFORE INSERT OR UPDATE OF title, context_text, solution_text ON traces
+        FOR EACH ROW EXECUTE FUNCTION traces_search_tsv_update()
+        """
+    )
+    op.execute(f"UPDATE traces SET search_tsv = {_TSV_EXPRESSION.format(row='')}")
+    op.create_index(
+        "ix_traces_search_tsv",
+        "traces",
+        ["search_tsv"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_traces_search_tsv", table_name="traces")
+    op.execute("DROP TRIGGER IF EXISTS traces_search_tsv_update ON traces")
+    op.execute("DROP FUNCTION IF EXISTS traces_search_tsv_update()")
+    op.drop_column("traces", "search_tsv")
@@ -0,0 +1,38 @@
+"""Create embedding_cache table.
+
+Content-addressed embeddings keyed by (model_id, sha256(text)), consulted
+by the embedding worker before any backend call so identical texts
+(context strings, duplicate solutions, seed re-imports) are embedded once.
+
+Revision ID: 340a1b2c3d4e
+Revises: 330a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+revision: str = "340a1b2c3d4e"
+down_revision: str = "330a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embedding_cache",
+        sa.Column("model_id", sa.String(100), primary_key=True),
+        sa.Column("text_hash", sa.LargeBinary(32), primary_key=True),
+        sa.Column("embedding", Vector(1536), nullable=False),
+        sa.Column("model_version", sa.String(100), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("embedding_cache")
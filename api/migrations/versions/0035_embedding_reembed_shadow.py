@@ -0,0 +1,63 @@
+"""Add shadow embedding columns and the embedding_migrations table.
+
+A model change re-embeds the corpus into embedding_next,
+context_embedding_next and solution_embedding_next (tagged with
+embedding_next_model_id / _version) while search keeps serving the live
+columns. Once every embedded trace is covered and the shadow HNSW indexes
+are built, app.services.reembed swaps the column and index names in one
+transaction. embedding_migrations records each run: its target model,
+keyset checkpoint and progress, so an interrupted run resumes where it
+stopped. The latest switched row is the model every process embeds with.
+
+Revision ID: 350a1b2c3d4e
+Revises: 340a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects import postgresql
+
+revision: str = "350a1b2c3d4e"
+down_revision: str = "340a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("traces", sa.Column("embedding_next", Vector(1536), nullable=True))
+    op.add_column("traces", sa.Column("context_embedding_next", Vector(1536), nullable=True))
+    op.add_column("traces", sa.Column("solution_embedding_next", Vector(1536), nullable=True))
+    op.add_column("traces", sa.Column("embedding_next_model_id", sa.String(100), nullable=True))
+    op.add_column("traces", sa.Column("embedding_next_model_version", sa.String(100), nullable=True))
+
+    op.create_table(
+        "embedding_migrations",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("backend", sa.String(20), nullable=False),
+        sa.Column("local_model", sa.String(200), nullable=True),
+        sa.Column("local_dimensions", sa.Integer(), nullable=True),
+        sa.Column("target_model_id", sa.String(100), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("checkpoint_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("embedded_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "started_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("switched_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_embedding_migrations_status", "embedding_migrations", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_embedding_migrations_status", table_name="embedding_migrations")
+    op.drop_table("embedding_migrations")
+    op.drop_column("traces", "embedding_next_model_version")
+    op.drop_column("traces", "embedding_next_model_id")
+    op.drop_column("traces", "solution_embedding_next")
+    op.drop_column("traces", "context_embedding_next")
+    op.drop_column("traces", "embedding_next")
@@ -0,0 +1,27 @@
+"""Add traces.embedded_at.
+
+Set by the embedding worker whenever it writes a trace's vectors. The
+knowledge-health pair scan rescans a trace only when embedded_at is newer
+than its last scan, instead of on every updated_at bump (retrieval
+counters, consolidation) that leaves the vectors unchanged. Existing
+traces start NULL; their recorded scans stay valid.
+
+Revision ID: 360a1b2c3d4e
+Revises: 350a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "360a1b2c3d4e"
+down_revision: str = "350a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("traces", sa.Column("embedded_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("traces", "embedded_at")
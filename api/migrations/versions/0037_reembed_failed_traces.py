@@ -0,0 +1,36 @@
+"""Add embedding_migrations.failed_trace_ids.
+
+A trace whose text the target model rejects (e.g. over its input limit)
+no longer stops a re-embedding run at the same checkpoint: its id is
+recorded here and the run moves on. Recorded traces do not count as
+uncovered for the switch; they go live without vectors and the embedding
+worker retries them. Each `run` invocation retries the recorded ids.
+
+Revision ID: 370a1b2c3d4e
+Revises: 360a1b2c3d4e
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "370a1b2c3d4e"
+down_revision: str = "360a1b2c3d4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "embedding_migrations",
+        sa.Column(
+            "failed_trace_ids",
+            postgresql.ARRAY(postgresql.UUID(as_uuid=True)),
+            nullable=False,
+            server_default="{}",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("embedding_migrations", "failed_trace_ids")
@@ -0,0 +1,96 @@
+"""Benchmark sequential vs concurrent dashboard aggregates.
+
+Runs the same set of independent read queries twice against DATABASE_URL:
+once back-to-back on a single session (the old endpoint behaviour) and once
+through app.services.concurrent_reads.gather_reads. Sequential wall-clock
+should approach the *sum* of the per-query times, concurrent the *max*.
+
+By default each query is `SELECT pg_sleep(<delay>)`, which isolates the
+round-trip/latency effect from data volume. Pass --real to time the actual
+/analytics/platforms GROUP BYs plus the admin funnel counts instead (best on
+a database populated by scripts/generate_capacity_data.py).
+
+Usage:
+    cd api && uv run python scripts/bench_concurrent_reads.py [--queries 4] [--delay 0.2] [--real] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+# Support running from both project root and api/ directory
+_api_root = Path(__file__).parent.parent  # api/
+if str(_api_root) not in sys.path:
+    sys.path.insert(0, str(_api_root))
+
+from app.config import settings
+from app.database import async_session_factory, engine
+from app.services.concurrent_reads import gather_reads
+
+REAL_QUERIES = {
+    "platforms": "SELECT COALESCE(platform, 'unknown'), COUNT(*) FROM users GROUP BY platform",
+    "versions": "SELECT COALESCE(skill_version, 'unknown'), COUNT(*) FROM users GROUP BY skill_version",
+    "sources": "SELECT COALESCE(install_source, 'unknown'), COUNT(*) FROM users GROUP BY install_source",
+    "contributed": "SELECT COUNT(DISTINCT contributor_id) FROM traces",
+    "voted": "SELECT COUNT(DISTINCT voter_id) FROM votes",
+}
+
+
+async def _time(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return time.perf_counter() - started
+
+
+async def _sequential(queries: dict) -> None:
+    async with async_session_factory() as session:
+        for stmt in queries.values():
+            (await session.execute(stmt)).all()
+
+
+async def _concurrent(queries: dict) -> None:
+    async with async_session_factory() as session:
+        await gather_reads(session, queries)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--real", action="store_true")
+    args = parser.parse_args()
+
+    if args.real:
+        queries = {name: text(sql) for name, sql in REAL_QUERIES.items()}
+    else:
+        queries = {
+            f"sleep_{i}": text(f"SELECT pg_sleep({args.delay})") for i in range(args.queries)
+        }
+
+    # Time each query alone for the sum/max reference points.
+    singles = []
+    for stmt in queries.values():
+        singles.append(await _time(_sequential({"q": stmt})))
+
+    # Warm the pool so connection setup is not billed to the first concurrent run.
+    await _concurrent(queries)
+
+    seq = [await _time(_sequential(queries)) for _ in range(args.rounds)]
+    conc = [await _time(_concurrent(queries)) for _ in range(args.rounds)]
+
+    print(f"queries={len(queries)} concurrency={settings.analytics_query_concurrency} rounds={args.rounds}")
+    print(f"  sum of single-query times : {sum(singles) * 1000:8.1f} ms")
+    print(f"  max single-query time     : {max(singles) * 1000:8.1f} ms")
+    print(f"  sequential (median)       : {sorted(seq)[len(seq) // 2] * 1000:8.1f} ms")
+    print(f"  gather_reads (median)     : {sorted(conc)[len(conc) // 2] * 1000:8.1f} ms")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""Benchmark embedding throughput and latency: OpenAI API vs local CPU model.
+
+For each available backend ("openai" needs OPENAI_API_KEY, "local" needs the
+`local-embeddings` extra) this reports:
+  * single-text latency (p50 / p95), the cost a search query pays;
+  * batch throughput in texts/second at several batch sizes, the cost the
+    embedding worker and a re-embed backfill pay.
+
+Texts are real trace bodies (title + context + solution, as the embedding
+worker builds them) when the database has traces, otherwise synthetic
+sentences. The first local call loads the model in the pool process and is
+reported separately as warm-up.
+
+Usage:
+    cd api && uv run python scripts/bench_embedding_backends.py [--backends openai,local] [--queries 50] [--batches 8,32,128]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import text
+
+# Support running from both project root and api/ directory
+_api_root = Path(__file__).parent.parent  # api/
+if str(_api_root) not in sys.path:
+    sys.path.insert(0, str(_api_root))
+
+from app.database import async_session_factory, engine
+from app.services.embedding import EmbeddingService, LocalBackend, OpenAIBackend
+
+BACKENDS = {"openai": OpenAIBackend, "local": LocalBackend}
+
+
+async def _texts(n: int) -> list[str]:
+    try:
+        async with async_session_factory() as session:
+            result = await session.execute(
+                text(
+                    "SELECT title || E'\\n' || context_text || E'\\n' || solution_text "
+                    "FROM traces ORDER BY random() LIMIT :n"
+                ),
+                {"n": n},
+            )
+            texts = list(result.scalars().all())
+    except Exception as exc:
+        print(f"database unavailable ({exc.__class__.__name__}); using synthetic texts")
+        texts = []
+    rng = np.random.default_rng(42)
+    words = "python docker timeout retry cache index query worker deploy error".split()
+    while len(texts) < n:
+        texts.append(" ".join(rng.choice(words, size=40)))
+    return texts
+
+
+async def _bench(svc: EmbeddingService, texts: list[str], queries: int, batches: list[int]) -> None:
+    started = time.perf_counter()
+    await svc.embed(texts[0])
+    print(f"  warm-up        {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    latencies = []
+    for sample in texts[:queries]:
+        started = time.perf_counter()
+        await svc.embed(sample)
+        latencies.append(time.perf_counter() - started)
+    print(
+        f"  single text    p50 {np.percentile(latencies, 50) * 1000:7.1f} ms"
+        f"  p95 {np.percentile(latencies, 95) * 1000:7.1f} ms"
+    )
+
+    for size in batches:
+        batch = texts[:size]
+        started = time.perf_counter()
+        await svc.embed_batch(batch)
+        elapsed = time.perf_counter() - started
+        print(f"  batch {size:5d}    {elapsed * 1000:8.1f} ms  {len(batch) / elapsed:8.1f} texts/s")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default="openai,local")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batches", default="8,32,128")
+    args = parser.parse_args()
+    batches = [int(b) for b in args.batches.split(",")]
+
+    texts = await _texts(max(args.queries, *batches))
+    for name in args.backends.split(","):
+        backend = BACKENDS[name]()
+        if not backend.available():
+            print(f"\n{name}: not configured, skipped")
+            continue
+        print(f"\n{name} ({backend.model_id})")
+        await _bench(EmbeddingService(backend), texts, args.queries, batches)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
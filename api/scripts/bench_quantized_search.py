@@ -0,0 +1,134 @@
+"""Benchmark recall and latency of the quantized vector-search modes.
+
+Runs the pgvector search backend in each VECTOR_QUANTIZATION mode ("none",
+"halfvec", "binary") and at several rescore factors against DATABASE_URL. It
+reports the median and p95 latency and the recall@k against an exact
+sequential-scan ground truth. It also prints the on-disk size of each HNSW
+index.
+
+Run it on a database populated by scripts/generate_capacity_data.py and
+migrated to 0031. Queries are stored embeddings with Gaussian noise added,
+the same tiled-cluster construction the generator uses, so each one has a
+real neighbourhood.
+
+Usage:
+    cd api && uv run python scripts/bench_quantized_search.py [--queries 50] [--k 10] [--factors 2,4,10]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import text
+
+# Support running from both project root and api/ directory
+_api_root = Path(__file__).parent.parent  # api/
+if str(_api_root) not in sys.path:
+    sys.path.insert(0, str(_api_root))
+
+from app.database import async_session_factory, engine
+from app.services.embedding import active_embedding_model
+from app.services.knn import parse_vector
+from app.services.vector_search import PgvectorBackend
+
+INDEXES = (
+    "ix_traces_embedding_hnsw",
+    "ix_traces_embedding_halfvec_hnsw",
+    "ix_traces_embedding_binary_hnsw",
+)
+NOISE_SIGMA = 0.05
+
+
+async def _queries(n: int, rng: np.random.Generator) -> list[list[float]]:
+    async with async_session_factory() as session:
+        result = await session.execute(
+            text(
+                "SELECT embedding FROM traces WHERE embedding IS NOT NULL "
+                "ORDER BY random() LIMIT :n"
+            ),
+            {"n": n},
+        )
+        queries = []
+        for (embedding,) in result.all():
+            vec = parse_vector(embedding) + rng.normal(0, NOISE_SIGMA, 1536)
+            queries.append((vec / np.linalg.norm(vec)).tolist())
+    return queries
+
+
+async def _exact(query: list[float], k: int) -> set:
+    """Ground-truth top-k by sequential scan (index scans disabled)."""
+    async with async_session_factory() as session:
+        await session.execute(text("SET LOCAL enable_indexscan = off"))
+        result = await session.execute(
+            text(
+                "SELECT id FROM traces "
+                "WHERE embedding IS NOT NULL AND embedding_model_id = :model "
+                "AND is_flagged = false "
+                "ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k"
+            ),
+            {"model": active_embedding_model(), "q": "[" + ",".join(map(str, query)) + "]", "k": k},
+        )
+        return {row.id for row in result.all()}
+
+
+async def _run(backend: PgvectorBackend, queries, truths, k: int) -> tuple[list[float], float]:
+    latencies, recalls = [], []
+    now = datetime.now(timezone.utc)
+    for query, truth in zip(queries, truths):
+        async with async_session_factory() as session:
+            started = time.perf_counter()
+            hits = await backend.search(
+                session, query, limit=k, tags=[], include_expired=True, now=now,
+            )
+            latencies.append(time.perf_counter() - started)
+            await session.rollback()
+        recalls.append(len({hit.trace.id for hit in hits} & truth) / max(len(truth), 1))
+    return latencies, float(np.mean(recalls))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--factors", default="2,4,10")
+    args = parser.parse_args()
+    factors = [int(f) for f in args.factors.split(",")]
+
+    rng = np.random.default_rng(42)
+    queries = await _queries(args.queries, rng)
+    truths = [await _exact(q, args.k) for q in queries]
+
+    async with async_session_factory() as session:
+        print("index sizes:")
+        for name in INDEXES:
+            size = await session.scalar(
+                text("SELECT pg_size_pretty(pg_relation_size(to_regclass(:name)))"),
+                {"name": name},
+            )
+            print(f"  {name:36s} {size or 'missing'}")
+
+    runs = [("none", None)] + [
+        (mode, factor) for mode in ("halfvec", "binary") for factor in factors
+    ]
+    print(f"\nqueries={len(queries)} k={args.k}")
+    print(f"  {'mode':8s} {'factor':>6s} {'p50 ms':>8s} {'p95 ms':>8s} {'recall':>7s}")
+    for mode, factor in runs:
+        backend = PgvectorBackend(quantization=mode, rescore_factor=factor)
+        await _run(backend, queries[:3], truths[:3], args.k)  # warm the index pages
+        latencies, recall = await _run(backend, queries, truths, args.k)
+        print(
+            f"  {mode:8s} {factor or '-':>6} "
+            f"{np.percentile(latencies, 50) * 1000:8.1f} "
+            f"{np.percentile(latencies, 95) * 1000:8.1f} "
+            f"{recall:7.3f}"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
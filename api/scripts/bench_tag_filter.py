@@ -0,0 +1,166 @@
+"""Benchmark the tag pre-filter: SQL semi-join vs the in-process tag index.
+
+For a broad, a mid and a selective AND-tag combination, this reports:
+  * how long resolving the filter takes in the bitset index vs the SQL
+    trace_tags/tags semi-join;
+  * end-to-end latency of the pgvector search backend with
+    TAG_INDEX_ENABLED off (semi-join in the HNSW query) and on
+    (`id = ANY(:ids)`), with the number of hits each returned.
+
+The capacity corpus from scripts/generate_capacity_data.py carries no tags.
+Pass --seed-tags to give its traces Zipf-distributed "bench-*" tags first.
+The seeding is idempotent, so popular tags end up broad and tail tags
+selective.
+
+Usage:
+    cd api && uv run python scripts/bench_tag_filter.py [--seed-tags] [--queries 20]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import text
+
+# Support running from both project root and api/ directory
+_api_root = Path(__file__).parent.parent  # api/
+if str(_api_root) not in sys.path:
+    sys.path.insert(0, str(_api_root))
+
+from app.config import settings
+from app.database import async_session_factory, engine
+from app.services.knn import parse_vector
+from app.services.tag_index import rebuild_tag_index, tag_index
+from app.services.vector_search import PgvectorBackend, _TAGGED_SQL, _eligible_counts
+
+CAPACITY_USER_EMAIL = "capacity-test@commontrace.internal"
+BENCH_TAGS = 200
+TAGS_PER_TRACE = 3
+
+
+async def _seed_tags(rng: np.random.Generator) -> None:
+    async with async_session_factory() as session:
+        await session.execute(
+            text(
+                "INSERT INTO tags (id, name, is_curated) "
+                "SELECT gen_random_uuid(), 'bench-' || lpad(n::text, 3, '0'), false "
+                "FROM generate_series(0, :n - 1) n ON CONFLICT (name) DO NOTHING"
+            ),
+            {"n": BENCH_TAGS},
+        )
+        trace_ids = (await session.execute(
+            text(
+                "SELECT t.id FROM traces t JOIN users u ON u.id = t.contributor_id "
+                "WHERE u.email = :email"
+            ),
+            {"email": CAPACITY_USER_EMAIL},
+        )).scalars().all()
+        # Zipf ranks: tag 0 on a large share of traces, the tail on a handful.
+        ranks = np.minimum(rng.zipf(1.3, size=(len(trace_ids), TAGS_PER_TRACE)) - 1, BENCH_TAGS - 1)
+        pairs_trace, pairs_tag = [], []
+        for trace_id, row in zip(trace_ids, ranks):
+            for rank in set(row.tolist()):
+                pairs_trace.append(trace_id)
+                pairs_tag.append(f"bench-{rank:03d}")
+        for start in range(0, len(pairs_trace), 50_000):
+            await session.execute(
+                text(
+                    "INSERT INTO trace_tags (trace_id, tag_id) "
+                    "SELECT p.trace_id, g.id "
+                    "FROM unnest(CAST(:traces AS uuid[]), CAST(:tags AS text[])) AS p(trace_id, name) "
+                    "JOIN tags g ON g.name = p.name ON CONFLICT DO NOTHING"
+                ),
+                {"traces": pairs_trace[start:start + 50_000], "tags": pairs_tag[start:start + 50_000]},
+            )
+        await session.commit()
+        print(f"seeded {len(pairs_trace)} trace_tags rows over {len(trace_ids)} traces")
+
+
+def _combinations() -> dict[str, list[str]]:
+    counts = sorted(
+        ((tag_index.count(name), name) for name in tag_index.tag_names()),
+        reverse=True,
+    )
+    names = [name for _, name in counts]
+    return {
+        "broad (top tag)": names[:1],
+        "mid (top two tags)": names[:2],
+        "selective (tail pair)": [names[len(names) // 2], names[0]],
+    }
+
+
+async def _semi_join_ids(tags: list[str]) -> list:
+    async with async_session_factory() as session:
+        result = await session.execute(text(_TAGGED_SQL), {"tags": tags, "tag_count": len(tags)})
+        return result.scalars().all()
+
+
+async def _search(tags: list[str], query: list[float]) -> tuple[float, int]:
+    _eligible_counts.clear()
+    async with async_session_factory() as session:
+        started = time.perf_counter()
+        hits = await PgvectorBackend(quantization="none").search(
+            session, query, limit=100, tags=tags, include_expired=True,
+            now=datetime.now(timezone.utc),
+        )
+        elapsed = time.perf_counter() - started
+        await session.rollback()
+    return elapsed, len(hits)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed-tags", action="store_true")
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    if args.seed_tags:
+        await _seed_tags(rng)
+
+    async with async_session_factory() as session:
+        started = time.perf_counter()
+        await rebuild_tag_index(session)
+        print(f"tag index: {len(tag_index)} traces, {tag_index.tag_count} tags, "
+              f"built in {(time.perf_counter() - started) * 1000:.0f} ms")
+        result = await session.execute(
+            text("SELECT embedding FROM traces WHERE embedding IS NOT NULL ORDER BY random() LIMIT :n"),
+            {"n": args.queries},
+        )
+        queries = [parse_vector(v).tolist() for v in result.scalars().all()]
+
+    for label, tags in _combinations().items():
+        started = time.perf_counter()
+        ids = tag_index.resolve(tags)
+        bitset_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        sql_ids = await _semi_join_ids(tags)
+        sql_ms = (time.perf_counter() - started) * 1000
+        assert len(ids) == len(sql_ids), "tag index disagrees with trace_tags"
+
+        timings = {}
+        for enabled in (False, True):
+            settings.tag_index_enabled = enabled
+            runs = [await _search(tags, q) for q in queries]
+            timings[enabled] = (
+                np.percentile([r[0] for r in runs], 50) * 1000,
+                np.percentile([r[0] for r in runs], 95) * 1000,
+                np.mean([r[1] for r in runs]),
+            )
+
+        print(f"\n{label}: {tags} -> {len(ids)} traces"
+              f"{' (over TAG_INDEX_MAX_CANDIDATES: semi-join)' if len(ids) > settings.tag_index_max_candidates else ''}")
+        print(f"  resolve   bitset {bitset_ms:8.2f} ms   sql semi-join {sql_ms:8.2f} ms")
+        for enabled, name in ((False, "semi-join"), (True, "tag index")):
+            p50, p95, hits = timings[enabled]
+            print(f"  search    {name:10s} p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  hits {hits:5.1f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,7 +8,8 @@ Key behaviors:
 - Idempotent per trace: checks title + is_seed before inserting (skips duplicates)
 - Traces are inserted with status=validated, is_seed=True, trust_score=1.0
 - Embeddings are left NULL — the Phase 3 embedding worker picks them up automatically
-- Tags are normalized and validated before insertion
+- Tags are normalized and validated before insertion, then resolved and linked
+  for the whole file at once (app.services.tags)
 
 Usage:
     # From project root:
@@ -25,9 +26,10 @@ import argparse
 import asyncio
 import json
 import sys
+import uuid
 from pathlib import Path
 
-from sqlalchemy import insert, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 # Support running from both project root and api/ directory
@@ -36,10 +38,9 @@ if str(_api_root) not in sys.path:
     sys.path.insert(0, str(_api_root))
 
 from app.config import settings
-from app.models.tag import Tag, trace_tags
 from app.models.trace import Trace, TraceStatus
 from app.models.user import User
-from app.services.tags import normalize_tag, validate_tag
+from app.services.tags import clean_tags, tag_traces
 
 SEED_USER_EMAIL = "seeds@commontrace.internal"
 SEED_USER_DISPLAY_NAME = "CommonTrace Seeds"
@@ -70,26 +71,6 @@ async def get_or_create_seed_user(session: AsyncSession) -> User:
     return user
 
 
-async def get_or_create_tag(session: AsyncSession, raw_name: str) -> Tag | None:
-    """Normalize and validate a tag name, then get or create the Tag row.
-
-    Returns the Tag ORM object, or None if the normalized tag is invalid.
-    """
-    normalized = normalize_tag(raw_name)
-    if not validate_tag(normalized):
-        return None
-
-    result = await session.execute(select(Tag).where(Tag.name == normalized))
-    tag = result.scalar_one_or_none()
-
-    if tag is None:
-        tag = Tag(name=normalized)
-        session.add(tag)
-        await session.flush()  # Populate tag.id
-
-    return tag
-
-
 async def import_seeds(fixtures_path: Path) -> None:
     """Import seed traces from the given JSON file into the database.
 
@@ -99,7 +80,7 @@ async def import_seeds(fixtures_path: Path) -> None:
     3. Iterates over each trace in the fixture file
     4. Skips traces that already exist (idempotency: title + is_seed match)
     5. Inserts new traces with pre-validated status and NULL embedding
-    6. Processes tags via normalize_tag + validate_tag + get-or-create
+    6. Resolves every trace's tags with one upsert and links them with one insert
     7. Commits all changes in a single transaction
     8. Prints a summary: "Seed import complete: N inserted, M skipped"
     """
@@ -119,6 +100,7 @@ async def import_seeds(fixtures_path: Path) -> None:
 
     inserted = 0
     skipped = 0
+    tags_by_trace: dict[uuid.UUID, list[str]] = {}
 
     async with session_factory() as session:
         seed_user = await get_or_create_seed_user(session)
@@ -137,6 +119,7 @@ async def import_seeds(fixtures_path: Path) -> None:
 
             # Create the trace — embedding left NULL so the Phase 3 worker picks it up
             trace = Trace(
+                id=uuid.uuid4(),                       # Assigned up front for the tag links
                 title=title,
                 context_text=trace_json["context"],    # JSON: "context" -> ORM: "context_text"
                 solution_text=trace_json["solution"],  # JSON: "solution" -> ORM: "solution_text"
@@ -150,21 +133,13 @@ async def import_seeds(fixtures_path: Path) -> None:
                 embedding=None,                        # Left NULL; embedding worker processes these
             )
             session.add(trace)
-            await session.flush()  # Populate trace.id for join table insertion
-
-            # Process tags: normalize -> validate -> get-or-create -> insert into join table
-            for raw_tag in trace_json.get("tags", []):
-                tag = await get_or_create_tag(session, raw_tag)
-                if tag is None:
-                    continue  # Skip invalid tags silently
-                # Direct insert into trace_tags join table (not relationship .append())
-                # — codebase convention per 01-03 decision: direct insert in async context
-                await session.execute(
-                    insert(trace_tags).values(trace_id=trace.id, tag_id=tag.id)
-                )
+            tags_by_trace[trace.id] = clean_tags(trace_json.get("tags", []))
 
             inserted += 1
 
+        # Traces must exist before the join-table insert references them
+        await session.flush()
+        await tag_traces(session, tags_by_trace)
         await session.commit()
 
     await engine.dispose()
@@ -0,0 +1,134 @@
+"""Migrate the corpus to a new embedding model without a search outage.
+
+Stages (see app.services.reembed):
+    start   --backend local [--model NAME] [--dimensions N]   record a run
+    run     [--batch-size N] [--max-per-second R]             shadow-embed; resumable
+    index                                                     build shadow HNSW indexes concurrently
+    switch                                                    atomic swap once coverage is 100%
+    cleanup                                                   drop the previous model's columns
+    status                                                    progress of the current run
+
+`run` can be stopped at any time and re-run; it resumes from the last
+committed checkpoint and finishes with catch-up passes over traces embedded
+meanwhile. Traces the target model rejects are reported and skipped; each
+`run` retries them. Run `run` once more right before `switch`, which refuses
+while any embedded trace is uncovered (reported failures go live without
+vectors and the embedding worker retries them).
+
+Usage:
+    cd api && uv run python scripts/reembed.py start --backend local
+    cd api && uv run python scripts/reembed.py run --max-per-second 50
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Support running from both project root and api/ directory
+_api_root = Path(__file__).parent.parent  # api/
+if str(_api_root) not in sys.path:
+    sys.path.insert(0, str(_api_root))
+
+from app.database import async_session_factory, engine
+from app.models.embedding_migration import EmbeddingMigration
+from app.services.reembed import (
+    build_shadow_indexes,
+    cleanup_migration,
+    current_migration,
+    last_switched,
+    refresh_active_embedding_model,
+    run_migration,
+    start_migration,
+    switch_migration,
+    uncovered_count,
+)
+
+
+async def _current():
+    async with async_session_factory() as session:
+        migration = await current_migration(session)
+    if migration is None:
+        sys.exit("no re-embedding migration is in progress (use `start`)")
+    return migration
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    start = commands.add_parser("start")
+    start.add_argument("--backend", required=True, choices=["openai", "local"])
+    start.add_argument("--model")
+    start.add_argument("--dimensions", type=int)
+    run = commands.add_parser("run")
+    run.add_argument("--batch-size", type=int)
+    run.add_argument("--max-per-second", type=float)
+    for name in ("index", "switch", "cleanup", "status"):
+        commands.add_parser(name)
+    args = parser.parse_args()
+
+    async with async_session_factory() as session:
+        print(f"active model: {(await refresh_active_embedding_model(session))['embedding_model']}")
+
+    try:
+        if args.command == "start":
+            async with async_session_factory() as session:
+                migration = await start_migration(session, args.backend, args.model, args.dimensions)
+                await session.commit()
+            print(f"started migration {migration.id} -> {migration.target_model_id}")
+
+        elif args.command == "run":
+            migration = await _current()
+            written = await run_migration(
+                migration.id, batch_size=args.batch_size, max_per_second=args.max_per_second,
+            )
+            async with async_session_factory() as session:
+                migration = await session.get(EmbeddingMigration, migration.id)
+            print(f"migration {migration.id}: {written} traces processed, coverage complete")
+            if migration.failed_trace_ids:
+                print(
+                    f"{len(migration.failed_trace_ids)} traces failed to embed: "
+                    + ", ".join(str(i) for i in migration.failed_trace_ids)
+                )
+
+        elif args.command == "index":
+            migration = await _current()
+            built = await build_shadow_indexes(migration.id)
+            print(f"migration {migration.id}: built {', '.join(built) or 'nothing (all valid)'}")
+
+        elif args.command == "switch":
+            migration = await _current()
+            async with async_session_factory() as session:
+                migration = await session.merge(migration)
+                await switch_migration(session, migration)
+            print(f"switched to {migration.target_model_id}")
+
+        elif args.command == "cleanup":
+            async with async_session_factory() as session:
+                migration = await last_switched(session)
+                if migration is None:
+                    sys.exit("no switched migration to clean up")
+                cleared = await cleanup_migration(session, migration)
+            print(f"dropped previous columns; {cleared} stale traces queued for re-embedding")
+
+        elif args.command == "status":
+            async with async_session_factory() as session:
+                migration = await current_migration(session)
+                if migration is None:
+                    print("no migration in progress")
+                else:
+                    missing = await uncovered_count(session, migration)
+                    print(
+                        f"migration {migration.id} -> {migration.target_model_id}: "
+                        f"{migration.status}, {migration.embedded_count} embedded, "
+                        f"{missing} uncovered, {len(migration.failed_trace_ids)} failed, "
+                        f"checkpoint {migration.checkpoint_id}"
+                    )
+    except ValueError as exc:
+        sys.exit(str(exc))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
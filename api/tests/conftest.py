@@ -12,17 +12,23 @@ from typing import Any, Optional
 
 
 class FakeResult:
-    def __init__(self, scalar_value: Any = None, rows: Optional[list] = None):
+    def __init__(
+        self, scalar_value: Any = None, rows: Optional[list] = None, rowcount: int = 0
+    ):
         self._scalar = scalar_value
         self._rows = list(rows) if rows is not None else []
+        self.rowcount = rowcount
 
     def scalar(self): return self._scalar
     def scalar_one(self): return self._scalar
     def scalar_one_or_none(self): return self._scalar
     def fetchone(self): return self._rows[0] if self._rows else None
+    def first(self): return self._rows[0] if self._rows else None
+    def one(self): return self._rows[0]
     def fetchall(self): return list(self._rows)
     def all(self): return list(self._rows)
     def scalars(self): return self
+    def __iter__(self): return iter(self._rows)
 
 
 class FakeDbSession:
@@ -32,6 +38,7 @@ class FakeDbSession:
         self.executed: list = []
         self.commits: int = 0
         self.refreshed: list = []
+        self.info: dict = {}  # AsyncSession.info
 
     def add(self, obj): self.added.append(obj)
 
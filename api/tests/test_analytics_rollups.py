@@ -0,0 +1,137 @@
+"""Tests for the owner-dashboard analytics rollups and the endpoints reading them."""
+
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.config import settings
+from app.routers import analytics
+from app.services.analytics_rollups import (
+    INGEST_LAG,
+    _refresh_snapshots,
+    refresh_analytics_rollups,
+    refresh_window,
+)
+from tests.conftest import FakeDbSession, FakeResult
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def test_refresh_window_backfills_on_first_run(monkeypatch):
+    monkeypatch.setattr(settings, "analytics_backfill_days", 90)
+    assert refresh_window(None, date(2026, 3, 10)) == date(2025, 12, 10)
+
+
+def test_refresh_window_rechecks_the_day_before_the_watermark():
+    mark = datetime(2026, 3, 10, tzinfo=timezone.utc)
+    assert refresh_window(mark, date(2026, 3, 10)) == date(2026, 3, 9)
+
+
+async def test_refresh_recomputes_only_the_window_and_advances_watermark():
+    mark = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    db = FakeDbSession([
+        FakeResult(scalar_value=True),  # advisory lock
+        FakeResult(scalar_value=mark),
+        FakeResult(),
+        FakeResult(),
+        FakeResult(),
+        FakeResult(scalar_value=None),  # snapshot watermark
+    ])
+    result = await refresh_analytics_rollups(db)
+
+    assert result == {"days_recomputed": 2}
+    statements = [str(stmt) for stmt, _ in db.executed]
+    assert "pg_try_advisory_xact_lock" in statements[0]
+    assert "INSERT INTO analytics_daily" in statements[2]
+    assert db.executed[2][1]["since"] == mark.date() - timedelta(days=1)
+    assert "DELETE FROM analytics_tag_daily" in statements[3]
+    assert "INSERT INTO analytics_tag_daily" in statements[4]
+    assert "job_watermarks" in statements[-1]
+    assert db.commits == 0
+
+
+async def test_snapshots_advance_from_their_watermark():
+    since = NOW - timedelta(minutes=20)
+    db = FakeDbSession([FakeResult(scalar_value=since)])
+    await _refresh_snapshots(db, NOW)
+
+    statements = [str(stmt) for stmt, _ in db.executed]
+    # Only contributors with new or retrieved traces; row totals add deltas.
+    assert "last_retrieved_at > :changed" in statements[1]
+    assert "ON CONFLICT (user_id)" in statements[1]
+    assert not any("DELETE" in stmt for stmt in statements)
+    assert "value = g.value + d.delta" in statements[2]
+    assert db.executed[2][1] == {"since": since, "until": NOW - INGEST_LAG}
+    assert db.executed[3][1]["value"] == NOW - INGEST_LAG
+    assert "users_dau" in statements[4]
+
+
+async def test_first_snapshot_of_the_day_reconciles_in_full():
+    db = FakeDbSession([FakeResult(scalar_value=NOW - timedelta(days=1))])
+    await _refresh_snapshots(db, NOW)
+
+    statements = [str(stmt) for stmt, _ in db.executed]
+    assert "INSERT INTO analytics_contributors" in statements[1]
+    assert "WHERE contributor_id IN" not in statements[1]
+    assert "DELETE FROM analytics_contributors c WHERE NOT EXISTS" in statements[2]
+    assert "created_at <= :until" in statements[3]
+
+
+async def test_refresh_is_skipped_while_another_run_holds_the_lock():
+    db = FakeDbSession([FakeResult(scalar_value=False)])
+    assert await refresh_analytics_rollups(db) == {"skipped": True}
+    assert len(db.executed) == 1
+
+
+async def test_summary_reads_gauges_and_daily_sums(monkeypatch):
+    monkeypatch.setattr(analytics, "_utcnow", lambda: NOW)
+    monkeypatch.setattr(settings, "analytics_query_concurrency", 1)
+    gauges = [
+        SimpleNamespace(name="users_total", value=120, refreshed_at=NOW),
+        SimpleNamespace(name="traces_total", value=900, refreshed_at=NOW),
+        SimpleNamespace(name="retrievals_total", value=4000, refreshed_at=NOW),
+    ]
+    window = SimpleNamespace(
+        users_7d=4, users_30d=11, traces_7d=30, traces_30d=100, votes_7d=5,
+        amendments_7d=1, searches_7d=70, searches_30d=250, retrievals_7d=300,
+    )
+    db = FakeDbSession([FakeResult(rows=gauges), FakeResult(rows=[window])])
+    body = await analytics.get_summary(db)
+
+    assert len(db.executed) == 2
+    assert body["users"]["total"] == 120
+    assert body["users"]["new_30d"] == 11
+    assert body["users"]["mau"] == 0
+    assert body["traces"] == {
+        "total": 900, "new_7d": 30, "new_30d": 100, "total_retrievals": 4000,
+    }
+    assert body["searches"]["distinct_sessions_7d"] == 70
+    assert body["rollup_refreshed_at"] == NOW.isoformat()
+    assert body["rollups_pending"] is False
+
+
+async def test_dashboard_reads_never_refresh_the_rollups(monkeypatch):
+    monkeypatch.setattr(analytics, "_utcnow", lambda: NOW)
+    db = FakeDbSession([FakeResult(scalar_value=None), FakeResult(rows=[])])
+    body = await analytics.get_timeline(db, days=3)
+
+    assert db.commits == 0
+    assert not any("INSERT" in str(stmt) for stmt, _ in db.executed)
+    assert body["rollups_pending"] is True
+    assert [p["date"] for p in body["series"]] == [
+        "2026-03-07", "2026-03-08", "2026-03-09", "2026-03-10",
+    ]
+
+
+async def test_timeline_fills_missing_days_from_rollup(monkeypatch):
+    monkeypatch.setattr(analytics, "_utcnow", lambda: NOW)
+    row = SimpleNamespace(
+        day=date(2026, 3, 9), signups=2, traces=5, votes=1, search_sessions=8,
+    )
+    db = FakeDbSession([FakeResult(scalar_value=NOW), FakeResult(rows=[row])])
+    body = await analytics.get_timeline(db, days=2)
+
+    assert body["series"] == [
+        {"date": "2026-03-08", "signups": 0, "traces": 0, "votes": 0, "search_sessions": 0},
+        {"date": "2026-03-09", "signups": 2, "traces": 5, "votes": 1, "search_sessions": 8},
+        {"date": "2026-03-10", "signups": 0, "traces": 0, "votes": 0, "search_sessions": 0},
+    ]
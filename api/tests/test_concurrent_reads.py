@@ -0,0 +1,103 @@
+"""Tests for gather_reads: independent dashboard queries on separate sessions."""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.config import settings
+from app.routers import analytics
+from app.services import concurrent_reads
+from app.services.concurrent_reads import gather_reads
+from tests.conftest import FakeDbSession, FakeResult
+
+
+class SlowSession(FakeDbSession):
+    """A pooled session whose query takes `delay` seconds (like a real round trip)."""
+
+    def __init__(self, factory, rows):
+        super().__init__([FakeResult(rows=rows)])
+        self.factory = factory
+
+    async def execute(self, statement, params=None):
+        self.factory.active += 1
+        self.factory.peak = max(self.factory.peak, self.factory.active)
+        try:
+            sql = str(statement)
+            if "fail" in sql:
+                raise RuntimeError("boom")
+            await asyncio.sleep(self.factory.delay)
+            return await super().execute(statement, params)
+        finally:
+            self.factory.active -= 1
+
+    async def __aenter__(self):
+        self.factory.opened += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class SlowSessionFactory:
+    def __init__(self, delay=0.05, rows=None):
+        self.delay = delay
+        self.rows = rows if rows is not None else [("x", 1)]
+        self.opened = self.active = self.peak = 0
+
+    def __call__(self):
+        return SlowSession(self, self.rows)
+
+
+@pytest.fixture
+def factory(monkeypatch):
+    fake = SlowSessionFactory()
+    monkeypatch.setattr(concurrent_reads, "async_session_factory", fake)
+    monkeypatch.setattr(settings, "analytics_query_concurrency", 4)
+    return fake
+
+
+async def test_wall_clock_is_max_not_sum(factory):
+    queries = {f"q{i}": text(f"SELECT {i}") for i in range(4)}
+    started = time.perf_counter()
+    rows = await gather_reads(FakeDbSession(), queries)
+    elapsed = time.perf_counter() - started
+
+    assert list(rows) == ["q0", "q1", "q2", "q3"]
+    assert rows["q2"] == [("x", 1)]
+    assert factory.opened == 4
+    assert factory.peak == 4
+    assert elapsed < 4 * factory.delay * 0.75
+
+
+async def test_concurrency_is_capped(factory, monkeypatch):
+    monkeypatch.setattr(settings, "analytics_query_concurrency", 2)
+    await gather_reads(FakeDbSession(), {f"q{i}": text("SELECT 1") for i in range(5)})
+    assert factory.opened == 5
+    assert factory.peak == 2
+
+
+async def test_concurrency_one_stays_on_request_session(factory, monkeypatch):
+    monkeypatch.setattr(settings, "analytics_query_concurrency", 1)
+    db = FakeDbSession([FakeResult(rows=[(1,)]), FakeResult(rows=[(2,)])])
+    rows = await gather_reads(db, {"a": (text("SELECT :n"), {"n": 1}), "b": text("SELECT 2")})
+    assert rows == {"a": [(1,)], "b": [(2,)]}
+    assert db.executed[0][1] == {"n": 1}
+    assert factory.opened == 0
+
+
+async def test_first_failure_is_reraised(factory):
+    with pytest.raises(RuntimeError, match="boom"):
+        await gather_reads(FakeDbSession(), {"ok": text("SELECT 1"), "bad": text("SELECT fail")})
+
+
+async def test_platforms_runs_breakdowns_concurrently(factory):
+    factory.rows = [("claude-code", 7)]
+    body = await analytics.get_platforms(FakeDbSession())
+    assert factory.peak == 3
+    assert body == {
+        "platforms": [{"name": "claude-code", "users": 7}],
+        "versions": [{"name": "claude-code", "users": 7}],
+        "sources": [{"name": "claude-code", "users": 7}],
+    }
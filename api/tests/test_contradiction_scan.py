@@ -0,0 +1,81 @@
+"""Tests for the bounded, change-driven alternative/contradiction scan."""
+
+import uuid
+from types import SimpleNamespace
+
+from app.config import settings
+from app.services import contradiction
+from app.services.contradiction import score_cluster_pairs
+from tests.conftest import FakeDbSession, FakeResult
+
+
+class TestScoreClusterPairs:
+    def test_single_member_has_no_pairs(self):
+        assert score_cluster_pairs([uuid.uuid4()], [0.0], [[1.0, 0.0]]) == []
+
+    def test_only_divergent_pairs_are_returned(self):
+        a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        # a ~ b (same direction), c orthogonal to both.
+        pairs = score_cluster_pairs(
+            [a, b, c], [0.0, 0.0, 0.0], [[1.0, 0.0], [0.99, 0.05], [0.0, 1.0]]
+        )
+        assert {(x, y) for x, y, _ in pairs} == {(a, c), (b, c)}
+        assert all(t == "ALTERNATIVE_TO" for _, _, t in pairs)
+
+    def test_trust_conflict_is_a_contradiction(self):
+        a, b = uuid.uuid4(), uuid.uuid4()
+        pairs = score_cluster_pairs([a, b], [2.0, -1.0], [[1.0, 0.0], [0.0, 1.0]])
+        assert pairs == [(a, b, "CONTRADICTS")]
+
+
+class TestDetectAlternatives:
+    async def test_unchanged_clusters_short_circuit(self):
+        db = FakeDbSession([FakeResult(rows=[])])
+        assert await contradiction.detect_alternatives(db) == 0
+        assert len(db.executed) == 1
+
+    async def test_changed_cluster_scored_and_bulk_inserted(self):
+        cluster = uuid.uuid4()
+        a, b = uuid.uuid4(), uuid.uuid4()
+        changed = [SimpleNamespace(cluster_id=cluster, member_count=2, member_hash="h")]
+        members = [
+            SimpleNamespace(cluster_id=cluster, id=a, trust_score=0.0, vec="[1,0]"),
+            SimpleNamespace(cluster_id=cluster, id=b, trust_score=0.0, vec="[0,1]"),
+        ]
+        db = FakeDbSession([
+            FakeResult(rows=changed),
+            FakeResult(rows=members),
+            FakeResult(rowcount=0),
+            FakeResult(rowcount=2),
+            FakeResult(),
+        ])
+        assert await contradiction.detect_alternatives(db) == 2
+
+        # Stale edges among the re-scored members go before the insert.
+        delete_sql, delete_params = db.executed[2]
+        assert "DELETE FROM trace_relationships" in str(delete_sql)
+        assert delete_params["ids"] == [a, b]
+        assert delete_params["clusters"] == [cluster, cluster]
+        assert delete_params["src"] == [a, b]
+        insert_params = db.executed[3][1]
+        assert insert_params["src"] == [a, b]
+        assert insert_params["tgt"] == [b, a]
+        assert db.executed[4][1]["hashes"] == ["h"]
+
+    async def test_signature_covers_trust_band_and_embedding_time(self):
+        db = FakeDbSession([FakeResult(rows=[])])
+        await contradiction.detect_alternatives(db)
+        sql, params = db.executed[0]
+        assert "trust_score > :high" in str(sql) and "trust_score < :low" in str(sql)
+        assert "embedded_at" in str(sql)
+        assert params == {"high": contradiction.TRUST_HIGH, "low": contradiction.TRUST_LOW}
+
+    async def test_oversized_cluster_skipped_when_sampling_disabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "alternatives_max_cluster_size", 10)
+        monkeypatch.setattr(settings, "alternatives_sample_oversized", False)
+        changed = [SimpleNamespace(cluster_id=uuid.uuid4(), member_count=11, member_hash="h")]
+        db = FakeDbSession([FakeResult(rows=changed), FakeResult()])
+        assert await contradiction.detect_alternatives(db) == 0
+        # No member load, no inserts — only the signature upsert.
+        assert len(db.executed) == 2
+        assert "convergence_cluster_scans" in str(db.executed[1][0])
@@ -0,0 +1,91 @@
+"""Tests for batched convergence clustering (kNN helpers + cluster planning)."""
+
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services import convergence
+from app.services.convergence import plan_clusters
+from app.services.knn import parse_vector, top_k_cosine, unit_matrix
+from tests.conftest import FakeDbSession, FakeResult
+
+
+class TestKnnHelpers:
+    def test_parse_vector_text_form(self):
+        vec = parse_vector("[1,2.5,-3]")
+        assert vec.dtype == np.float32
+        assert vec.tolist() == [1.0, 2.5, -3.0]
+
+    def test_unit_matrix_normalises_rows_and_keeps_zero_rows(self):
+        m = unit_matrix([[3.0, 4.0], [0.0, 0.0]])
+        assert np.allclose(m[0], [0.6, 0.8])
+        assert np.allclose(m[1], [0.0, 0.0])
+
+    def test_top_k_matches_brute_force_and_skips_self(self):
+        rng = np.random.default_rng(7)
+        corpus = unit_matrix(rng.normal(size=(600, 16)))
+        queries = [0, 5, 599]
+        hits = top_k_cosine(corpus[queries], corpus, 4, self_index=queries)
+        for q, row in zip(queries, hits):
+            dist = 1.0 - corpus @ corpus[q]
+            dist[q] = np.inf
+            expected = np.argsort(dist)[:4].tolist()
+            assert [col for col, _ in row] == expected
+
+    def test_max_distance_filters_far_neighbours(self):
+        corpus = unit_matrix([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]])
+        hits = top_k_cosine(corpus[:1], corpus, 3, max_distance=0.15, self_index=[0])
+        assert [col for col, _ in hits[0]] == [1]
+
+
+class TestPlanClusters:
+    def test_fresh_component_gets_new_cluster(self):
+        plan = plan_clusters([("a", "b"), ("b", "c")], {"a": None, "b": None, "c": None})
+        assert len(plan) == 1
+        assert sorted(next(iter(plan.values()))) == ["a", "b", "c"]
+
+    def test_component_joins_majority_existing_cluster(self):
+        big, small = uuid.uuid4(), uuid.uuid4()
+        cluster_of = {"a": None, "b": big, "c": big, "d": small}
+        plan = plan_clusters([("a", "b"), ("a", "c"), ("a", "d")], cluster_of)
+        assert list(plan) == [big]
+
+    def test_components_sharing_a_cluster_are_merged(self):
+        existing = uuid.uuid4()
+        cluster_of = {"a": None, "b": existing, "x": None, "y": existing}
+        plan = plan_clusters([("a", "b"), ("x", "y")], cluster_of)
+        assert list(plan) == [existing]
+        assert sorted(plan[existing]) == ["a", "b", "x", "y"]
+
+
+class TestDetectConvergenceClusters:
+    async def test_no_unclustered_traces_is_a_single_query(self):
+        db = FakeDbSession([FakeResult(rows=[])])
+        assert await convergence.detect_convergence_clusters(db) == 0
+        assert len(db.executed) == 1
+
+    async def test_bulk_assignment_statement_count_is_constant(self, monkeypatch):
+        a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+        async def fake_neighbors(session, ids, **kwargs):
+            return [(a, b, 0.05), (b, c, 0.1)]
+
+        monkeypatch.setattr(convergence, "hnsw_neighbors", fake_neighbors)
+        node_rows = [
+            SimpleNamespace(id=t, convergence_cluster_id=None,
+                            context_fingerprint={"language": lang})
+            for t, lang in ((a, "python"), (b, "go"), (c, "python"))
+        ]
+        db = FakeDbSession([
+            FakeResult(rows=[a, b, c]),   # unclustered ids
+            FakeResult(rows=node_rows),  # node info
+        ])
+        assert await convergence.detect_convergence_clusters(db) == 3
+
+        # select ids + node info + assign UPDATE + level UPDATE
+        assert len(db.executed) == 4
+        assign_params = db.executed[2][1]
+        assert sorted(assign_params["ids"]) == sorted([a, b, c])
+        assert len(set(assign_params["cluster_ids"])) == 1
+        assert db.executed[3][1]["levels"] == [0]  # python + go → universal
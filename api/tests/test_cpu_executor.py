@@ -0,0 +1,77 @@
+"""Tests for the CPU executor and the submission preparation routed through it."""
+
+import asyncio
+import pickle
+import threading
+import time
+
+import pytest
+
+from app.schemas.trace import TraceCreate
+from app.services import cpu_executor
+from app.services.cpu_executor import CpuTaskTimeout, run_cpu
+from app.services.scanner import SecretDetectedError
+from app.services.submission import prepare_traces
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    """A fresh pool per test; yields a setter for the executor kind."""
+    monkeypatch.setattr(cpu_executor, "_executor", None)
+
+    def _configure(kind="thread", workers=1):
+        monkeypatch.setattr(cpu_executor.settings, "cpu_executor_kind", kind)
+        monkeypatch.setattr(cpu_executor.settings, "cpu_executor_workers", workers)
+
+    yield _configure
+    cpu_executor.shutdown_cpu_executor()
+
+
+def _fail():
+    raise ValueError("boom")
+
+
+async def test_runs_off_the_loop_thread_and_propagates_errors(executor):
+    executor()
+    assert await run_cpu("test", threading.get_ident) != threading.get_ident()
+    assert await run_cpu("test", divmod, 7, 2) == (3, 1)
+    with pytest.raises(ValueError, match="boom"):
+        await run_cpu("test", _fail)
+
+
+async def test_timeout_includes_queueing(executor):
+    executor(workers=1)
+    release = threading.Event()
+    blocker = asyncio.ensure_future(run_cpu("test", release.wait, 5))
+    await asyncio.sleep(0)  # let it take the worker
+    try:
+        # Queued behind the call occupying the only worker.
+        with pytest.raises(CpuTaskTimeout) as exc:
+            await run_cpu("queued", time.time, timeout=0.05)
+        assert exc.value.task == "queued"
+    finally:
+        release.set()
+        assert await blocker is True
+
+
+def test_errors_survive_pickling_for_process_pools():
+    error = pickle.loads(pickle.dumps(SecretDetectedError({"AWS Access Key"})))
+    assert error.secret_types == {"AWS Access Key"}
+    timeout = pickle.loads(pickle.dumps(CpuTaskTimeout("scan", 2.0)))
+    assert (timeout.task, timeout.timeout) == ("scan", 2.0)
+
+
+async def test_batch_preparation_runs_in_a_process_pool(executor):
+    executor(kind="process")
+    bodies = [
+        TraceCreate(
+            title="Pool timeout", context_text="asyncpg under load",
+            solution_text="```python\nimport asyncpg\n```", tags=["Python", "bad tag!"],
+        ),
+        TraceCreate(title="Leak", context_text="c", solution_text='password = "hunter2"'),
+    ]
+    prepared = await run_cpu("test", prepare_traces, bodies, timeout=60)
+    assert prepared == prepare_traces(bodies)
+    assert prepared[0].tag_names == ["python"]
+    assert prepared[0].fields["metadata_json"]["language"] == "python"
+    assert prepared[1].rejection.startswith("Content rejected")
@@ -0,0 +1,101 @@
+"""Tests for the pluggable embedding backends."""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services import embedding
+from app.services.embedding import (
+    OPENAI_DIMENSIONS,
+    OPENAI_MODEL,
+    EmbeddingBackend,
+    EmbeddingService,
+    EmbeddingSkippedError,
+    LocalBackend,
+    OpenAIBackend,
+    active_embedding_model,
+    pad_vector,
+)
+
+
+class _FakeModel:
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size, normalize_embeddings):
+        self.batches.append(list(texts))
+        return np.array([[len(t), 1.0, 0.0] for t in texts]) / 2
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = _FakeModel()
+    monkeypatch.setattr(embedding, "_get_local_model", lambda name, dim: model)
+    return model
+
+
+class TestLocalBackend:
+    async def test_batches_and_pads_to_storage_width(self, fake_model):
+        backend = LocalBackend(
+            "tiny-model", dimensions=0, batch_size=2, executor=ThreadPoolExecutor(2),
+        )
+        vectors, version = await backend.embed_batch(["a", "bb", "ccc"])
+        assert fake_model.batches == [["a", "bb"], ["ccc"]]
+        assert [len(v) for v in vectors] == [OPENAI_DIMENSIONS] * 3
+        assert [v[0] for v in vectors] == [0.5, 1.0, 1.5]
+        assert vectors[2][3:] == [0.0] * (OPENAI_DIMENSIONS - 3)
+        assert version == backend.model_id == "local/tiny-model"
+
+    def test_truncated_dimensions_get_their_own_model_id(self):
+        assert LocalBackend("m", dimensions=256).model_id == "local/m@256"
+
+    def test_wider_than_storage_is_rejected(self):
+        with pytest.raises(ValueError):
+            pad_vector([0.1] * (OPENAI_DIMENSIONS + 1))
+
+
+class TestEmbeddingService:
+    async def test_embed_tags_vectors_with_the_backend_model(self, fake_model, monkeypatch):
+        monkeypatch.setattr(embedding.LocalBackend, "available", lambda self: True)
+        svc = EmbeddingService(LocalBackend("tiny-model", dimensions=0, executor=ThreadPoolExecutor(1)))
+        vector, model_id, _ = await svc.embed("hello")
+        assert model_id == svc.model_id == "local/tiny-model"
+        assert vector[:2] == [2.5, 0.5]
+
+    async def test_unavailable_backend_skips(self, monkeypatch):
+        monkeypatch.setattr(settings, "openai_api_key", "")
+        svc = EmbeddingService(OpenAIBackend())
+        with pytest.raises(EmbeddingSkippedError):
+            await svc.embed("hello")
+
+    async def test_openai_batch_keeps_input_order(self, monkeypatch):
+        monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+        backend = OpenAIBackend()
+
+        async def create(input, model, dimensions):
+            data = [SimpleNamespace(index=i, embedding=[float(i)]) for i in range(len(input))]
+            return SimpleNamespace(data=data[::-1], model="text-embedding-3-small-v1")
+
+        backend._client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+        vectors, model_id, version = await EmbeddingService(backend).embed_batch(["a", "b"])
+        assert vectors == [[0.0], [1.0]]
+        assert (model_id, version) == (OPENAI_MODEL, "text-embedding-3-small-v1")
+
+
+def test_search_filters_on_the_active_backend_model(monkeypatch):
+    assert active_embedding_model() == OPENAI_MODEL
+    monkeypatch.setattr(settings, "embedding_backend", "local")
+    monkeypatch.setattr(settings, "local_embedding_model", "tiny-model")
+    monkeypatch.setattr(settings, "local_embedding_dimensions", 0)
+    assert active_embedding_model() == "local/tiny-model"
+
+
+def test_backend_without_embed_batch_fails_at_instantiation():
+    class Incomplete(EmbeddingBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="embed_batch"):
+        Incomplete()
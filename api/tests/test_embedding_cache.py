@@ -0,0 +1,152 @@
+"""Tests for content-addressed embedding reuse and the batched worker path."""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import embedding_cache, trace_embedding
+from app.services.embedding_cache import embed_cached, text_hash
+from app.services.trace_embedding import IndexUpdate, embed_traces, index_after_commit
+from app.worker.embedding_worker import process_batch
+from tests.conftest import FakeDbSession, FakeResult, make_trace
+
+
+class _FakeService:
+    model_id = "fake-model"
+
+    def __init__(self):
+        self.calls = []
+
+    async def embed_batch(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts], self.model_id, "fake-model-v1"
+
+
+@pytest.fixture(autouse=True)
+def _empty_memory_tier():
+    embedding_cache._memory.clear()
+    yield
+    embedding_cache._memory.clear()
+
+
+async def test_repeated_texts_are_embedded_once():
+    svc = _FakeService()
+    first = await embed_cached(svc, ["ctx", "solution", "ctx"])
+    assert svc.calls == [["ctx", "solution"]]
+    assert first[0] == first[2] == ([3.0, 1.0], "fake-model", "fake-model-v1")
+
+    again = await embed_cached(svc, ["solution"])
+    assert svc.calls == [["ctx", "solution"]]
+    assert again == [first[1]]
+
+
+async def test_database_tier_hits_skip_the_backend_and_misses_are_stored():
+    svc = _FakeService()
+    db = FakeDbSession([FakeResult(rows=[
+        SimpleNamespace(text_hash=text_hash("known"), embedding=[9.0, 9.0], model_version="old"),
+    ])])
+    result = await embed_cached(svc, ["known", "new"], db)
+
+    assert result == [([9.0, 9.0], "fake-model", "old"), ([3.0, 1.0], "fake-model", "fake-model-v1")]
+    assert svc.calls == [["new"]]
+    insert = db.executed[1][0].compile()
+    assert "ON CONFLICT DO NOTHING" in str(insert)
+    assert insert.params["text_hash_m0"] == text_hash("new")
+    assert "text_hash_m1" not in insert.params
+
+
+async def test_worker_embeds_a_batch_in_one_backend_call():
+    fingerprint = {"language": "python", "framework": "fastapi"}
+    traces = [
+        make_trace(embedding=None, context_embedding=None, solution_embedding=None,
+                   context_fingerprint=fingerprint, solution_text="pin the dependency version"),
+        make_trace(title="other trace", embedding=None, context_embedding=None,
+                   solution_embedding=[0.1], context_fingerprint=fingerprint, solution_text="pin the dependency version"),
+    ]
+    svc = _FakeService()
+    db = FakeDbSession()
+
+    embedded = await embed_traces(db, svc, traces)
+    assert embedded.processed == 2
+    (batch,) = svc.calls
+    # Two content texts, one shared context string, one solution.
+    assert len(batch) == 4
+    updates = [stmt for stmt, _ in db.executed if stmt.is_dml and stmt.table.name == "traces"]
+    assert len(updates) == 2
+    # The health-pair scan keys rescans on embedded_at.
+    assert all("embedded_at=now()" in str(stmt) for stmt in updates)
+    # Content vectors are handed back for the memory index, not applied yet.
+    assert [u.trace_id for u in embedded.index_updates] == [t.id for t in traces]
+
+
+class _TokenLimitedService(_FakeService):
+    """Rejects any batch containing a text longer than 100 characters."""
+
+    async def embed_batch(self, texts):
+        self.calls.append(list(texts))
+        if any(len(t) > 100 for t in texts):
+            raise ValueError("maximum context length exceeded")
+        return [[float(len(t)), 1.0] for t in texts], self.model_id, "fake-model-v1"
+
+
+async def test_one_oversized_text_does_not_fail_the_batch():
+    oversized = make_trace(embedding=None, context_embedding=None, solution_embedding=None,
+                           context_fingerprint=None, context_text="x" * 200,
+                           solution_text="pin the dependency version")
+    other = make_trace(embedding=None, context_embedding=None, solution_embedding=None,
+                       context_fingerprint=None, solution_text="bump the pool size to twenty")
+    svc = _TokenLimitedService()
+    db = FakeDbSession()
+
+    embedded = await embed_traces(db, svc, [oversized, other])
+
+    # One failed batch call, then one call per text.
+    assert len(svc.calls) == 1 + 4
+    assert embedded.processed == 2
+    assert [u.trace_id for u in embedded.index_updates] == [other.id]
+    updates = [stmt for stmt, _ in db.executed if stmt.is_dml and stmt.table.name == "traces"]
+    stored = [set(stmt.compile().params) for stmt in updates]
+    # The oversized trace keeps its solution vector; its content stays NULL.
+    assert "solution_embedding" in stored[0] and "embedding" not in stored[0]
+    assert {"embedding", "solution_embedding"} <= stored[1]
+
+
+async def test_worker_indexes_vectors_only_after_commit(monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        trace_embedding, "index_trace_embedding",
+        lambda trace_id, *args, **kwargs: events.append("index"),
+    )
+
+    class _Session(FakeDbSession):
+        async def commit(self):
+            events.append("commit")
+
+    trace = make_trace(embedding=None, context_embedding=None, solution_embedding=None,
+                       context_fingerprint=None, solution_text="pin the dependency version")
+    db = _Session([FakeResult(rows=[trace])])
+    assert await process_batch(db, _FakeService()) == 1
+    assert events == ["commit", "index"]
+
+
+async def test_index_after_commit_drops_rolled_back_updates(monkeypatch):
+    indexed = []
+    monkeypatch.setattr(
+        trace_embedding, "index_trace_embedding",
+        lambda trace_id, *args, **kwargs: indexed.append(trace_id),
+    )
+    update = IndexUpdate(uuid.uuid4(), [1.0, 0.0], "fake-model", False, None)
+
+    session = AsyncSession()
+    await session.begin()
+    index_after_commit(session, [update])
+    await session.rollback()
+    await session.commit()
+    assert indexed == []
+
+    session = AsyncSession()
+    index_after_commit(session, [update])
+    await session.commit()
+    assert indexed == [update.trace_id]
@@ -0,0 +1,81 @@
+"""Tests for the incremental, kNN-backed knowledge-health pair scan."""
+
+import uuid
+from types import SimpleNamespace
+
+from app.services import health_pairs
+from app.services.health import (
+    DIVERGENT_SOLUTION_DISTANCE,
+    DUP_DISTANCE,
+    SAME_PROBLEM_DISTANCE,
+)
+from app.services.health_pairs import CONFLICT, DUPLICATE, classify_pair
+from tests.conftest import FakeDbSession, FakeResult
+
+
+class TestClassifyPair:
+    def test_near_identical_is_duplicate(self):
+        assert classify_pair(DUP_DISTANCE / 2, 0.0, 0.9) == DUPLICATE
+
+    def test_same_problem_divergent_fix_is_conflict(self):
+        assert classify_pair(
+            DUP_DISTANCE, SAME_PROBLEM_DISTANCE / 2, DIVERGENT_SOLUTION_DISTANCE + 0.1
+        ) == CONFLICT
+
+    def test_same_problem_same_fix_is_nothing(self):
+        assert classify_pair(0.2, 0.1, 0.1) is None
+
+    def test_different_problem_is_nothing(self):
+        assert classify_pair(0.5, SAME_PROBLEM_DISTANCE, 0.9) is None
+
+
+async def test_sources_are_traces_whose_vectors_changed_since_their_scan():
+    db = FakeDbSession([FakeResult(rows=[])])
+    await health_pairs.refresh_health_pairs(db)
+    sql = str(db.executed[0][0])
+    assert "t.embedded_at > s.scanned_at" in sql
+    assert "updated_at" not in sql
+
+
+async def test_nothing_to_scan_short_circuits():
+    db = FakeDbSession([FakeResult(rows=[])])
+    assert await health_pairs.refresh_health_pairs(db) == {
+        "health_traces_scanned": 0, "health_pairs_found": 0,
+    }
+    assert len(db.executed) == 1
+
+
+async def test_scan_probes_knn_rescores_and_replaces_pairs(monkeypatch):
+    a, b, c, d = sorted(uuid.uuid4() for _ in range(4))
+    probes = []
+
+    async def fake_neighbors(session, ids, *, k, max_distance, column):
+        probes.append((column, max_distance))
+        return [(b, a, 0.05)] if column == "embedding" else [(b, c, 0.1)]
+
+    monkeypatch.setattr(health_pairs, "hnsw_neighbors", fake_neighbors)
+    scored = [
+        SimpleNamespace(a_id=a, b_id=b, dist=0.05, ctx_dist=0.05, sol_dist=0.05),
+        SimpleNamespace(a_id=b, b_id=c, dist=0.3, ctx_dist=0.1, sol_dist=0.6),
+        SimpleNamespace(a_id=b, b_id=d, dist=0.4, ctx_dist=0.4, sol_dist=0.4),
+    ]
+    db = FakeDbSession([
+        FakeResult(rows=[b]),                                  # sources
+        FakeResult(rows=[SimpleNamespace(a_id=b, b_id=d)]),   # stored pairs to recheck
+        FakeResult(rows=scored),
+    ])
+    assert await health_pairs.refresh_health_pairs(db) == {
+        "health_traces_scanned": 1, "health_pairs_found": 2,
+    }
+
+    assert probes == [
+        ("embedding", SAME_PROBLEM_DISTANCE),
+        ("context_embedding", SAME_PROBLEM_DISTANCE),
+    ]
+    score_params = db.executed[2][1]
+    assert list(zip(score_params["a"], score_params["b"])) == [(a, b), (b, c), (b, d)]
+    assert "DELETE FROM health_pairs" in str(db.executed[3][0])
+    insert_params = db.executed[4][1]
+    assert insert_params["kind"] == [DUPLICATE, CONFLICT]
+    assert "health_pair_scans" in str(db.executed[5][0])
+    assert db.executed[5][1]["ids"] == [b]
@@ -0,0 +1,85 @@
+"""Tests for the materialized knowledge-health report and its endpoints."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from fastapi import BackgroundTasks, Response
+
+from app.config import settings
+from app.routers import analytics
+from app.services import health_snapshot
+from tests.conftest import FakeDbSession, FakeResult
+
+REPORT = {"total_traces": 12, "health_score": 91}
+
+
+def _snapshot_row(age: timedelta):
+    return SimpleNamespace(payload=REPORT, generated_at=datetime.now(timezone.utc) - age)
+
+
+async def _fake_compute(session):
+    return dict(REPORT)
+
+
+def test_cache_control_allows_stale_while_revalidate(monkeypatch):
+    monkeypatch.setattr(settings, "knowledge_health_refresh_minutes", 10)
+    monkeypatch.setattr(settings, "knowledge_health_stale_while_revalidate_seconds", 900)
+    assert health_snapshot.cache_control() == (
+        "private, max-age=600, stale-while-revalidate=900"
+    )
+
+
+async def test_fresh_snapshot_served_without_recompute(monkeypatch):
+    monkeypatch.setattr(settings, "knowledge_health_refresh_minutes", 15)
+    row = _snapshot_row(timedelta(minutes=1))
+    db = FakeDbSession([FakeResult(rows=[row])])
+    response, tasks = Response(), BackgroundTasks()
+
+    body = await analytics.get_knowledge_health(db, response, tasks)
+
+    assert body == {
+        **REPORT, "generated_at": row.generated_at.isoformat(), "snapshot_pending": False,
+    }
+    assert len(db.executed) == 1
+    assert tasks.tasks == []
+    assert "stale-while-revalidate" in response.headers["Cache-Control"]
+
+
+async def test_stale_snapshot_served_and_revalidated_in_background(monkeypatch):
+    monkeypatch.setattr(settings, "knowledge_health_refresh_minutes", 15)
+    db = FakeDbSession([FakeResult(rows=[_snapshot_row(timedelta(hours=2))])])
+    tasks = BackgroundTasks()
+
+    body = await analytics.get_knowledge_health(db, Response(), tasks)
+
+    assert body["health_score"] == 91
+    assert db.commits == 0
+    assert [t.func for t in tasks.tasks] == [health_snapshot.refresh_in_background]
+
+
+async def test_first_load_is_pending_and_builds_in_background():
+    db = FakeDbSession([FakeResult(rows=[])])
+    response, tasks = Response(), BackgroundTasks()
+
+    body = await analytics.get_knowledge_health(db, response, tasks)
+
+    assert body == {"generated_at": None, "snapshot_pending": True}
+    assert len(db.executed) == 1 and db.commits == 0
+    assert [t.func for t in tasks.tasks] == [health_snapshot.refresh_in_background]
+    assert response.headers["Cache-Control"] == "no-store"
+
+
+async def test_force_refresh_recomputes(monkeypatch):
+    monkeypatch.setattr(health_snapshot, "compute_knowledge_health", _fake_compute)
+    db = FakeDbSession()
+    body = await analytics.refresh_knowledge_health(db, Response())
+    assert body["health_score"] == 91
+    assert db.commits == 1
+
+
+async def test_background_refresh_is_single_flight(monkeypatch):
+    monkeypatch.setattr(health_snapshot, "_refresh_in_flight", True)
+    opened = []
+    monkeypatch.setattr(health_snapshot, "async_session_factory", lambda: opened.append(1))
+    await health_snapshot.refresh_in_background()
+    assert opened == []
@@ -0,0 +1,123 @@
+"""Tests for the full-text lexical search leg and its fusion with vector hits."""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import app.routers.search as search_mod
+from app.config import settings
+from app.schemas.search import TraceSearchRequest
+from app.services import tag_index as tag_index_mod
+from app.services.lexical_search import fuse_lexical, lexical_search
+from app.services.tag_index import TagIndex
+from app.services.vector_search import SearchHit
+from tests.conftest import FakeDbSession, FakeResult, make_trace
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def _empty_tag_index(monkeypatch):
+    monkeypatch.setattr(tag_index_mod, "tag_index", TagIndex())
+
+
+class TestLexicalSearch:
+    async def test_ranks_tsv_matches_without_requiring_an_embedding(self):
+        a, b = uuid.uuid4(), uuid.uuid4()
+        db = FakeDbSession([FakeResult(rows=[
+            SimpleNamespace(id=a, rank=0.6), SimpleNamespace(id=b, rank=0.2),
+        ])])
+        ranked = await lexical_search(
+            db, '"ECONNRESET" -docker', limit=20, tags=["node"],
+            include_expired=False, now=NOW,
+        )
+        assert ranked == [(a, 0.6), (b, 0.2)]
+        sql, params = str(db.executed[0][0]), db.executed[0][1]
+        assert "websearch_to_tsquery('english', :q)" in sql
+        assert "t.search_tsv @@ query" in sql
+        assert "ORDER BY rank DESC" in sql
+        assert "embedding" not in sql
+        assert params["q"] == '"ECONNRESET" -docker'
+        assert params["limit"] == 20 and params["now"] == NOW
+        assert params["tags"] == ["node"] and params["tag_count"] == 1
+
+    async def test_tag_index_miss_skips_the_query(self, monkeypatch):
+        tag_index_mod.tag_index.ready = True
+        db = FakeDbSession()
+        assert await lexical_search(
+            db, "timeout", limit=20, tags=["unknown"], include_expired=True, now=NOW,
+        ) == []
+        assert db.executed == []
+
+
+class TestFuseLexical:
+    async def test_rrf_merges_both_rankings_and_hydrates_lexical_only_hits(self):
+        both, vector_only, lexical_only = make_trace(), make_trace(), make_trace()
+        hits = [SearchHit(vector_only, 0.1), SearchHit(both, 0.2)]
+        lexical = [(both.id, 0.9), (lexical_only.id, 0.5)]
+        db = FakeDbSession([FakeResult(rows=[lexical_only])])
+
+        fused = await fuse_lexical(db, hits, lexical, limit=10, include_expired=True, now=NOW)
+
+        assert [h.trace for h in fused] == [both, vector_only, lexical_only]
+        assert fused[0].distance == 0.2 and fused[2].distance == 1.0
+        assert fused[0].fused > fused[1].fused > fused[2].fused
+        k = settings.search_rrf_k
+        assert fused[0].fused == pytest.approx((1 / (k + 2) + 1 / (k + 1)) / (2 / (k + 1)))
+        assert len(db.executed) == 1
+
+    async def test_fallback_without_vector_hits_serves_the_lexical_ranking(self):
+        first, second = make_trace(), make_trace()
+        db = FakeDbSession([FakeResult(rows=[second, first])])
+        fused = await fuse_lexical(
+            db, [], [(first.id, 0.7), (second.id, 0.3)],
+            limit=10, include_expired=True, now=NOW,
+        )
+        assert [h.trace for h in fused] == [first, second]
+        assert fused[0].fused == pytest.approx(1.0)
+
+    async def test_no_lexical_matches_leaves_vector_hits_untouched(self):
+        hits = [SearchHit(make_trace(), 0.1)]
+        db = FakeDbSession()
+        assert await fuse_lexical(db, hits, [], limit=10, include_expired=True, now=NOW) is hits
+        assert db.executed == []
+
+
+class TestEmbeddingFallback:
+    async def test_backend_outage_falls_back_to_the_lexical_leg(self):
+        async def _outage():
+            raise ConnectionError("embedding provider unreachable")
+
+        assert await search_mod._await_embeddings(_outage(), lexical_fallback=True) is None
+        with pytest.raises(ConnectionError):
+            await search_mod._await_embeddings(_outage(), lexical_fallback=False)
+
+    async def test_lexical_leg_is_cancelled_when_the_search_fails(self, monkeypatch):
+        started = []
+
+        def _start(body, tags, now):
+            task = asyncio.create_task(asyncio.sleep(60))
+            started.append(task)
+            return task
+
+        async def _embed_query(q):
+            raise RuntimeError("embedding provider 500")
+
+        async def _run_search(db, body, *, query_vector, **_):
+            assert query_vector is None  # served from the lexical fallback
+            raise RuntimeError("vector query failed")
+
+        monkeypatch.setattr(search_mod, "_start_lexical_leg", _start)
+        monkeypatch.setattr(search_mod, "_embed_query", _embed_query)
+        monkeypatch.setattr(search_mod, "_run_search", _run_search)
+
+        with pytest.raises(RuntimeError, match="vector query failed"):
+            await search_mod.search_traces(
+                TraceSearchRequest(q="pool timeout"), SimpleNamespace(id=uuid.uuid4()),
+                FakeDbSession(), None,
+            )
+        await asyncio.sleep(0)
+        assert started[0].cancelled()
@@ -0,0 +1,71 @@
+"""Tests for pattern trace synthesis: anti-joined cluster query, bulk writes."""
+
+import uuid
+from types import SimpleNamespace
+
+from app.services import pattern_synthesis
+from app.services.pattern_synthesis import generate_pattern_traces
+from app.services.trace_embedding import EmbeddedTraces
+from tests.conftest import FakeDbSession, FakeResult, make_trace
+
+
+def _members(cluster_id, n, tag_ids):
+    return [
+        make_trace(
+            convergence_cluster_id=cluster_id,
+            trust_score=1.0 + i,
+            tags=[SimpleNamespace(id=t) for t in tag_ids],
+            metadata_json={"language": "python"},
+        )
+        for i in range(n)
+    ]
+
+
+async def test_no_qualifying_clusters():
+    db = FakeDbSession([FakeResult(rows=[])])
+    assert await generate_pattern_traces(db) == 0
+    assert "NOT EXISTS" in str(db.executed[0][0])
+
+
+async def test_patterns_written_with_multi_row_inserts():
+    c1, c2 = uuid.uuid4(), uuid.uuid4()
+    tag = uuid.uuid4()
+    clusters = [
+        SimpleNamespace(cluster_id=c1, member_count=3, avg_trust=1.0),
+        SimpleNamespace(cluster_id=c2, member_count=4, avg_trust=2.0),
+    ]
+    members = _members(c1, 3, [tag]) + _members(c2, 4, [tag])
+    db = FakeDbSession([FakeResult(rows=clusters), FakeResult(rows=members)])
+
+    assert await generate_pattern_traces(db) == 2
+
+    # cluster query + member load + one edge INSERT + one tag INSERT
+    assert len(db.executed) == 4
+    assert len(db.added) == 2
+    edge_sql = str(db.executed[2][0])
+    assert "trace_relationships" in edge_sql and "ON CONFLICT" in edge_sql
+    tag_sql = str(db.executed[3][0])
+    assert "trace_tags" in tag_sql
+
+    exemplar_titles = {p.title for p in db.added}
+    assert all(t.startswith("Pattern: ") for t in exemplar_titles)
+    # Highest-trust member leads the synthesized pattern.
+    pattern_c2 = next(p for p in db.added if p.convergence_cluster_id == c2)
+    assert pattern_c2.metadata_json["exemplar_id"] == str(members[-1].id)
+
+
+async def test_new_patterns_are_embedded_in_the_same_cycle(monkeypatch):
+    cluster = uuid.uuid4()
+    db = FakeDbSession([
+        FakeResult(rows=[SimpleNamespace(cluster_id=cluster, member_count=3, avg_trust=1.0)]),
+        FakeResult(rows=_members(cluster, 3, [])),
+    ])
+    embedded = []
+
+    async def fake_embed(session, svc, traces):
+        embedded.extend(traces)
+        return EmbeddedTraces(len(traces), [])
+
+    monkeypatch.setattr(pattern_synthesis, "embed_traces", fake_embed)
+    assert await generate_pattern_traces(db, embedder=object()) == 1
+    assert embedded == db.added
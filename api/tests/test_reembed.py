@@ -0,0 +1,175 @@
+"""Tests for the zero-downtime re-embedding pipeline."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import embedding, embedding_cache
+from app.services.embedding import OPENAI_MODEL, active_embedding_model
+from app.services.reembed import (
+    cleanup_migration,
+    reembed_batch,
+    refresh_active_embedding_model,
+    start_migration,
+    switch_migration,
+)
+from tests.conftest import FakeDbSession, FakeResult
+
+
+class _FakeService:
+    model_id = "local/tiny"
+
+    def __init__(self):
+        self.calls = []
+
+    async def embed_batch(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t))] for t in texts], self.model_id, "tiny-v2"
+
+
+class _Session(FakeDbSession):
+    rolled_back = False
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.fixture(autouse=True)
+def _isolated_model_state(monkeypatch):
+    monkeypatch.setattr(embedding, "_active_override", None)
+    embedding_cache._memory.clear()
+    yield
+    embedding_cache._memory.clear()
+
+
+def _migration(**overrides):
+    defaults = dict(
+        id=7, backend="local", local_model="tiny", local_dimensions=0,
+        target_model_id="local/tiny", status="embedding", checkpoint_id=None,
+        embedded_count=0, updated_at=None, switched_at=None, failed_trace_ids=[],
+    )
+    defaults.update(overrides)
+    return SimpleNamespace(**defaults)
+
+
+def _row(**overrides):
+    defaults = dict(
+        id=uuid.uuid4(), title="t", context_text="c",
+        solution_text="a solution long enough", context_fingerprint=None,
+    )
+    defaults.update(overrides)
+    return SimpleNamespace(**defaults)
+
+
+class TestReembedBatch:
+    async def test_writes_shadow_vectors_and_advances_the_checkpoint(self):
+        first, second = sorted([uuid.uuid4(), uuid.uuid4()])
+        rows = [
+            _row(id=first, context_fingerprint={"language": "python"}),
+            _row(id=second, solution_text="short"),
+        ]
+        db = _Session([FakeResult(rows=rows)])
+        migration = _migration(checkpoint_id=uuid.UUID(int=1), embedded_count=10)
+        svc = _FakeService()
+
+        assert await reembed_batch(db, migration, svc, batch_size=2) == 2
+
+        select_sql, select_params = str(db.executed[0][0]), db.executed[0][1]
+        assert "embedding_next_model_id IS DISTINCT FROM :target" in select_sql
+        assert select_params == {
+            "target": "local/tiny", "failed": [], "limit": 2, "after": uuid.UUID(int=1),
+        }
+        assert len(svc.calls) == 1  # the whole page in one backend call
+        updates = db.executed[-1][1]
+        assert [u["id"] for u in updates] == [first, second]
+        assert updates[0]["context_embedding"] is not None
+        assert updates[1]["solution_embedding"] is None
+        assert {u["model_id"] for u in updates} == {"local/tiny"}
+        assert migration.checkpoint_id == second
+        assert migration.embedded_count == 12
+
+    async def test_rejected_trace_is_recorded_and_skipped(self):
+        good, bad = sorted([uuid.uuid4(), uuid.uuid4()])
+        rows = [_row(id=good), _row(id=bad, context_text="x" * 200)]
+
+        class _TokenLimited(_FakeService):
+            async def embed_batch(self, texts):
+                if any(len(t) > 100 for t in texts):
+                    raise ValueError("maximum context length exceeded")
+                return await super().embed_batch(texts)
+
+        db = _Session([FakeResult(rows=rows)])
+        migration = _migration(failed_trace_ids=[uuid.UUID(int=5)])
+
+        assert await reembed_batch(db, migration, _TokenLimited(), batch_size=2) == 2
+
+        assert db.executed[0][1]["failed"] == [uuid.UUID(int=5)]
+        updates = db.executed[-1][1]
+        assert [u["id"] for u in updates] == [good]
+        assert migration.failed_trace_ids == [uuid.UUID(int=5), bad]
+        assert migration.checkpoint_id == bad
+        assert migration.embedded_count == 1
+
+    async def test_end_of_pass_writes_nothing(self):
+        db = _Session([FakeResult(rows=[])])
+        migration = _migration()
+        assert await reembed_batch(db, migration, _FakeService(), batch_size=50) == 0
+        assert len(db.executed) == 1 and migration.checkpoint_id is None
+
+
+class TestSwitch:
+    async def test_refuses_while_traces_are_uncovered(self):
+        db = _Session([FakeResult(), FakeResult(), FakeResult(scalar_value=3)])
+        migration = _migration(status="indexed")
+        with pytest.raises(ValueError, match="3 embedded traces"):
+            await switch_migration(db, migration)
+        assert db.rolled_back and db.commits == 0
+        assert migration.status == "indexed"
+        assert not any("RENAME" in str(stmt) for stmt, _ in db.executed)
+
+    async def test_swaps_columns_and_indexes_in_one_transaction(self):
+        db = _Session([FakeResult(), FakeResult(), FakeResult(scalar_value=0)])
+        migration = _migration(status="indexed")
+        await switch_migration(db, migration)
+
+        ddl = [str(stmt) for stmt, _ in db.executed]
+        assert ddl[1] == "LOCK TABLE traces IN ACCESS EXCLUSIVE MODE"
+        assert "RENAME COLUMN embedding TO embedding_prev" in ddl[3]
+        assert "RENAME COLUMN embedding_next TO embedding" in ddl[4]
+        assert "ALTER INDEX ix_traces_next_embedding_hnsw RENAME TO ix_traces_embedding_hnsw" in ddl
+        assert "DELETE FROM health_pair_scans" in ddl
+        assert "DELETE FROM convergence_cluster_scans" in ddl
+        assert db.commits == 1 and migration.status == "switched"
+        assert active_embedding_model() == "local/tiny"
+
+    async def test_requires_built_indexes(self):
+        with pytest.raises(ValueError, match="build the indexes"):
+            await switch_migration(_Session(), _migration(status="embedding"))
+
+
+async def test_start_refuses_the_active_model():
+    with pytest.raises(ValueError, match="already the active"):
+        await start_migration(_Session(), "openai")
+
+
+async def test_cleanup_waits_for_processes_to_refresh():
+    migration = _migration(status="switched", switched_at=datetime.now(timezone.utc))
+    with pytest.raises(ValueError):
+        await cleanup_migration(_Session(), migration)
+
+    migration.switched_at -= timedelta(hours=1)
+    db = _Session([FakeResult(rowcount=4)])
+    assert await cleanup_migration(db, migration) == 4
+    assert "DROP COLUMN IF EXISTS embedding_prev" in str(db.executed[1][0])
+
+
+async def test_processes_adopt_the_last_switched_model():
+    switched = _migration(status="switched", local_model="tiny", local_dimensions=256)
+    assert await refresh_active_embedding_model(_Session([FakeResult(scalar_value=switched)])) == {
+        "embedding_model": "local/tiny@256",
+    }
+    assert await refresh_active_embedding_model(_Session([FakeResult(scalar_value=None)])) == {
+        "embedding_model": OPENAI_MODEL,
+    }
@@ -0,0 +1,78 @@
+"""Tests for daily retrieval_logs partitions: naming, planning, migration DDL."""
+
+import importlib.util
+import io
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.services.partitions import (
+    partition_day,
+    partition_name,
+    partitions_to_create,
+    partitions_to_drop,
+)
+
+MIGRATION_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "migrations" / "versions" / "0027_partition_retrieval_logs.py"
+)
+
+
+def test_partition_name_round_trip():
+    assert partition_name(date(2026, 3, 7)) == "retrieval_logs_p20260307"
+    assert partition_day("retrieval_logs_p20260307") == date(2026, 3, 7)
+    assert partition_day("retrieval_logs_legacy") is None
+
+
+def test_only_missing_days_are_created():
+    existing = {partition_name(date(2026, 3, 7)), partition_name(date(2026, 3, 8))}
+    assert partitions_to_create(existing, date(2026, 3, 7), ahead=3) == [
+        date(2026, 3, 9), date(2026, 3, 10),
+    ]
+
+
+def test_partition_dropped_only_when_entirely_past_cutoff():
+    existing = {
+        partition_name(date(2026, 3, 1)),
+        partition_name(date(2026, 3, 2)),
+        "unrelated_table",
+    }
+    cutoff = datetime(2026, 3, 2, 12, tzinfo=timezone.utc)
+    # 03-02 still holds rows newer than the cutoff, so it survives.
+    assert partitions_to_drop(existing, cutoff) == ["retrieval_logs_p20260301"]
+
+
+def _emit(direction: str) -> str:
+    spec = importlib.util.spec_from_file_location("m0027", MIGRATION_PATH)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    assert mod.down_revision == "260a1b2c3d4e"
+
+    buf = io.StringIO()
+    ctx = MigrationContext.configure(
+        dialect_name="postgresql", opts={"as_sql": True, "output_buffer": buf}
+    )
+    ops = Operations(ctx)
+    ops._install_proxy()
+    try:
+        getattr(mod, direction)()
+    finally:
+        ops._remove_proxy()
+    return buf.getvalue().lower()
+
+
+def test_upgrade_creates_partitioned_table():
+    sql = _emit("upgrade")
+    assert "partition by range (retrieved_at)" in sql
+    assert "primary key (id, retrieved_at)" in sql
+    assert "partition of retrieval_logs" in sql
+    assert "drop table retrieval_logs_legacy" in sql
+
+
+def test_downgrade_restores_plain_table():
+    sql = _emit("downgrade")
+    assert "id uuid primary key" in sql
+    assert "drop table retrieval_logs_partitioned" in sql
@@ -0,0 +1,64 @@
+"""Tests for incremental RIF shadow detection (watermarked, one statement)."""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.services.rif import INGEST_LAG, MIN_CO_OCCURRENCE, detect_rif_shadows
+from tests.conftest import FakeDbSession, FakeResult
+
+
+async def test_window_starts_at_watermark_and_advances_it():
+    mark = datetime.now(timezone.utc) - timedelta(days=1)
+    db = FakeDbSession([
+        FakeResult(scalar_value=mark),
+        FakeResult(rows=[SimpleNamespace(pairs_upserted=7, shadow_count=2)]),
+        FakeResult(),
+    ])
+    assert await detect_rif_shadows(db) == 2
+
+    upsert_sql, params = db.executed[1]
+    assert "INSERT INTO rif_shadows" in str(upsert_sql)
+    assert "rif_shadows.loss_count + EXCLUDED.loss_count" in str(upsert_sql)
+    assert params["since"] == mark
+    assert params["min_count"] == MIN_CO_OCCURRENCE
+
+    watermark_sql, wm_params = db.executed[2]
+    assert "job_watermarks" in str(watermark_sql)
+    assert wm_params["value"] == params["until"]
+    assert datetime.now(timezone.utc) - params["until"] >= INGEST_LAG
+
+
+async def test_first_run_resumes_from_last_observed_shadow():
+    last_observed = datetime.now(timezone.utc) - timedelta(days=3)
+    db = FakeDbSession([
+        FakeResult(scalar_value=None),          # no watermark yet
+        FakeResult(scalar_value=last_observed),  # MAX(last_observed)
+        FakeResult(rows=[SimpleNamespace(pairs_upserted=0, shadow_count=0)]),
+        FakeResult(),
+    ])
+    assert await detect_rif_shadows(db) == 0
+    assert db.executed[2][1]["since"] == last_observed
+
+
+async def test_watermark_inside_ingest_lag_is_a_no_op():
+    db = FakeDbSession([FakeResult(scalar_value=datetime.now(timezone.utc))])
+    assert await detect_rif_shadows(db) == 0
+    assert len(db.executed) == 1
+
+
+async def test_conflict_target_matches_the_migrated_unique_index():
+    # Migration 0014 created the unique constraint unnamed, so only a
+    # column-list conflict target resolves on migrated databases.
+    db = FakeDbSession([
+        FakeResult(scalar_value=datetime.now(timezone.utc) - timedelta(days=1)),
+        FakeResult(rows=[SimpleNamespace(pairs_upserted=0, shadow_count=0)]),
+        FakeResult(),
+    ])
+    await detect_rif_shadows(db)
+    upsert_sql = str(db.executed[1][0])
+    assert "ON CONFLICT (loser_trace_id, winner_trace_id)" in upsert_sql
+    assert "ON CONSTRAINT" not in upsert_sql
+
+    migration = Path(__file__).parents[1] / "migrations/versions/0014_rif_tracking.py"
+    assert "UNIQUE(loser_trace_id, winner_trace_id)" in migration.read_text()
@@ -0,0 +1,160 @@
+"""Tests for POST /traces/search/batch and batched retrieval recording."""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import app.routers.search as search_mod
+from app.routers.search import _serialize_trace, search_traces_batch
+from app.schemas.search import TraceSearchBatchRequest
+from app.services import retrieval
+from app.services.retrieval import record_batch_retrievals
+from tests.conftest import FakeDbSession, FakeResult, make_trace
+
+
+class _PooledSession(FakeDbSession):
+    """A FakeDbSession usable as `async with async_session_factory()`."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def batch_env(monkeypatch):
+    """Stub the router's collaborators; returns what each of them saw."""
+    seen = SimpleNamespace(cost=None, texts=[], searches=[], recorded=[], misses=[])
+
+    async def _check_rate_limit(user, redis_client, bucket_type, app_settings, cost=1):
+        seen.cost = cost
+
+    async def _embed_cached(svc, texts, db=None):
+        seen.texts.append(list(texts))
+        return [([float(len(t))], "m", "m") for t in texts]
+
+    async def _run_search(db, body, *, query_vector, context_vector, lexical_task, **_):
+        seen.searches.append((body.q, query_vector, context_vector))
+        if body.q == "nothing":
+            return []
+        return [_serialize_trace(make_trace(title=body.q or "tagged"), similarity=0.5, combined=1.0)]
+
+    async def _record_batch(result_sets):
+        seen.recorded.append(result_sets)
+
+    async def _record_miss(q, tags, context):
+        seen.misses.append(q)
+
+    def _track(coro):
+        seen.pending.append(coro)
+
+    seen.pending = []
+    monkeypatch.setattr(search_mod, "check_rate_limit", _check_rate_limit)
+    monkeypatch.setattr(search_mod, "embed_cached", _embed_cached)
+    monkeypatch.setattr(search_mod, "_run_search", _run_search)
+    monkeypatch.setattr(search_mod, "record_batch_retrievals", _record_batch)
+    monkeypatch.setattr(search_mod, "record_search_miss", _record_miss)
+    monkeypatch.setattr(search_mod, "track_task", _track)
+    monkeypatch.setattr(search_mod, "async_session_factory", _PooledSession)
+    monkeypatch.setattr(search_mod.settings, "search_lexical_enabled", False)
+    return seen
+
+
+async def test_batch_shares_one_embedding_call_and_charges_per_search(batch_env):
+    body = TraceSearchBatchRequest(searches=[
+        {"q": "pool timeout"},
+        {"q": "nothing"},
+        {"tags": ["python"]},
+        {"q": "pool timeout", "mode": "multi_vector", "context": {"language": "python"}},
+    ])
+    db = FakeDbSession([FakeResult(rows=[]), FakeResult(rows=[])])
+
+    response = await search_traces_batch(body, SimpleNamespace(id=uuid.uuid4()), db, None)
+
+    assert batch_env.cost == 4
+    (texts,) = batch_env.texts
+    assert texts[:3] == ["pool timeout", "nothing", "pool timeout"]
+    assert len(texts) == 4  # plus the one context string
+    by_query = {q: (qv, cv) for q, qv, cv in batch_env.searches}
+    assert by_query[None] == (None, None)
+    assert by_query["nothing"][0] == [7.0]
+
+    assert [r.query for r in response.responses] == ["pool timeout", "nothing", None, "pool timeout"]
+    assert [r.total for r in response.responses] == [1, 0, 1, 1]
+    assert response.responses[3].results[0].title == "pool timeout"
+    # Related traces and contributor names: one query each for the whole batch.
+    assert len(db.executed) == 2
+
+    for coro in batch_env.pending:
+        await coro
+    (result_sets,) = batch_env.recorded
+    assert len(result_sets) == 3
+    assert batch_env.misses == ["nothing"]
+
+
+async def test_batch_validates_every_search_before_charging(batch_env):
+    body = TraceSearchBatchRequest(searches=[{"q": "ok"}, {"limit": 5}])
+    with pytest.raises(HTTPException) as exc:
+        await search_traces_batch(body, SimpleNamespace(id=uuid.uuid4()), FakeDbSession(), None)
+    assert exc.value.status_code == 422
+    assert "searches[1]" in exc.value.detail
+    assert batch_env.cost is None
+
+
+async def test_record_batch_retrievals_uses_one_session(monkeypatch):
+    sessions = []
+
+    def _factory():
+        sessions.append(_PooledSession())
+        return sessions[-1]
+
+    monkeypatch.setattr(retrieval, "async_session_factory", _factory)
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    await record_batch_retrievals([[a, b], [], [b, c]])
+
+    (db,) = sessions
+    assert db.commits == 1
+    update_stmt = db.executed[0][0]
+    assert update_stmt.is_dml and update_stmt.table.name == "traces"
+    log_rows = db.executed[1][1]
+    assert [row["trace_id"] for row in log_rows] == [str(a), str(b), str(b), str(c)]
+    assert log_rows[0]["search_session_id"] == log_rows[1]["search_session_id"]
+    assert log_rows[1]["search_session_id"] != log_rows[2]["search_session_id"]
+    # One pair per result set, both directions.
+    assert len(db.executed) == 2 + 4
+
+
+async def test_lexical_legs_are_bounded_and_cancelled_on_failure(batch_env, monkeypatch):
+    monkeypatch.setattr(search_mod.settings, "search_batch_concurrency", 2)
+    legs, running = [], []
+    peak = 0
+
+    def _start_leg(search, tags, now):
+        nonlocal peak
+        running.append(search.q)
+        peak = max(peak, len(running))
+        legs.append(asyncio.create_task(asyncio.sleep(3600)))
+        return legs[-1]
+
+    async def _run_search(db, body, *, lexical_task, **_):
+        await asyncio.sleep(0.01)
+        running.remove(body.q)
+        if body.q == "boom":
+            raise RuntimeError("search failed")
+        return []
+
+    monkeypatch.setattr(search_mod, "_start_lexical_leg", _start_leg)
+    monkeypatch.setattr(search_mod, "_run_search", _run_search)
+    body = TraceSearchBatchRequest(searches=[{"q": q} for q in ("a", "b", "boom", "c", "d")])
+
+    with pytest.raises(RuntimeError):
+        await search_traces_batch(body, SimpleNamespace(id=uuid.uuid4()), FakeDbSession(), None)
+
+    await asyncio.sleep(0)
+    assert peak <= 2
+    assert legs and all(leg.cancelled() for leg in legs)
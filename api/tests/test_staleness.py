@@ -0,0 +1,140 @@
+"""Tests for cached PyPI staleness checks against a local stand-in PyPI."""
+
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import staleness
+from app.services.staleness import (
+    check_library_staleness,
+    flag_stale_traces,
+    latest_version,
+    refresh_trace_staleness,
+)
+from tests.conftest import FakeDbSession, FakeResult
+
+RELEASES = {"fastapi": "0.110.2", "requests": "2.32.3"}
+
+
+class _PyPIHandler(BaseHTTPRequestHandler):
+    requests: list[str] = []
+
+    def do_GET(self):
+        type(self).requests.append(self.path)
+        name = self.path.strip("/").removesuffix("/json")
+        if name not in RELEASES:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.dumps({"info": {"version": RELEASES[name]}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+class _PooledSession(FakeDbSession):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+async def pypi(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PyPIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _PyPIHandler.requests = []
+    monkeypatch.setattr(staleness.settings, "pypi_base_url", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(staleness, "_latest", {})
+    monkeypatch.setattr(staleness, "_redis", None)
+    monkeypatch.setattr(staleness, "_client", None)
+    yield _PyPIHandler
+    await staleness.close_http_client()
+    server.shutdown()
+    server.server_close()
+
+
+async def test_versions_are_fetched_once_and_cached(pypi):
+    assert await check_library_staleness("fastapi", "0.95.0") is True
+    assert await check_library_staleness("FastAPI", "0.110.0") is False
+    assert pypi.requests == ["/fastapi/json"]
+
+
+async def test_unknown_packages_are_negatively_cached(pypi):
+    assert await check_library_staleness("no-such-package", "1.0") is False
+    assert await check_library_staleness("no_such.package", "1.0") is False
+    assert pypi.requests == ["/no-such-package/json"]
+
+
+async def test_redis_shares_versions_and_misses_across_processes(pypi):
+    shared = _FakeRedis()
+    staleness.set_version_cache_redis(shared)
+    assert await latest_version("requests") == "2.32.3"
+    assert await latest_version("missing") is None
+    assert shared.values == {"pypi:latest:requests": "2.32.3", "pypi:latest:missing": ""}
+
+    staleness._latest.clear()  # another process: cold memory, warm Redis
+    assert await latest_version("requests") == "2.32.3"
+    assert await latest_version("missing") is None
+    assert len(pypi.requests) == 2
+
+
+async def test_transient_failures_are_not_shared(monkeypatch, pypi):
+    shared = _FakeRedis()
+    staleness.set_version_cache_redis(shared)
+    monkeypatch.setattr(staleness.settings, "pypi_base_url", "http://127.0.0.1:9")  # nothing listens
+    assert await latest_version("fastapi") is None
+    assert shared.values == {}
+
+
+async def test_refresh_job_flags_stale_pairs_in_batches(monkeypatch, pypi):
+    monkeypatch.setattr(staleness.settings, "staleness_batch_size", 2)
+    db = FakeDbSession([
+        FakeResult(rows=[
+            SimpleNamespace(library="fastapi", version="0.95.0"),
+            SimpleNamespace(library="fastapi", version="0.110.0"),
+            SimpleNamespace(library="requests", version="2.20"),
+        ]),
+        FakeResult(rowcount=3),
+        FakeResult(rowcount=1),
+    ])
+
+    assert await refresh_trace_staleness(db) == {"pairs": 3, "stale_pairs": 2, "flagged": 4}
+    assert db.executed[1][1] == {"libraries": ["fastapi"], "versions": ["0.95.0"]}
+    assert db.executed[2][1] == {"libraries": ["requests"], "versions": ["2.20"]}
+    assert db.commits == 2
+    assert sorted(pypi.requests) == ["/fastapi/json", "/requests/json"]
+
+
+async def test_new_traces_are_flagged_in_the_background(monkeypatch, pypi):
+    sessions = []
+    monkeypatch.setattr(staleness, "async_session_factory", lambda: sessions.append(_PooledSession()) or sessions[-1])
+    old, current = uuid.uuid4(), uuid.uuid4()
+
+    await flag_stale_traces({old: ("fastapi", "0.95.0"), current: ("fastapi", "0.110.1")})
+
+    (db,) = sessions
+    assert db.executed[0][1] == {"ids": [old]}
+    assert db.commits == 1
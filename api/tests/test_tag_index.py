@@ -0,0 +1,102 @@
+"""Tests for the in-process tag → trace bitset index."""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.services import tag_index as tag_index_mod
+from app.services.tag_index import TagIndex, rebuild_tag_index, tag_candidates
+from tests.conftest import FakeDbSession, FakeResult
+
+
+@pytest.fixture
+def index(monkeypatch):
+    fresh = TagIndex()
+    monkeypatch.setattr(tag_index_mod, "tag_index", fresh)
+    return fresh
+
+
+def _ids(n):
+    return [uuid.uuid4() for _ in range(n)]
+
+
+class TestTagIndex:
+    def test_and_filter_matches_set_intersection(self, index):
+        ids = _ids(40)  # spans several bytes of each bitset
+        for i, trace_id in enumerate(ids):
+            tags = {"python"} | ({"fastapi"} if i % 3 == 0 else set()) | ({"docker"} if i % 2 else set())
+            index.set_tags(trace_id, tags)
+        assert index.resolve(["python"]) == ids
+        assert index.resolve(["python", "fastapi"]) == [t for i, t in enumerate(ids) if i % 3 == 0]
+        assert index.resolve(["fastapi", "docker"]) == [t for i, t in enumerate(ids) if i % 6 == 3]
+        assert index.resolve(["python", "unknown"]) == []
+        assert index.count("fastapi") == 14
+
+    def test_retag_and_remove_clear_old_bits(self, index):
+        a, b = _ids(2)
+        index.set_tags(a, ["python", "django"])
+        index.set_tags(b, ["python"])
+        index.set_tags(a, ["rust"])
+        assert index.resolve(["django"]) == []
+        assert index.resolve(["python"]) == [b]
+        index.remove(b)
+        assert index.resolve(["python"]) == []
+        assert len(index) == 1
+
+    def test_candidates_only_when_enabled_and_loaded(self, index, monkeypatch):
+        trace_id = uuid.uuid4()
+        index.set_tags(trace_id, ["python"])
+        assert tag_candidates(["python"]) is None
+        index.ready = True
+        assert tag_candidates(["python"]) == [trace_id]
+        monkeypatch.setattr(settings, "tag_index_enabled", False)
+        assert tag_candidates(["python"]) is None
+
+
+class TestRebuild:
+    async def test_rebuild_pages_and_replays_concurrent_changes(self, index, monkeypatch):
+        monkeypatch.setattr(tag_index_mod, "_REBUILD_PAGE", 2)
+        a, b, submitted = sorted(_ids(3))
+        tag_a, tag_b = uuid.uuid4(), uuid.uuid4()
+        stale = uuid.uuid4()
+        index.set_tags(stale, ["gone"])
+
+        class Session(FakeDbSession):
+            async def execute(self, statement, params=None):
+                if not self.executed:
+                    # A submission commits while the rebuild is reading.
+                    index.set_tags(submitted, ["python"])
+                return await super().execute(statement, dict(params))
+
+        db = Session([
+            FakeResult(rows=[
+                SimpleNamespace(trace_id=a, tag_id=tag_a, name="python"),
+                SimpleNamespace(trace_id=a, tag_id=tag_b, name="docker"),
+            ]),
+            FakeResult(rows=[SimpleNamespace(trace_id=b, tag_id=tag_a, name="python")]),
+        ])
+        result = await rebuild_tag_index(db)
+
+        assert result == {"tag_index_traces": 3, "tag_index_tags": 2}
+        assert index.ready and not index.rebuilding
+        assert set(index.resolve(["python"])) == {a, b, submitted}
+        assert index.resolve(["python", "docker"]) == [a]
+        assert index.resolve(["gone"]) == []
+        assert "WHERE" not in str(db.executed[0][0])
+        assert db.executed[1][1] == {"page": 2, "last_trace": a, "last_tag": tag_b}
+
+    async def test_failed_rebuild_keeps_the_old_index(self, index):
+        trace_id = uuid.uuid4()
+        index.set_tags(trace_id, ["python"])
+        index.ready = True
+
+        class Broken(FakeDbSession):
+            async def execute(self, statement, params=None):
+                raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await rebuild_tag_index(Broken())
+        assert not index.rebuilding
+        assert index.resolve(["python"]) == [trace_id]
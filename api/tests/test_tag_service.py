@@ -0,0 +1,68 @@
+"""Tests for single-statement tag resolution and linking."""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import tags as tags_mod
+from app.services.tags import clean_tags, resolve_tag_ids, tag_traces
+from tests.conftest import FakeDbSession, FakeResult
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache(monkeypatch):
+    monkeypatch.setattr(tags_mod, "_tag_ids", {})
+
+
+def test_clean_tags_normalizes_validates_and_dedupes_once():
+    assert clean_tags([" Python ", "python", "not valid!", "FastAPI", ""]) == ["python", "fastapi"]
+
+
+async def test_one_insert_and_one_select_then_cached():
+    created, existing = uuid.uuid4(), uuid.uuid4()
+    db = FakeDbSession([
+        FakeResult(rows=[SimpleNamespace(id=created, name="brand-new")]),
+        FakeResult(rows=[SimpleNamespace(id=existing, name="python")]),
+    ])
+
+    assert await resolve_tag_ids(db, ["brand-new", "python"]) == {
+        "brand-new": created, "python": existing,
+    }
+    insert = db.executed[0][0].compile()
+    assert "ON CONFLICT (name) DO NOTHING RETURNING" in str(insert)
+    assert "python" in str(db.executed[1][0].compile(compile_kwargs={"literal_binds": True}))
+    # Only the committed row is cached; this transaction's new tag may roll back.
+    assert tags_mod._tag_ids == {"python": existing}
+
+    again = FakeDbSession()
+    assert await resolve_tag_ids(again, ["python"]) == {"python": existing}
+    assert again.executed == []
+
+
+async def test_tags_created_earlier_in_the_transaction_are_not_cached():
+    created = uuid.uuid4()
+    db = FakeDbSession([
+        FakeResult(rows=[SimpleNamespace(id=created, name="new")]),
+        FakeResult(rows=[]),
+        FakeResult(rows=[SimpleNamespace(id=created, name="new")]),
+    ])
+    await resolve_tag_ids(db, ["new"])
+    assert await resolve_tag_ids(db, ["new"]) == {"new": created}
+    assert tags_mod._tag_ids == {}
+
+
+async def test_tag_traces_links_every_trace_in_one_insert():
+    tag_a, tag_b = uuid.uuid4(), uuid.uuid4()
+    t1, t2 = uuid.uuid4(), uuid.uuid4()
+    tags_mod._tag_ids.update({"a": tag_a, "b": tag_b})
+    db = FakeDbSession()
+
+    await tag_traces(db, {t1: ["a", "b"], t2: ["b"], uuid.uuid4(): []})
+
+    (stmt, _), = db.executed
+    params = stmt.compile().params
+    assert [(params[f"trace_id_m{i}"], params[f"tag_id_m{i}"]) for i in range(3)] == [
+        (t1, tag_a), (t1, tag_b), (t2, tag_b),
+    ]
+    assert "ON CONFLICT DO NOTHING" in str(stmt.compile())
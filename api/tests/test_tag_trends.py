@@ -0,0 +1,61 @@
+"""Tests for tag trend detection and the hourly rollup-backed window."""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.routers.tags import list_trending_tags
+from app.services.trends import (
+    MIN_GROWTH_RATE,
+    MIN_TRENDING_COUNT,
+    detect_tag_trends,
+    hourly_tag_trends,
+    refresh_tag_activity_rollup,
+)
+from tests.conftest import FakeDbSession, FakeResult, make_user
+
+
+async def test_detect_tag_trends_is_one_statement():
+    db = FakeDbSession([
+        FakeResult(rows=[SimpleNamespace(tags_evaluated=40, trending_count=3)]),
+    ])
+    assert await detect_tag_trends(db) == 3
+    assert len(db.executed) == 1
+    sql, params = db.executed[0]
+    assert "INSERT INTO tag_trends" in str(sql)
+    assert "ON CONFLICT (tag_name, period_end)" in str(sql)
+    assert params["min_growth"] == MIN_GROWTH_RATE
+    assert params["min_count"] == MIN_TRENDING_COUNT
+
+
+async def test_rollup_refresh_upserts_then_prunes(monkeypatch):
+    monkeypatch.setattr(settings, "tag_trends_hourly_window_hours", 6)
+    db = FakeDbSession([FakeResult(rowcount=12), FakeResult()])
+    assert await refresh_tag_activity_rollup(db) == 12
+    assert "ON CONFLICT (tag_name, bucket_start)" in str(db.executed[0][0])
+    assert "DELETE FROM tag_activity_hourly" in str(db.executed[1][0])
+    assert db.executed[1][1]["retention_hours"] == 12
+
+
+async def test_hourly_trends_read_from_rollup(monkeypatch):
+    monkeypatch.setattr(settings, "tag_trends_hourly_window_hours", 24)
+    db = FakeDbSession([
+        FakeResult(rows=[SimpleNamespace(
+            tag_name="fastapi", count_current=9, count_prior=2, growth_rate=4.5,
+        )]),
+    ])
+    trending = await hourly_tag_trends(db)
+    assert trending[0]["tag"] == "fastapi"
+    assert trending[0]["trace_count"] == 9
+    params = db.executed[0][1]
+    assert (params["current_start"] - params["prior_start"]).total_seconds() == 24 * 3600
+    assert "FROM tag_activity_hourly" in str(db.executed[0][0])
+
+
+async def test_hourly_window_disabled_returns_503(monkeypatch):
+    monkeypatch.setattr(settings, "tag_trends_hourly_enabled", False)
+    with pytest.raises(HTTPException) as exc:
+        await list_trending_tags(user=make_user(), db=FakeDbSession(), _rate=None, window="hourly")
+    assert exc.value.status_code == 503
@@ -0,0 +1,93 @@
+"""Tests for POST /traces/batch."""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import app.routers.traces as traces_mod
+import app.services.submission as submission_mod
+from app.routers.traces import submit_traces_batch
+from app.schemas.trace import TraceBatchCreate
+from app.services import tags as tags_mod
+from app.services.scanner import SecretDetectedError
+from tests.conftest import FakeDbSession, FakeResult, make_user
+
+
+@pytest.fixture
+def batch_env(monkeypatch):
+    seen = SimpleNamespace(cost=None, indexed={}, background=[])
+
+    async def _check_rate_limit(user, redis_client, bucket_type, app_settings, cost=1):
+        seen.cost = (bucket_type, cost)
+
+    def _scan(title, context_text, solution_text):
+        if "SECRET" in solution_text:
+            raise SecretDetectedError({"Secret Keyword"})
+
+    monkeypatch.setattr(traces_mod, "check_rate_limit", _check_rate_limit)
+    monkeypatch.setattr(submission_mod, "scan_trace_submission", _scan)
+    monkeypatch.setattr(traces_mod, "flag_stale_traces", lambda references: references)
+    monkeypatch.setattr(traces_mod, "track_task", seen.background.append)
+    monkeypatch.setattr(traces_mod, "index_trace_tags", lambda tid, names: seen.indexed.update({tid: names}))
+    monkeypatch.setattr(tags_mod, "_tag_ids", {})
+    return seen
+
+
+def _item(**overrides):
+    item = {"title": "t", "context_text": "c", "solution_text": "s"}
+    item.update(overrides)
+    return item
+
+
+async def test_accepts_valid_items_in_one_transaction_and_reports_rejections(batch_env):
+    user = make_user()
+    own, foreign = uuid.uuid4(), uuid.uuid4()
+    python_tag = uuid.uuid4()
+    db = FakeDbSession([
+        FakeResult(rows=[
+            SimpleNamespace(id=own, contributor_id=user.id),
+            SimpleNamespace(id=foreign, contributor_id=uuid.uuid4()),
+        ]),
+        FakeResult(),  # trace insert
+        FakeResult(rows=[SimpleNamespace(id=python_tag, name="python")]),
+    ])
+    body = TraceBatchCreate(traces=[
+        _item(tags=["Python", "python", "not valid!"],
+              metadata_json={"library": "fastapi", "library_version": "0.95.0"}),
+        _item(solution_text="SECRET=abc"),
+        _item(supersedes_trace_id=foreign),
+        _item(supersedes_trace_id=own),
+    ])
+
+    response = await submit_traces_batch(body, user, db, None)
+
+    assert batch_env.cost == ("write", 4)
+    assert [r.status for r in response.results] == ["pending", "rejected", "rejected", "pending"]
+    assert response.results[1].error.startswith("Content rejected")
+    assert response.results[2].error == "Can only supersede your own traces"
+    assert (response.accepted, response.rejected) == (2, 2)
+    assert db.commits == 1
+
+    statements = [(str(stmt), params) for stmt, params in db.executed]
+    trace_rows = statements[1][1]
+    assert [row["id"] for row in trace_rows] == [response.results[0].id, response.results[3].id]
+    assert trace_rows[0]["memory_temperature"] == "WARM"
+    assert "INSERT INTO tags" in statements[2][0]
+    link = db.executed[3][0].compile().params
+    assert (link["trace_id_m0"], link["tag_id_m0"]) == (response.results[0].id, python_tag)
+    assert "trace_id_m1" not in link
+    assert "valid_from = created_at" in statements[4][0]
+    assert statements[5][1] == [{"new_id": str(response.results[3].id), "old_id": str(own)}]
+    assert statements[6][1] == {"ids": [own]}
+    assert batch_env.indexed[response.results[0].id] == ["python"]
+    # Staleness is checked after commit, off the request path.
+    assert batch_env.background == [{response.results[0].id: ("fastapi", "0.95.0")}]
+
+
+async def test_nothing_is_written_when_every_item_is_rejected(batch_env):
+    db = FakeDbSession()
+    body = TraceBatchCreate(traces=[_item(solution_text="SECRET")])
+    response = await submit_traces_batch(body, make_user(), db, None)
+    assert response.accepted == 0
+    assert db.executed == [] and db.commits == 0
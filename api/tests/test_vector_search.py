@@ -0,0 +1,376 @@
+"""Tests for the pluggable vector-search backends and the in-process index."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services import tag_index as tag_index_mod
+from app.services import vector_search
+from app.services.embedding import OPENAI_MODEL
+from app.services.tag_index import TagIndex
+from app.services.vector_search import (
+    MemoryBackend,
+    MemoryVectorIndex,
+    PgvectorBackend,
+    SearchHit,
+    VectorSearchBackend,
+)
+from tests.conftest import FakeDbSession, FakeResult, make_trace
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def _index(vectors: dict) -> MemoryVectorIndex:
+    index = MemoryVectorIndex(dim=3, capacity=2)
+    for trace_id, vec in vectors.items():
+        index.upsert(trace_id, vec)
+    index.ready = True
+    return index
+
+
+class TestMemoryVectorIndex:
+    def test_nearest_first_with_cosine_distance(self):
+        a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        index = _index({a: [1, 0, 0], b: [1, 1, 0], c: [0, 0, 1]})  # grows past capacity 2
+        hits = index.search([2, 0, 0], 2, now=NOW, include_expired=True)
+        assert [h[0] for h in hits] == [a, b]
+        assert hits[0][1] == pytest.approx(0.0, abs=1e-6)
+        assert hits[1][1] == pytest.approx(1 - 1 / np.sqrt(2), abs=1e-6)
+
+    def test_matches_numpy_reference(self):
+        rng = np.random.default_rng(7)
+        ids = [uuid.uuid4() for _ in range(300)]
+        vecs = rng.normal(size=(300, 3)).astype(np.float32)
+        index = _index(dict(zip(ids, vecs)))
+        query = rng.normal(size=3)
+        unit = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+        expected = np.argsort(-(unit @ (query / np.linalg.norm(query))))[:10]
+        hits = index.search(query, 10, now=NOW, include_expired=True)
+        assert [h[0] for h in hits] == [ids[i] for i in expected]
+
+    def test_flagged_removed_and_expired_rows_are_masked(self):
+        a, b, c, d = (uuid.uuid4() for _ in range(4))
+        index = _index({a: [1, 0, 0], b: [1, 0.1, 0]})
+        index.upsert(c, [1, 0.05, 0], flagged=True)
+        index.upsert(d, [1, 0.02, 0], valid_until=NOW - timedelta(days=1))
+        index.remove(a)
+        assert [h[0] for h in index.search([1, 0, 0], 5, now=NOW, include_expired=False)] == [b]
+        assert [h[0] for h in index.search([1, 0, 0], 5, now=NOW, include_expired=True)] == [d, b]
+        assert len(index) == 2
+
+    def test_upsert_replaces_vector_in_place(self):
+        a, b = uuid.uuid4(), uuid.uuid4()
+        index = _index({a: [1, 0, 0], b: [0, 1, 0]})
+        index.upsert(a, [0, 0, 1])
+        assert index.search([0, 0, 1], 1, now=NOW, include_expired=True)[0][0] == a
+        assert len(index) == 2
+
+
+class TestMemoryBackend:
+    async def test_hydrates_only_top_k_in_distance_order(self):
+        near, far = make_trace(), make_trace()
+        index = _index({far.id: [0, 1, 0], near.id: [1, 0, 0]})
+        backend = MemoryBackend(index, PgvectorBackend())
+        # Hydration returns rows in arbitrary order; hits keep distance order.
+        db = FakeDbSession([FakeResult(rows=[far, near])])
+        hits = await backend.search(
+            db, [1, 0, 0], limit=2, tags=[], include_expired=True, now=NOW,
+        )
+        assert [h.trace for h in hits] == [near, far]
+        assert len(db.executed) == 1
+
+    async def test_rows_missing_at_hydration_are_dropped(self):
+        kept, gone = make_trace(), make_trace()
+        index = _index({kept.id: [1, 0, 0], gone.id: [1, 0.1, 0]})
+        db = FakeDbSession([FakeResult(rows=[kept])])  # e.g. flagged since last sync
+        hits = await MemoryBackend(index, PgvectorBackend()).search(
+            db, [1, 0, 0], limit=5, tags=[], include_expired=True, now=NOW,
+        )
+        assert hits == [SearchHit(kept, pytest.approx(0.0, abs=1e-6))]
+
+    async def test_tag_filter_without_tag_index_and_unloaded_index_defer_to_fallback(self):
+        calls = []
+
+        class Fallback(PgvectorBackend):
+            async def search(self, db, query_vector, **kwargs):
+                calls.append(kwargs["tags"])
+                return []
+
+        index = MemoryVectorIndex(dim=3)
+        backend = MemoryBackend(index, Fallback())
+        kwargs = dict(limit=5, include_expired=False, now=NOW)
+        await backend.search(FakeDbSession(), [1, 0, 0], tags=[], **kwargs)
+        index.ready = True
+        await backend.search(FakeDbSession(), [1, 0, 0], tags=["python"], **kwargs)
+        assert calls == [[], ["python"]]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_planner_state(monkeypatch):
+    monkeypatch.setattr(vector_search, "_eligible_counts", {})
+    monkeypatch.setattr(vector_search, "_observed_yield", vector_search._YieldTracker())
+
+
+def _counts(total: int, tagged: int | None = None) -> list:
+    results = [FakeResult(scalar_value=total)]
+    if tagged is not None:
+        results.append(FakeResult(scalar_value=tagged))
+    return results
+
+
+def _hit_rows(traces, start=0.1):
+    return [SimpleNamespace(Trace=t, distance=start + i / 100) for i, t in enumerate(traces)]
+
+
+class TestSearchPlanning:
+    def test_candidate_limit_scales_with_limit_and_caps(self):
+        assert vector_search.candidate_limit(10) == 100
+        assert vector_search.candidate_limit(1) == 10
+        assert vector_search.candidate_limit(50) == 200
+
+    def test_ef_search_grows_with_selectivity_and_yield(self):
+        assert vector_search.plan_ef_search(10, 1.0) == 40
+        assert vector_search.plan_ef_search(100, 1.0) == 100
+        assert vector_search.plan_ef_search(100, 0.25) == 400
+        assert vector_search.plan_ef_search(100, 0.25, observed_yield=0.5) == 800
+        assert vector_search.plan_ef_search(100, 0.01) == 1000
+
+    def test_yield_tracker_moves_toward_observed_ratio(self):
+        tracker = vector_search._YieldTracker(alpha=0.5)
+        tracker.observe("filtered", 5, 10)
+        assert tracker.get("filtered") == pytest.approx(0.75)
+        tracker.observe("filtered", 3, 0)  # nothing expected: ignored
+        assert tracker.get("filtered") == pytest.approx(0.75)
+        assert tracker.get("unfiltered") == 1.0
+
+    async def test_unfiltered_probe_sizes_ef_search_from_candidates(self):
+        traces = [make_trace() for _ in range(3)]
+        db = FakeDbSession(_counts(5000) + [FakeResult(), FakeResult(rows=_hit_rows(traces))])
+        hits = await PgvectorBackend(quantization="none").search(
+            db, [0.1] * 1536, limit=100, tags=[], include_expired=True, now=NOW,
+        )
+        assert [h.trace for h in hits] == traces
+        assert str(db.executed[1][0]) == "SET LOCAL hnsw.ef_search = 100"
+        assert "halfvec" not in str(db.executed[2][0])
+        # Fewer rows than limit, but plenty eligible: a shortfall, no retry
+        # without a tag filter.
+        assert len(db.executed) == 3
+        assert vector_search._observed_yield.get("unfiltered") < 1.0
+
+    async def test_selective_tags_raise_ef_search_and_use_semi_join(self):
+        traces = [make_trace() for _ in range(10)]
+        db = FakeDbSession(_counts(1000, 250) + [FakeResult(), FakeResult(rows=_hit_rows(traces))])
+        await PgvectorBackend(quantization="none").search(
+            db, [0.1] * 1536, limit=10, tags=["python"], include_expired=True, now=NOW,
+        )
+        assert db.executed[1][1]["tags"] == ["python"]
+        assert str(db.executed[2][0]) == "SET LOCAL hnsw.ef_search = 40"
+        sql = str(db.executed[3][0])
+        assert "GROUP BY trace_tags.trace_id" in sql and "traces.id IN" in sql
+        assert len(db.executed) == 4  # full yield, no retry
+
+    async def test_filtered_shortfall_retries_with_iterative_scan(self):
+        first, full = [make_trace() for _ in range(3)], [make_trace() for _ in range(10)]
+        db = FakeDbSession(
+            _counts(1000, 50)
+            + [FakeResult(), FakeResult(rows=_hit_rows(first)), FakeResult(), FakeResult(rows=_hit_rows(full))]
+        )
+        hits = await PgvectorBackend(quantization="none").search(
+            db, [0.1] * 1536, limit=10, tags=["rare"], include_expired=True, now=NOW,
+        )
+        assert [h.trace for h in hits] == full
+        assert str(db.executed[2][0]) == "SET LOCAL hnsw.ef_search = 200"
+        assert str(db.executed[4][0]) == "SET LOCAL hnsw.iterative_scan = strict_order"
+
+    async def test_counts_are_cached_between_queries(self):
+        db = FakeDbSession(_counts(1000, 50))
+        kwargs = dict(limit=10, tags=["python"], include_expired=True, now=NOW)
+        await PgvectorBackend(quantization="none").search(db, [0.1] * 1536, **kwargs)
+        executed = len(db.executed)
+        await PgvectorBackend(quantization="none").search(db, [0.1] * 1536, **kwargs)
+        assert not any("COUNT" in str(stmt) for stmt, _ in db.executed[executed:])
+
+
+class TestTagIndexPrefilter:
+    @pytest.fixture
+    def tags(self, monkeypatch):
+        index = TagIndex()
+        index.ready = True
+        monkeypatch.setattr(tag_index_mod, "tag_index", index)
+        return index
+
+    async def test_resolved_ids_replace_the_tag_join(self, tags):
+        python_only, both = make_trace(), make_trace()
+        tags.set_tags(python_only.id, ["python"])
+        tags.set_tags(both.id, ["python", "fastapi"])
+        db = FakeDbSession(_counts(1000, 1) + [FakeResult(), FakeResult(rows=_hit_rows([both]))])
+        hits = await PgvectorBackend(quantization="none").search(
+            db, [0.1] * 1536, limit=10, tags=["python", "fastapi"], include_expired=True, now=NOW,
+        )
+        assert [h.trace for h in hits] == [both]
+        assert db.executed[1][1]["ids"] == [both.id]
+        sql = str(db.executed[3][0])
+        assert "traces.id = ANY (:ids)" in sql and "trace_tags" not in sql
+
+    async def test_no_matching_trace_skips_the_database(self, tags):
+        db = FakeDbSession()
+        assert await PgvectorBackend().search(
+            db, [0.1] * 1536, limit=10, tags=["nope"], include_expired=True, now=NOW,
+        ) == []
+        assert db.executed == []
+
+    async def test_broad_filter_falls_back_to_semi_join(self, tags, monkeypatch):
+        monkeypatch.setattr(settings, "tag_index_max_candidates", 1)
+        for _ in range(2):
+            tags.set_tags(uuid.uuid4(), ["python"])
+        db = FakeDbSession(_counts(1000, 2))
+        await PgvectorBackend(quantization="none").search(
+            db, [0.1] * 1536, limit=10, tags=["python"], include_expired=True, now=NOW,
+        )
+        assert "ids" not in db.executed[1][1]
+        assert "GROUP BY trace_tags.trace_id" in str(db.executed[3][0])
+
+    async def test_quantized_probe_uses_any_ids(self, tags):
+        trace = make_trace()
+        tags.set_tags(trace.id, ["python"])
+        db = FakeDbSession(_counts(1000, 1))
+        await PgvectorBackend(quantization="halfvec").search(
+            db, [0.1] * 3, limit=10, tags=["python"], include_expired=True, now=NOW,
+        )
+        sql, params = str(db.executed[3][0]), db.executed[3][1]
+        assert "t.id = ANY(:ids)" in sql and params["ids"] == [trace.id]
+
+    async def test_memory_backend_masks_rows_by_tag(self, tags):
+        tagged, untagged = make_trace(), make_trace()
+        tags.set_tags(tagged.id, ["python"])
+        index = _index({untagged.id: [1, 0, 0], tagged.id: [0.5, 0.5, 0]})
+        db = FakeDbSession([FakeResult(rows=[tagged])])
+        hits = await MemoryBackend(index, PgvectorBackend()).search(
+            db, [1, 0, 0], limit=5, tags=["python"], include_expired=True, now=NOW,
+        )
+        assert [h.trace for h in hits] == [tagged]
+
+
+class TestMultiVector:
+    def test_rrf_rewards_agreement_across_legs(self):
+        a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        fused = vector_search.reciprocal_rank_fusion(
+            {"content": [a, b, c], "solution": [b, c], "context": [b]}, k=60,
+        )
+        assert [trace_id for trace_id, _ in fused] == [b, c, a]
+        assert fused[0][1] == pytest.approx((1 / 62 + 2 / 61) / (3 / 61))
+        single = vector_search.reciprocal_rank_fusion({"content": [a]}, k=60)
+        assert single == [(a, pytest.approx(1.0))]
+
+    async def test_legs_run_as_one_union_and_fuse(self):
+        shared, content_only, context_only = make_trace(), make_trace(), make_trace()
+        rows = [
+            SimpleNamespace(leg="content", id=content_only.id, distance=0.10),
+            SimpleNamespace(leg="content", id=shared.id, distance=0.20),
+            SimpleNamespace(leg="solution", id=shared.id, distance=0.15),
+            SimpleNamespace(leg="context", id=context_only.id, distance=0.05),
+            SimpleNamespace(leg="context", id=shared.id, distance=0.30),
+        ]
+        db = FakeDbSession(
+            _counts(1000) + [FakeResult(), FakeResult(rows=rows),
+                             FakeResult(rows=[content_only, context_only, shared])]
+        )
+        hits = await vector_search.multi_vector_search(
+            db, [0.1] * 3, [0.2] * 3, limit=100, tags=[], include_expired=False, now=NOW,
+        )
+        assert [h.trace for h in hits] == [shared, content_only, context_only]
+        assert hits[0].distance == pytest.approx(0.15)  # best leg distance
+        assert 0 < hits[2].fused == hits[1].fused < hits[0].fused <= 1  # tie keeps leg order
+
+        sql, params = str(db.executed[2][0]), db.executed[2][1]
+        assert sql.count("UNION ALL") == 2
+        assert "t.solution_embedding <=> CAST(:query" in sql
+        assert "t.context_embedding <=> CAST(:context" in sql
+        assert params["content_limit"] == 100 and params["solution_limit"] == 50
+        assert params["now"] == NOW
+
+    async def test_without_context_vector_only_two_legs_run(self):
+        db = FakeDbSession(_counts(1000, 10))
+        await vector_search.multi_vector_search(
+            db, [0.1] * 3, None, limit=20, tags=["python"], include_expired=True, now=NOW,
+        )
+        assert str(db.executed[3][0]) == "SET LOCAL hnsw.iterative_scan = strict_order"
+        sql, params = str(db.executed[4][0]), db.executed[4][1]
+        assert sql.count("UNION ALL") == 1 and "context" not in params
+        assert params["solution_limit"] == 20 and params["tags"] == ["python"]
+
+
+class TestQuantizedPgvector:
+    async def test_shortlists_from_compact_index_and_reranks_exactly(self):
+        near, far = make_trace(), make_trace()
+        candidates = [SimpleNamespace(id=near.id, distance=0.1), SimpleNamespace(id=far.id, distance=0.3)]
+        db = FakeDbSession(
+            _counts(1000, 2)
+            + [FakeResult(), FakeResult(rows=candidates), FakeResult(rows=[far, near])]
+        )
+        backend = PgvectorBackend(quantization="halfvec", rescore_factor=10)
+        hits = await backend.search(
+            db, [0.1] * 3, limit=5, tags=["python", "fastapi"], include_expired=False, now=NOW,
+        )
+        assert hits == [SearchHit(near, 0.1), SearchHit(far, 0.3)]
+
+        # 50 shortlist rows at 2/1000 selectivity: ef_search at its ceiling.
+        assert str(db.executed[2][0]) == "SET LOCAL hnsw.ef_search = 1000"
+        sql, params = str(db.executed[3][0]), db.executed[3][1]
+        assert "CAST(t.embedding AS halfvec(1536)) <=> CAST(:query AS halfvec(1536))" in sql
+        assert "ORDER BY distance" in sql
+        assert params["candidates"] == 50 and params["limit"] == 5
+        assert params["tags"] == ["python", "fastapi"] and params["tag_count"] == 2
+        assert params["now"] == NOW
+
+    async def test_binary_mode_orders_by_hamming(self, monkeypatch):
+        monkeypatch.setattr(settings, "vector_quantization", "binary")
+        monkeypatch.setattr(settings, "vector_rescore_factor", 4)
+        db = FakeDbSession(_counts(0))
+        assert await PgvectorBackend().search(
+            db, [0.1] * 3, limit=50, tags=[], include_expired=True, now=NOW,
+        ) == []
+        assert str(db.executed[1][0]) == "SET LOCAL hnsw.ef_search = 200"
+        sql, params = str(db.executed[2][0]), db.executed[2][1]
+        assert "binary_quantize(t.embedding)" in sql and "<~>" in sql
+        assert "tags" not in params and "now" not in params
+        assert len(db.executed) == 3  # nothing to hydrate, nothing eligible
+
+
+def test_backend_selected_by_setting(monkeypatch):
+    monkeypatch.setattr(settings, "vector_search_backend", "memory")
+    assert vector_search.get_search_backend().name == "memory"
+    monkeypatch.setattr(settings, "vector_search_backend", "pgvector")
+    assert vector_search.get_search_backend().name == "pgvector"
+
+
+def test_backend_without_search_fails_at_instantiation():
+    class Incomplete(VectorSearchBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="search"):
+        Incomplete()
+
+
+async def test_sync_applies_updates_and_drops_unembedded(monkeypatch):
+    index = MemoryVectorIndex(dim=3)
+    monkeypatch.setattr(vector_search, "vector_index", index)
+    kept, cleared = uuid.uuid4(), uuid.uuid4()
+    index.upsert(cleared, [1, 0, 0])
+    index.ready = True
+    index.synced_through = NOW
+
+    rows = [
+        SimpleNamespace(id=kept, embedding="[0,1,0]", embedding_model_id=OPENAI_MODEL,
+                        is_flagged=False, valid_until=None),
+        SimpleNamespace(id=cleared, embedding=None, embedding_model_id=None,
+                        is_flagged=False, valid_until=None),
+    ]
+    db = FakeDbSession([FakeResult(rows=rows)])
+    result = await vector_search.sync_vector_index(db)
+    assert result == {"vector_index_synced": 2, "vector_index_size": 1}
+    assert index.search([0, 1, 0], 5, now=NOW, include_expired=True)[0][0] == kept